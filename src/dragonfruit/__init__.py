@@ -1 +1,10 @@
-﻿from harlequin import *
+﻿from typing import Any
+
+import harlequin
+
+__all__ = harlequin.__all__
+
+
+def __getattr__(name: str) -> Any:
+    # re-export lazily, so importing the entry point doesn't import the TUI
+    return getattr(harlequin, name)
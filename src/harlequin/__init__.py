@@ -1,11 +1,15 @@
-﻿from harlequin.adapter import HarlequinAdapter, HarlequinConnection, HarlequinCursor
-from harlequin.app import Harlequin
+﻿from typing import TYPE_CHECKING, Any
+
+from harlequin.adapter import HarlequinAdapter, HarlequinConnection, HarlequinCursor
 from harlequin.autocomplete import HarlequinCompletion
 from harlequin.keymap import HarlequinKeyBinding, HarlequinKeyMap
-from harlequin.keys_app import HarlequinKeys
 from harlequin.options import HarlequinAdapterOption, HarlequinCopyFormat
 from harlequin.transaction_mode import HarlequinTransactionMode
 
+if TYPE_CHECKING:
+    from harlequin.app import Harlequin
+    from harlequin.keys_app import HarlequinKeys
+
 __all__ = [
   
     "HarlequinAdapter",
@@ -19,3 +23,17 @@ __all__ = [
     "HarlequinKeyMap",
     "HarlequinKeyBinding",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    # the Textual apps are imported on first use, so adapters and headless
+    # mode don't pay to import them
+    if name == "Harlequin":
+        from harlequin.app import Harlequin
+
+        return Harlequin
+    elif name == "HarlequinKeys":
+        from harlequin.keys_app import HarlequinKeys
+
+        return HarlequinKeys
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
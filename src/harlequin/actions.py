@@ -80,7 +80,13 @@ HARLEQUIN_ACTIONS = {
     "refresh_catalog": Action(
         target=None, action="refresh_catalog", description="Refresh Data Catalog"
     ),
+    "search_catalog": Action(
+        target=None, action="search_catalog", description="Search Data Catalog"
+    ),
     "run_query": Action(target=None, action="run_query", description="Run Query"),
+    "profile_query": Action(
+        target=None, action="profile_query", description="Profile Query"
+    ),
     "cancel_query": Action(
         target=None, action="cancel_query", description="Cancel Query"
     ),
@@ -310,6 +316,34 @@ HARLEQUIN_ACTIONS = {
         target=ResultsTable, action="cursor_table_end(True)"
     ),
     "results_viewer.select_all": Action(target=ResultsTable, action="select_all"),
+    # Sorting and filtering
+    "results_viewer.sort_ascending": Action(
+        target=ResultsViewer,
+        action="sort('ascending')",
+        description="Sort Asc",
+        show=True,
+    ),
+    "results_viewer.sort_descending": Action(
+        target=ResultsViewer, action="sort('descending')", description="Sort Desc"
+    ),
+    "results_viewer.filter": Action(
+        target=ResultsViewer, action="filter", description="Filter", show=True
+    ),
+    "results_viewer.reset_transforms": Action(
+        target=ResultsViewer, action="reset_transforms", description="Reset Sort"
+    ),
+    "results_viewer.cancel_transform": Action(
+        target=ResultsViewer, action="cancel_transform"
+    ),
+    "results_viewer.toggle_profile": Action(
+        target=ResultsViewer, action="toggle_profile", description="Profile"
+    ),
+    "results_viewer.diff_tabs": Action(
+        target=ResultsViewer, action="diff_tabs", description="Diff Tabs"
+    ),
+    "results_viewer.view_cell": Action(
+        target=ResultsViewer, action="view_cell", description="View Cell"
+    ),
     # Scoped duplicates of app actions
     "results_viewer.focus_query_editor": Action(
         target=ResultsViewer, action="focus_query_editor"
@@ -326,4 +360,7 @@ HARLEQUIN_ACTIONS = {
     "history_screen.cancel": Action(
         target=HistoryScreen, action="cancel", description="Cancel"
     ),
+    "history_screen.view_profile": Action(
+        target=HistoryScreen, action="view_profile", description="View Profile"
+    ),
 }
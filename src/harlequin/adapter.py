@@ -2,15 +2,19 @@
 
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Any, Sequence
+from typing import TYPE_CHECKING, Any, Iterator, Sequence
 
-from textual_fastdatatable.backend import AutoBackendType
+from textual_fastdatatable.backend import ArrowBackend, AutoBackendType, create_backend
 
 from harlequin.autocomplete.completion import HarlequinCompletion
 from harlequin.catalog import Catalog
 from harlequin.options import HarlequinAdapterOption, HarlequinCopyFormat
+from harlequin.query_profile import QueryProfile
 from harlequin.transaction_mode import HarlequinTransactionMode
 
+if TYPE_CHECKING:
+    import pyarrow as pa
+
 
 class HarlequinCursor(ABC):
     @abstractmethod
@@ -43,6 +47,36 @@ class HarlequinCursor(ABC):
         """
         pass
 
+    def set_max_value_length(self, length: int) -> "HarlequinCursor":
+        """
+        Truncates long string and binary values for future calls to fetchall(),
+        so that huge values (like JSON documents or BLOBs) aren't transferred
+        and held in memory just to be shown in a table cell. Values should be
+        truncated by the database, to their first length + 1 characters (or
+        bytes), so Harlequin can tell which values were truncated: those longer
+        than length. Harlequin fetches the full value with
+        HarlequinConnection.fetch_value() when the user opens a cell.
+
+        The default implementation does not truncate values.
+
+        Args:
+            length (int): The maximum length of values that are returned
+            in full by future calls to fetchall().
+
+        Returns: HarlequinCursor, either a reference to self or a new
+            cursor with the truncation applied.
+        """
+        return self
+
+    def truncated_columns(self) -> list[int]:
+        """
+        Returns the indexes of the columns whose values may be truncated by
+        set_max_value_length().
+
+        Returns: list[int]
+        """
+        return []
+
     @abstractmethod
     def fetchall(self) -> AutoBackendType | None:
         """
@@ -60,6 +94,28 @@ class HarlequinCursor(ABC):
         """
         pass
 
+    def fetch_record_batches(
+        self, batch_size: int = 10_000
+    ) -> Iterator[pa.RecordBatch]:
+        """
+        Yields the cursor's result set as Arrow record batches of up to
+        batch_size rows, so the results can be written out without holding
+        all of them in memory (e.g., by Harlequin's headless mode). If
+        set_limit is called first, only the limited number of records are
+        yielded. Yields nothing if the query returns no rows.
+
+        The default implementation loads the entire result set with fetchall();
+        adapters should override it to stream batches from the database.
+
+        Returns: Iterator[pyarrow.RecordBatch]
+        """
+        data = self.fetchall()
+        if data is None:
+            return
+        backend = create_backend(data)
+        assert isinstance(backend, ArrowBackend)
+        yield from backend.source_data.to_batches(max_chunksize=batch_size)
+
 
 class HarlequinConnection(ABC):
     """
@@ -110,6 +166,42 @@ class HarlequinConnection(ABC):
         """
         pass
 
+    def get_catalog_fingerprints(self) -> dict[str, str]:
+        """
+        Returns a cheap fingerprint of each part of the catalog that can be
+        refreshed separately (e.g., each schema), keyed by the
+        qualified_identifier of that part's CatalogItem. A fingerprint must
+        change when any object in that part is created, dropped, or altered.
+
+        Harlequin shows the catalog from its cache when it starts, and
+        compares the cached fingerprints to these to decide which parts to
+        refresh with refresh_catalog().
+
+        Returns: dict[str, str]
+
+        Raises: NotImplementedError if the adapter does not provide this optional
+            functionality. Harlequin then refreshes the entire catalog.
+        """
+        raise NotImplementedError
+
+    def refresh_catalog(self, catalog: Catalog, changed: set[str]) -> Catalog:
+        """
+        Returns an updated copy of catalog (e.g., one loaded from Harlequin's
+        cache), where the parts whose fingerprints are in changed are
+        fetched again. That includes parts that have been added or dropped
+        since catalog was built. Other parts may be reused from catalog.
+
+        The default implementation fetches the entire catalog again.
+
+        Args:
+            catalog (Catalog): The catalog to be updated.
+            changed (set[str]): The keys of the fingerprints returned by
+                get_catalog_fingerprints() that have changed.
+
+        Returns: Catalog
+        """
+        return self.get_catalog()
+
     def get_completions(self) -> list[HarlequinCompletion]:
         """
         Returns a list of extra completions to make available to the Query Editor's
@@ -143,6 +235,92 @@ class HarlequinConnection(ABC):
         """
         raise NotImplementedError
 
+    def cancel_copy(self) -> None:
+        """
+        Interrupts any in-progress calls to copy(), without canceling other
+        queries. Harlequin calls this from the main thread when the user
+        cancels an export. The default does nothing.
+        """
+        return None
+
+    def profile(self, query: str) -> QueryProfile:
+        """
+        Runs query with the database's profiler (or query planner) enabled,
+        and returns the plan as a tree of operators, with timings and
+        cardinalities where the database reports them.
+
+        Args:
+            query (str): The text of a single query to be profiled.
+
+        Returns: QueryProfile
+
+        Raises:
+            NotImplementedError if the adapter does not provide this optional
+                functionality.
+            HarlequinQueryError for all other exceptions during profiling.
+        """
+        raise NotImplementedError
+
+    def count_rows(self, query: str) -> int:
+        """
+        Returns the number of records that query returns, without any limit.
+        Harlequin calls this from a background thread, after a limited query's
+        results have been loaded, so it must not block or be blocked by
+        queries run with execute().
+
+        Args:
+            query (str): The text of a single query, as passed to execute().
+
+        Returns: int
+
+        Raises:
+            NotImplementedError if the adapter does not provide this optional
+                functionality.
+            HarlequinQueryError for all other exceptions, including if the count
+                is canceled.
+        """
+        raise NotImplementedError
+
+    def fetch_value(
+        self, query: str, row: int, column: int, preview: Any = None
+    ) -> Any:
+        """
+        Runs query again and returns a single value from its results, in full.
+        Adapters that truncate values with HarlequinCursor.set_max_value_length()
+        must implement this method. Harlequin calls it from a background
+        thread.
+
+        Unless the query sorts its records, running it again may return them
+        in a different order, so adapters should check that the value starts
+        with preview, and raise HarlequinQueryError if it doesn't.
+
+        Args:
+            query (str): The text of a single query, as passed to execute().
+            row (int): The position of the record in the query's results,
+                starting at 0.
+            column (int): The index of the column in the query's results.
+            preview (Any): The truncated value that was fetched for the cell,
+                without its extra character (or byte), or None.
+
+        Returns: Any, the value of the cell.
+
+        Raises:
+            NotImplementedError if the adapter does not provide this optional
+                functionality.
+            HarlequinQueryError for all other exceptions, including if the
+                query no longer returns the record, or returns a different
+                record in its place.
+        """
+        raise NotImplementedError
+
+    def cancel_count_rows(self) -> None:
+        """
+        Interrupts any in-progress calls to count_rows(), without canceling
+        other queries. Adapters that implement count_rows() should also
+        implement this; the default does nothing.
+        """
+        return None
+
     def validate_sql(self, text: str) -> str:
         """
         Parses text as one or more queries; returns text if parsing does not result
@@ -1298,11 +1298,13 @@ from functools import partial
 from pathlib import Path 
 from typing import (
     TYPE_CHECKING,
+    Any,
     Callable,
     Dict,
     List,
     Optional,
     Sequence,
+    Tuple,
     Type,
     Union,
 )
@@ -1317,12 +1319,13 @@ from textual.lazy import Lazy
 from textual.message import Message
 from textual.reactive import reactive
 from textual.screen import Screen, ScreenResultCallbackType, ScreenResultType
+from textual.timer import Timer
 from textual.types import CSSPathType
 from textual.widget import AwaitMount, Widget
 # from textual.widgets import Button, Footer, Input
 from textual.widgets import Button, Footer, Input, Static
 from textual.containers import Container
-from textual.worker import Worker, WorkerState
+from textual.worker import Worker, WorkerState, get_current_worker
 from textual_fastdatatable import DataTable
 from textual_fastdatatable.backend import AutoBackendType
 
@@ -1346,6 +1349,8 @@ from harlequin.catalog_cache import (
     get_catalog_cache,
     update_catalog_cache,
 )
+from harlequin.catalog_index import CatalogIndex, CatalogSearchResult
+from harlequin.cell_formatting import MAX_CELL_VALUE_LENGTH
 from harlequin.components import (
     CodeEditor,
     DataCatalog,
@@ -1354,13 +1359,18 @@ from harlequin.components import (
     ExportScreen,
     HelpScreen,
     HistoryScreen,
+    ResultsTable,
     ResultsViewer,
     RunQueryBar,
     export_callback,
 )
+from harlequin.components.catalog_search import CatalogSearchScreen
+from harlequin.components.cell_value_screen import CellValueScreen
 from harlequin.components.confirm_modal import ConfirmModal
 from harlequin.components.data_catalog import ContextMenu
 from harlequin.components.data_catalog.tree import HarlequinTree
+from harlequin.components.export_progress import ExportProgressToast
+from harlequin.components.profile_screen import ProfileScreen
 from harlequin.copy_formats import HARLEQUIN_COPY_FORMATS, WINDOWS_COPY_FORMATS
 from harlequin.driver import HarlequinDriver
 from harlequin.editor_cache import BufferState, Cache
@@ -1369,25 +1379,37 @@ from harlequin.exception import (
     HarlequinBindingError,
     HarlequinConfigError,
     HarlequinConnectionError,
+    HarlequinCopyCanceled,
     HarlequinError,
     HarlequinQueryError,
     pretty_error_message,
     pretty_print_error,
 )
+from harlequin.export import (
+    CLIPBOARD_CONFIRM_CELLS,
+    CLIPBOARD_WORKER_CELLS,
+    ExportDestination,
+    ExportProgress,
+    to_tsv,
+)
 from harlequin.history import History
 from harlequin.messages import WidgetMounted
 from harlequin.plugins import load_keymap_plugins
+from harlequin.query_profile import QueryProfile
+from harlequin.result_ops import unique_column_names
+from harlequin.results_memory import DEFAULT_RESULTS_MEMORY_BUDGET, parse_byte_size
 from harlequin.transaction_mode import HarlequinTransactionMode
 from harlequin.nl_input import NlInput
 
 if TYPE_CHECKING:
+    import pyarrow as pa
     from textual.await_complete import AwaitComplete
 
     from harlequin.keymap import HarlequinKeyMap
 
 
 class CatalogCacheLoaded(Message):
-    def __init__(self, cache: CatalogCache) -> None:
+    def __init__(self, cache: CatalogCache | None) -> None:
         super().__init__()
         self.cache = cache
 
@@ -1420,18 +1442,33 @@ class QueriesExecuted(Message):
         cursors: Dict[str, tuple[HarlequinCursor, str]],
         submitted_at: float,
         ddl_queries: list[str],
+        limit: int | None = None,
     ) -> None:
         super().__init__()
         self.query_count = query_count
         self.cursors = cursors
         self.submitted_at = submitted_at
         self.ddl_queries = ddl_queries
+        self.limit = limit
 
 
 class QueriesCanceled(Message):
     pass
 
 
+class QueryProfiled(Message):
+    def __init__(self, profile: QueryProfile) -> None:
+        super().__init__()
+        self.profile = profile
+
+
+class QueryProfileError(Message):
+    def __init__(self, query_text: str, error: BaseException) -> None:
+        super().__init__()
+        self.query_text = query_text
+        self.error = error
+
+
 class ResultsFetched(Message):
     def __init__(
         self,
@@ -1439,12 +1476,52 @@ class ResultsFetched(Message):
         data: Dict[str, tuple[list[tuple[str, str]], AutoBackendType | None, str]],
         errors: list[tuple[BaseException, str]],
         elapsed: float,
+        limit: int | None = None,
     ) -> None:
         super().__init__()
         self.cursors = cursors
         self.data = data
         self.errors = errors
         self.elapsed = elapsed
+        self.limit = limit
+
+
+class RowsCounted(Message):
+    def __init__(self, table_id: str, count: int) -> None:
+        super().__init__()
+        self.table_id = table_id
+        self.count = count
+
+
+class FullValueFetched(Message):
+    def __init__(self, screen: CellValueScreen, value: Any) -> None:
+        super().__init__()
+        self.screen = screen
+        self.value = value
+
+
+class FullValueFetchError(Message):
+    def __init__(self, screen: CellValueScreen, error: BaseException) -> None:
+        super().__init__()
+        self.screen = screen
+        self.error = error
+
+
+class DataExported(Message):
+    def __init__(
+        self, table: ResultsTable, progress: ExportProgress, full_query: bool
+    ) -> None:
+        super().__init__()
+        self.table = table
+        self.progress = progress
+        self.full_query = full_query
+
+
+class ExportFailed(Message):
+    def __init__(self, progress: ExportProgress, error: BaseException) -> None:
+        super().__init__()
+        self.progress = progress
+        self.error = error
 
 
 class TransactionModeChanged(Message):
@@ -1462,6 +1539,12 @@ class CompletersReady(Message):
         self.member_completer = member_completer
 
 
+class CatalogIndexReady(Message):
+    def __init__(self, index: CatalogIndex) -> None:
+        super().__init__()
+        self.index = index
+
+
 class Harlequin(AppBase):
     """
     The SQL IDE for your Terminal.
@@ -1483,6 +1566,8 @@ class Harlequin(AppBase):
         show_files: Path | None = None,
         show_s3: str | None = None,
         max_results: int | str = 100_000,
+        count_rows: bool = True,
+        results_memory_budget: int | str = DEFAULT_RESULTS_MEMORY_BUDGET,
         driver_class: Union[Type[Driver], None] = None,
         css_path: Union[CSSPathType, None] = None,
         watch_css: bool = False,
@@ -1498,6 +1583,7 @@ class Harlequin(AppBase):
         self.history: History | None = None
         self.show_files = show_files
         self.show_s3 = show_s3 or None
+        self.count_rows = count_rows
         try:
             self.max_results = int(max_results)
         except ValueError:
@@ -1510,8 +1596,20 @@ class Harlequin(AppBase):
                     )
                 ),
             )
+        try:
+            self.results_memory_budget = parse_byte_size(results_memory_budget)
+        except HarlequinConfigError as e:
+            self.results_memory_budget = 0
+            self.exit(return_code=2, message=pretty_error_message(e))
         self.query_timer: Union[float, None] = None
         self.connection: HarlequinConnection | None = None
+        self.catalog: Catalog | None = None
+        self.catalog_fingerprints: dict[str, str] | None = None
+        self._catalog_cache_loaded = False
+        self._cached_catalog: tuple[Catalog, dict[str, str] | None] | None = None
+        self.catalog_index: CatalogIndex | None = None
+        self._catalog_index_timer: Timer | None = None
+        self.export_progress: ExportProgress | None = None
         self.harlequin_driver = HarlequinDriver(app=self)
 
         if keymap_names is None:
@@ -1541,7 +1639,10 @@ class Harlequin(AppBase):
         editor_placeholder = Lazy(widget=self.editor_collection)
         editor_placeholder.border_title = self.editor_collection.border_title
         editor_placeholder.loading = True
-        self.results_viewer = ResultsViewer(max_results=self.max_results)
+        self.results_viewer = ResultsViewer(
+            max_results=self.max_results,
+            memory_budget=self.results_memory_budget,
+        )
         self.run_query_bar = RunQueryBar(
             max_results=self.max_results,
             classes="non-responsive",
@@ -1592,12 +1693,19 @@ class Harlequin(AppBase):
         return new_screen
 
     def append_to_history(
-        self, query_text: str, result_row_count: int, elapsed: float
+        self,
+        query_text: str,
+        result_row_count: int,
+        elapsed: float,
+        profile: QueryProfile | None = None,
     ) -> None:
         if self.history is None:
             self.history = History.blank()
         self.history.append(
-            query_text=query_text, result_row_count=result_row_count, elapsed=elapsed
+            query_text=query_text,
+            result_row_count=result_row_count,
+            elapsed=elapsed,
+            profile=profile,
         )
 
     async def on_mount(self) -> None:
@@ -1645,15 +1753,21 @@ class Harlequin(AppBase):
 
     @on(CatalogCacheLoaded)
     def build_trees(self, message: CatalogCacheLoaded) -> None:
-        if self.connection_hash and (
-            cached_db := message.cache.get_db(self.connection_hash)
-        ):
-            self.post_message(NewCatalog(catalog=cached_db))
-        if self.show_s3 is not None:
-            self.data_catalog.load_s3_tree_from_cache(message.cache)
-        if self.connection_hash:
-            history = message.cache.get_history(self.connection_hash)
-            self.history = history if history is not None else History.blank()
+        self._catalog_cache_loaded = True
+        if message.cache is not None:
+            if self.connection_hash and (
+                cached_db := message.cache.get_db(self.connection_hash)
+            ):
+                self._cached_catalog = (
+                    cached_db,
+                    message.cache.get_fingerprints(self.connection_hash),
+                )
+            if self.show_s3 is not None:
+                self.data_catalog.load_s3_tree_from_cache(message.cache)
+            if self.connection_hash:
+                history = message.cache.get_history(self.connection_hash)
+                self.history = history if history is not None else History.blank()
+        self._load_initial_catalog()
 
     @on(CodeEditor.Submitted)
     def submit_query_from_editor(self, message: CodeEditor.Submitted) -> None:
@@ -1687,7 +1801,7 @@ class Harlequin(AppBase):
             self.notify(message.connection.init_message, title="Database Connected.")
         else:
             self.notify("Database Connected.")
-        self.update_schema_data()
+        self._load_initial_catalog()
 
     @on(HarlequinTree.NodeSubmitted)
     def insert_node_into_editor(self, message: HarlequinTree.NodeSubmitted) -> None:
@@ -1708,17 +1822,7 @@ class Harlequin(AppBase):
             callback = partial(self.post_message, message)
             self.set_timer(delay=0.1, callback=callback)
             return
-        self.editor.text_input.clipboard = message.copy_name
-        if (
-            self.editor.use_system_clipboard
-            and self.editor.text_input.system_copy is not None
-        ):
-            try:
-                self.editor.text_input.system_copy(message.copy_name)
-            except Exception:
-                self.notify("Error copying data to system clipboard.", severity="error")
-            else:
-                self.notify("Selected label copied to clipboard.")
+        self._set_clipboard(message.copy_name, "Selected label copied to clipboard.")
 
     @on(HarlequinDriver.InsertTextAtSelection)
     def driver_insert_text_into_editor(
@@ -1831,8 +1935,46 @@ class Harlequin(AppBase):
             callback = partial(self.post_message, message)
             self.set_timer(delay=0.1, callback=callback)
             return
-        # Excel, sheets, and Snowsight all use a TSV format for copying tabular data
-        text = os.linesep.join("\t".join(map(str, row)) for row in message.values)
+        if not isinstance(message, ResultsTable.SelectionCopied):
+            # Excel, sheets, and Snowsight all use a TSV format for copying
+            # tabular data
+            text = os.linesep.join("\t".join(map(str, row)) for row in message.values)
+            self._set_clipboard(text, "Selected data copied to clipboard.")
+            return
+        data = message.data
+        cells = data.num_rows * data.num_columns
+        if cells == 1:
+            # copy a single value as it is, without quoting
+            self._set_clipboard(
+                str(message.values[0][0]), "Selected data copied to clipboard."
+            )
+        elif cells > CLIPBOARD_CONFIRM_CELLS:
+
+            def export_callback(export_instead: bool | None) -> None:
+                if export_instead:
+                    self.action_export()
+                else:
+                    self._copy_to_clipboard(data)
+
+            self.push_screen(
+                ConfirmModal(
+                    prompt=(
+                        f"You selected {cells:,} cells, which may be slow to "
+                        "copy and paste. Export these results to a file "
+                        "instead? (Choose No to copy them anyway.)"
+                    )
+                ),
+                export_callback,
+            )
+        elif cells > CLIPBOARD_WORKER_CELLS:
+            self.notify(f"Copying {cells:,} cells to the clipboard.")
+            self._copy_to_clipboard(data)
+        else:
+            self._set_clipboard(to_tsv(data), "Selected data copied to clipboard.")
+
+    def _set_clipboard(self, text: str, success_message: str) -> None:
+        if self.editor is None or self.editor.text_input is None:
+            return
         self.editor.text_input.clipboard = text
         if (
             self.editor.use_system_clipboard
@@ -1843,7 +1985,7 @@ class Harlequin(AppBase):
             except Exception:
                 self.notify("Error copying data to system clipboard.", severity="error")
             else:
-                self.notify("Selected data copied to clipboard.")
+                self.notify(success_message)
 
     @on(Worker.StateChanged)
     async def handle_worker_error(self, message: Worker.StateChanged) -> None:
@@ -1852,7 +1994,7 @@ class Harlequin(AppBase):
 
     async def _handle_worker_error(self, message: Worker.StateChanged) -> None:
         if (
-            message.worker.name == "update_schema_data"
+            message.worker.name in ("update_schema_data", "refresh_changed_catalog")
             and message.worker.error is not None
         ):
             self._push_error_modal(
@@ -1898,6 +2040,36 @@ class Harlequin(AppBase):
             error=message.error,
         )
 
+    @on(QueryProfiled)
+    def handle_query_profiled(self, message: QueryProfiled) -> None:
+        profile = message.profile
+        self.append_to_history(
+            query_text=profile.query_text,
+            result_row_count=profile.row_count or 0,
+            elapsed=profile.elapsed or 0.0,
+            profile=profile,
+        )
+        self.push_screen(ProfileScreen(profile=profile, id="profile_screen"))
+
+    @on(QueryProfileError)
+    def handle_query_profile_error(self, message: QueryProfileError) -> None:
+        if isinstance(message.error, NotImplementedError):
+            self.notify(
+                "The selected adapter does not support profiling queries.",
+                severity="error",
+                timeout=5,
+            )
+            return
+        self.append_to_history(
+            query_text=message.query_text, result_row_count=-1, elapsed=0.0
+        )
+        header = getattr(message.error, "title", message.error.__class__.__name__)
+        self._push_error_modal(
+            title="Profile Error",
+            header=header,
+            error=message.error,
+        )
+
     @on(DataTable.DataLoadError)
     def handle_data_load_error(self, message: DataTable.DataLoadError) -> None:
         header = getattr(message.error, "title", message.error.__class__.__name__)
@@ -1907,6 +2079,17 @@ class Harlequin(AppBase):
             error=message.error,
         )
 
+    @on(ResultsViewer.OperationError)
+    def handle_results_operation_error(
+        self, message: ResultsViewer.OperationError
+    ) -> None:
+        header = getattr(message.error, "title", message.error.__class__.__name__)
+        self._push_error_modal(
+            title="Results Error",
+            header=header,
+            error=message.error,
+        )
+
     @on(ContextMenu.ExecuteInteraction)
     def execute_interaction_in_thread(
         self, message: ContextMenu.ExecuteInteraction
@@ -1919,8 +2102,11 @@ class Harlequin(AppBase):
 
     @on(NewCatalog)
     def handle_new_catalog(self, message: NewCatalog) -> None:
+        self.catalog = message.catalog
+        self.catalog_fingerprints = message.fingerprints
         self.data_catalog.update_database_tree(message.catalog)
         self.update_completers(message.catalog)
+        self._build_catalog_index(message.catalog)
 
     @on(NewCatalogItems)
     def handle_new_catalog_item(self, message: NewCatalogItems) -> None:
@@ -1929,6 +2115,7 @@ class Harlequin(AppBase):
             and self.editor_collection.member_completer is not None
         ):
             self.extend_completers(parent=message.parent, items=message.items)
+            self._schedule_catalog_index_update()
         else:
             # recycle message while completers are built
             callback = partial(self.post_message, message)
@@ -1937,7 +2124,7 @@ class Harlequin(AppBase):
     @on(QueriesExecuted)
     def fetch_data_or_reset_table(self, message: QueriesExecuted) -> None:
         if message.cursors:  # select query
-            self._fetch_data(message.cursors, message.submitted_at)
+            self._fetch_data(message.cursors, message.submitted_at, message.limit)
         else:
             self.run_query_bar.set_responsive()
             self.results_viewer.show_table(did_run=message.query_count > 0)
@@ -1963,17 +2150,26 @@ class Harlequin(AppBase):
 
     @on(ResultsFetched)
     async def load_tables(self, message: ResultsFetched) -> None:
-        for id_, (cols, data, query_text) in message.data.items():
+        limited_queries: list[tuple[str, str]] = []
+        for i, (id_, (cols, data, query_text)) in enumerate(message.data.items()):
+            # only the first tab is visible, so the others are mounted lazily,
+            # when they are first activated
+            cursor, _ = message.cursors[id_]
             table = await self.results_viewer.push_table(
                 table_id=id_,
                 column_labels=cols,
                 data=data,
+                lazy=i > 0,
+                query_text=query_text,
+                truncated_columns=cursor.truncated_columns(),
             )
             self.append_to_history(
                 query_text=query_text,
                 result_row_count=table.source_row_count,
                 elapsed=message.elapsed,
             )
+            if message.limit is not None and table.source_row_count >= message.limit:
+                limited_queries.append((id_, query_text))
         if message.errors:
             for _, query_text in message.errors:
                 self.append_to_history(
@@ -2002,6 +2198,70 @@ class Harlequin(AppBase):
             self.results_viewer.show_table(did_run=True)
             if message.data:
                 self.results_viewer.focus()
+        if limited_queries and self.count_rows:
+            self._count_rows(limited_queries)
+
+    @on(RowsCounted)
+    def update_table_row_count(self, message: RowsCounted) -> None:
+        self.results_viewer.set_query_row_count(
+            table_id=message.table_id, count=message.count
+        )
+
+    @on(ResultsViewer.FullValueRequested)
+    def show_full_value(self, message: ResultsViewer.FullValueRequested) -> None:
+        screen = CellValueScreen(title=message.title, value=message.value, loading=True)
+        self.push_screen(screen)
+        self._fetch_full_value(
+            screen=screen,
+            query_text=message.query_text,
+            row=message.row,
+            column=message.column,
+            preview=message.value,
+        )
+
+    @on(FullValueFetched)
+    def update_full_value(self, message: FullValueFetched) -> None:
+        if message.screen.is_attached:
+            message.screen.show_value(message.value)
+
+    @on(FullValueFetchError)
+    def handle_full_value_error(self, message: FullValueFetchError) -> None:
+        if message.screen.is_attached:
+            message.screen.show_error(message.error)
+
+    @on(ExportProgressToast.CancelRequested)
+    def cancel_export(self, message: ExportProgressToast.CancelRequested) -> None:
+        self._cancel_export(message.progress)
+
+    @on(DataExported)
+    def notify_data_exported(self, message: DataExported) -> None:
+        self._finish_export(message.progress)
+        progress = message.progress
+        summary = (
+            f"Wrote {progress.summary()} to {progress.names} "
+            f"in {progress.elapsed:,.2f}s."
+        )
+        if not message.full_query and message.table.has_truncated_values:
+            self.notify(
+                f"{summary} Values longer than {MAX_CELL_VALUE_LENGTH:,} "
+                "characters were truncated.",
+                title="Data exported with truncated values.",
+                severity="warning",
+            )
+        else:
+            self.notify(summary, title="Data exported successfully.")
+
+    @on(ExportFailed)
+    def handle_export_error(self, message: ExportFailed) -> None:
+        self._finish_export(message.progress)
+        if isinstance(message.error, HarlequinCopyCanceled):
+            self.notify(str(message.error), title=message.error.title)
+        else:
+            self._push_error_modal(
+                title="Export Data Error",
+                header="Could not export data.",
+                error=message.error,
+            )
 
     @on(WidgetMounted)
     def bind_keys(self, message: WidgetMounted) -> None:
@@ -2065,6 +2325,7 @@ class Harlequin(AppBase):
             self.full_screen = False
             self.run_query_bar.set_not_responsive()
             self.results_viewer.show_loading()
+            self._cancel_row_counts()
             self._execute_query(message)
 
     async def on_nl_input_query_submitted(self, message: NlInput.QuerySubmitted) -> None:
@@ -2104,6 +2365,10 @@ class Harlequin(AppBase):
         self.editor_collection.word_completer = message.word_completer
         self.editor_collection.member_completer = message.member_completer
 
+    @on(CatalogIndexReady)
+    def update_catalog_index(self, message: CatalogIndexReady) -> None:
+        self.catalog_index = message.index
+
     def action_noop(self) -> None:
         """
         A no-op action to unmap keys.
@@ -2168,25 +2433,59 @@ class Harlequin(AppBase):
         await self.editor.action_submit()
 
     def action_cancel_query(self) -> None:
+        self._cancel_row_counts()
         self._cancel_query()
 
+    def action_profile_query(self) -> None:
+        queries = self._get_selected_queries()
+        if not queries or self.connection is None:
+            return
+        if len(queries) > 1:
+            self.notify("Profiling the first selected query.", timeout=3)
+        self._profile_query(queries[0])
+
     def action_export(self) -> None:
         show_export_error = partial(
             self._push_error_modal,
             "Export Data Error",
             "Could not export data.",
         )
+        if self.export_progress is not None:
+            # only one export runs at a time; offer to cancel it instead.
+            progress = self.export_progress
+
+            def cancel_callback(confirmed: bool | None) -> None:
+                if confirmed:
+                    self._cancel_export(progress)
+
+            self.push_screen(
+                ConfirmModal(
+                    prompt=(
+                        f"Still exporting to {progress.names}. "
+                        "Cancel the export?"
+                    )
+                ),
+                cancel_callback,
+            )
+            return
         table = self.results_viewer.get_visible_table()
         if table is None:
             show_export_error(error=ValueError("You must execute a query first."))
             return
-        notify = partial(self.notify, "Data exported successfully.")
-        callback = partial(
-            export_callback,
-            table=table,
-            success_callback=notify,
-            error_callback=show_export_error,
-        )
+
+        def callback(screen_data: Tuple[List[ExportDestination], bool]) -> None:
+            destinations, full_query = screen_data
+            progress = ExportProgress(
+                path=destinations[0].path,
+                total_rows=None if full_query else table.source_row_count,
+                other_paths=[d.path for d in destinations[1:]],
+            )
+            self.export_progress = progress
+            self.query_one("#main_panel").mount(
+                ExportProgressToast(progress=progress, id="export_progress")
+            )
+            self._export(screen_data, table=table, progress=progress)
+
         self.app.push_screen(
             ExportScreen(
                 formats=(
@@ -2194,6 +2493,8 @@ class Harlequin(AppBase):
                     if sys.platform == "win32"
                     else HARLEQUIN_COPY_FORMATS
                 ),
+                can_export_query=self._connection_implements_copy(),
+                column_names=unique_column_names(table.plain_column_labels),
                 id="export_screen",
             ),
             callback,
@@ -2229,6 +2530,32 @@ class Harlequin(AppBase):
                 history_callback,
             )
 
+    def action_search_catalog(self) -> None:
+        def search_callback(result: CatalogSearchResult | None) -> None:
+            """
+            Expand the path to the selected item in the Data Catalog.
+            """
+            if result is None:
+                return
+            self.action_focus_data_catalog()
+            self.data_catalog.active = "tab-1"
+            self.data_catalog.database_tree.select_path(result.path)
+            self.data_catalog.database_tree.focus()
+
+        if self.catalog_index is None:
+            self.notify(
+                "The Data Catalog is still being indexed. Please try again in a "
+                "moment.",
+                severity="warning",
+            )
+        elif self.screen.id != "catalog_search_screen":
+            self.push_screen(
+                CatalogSearchScreen(
+                    index=self.catalog_index, id="catalog_search_screen"
+                ),
+                search_callback,
+            )
+
     def action_focus_data_catalog(self) -> None:
         if self.sidebar_hidden or self.data_catalog.disabled:
             self.action_toggle_sidebar()
@@ -2250,11 +2577,15 @@ class Harlequin(AppBase):
         write_editor_cache(Cache(focus_index=focus_index, buffers=buffers))
         update_catalog_cache(
             connection_hash=self.connection_hash,
-            catalog=None,  # TODO: cache completions instead.
+            catalog=self.catalog,
             s3_tree=self.data_catalog.s3_tree,
             history=self.history,
+            fingerprints=self.catalog_fingerprints,
         )
+        if self.export_progress is not None:
+            self._cancel_export(self.export_progress)
         if self.connection:
+            self._cancel_row_counts()
             self.connection.close()
         await super().action_quit()
 
@@ -2293,6 +2624,19 @@ class Harlequin(AppBase):
         connection = self.adapter.connect()
         self.post_message(DatabaseConnected(connection=connection))
 
+    @work(
+        thread=True,
+        exclusive=True,
+        exit_on_error=False,
+        group="clipboard",
+        description="Copying data to the clipboard.",
+    )
+    def _copy_to_clipboard(self, data: pa.Table) -> None:
+        text = to_tsv(data)
+        self.call_from_thread(
+            self._set_clipboard, text, "Selected data copied to clipboard."
+        )
+
     @work(
         thread=True,
         exclusive=True,
@@ -2302,8 +2646,25 @@ class Harlequin(AppBase):
     )
     def _load_catalog_cache(self) -> None:
         cache = get_catalog_cache()
-        if cache is not None:
-            self.post_message(CatalogCacheLoaded(cache=cache))
+        self.post_message(CatalogCacheLoaded(cache=cache))
+
+    def _load_initial_catalog(self) -> None:
+        """
+        Once the database is connected and the cache is loaded, shows the
+        cached catalog and refreshes it in the background, if the database
+        has changed since it was cached. Without a cached catalog, loads it
+        from the database.
+        """
+        if self.connection is None or not self._catalog_cache_loaded:
+            return
+        if self._cached_catalog is None:
+            self.update_schema_data()
+            return
+        catalog, fingerprints = self._cached_catalog
+        self._cached_catalog = None
+        catalog.set_connection(self.connection)
+        self.post_message(NewCatalog(catalog=catalog, fingerprints=fingerprints))
+        self.refresh_changed_catalog(catalog, fingerprints)
 
     @work(
         thread=True,
@@ -2328,6 +2689,7 @@ class Harlequin(AppBase):
                 if cur is not None:
                     if message.limit is not None:
                         cur = cur.set_limit(message.limit)
+                    cur = cur.set_max_value_length(MAX_CELL_VALUE_LENGTH)
                     table_id = f"t{hash(cur)}"
                     cursors[table_id] = (cur, q)
                 else:
@@ -2338,6 +2700,7 @@ class Harlequin(AppBase):
                 cursors=cursors,
                 submitted_at=message.submitted_at,
                 ddl_queries=ddl_queries,
+                limit=message.limit,
             )
         )
 
@@ -2354,6 +2717,129 @@ class Harlequin(AppBase):
         self.connection.cancel()
         self.post_message(QueriesCanceled())
 
+    @work(
+        thread=True,
+        exclusive=True,
+        exit_on_error=False,
+        group="query_profilers",
+        description="Profiling query.",
+    )
+    def _profile_query(self, query_text: str) -> None:
+        if self.connection is None:
+            return
+        try:
+            profile = self.connection.profile(query_text)
+        except (HarlequinQueryError, NotImplementedError) as e:
+            self.post_message(QueryProfileError(query_text=query_text, error=e))
+        else:
+            self.post_message(QueryProfiled(profile=profile))
+
+    @work(
+        thread=True,
+        exclusive=True,
+        exit_on_error=False,
+        group="row_counters",
+        description="Counting records.",
+    )
+    def _count_rows(self, queries: list[tuple[str, str]]) -> None:
+        """
+        Counts the records each limited query would return without its limit,
+        one query at a time, after its results have been loaded.
+        """
+        if self.connection is None:
+            return
+        worker = get_current_worker()
+        for table_id, query_text in queries:
+            if worker.is_cancelled:
+                return
+            try:
+                count = self.connection.count_rows(query_text)
+            except NotImplementedError:
+                return
+            except HarlequinQueryError:
+                # the limited results are still valid; they just aren't counted
+                continue
+            if not worker.is_cancelled:
+                self.post_message(RowsCounted(table_id=table_id, count=count))
+
+    @work(
+        thread=True,
+        exclusive=True,
+        exit_on_error=False,
+        group="value_fetchers",
+        description="Fetching full value.",
+    )
+    def _fetch_full_value(
+        self,
+        screen: CellValueScreen,
+        query_text: str,
+        row: int,
+        column: int,
+        preview: Any,
+    ) -> None:
+        if self.connection is None:
+            return
+        try:
+            value = self.connection.fetch_value(
+                query_text, row=row, column=column, preview=preview
+            )
+        except (HarlequinQueryError, NotImplementedError) as e:
+            self.post_message(FullValueFetchError(screen=screen, error=e))
+        else:
+            self.post_message(FullValueFetched(screen=screen, value=value))
+
+    @work(
+        thread=True,
+        exclusive=True,
+        exit_on_error=False,
+        group="exporters",
+        description="Exporting data.",
+    )
+    def _export(
+        self,
+        screen_data: Tuple[List[ExportDestination], bool],
+        table: ResultsTable,
+        progress: ExportProgress,
+    ) -> None:
+        def on_success(full_query: bool) -> None:
+            self.post_message(
+                DataExported(table=table, progress=progress, full_query=full_query)
+            )
+
+        def on_error(error: Exception) -> None:
+            self.post_message(ExportFailed(progress=progress, error=error))
+
+        export_callback(
+            screen_data,
+            table=table,
+            success_callback=on_success,
+            error_callback=on_error,
+            connection=self.connection,
+            progress=progress,
+        )
+
+    def _cancel_export(self, progress: ExportProgress) -> None:
+        progress.cancel()
+        for toast in self.query(ExportProgressToast):
+            toast.refresh_progress()
+
+    def _finish_export(self, progress: ExportProgress) -> None:
+        if self.export_progress is progress:
+            self.export_progress = None
+        for toast in self.query(ExportProgressToast):
+            if toast.progress is progress:
+                toast.remove()
+
+    def _connection_implements_copy(self) -> bool:
+        return self.connection is not None and (
+            type(self.connection).copy is not HarlequinConnection.copy
+        )
+
+    def _cancel_row_counts(self) -> None:
+        self.workers.cancel_group(self, "row_counters")
+        if self.connection is not None:
+            self.connection.cancel_count_rows()
+
     def _get_selected_queries(self) -> list[str]:
         if self.editor is None:
             return []
@@ -2383,6 +2869,7 @@ class Harlequin(AppBase):
         self,
         cursors: Dict[str, tuple[HarlequinCursor, str]],
         submitted_at: float,
+        limit: int | None = None,
     ) -> None:
         errors: list[tuple[BaseException, str]] = []
         data: Dict[str, tuple[list[tuple[str, str]], AutoBackendType | None, str]] = {}
@@ -2395,7 +2882,13 @@ class Harlequin(AppBase):
                 data[id_] = (cur.columns(), cur_data, q)
         elapsed = time.monotonic() - submitted_at
         self.post_message(
-            ResultsFetched(cursors=cursors, data=data, errors=errors, elapsed=elapsed)
+            ResultsFetched(
+                cursors=cursors,
+                data=data,
+                errors=errors,
+                elapsed=elapsed,
+                limit=limit,
+            )
         )
 
     def extend_completers(self, parent: CatalogItem, items: list[CatalogItem]) -> None:
@@ -2442,12 +2935,73 @@ class Harlequin(AppBase):
             )
         )
 
+    @work(
+        thread=True,
+        exclusive=True,
+        exit_on_error=False,
+        group="catalog_indexers",
+        description="indexing catalog",
+    )
+    def _build_catalog_index(self, catalog: Catalog) -> None:
+        self.post_message(CatalogIndexReady(index=CatalogIndex(catalog)))
+
+    def _schedule_catalog_index_update(self) -> None:
+        """
+        Rebuilds the catalog index after lazily-loaded items are added to the
+        catalog; items often arrive in bursts, while the Data Catalog
+        prefetches nodes, so the index is rebuilt once the burst is over.
+        """
+        if self.catalog is None:
+            return
+        if self._catalog_index_timer is not None:
+            self._catalog_index_timer.stop()
+        self._catalog_index_timer = self.set_timer(
+            delay=1.0, callback=partial(self._build_catalog_index, self.catalog)
+        )
+
     @work(thread=True, exclusive=True, exit_on_error=False, group="schema_updaters")
     def update_schema_data(self) -> None:
         if self.connection is None:
             return
+        # fingerprint first, so changes made while the catalog is fetched
+        # are refreshed the next time it's loaded from the cache
+        fingerprints = self._get_catalog_fingerprints()
         catalog = self.connection.get_catalog()
-        self.post_message(NewCatalog(catalog=catalog))
+        self.post_message(NewCatalog(catalog=catalog, fingerprints=fingerprints))
+
+    @work(thread=True, exclusive=True, exit_on_error=False, group="schema_updaters")
+    def refresh_changed_catalog(
+        self, catalog: Catalog, fingerprints: dict[str, str] | None
+    ) -> None:
+        """
+        Refetches the parts of a cached catalog whose fingerprints have
+        changed; or the entire catalog, if the fingerprints are unknown.
+        """
+        if self.connection is None:
+            return
+        current = self._get_catalog_fingerprints()
+        if current is None or fingerprints is None:
+            new_catalog = self.connection.get_catalog()
+        else:
+            changed = {
+                key
+                for key in current.keys() | fingerprints.keys()
+                if current.get(key) != fingerprints.get(key)
+            }
+            if not changed:
+                return
+            new_catalog = self.connection.refresh_catalog(catalog, changed)
+        self.post_message(NewCatalog(catalog=new_catalog, fingerprints=current))
+
+    def _get_catalog_fingerprints(self) -> dict[str, str] | None:
+        if self.connection is None:
+            return None
+        try:
+            return self.connection.get_catalog_fingerprints()
+        except Exception:
+            # NotImplementedError or a database error; the catalog will be
+            # refreshed in full next time
+            return None
 
     def _validate_selection(self) -> str:
         """
@@ -1,7 +1,15 @@
 ﻿from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING, ClassVar, Generic, Protocol, Sequence, TypeVar
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    ClassVar,
+    Generic,
+    Protocol,
+    Sequence,
+    TypeVar,
+)
 
 from textual.message import Message
 
@@ -89,6 +97,11 @@ class InteractiveCatalogItem(CatalogItem, Generic[TAdapterConnection_contra]):
         """
         return []
 
+    def __getstate__(self) -> dict[str, Any]:
+        # connections can't be pickled, so they aren't stored in Harlequin's
+        # catalog cache. Catalog.set_connection() restores them.
+        return {**self.__dict__, "connection": None}
+
 
 @dataclass
 class Catalog:
@@ -103,10 +116,26 @@ class Catalog:
 
     items: list[CatalogItem]
 
+    def set_connection(self, connection: "HarlequinConnection") -> None:
+        """
+        Sets the connection of every InteractiveCatalogItem in the catalog,
+        e.g., after the catalog is loaded from Harlequin's cache, which
+        doesn't store connections.
+        """
+        stack = list(self.items)
+        while stack:
+            item = stack.pop()
+            if isinstance(item, InteractiveCatalogItem):
+                item.connection = connection
+            stack.extend(item.children)
+
 
 class NewCatalog(Message):
-    def __init__(self, catalog: Catalog) -> None:
+    def __init__(
+        self, catalog: Catalog, fingerprints: dict[str, str] | None = None
+    ) -> None:
         self.catalog = catalog
+        self.fingerprints = fingerprints
         super().__init__()
 
 
@@ -16,7 +16,7 @@ from harlequin.history import History
 if TYPE_CHECKING:
     from harlequin.components.data_catalog import S3Tree
 
-CACHE_VERSION = 2
+CACHE_VERSION = 3
 
 
 def recursive_dict() -> defaultdict:
@@ -39,10 +39,20 @@ class CatalogCache:
     databases: dict[str, Catalog]
     s3: dict[tuple[str | None, str | None, str | None], dict]
     history: dict[str, History]
+    fingerprints: dict[str, dict[str, str] | None]
 
     def get_db(self, connection_hash: str) -> Catalog | None:
-        # if connection_hash:
-        #     return self.databases.get(connection_hash, None)
+        if connection_hash:
+            return self.databases.get(connection_hash, None)
+        return None
+
+    def get_fingerprints(self, connection_hash: str) -> dict[str, str] | None:
+        """
+        Returns the fingerprints of the database when its catalog was cached,
+        or None if the adapter doesn't provide them.
+        """
+        if connection_hash:
+            return self.fingerprints.get(connection_hash, None)
         return None
 
     def get_history(self, connection_hash: str) -> History | None:
@@ -78,19 +88,29 @@ def update_catalog_cache(
     catalog: Catalog | None,
     s3_tree: S3Tree | None,
     history: History | None,
+    fingerprints: dict[str, str] | None = None,
 ) -> None:
     if connection_hash is None and s3_tree is None:
         return
     cache = _load_cache()
     if cache is None:
-        cache = CatalogCache(databases={}, s3={}, history={})
-    # if catalog is not None and connection_hash:
-    #     cache.databases[connection_hash] = catalog
+        cache = CatalogCache(databases={}, s3={}, history={}, fingerprints={})
+    if catalog is not None and connection_hash:
+        cache.databases[connection_hash] = catalog
+        cache.fingerprints[connection_hash] = fingerprints
     if s3_tree is not None and s3_tree.catalog_data is not None:
         cache.s3[s3_tree.cache_key] = s3_tree.catalog_data
     if history is not None and connection_hash:
         cache.history[connection_hash] = history
-    _write_cache(cache)
+    try:
+        _write_cache(cache)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        # an adapter's catalog items hold something that can't be pickled;
+        # write the rest of the cache without them
+        if connection_hash:
+            cache.databases.pop(connection_hash, None)
+            cache.fingerprints.pop(connection_hash, None)
+        _write_cache(cache)
 
 
 def _get_cache_file() -> Path:
@@ -118,6 +138,9 @@ def _load_cache() -> CatalogCache | None:
         FileNotFoundError,
         AssertionError,
         EOFError,
+        # the classes of cached catalog items may have been moved or removed
+        AttributeError,
+        ImportError,
     ):
         return None
     else:
@@ -129,6 +152,8 @@ def _write_cache(cache: CatalogCache) -> None:
     Updates cache with current data catalog
     """
     cache_file = _get_cache_file()
+    # pickle before opening the file, so an error doesn't leave it truncated
+    data = pickle.dumps(cache)
     cache_file.parent.mkdir(parents=True, exist_ok=True)
     with open(cache_file, "wb") as f:
-        pickle.dump(cache, f)
+        f.write(data)
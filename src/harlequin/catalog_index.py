@@ -0,0 +1,255 @@
+﻿from __future__ import annotations
+
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Iterator, Sequence
+
+from harlequin.catalog import Catalog, CatalogItem
+
+# the maximum number of results returned by CatalogIndex.search()
+CATALOG_SEARCH_LIMIT = 50
+TRIGRAM_LENGTH = 3
+# sorts after any name that starts with the same characters
+_MAX_CHAR = chr(0x10FFFF)
+# a query's terms are separated by whitespace or the dots that separate the
+# parts of a qualified identifier, and may be quoted
+TERM_SEPARATOR_PROG = re.compile(r"[\s.\"`]+")
+
+
+@dataclass(frozen=True)
+class CatalogSearchResult:
+    """
+    An item that matches a catalog search, with its ancestors: the path
+    from the top of the catalog down to (and including) the item.
+    """
+
+    item: CatalogItem
+    path: tuple[CatalogItem, ...]
+
+
+class CatalogIndex:
+    """
+    A search index over every item that has been loaded into a Catalog, so
+    items can be found without expanding (and lazy-loading) the catalog
+    tree node by node.
+
+    Items are indexed by the parts of their qualified identifiers: their
+    own names and their ancestors' names. Many items share a name (like a
+    column named "id" in every table), so the index keeps a sorted list of
+    the distinct names, for prefix matches, and an inverted index of the
+    names' trigrams, for substring matches; each name maps to the items that
+    have it. Items are numbered in the catalog's (depth-first) order, so
+    each item's descendants have consecutive numbers, and matching an
+    ancestor's name selects a range of items.
+
+    The index is built in a single pass over the catalog and is immutable
+    after that, so it can be built in a worker thread.
+    """
+
+    def __init__(self, catalog: Catalog) -> None:
+        self._items: list[CatalogItem] = []
+        parents: list[int] = []
+        depths: list[int] = []
+        stack: list[tuple[CatalogItem, int, int]] = [
+            (item, -1, 0) for item in reversed(catalog.items)
+        ]
+        while stack:
+            item, parent, depth = stack.pop()
+            position = len(self._items)
+            self._items.append(item)
+            parents.append(parent)
+            depths.append(depth)
+            stack.extend(
+                (child, position, depth + 1) for child in reversed(item.children)
+            )
+        self._parents = array("l", parents)
+        self._depths = array("l", depths)
+        # the number after the last of each item's descendants
+        ends = list(range(1, len(parents) + 1))
+        for n in reversed(range(len(parents))):
+            if parents[n] >= 0 and ends[n] > ends[parents[n]]:
+                ends[parents[n]] = ends[n]
+        self._ends = array("l", ends)
+
+        names = [item.label.lower() for item in self._items]
+        self._names = sorted(set(names))
+        name_ids = {name: i for i, name in enumerate(self._names)}
+        name_items: list[list[int]] = [[] for _ in self._names]
+        for n, name in enumerate(names):
+            name_items[name_ids[name]].append(n)
+        self._name_items = [array("l", ns) for ns in name_items]
+
+        trigrams: dict[str, list[int]] = {}
+        for name_id, name in enumerate(self._names):
+            for trigram in self._trigrams(name):
+                trigrams.setdefault(trigram, []).append(name_id)
+        self._trigram_names = {
+            trigram: array("l", name_ids) for trigram, name_ids in trigrams.items()
+        }
+        self._scopes: dict[str, tuple[array, array]] = {}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def search(
+        self, query: str, limit: int = CATALOG_SEARCH_LIMIT
+    ) -> list[CatalogSearchResult]:
+        """
+        Returns up to limit items whose names contain the last term of
+        query, and whose ancestors' names (or own name) contain the other
+        terms, ignoring case. Terms are separated by whitespace or dots, so
+        "orders.id" and "orders id" both find the id columns of tables named
+        like orders. Items whose names match exactly rank first, then names
+        that start with the term, then names that contain it; within each
+        group, shallower items (like tables) rank before deeper ones (like
+        columns). Terms of fewer than three characters only match the start
+        of a name.
+        """
+        terms = [term for term in TERM_SEPARATOR_PROG.split(query.lower()) if term]
+        if not terms or limit <= 0:
+            return []
+        *qualifiers, last = terms
+        # the scopes of the previous query's qualifiers, which don't change
+        # while the last term is being typed
+        scopes = {
+            qualifier: self._scopes.get(qualifier) or self._scope(qualifier)
+            for qualifier in qualifiers
+        }
+        self._scopes = scopes
+        scope = None
+        for qualifier in qualifiers:
+            scope = self._intersect(scope, scopes[qualifier])
+            if not scope[0]:
+                return []
+
+        exact, prefixed, contained = self._matching_names(last)
+        ranked: list[tuple[int, int, int]] = []
+        for rank, name_ids in enumerate((exact, prefixed, contained)):
+            for name_id in name_ids:
+                for n in self._scoped_items(self._name_items[name_id], scope):
+                    ranked.append((rank, self._depths[n], n))
+                    if len(ranked) == limit:
+                        break
+                if len(ranked) == limit:
+                    break
+            if len(ranked) == limit:
+                break
+        ranked.sort()
+        return [
+            CatalogSearchResult(item=self._items[n], path=self._path(n))
+            for *_, n in ranked
+        ]
+
+    def _matching_names(
+        self, term: str
+    ) -> tuple[Sequence[int], Sequence[int], Sequence[int]]:
+        """
+        Returns the ids of the names that are equal to term, that start with
+        it, and that contain it (but don't start with it).
+        """
+        lo = bisect_left(self._names, term)
+        hi = bisect_left(self._names, term + _MAX_CHAR, lo=lo)
+        exact = range(lo, lo + 1) if lo < hi and self._names[lo] == term else ()
+        prefixed = range(lo + len(exact), hi)
+        contained = [
+            name_id
+            for name_id in self._candidate_names(term)
+            if not lo <= name_id < hi and term in self._names[name_id]
+        ]
+        return exact, prefixed, contained
+
+    def _candidate_names(self, term: str) -> Sequence[int]:
+        """
+        Returns the shortest list of names that contain one of the term's
+        trigrams, which includes every name that contains the term.
+        """
+        shortest: Sequence[int] = ()
+        for trigram in self._trigrams(term):
+            name_ids = self._trigram_names.get(trigram)
+            if name_ids is None:
+                return ()
+            if not shortest or len(name_ids) < len(shortest):
+                shortest = name_ids
+        return shortest
+
+    def _scope(self, qualifier: str) -> tuple[array, array]:
+        """
+        Returns the ranges of items (as sorted, disjoint starts and ends)
+        that are, or descend from, an item whose name contains qualifier.
+        """
+        matches = sorted(
+            n
+            for name_ids in self._matching_names(qualifier)
+            for name_id in name_ids
+            for n in self._name_items[name_id]
+        )
+        starts, ends = array("l"), array("l")
+        for n in matches:
+            if ends and n < ends[-1]:
+                # a descendant of the previous match
+                continue
+            starts.append(n)
+            ends.append(self._ends[n])
+        return starts, ends
+
+    @staticmethod
+    def _intersect(
+        scope: tuple[array, array] | None, other: tuple[array, array]
+    ) -> tuple[array, array]:
+        """
+        Returns the ranges of items that are in both scopes.
+        """
+        if scope is None:
+            return other
+        if len(scope[0]) > len(other[0]):
+            scope, other = other, scope
+        # each range is an item and its descendants, so two ranges are either
+        # disjoint or one of them contains the other
+        starts, ends = array("l"), array("l")
+        for start, end in zip(*scope):
+            i = bisect_right(other[0], start) - 1
+            if i >= 0 and start < other[1][i]:
+                starts.append(start)
+                ends.append(end)
+            else:
+                lo = bisect_left(other[0], start)
+                hi = bisect_left(other[0], end, lo=lo)
+                starts.extend(other[0][lo:hi])
+                ends.extend(other[1][lo:hi])
+        return starts, ends
+
+    @staticmethod
+    def _scoped_items(
+        items: array, scope: tuple[array, array] | None
+    ) -> Iterator[int]:
+        """
+        Yields the items (a sorted array) that are in scope.
+        """
+        if scope is None:
+            yield from items
+            return
+        starts, ends = scope
+        if len(starts) < len(items):
+            for start, end in zip(starts, ends):
+                yield from items[bisect_left(items, start) : bisect_left(items, end)]
+        else:
+            for n in items:
+                i = bisect_right(starts, n) - 1
+                if i >= 0 and n < ends[i]:
+                    yield n
+
+    def _path(self, n: int) -> tuple[CatalogItem, ...]:
+        path: list[CatalogItem] = []
+        while n >= 0:
+            path.append(self._items[n])
+            n = self._parents[n]
+        return tuple(reversed(path))
+
+    @staticmethod
+    def _trigrams(text: str) -> set[str]:
+        return {
+            text[i : i + TRIGRAM_LENGTH]
+            for i in range(len(text) - TRIGRAM_LENGTH + 1)
+        }
@@ -0,0 +1,111 @@
+﻿from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.types as pt
+from rich.align import Align
+from rich.console import RenderableType
+from rich.text import Text
+from textual_fastdatatable.column import Column
+from textual_fastdatatable.formatter import cell_formatter
+
+# the number of rows in each block of formatted cells. Blocks are formatted
+# one column at a time, and cached by the table.
+FORMAT_BLOCK_SIZE = 128
+# the number of formatted blocks (of one column each) cached by each table
+FORMAT_CACHE_BLOCKS = 256
+# string and binary values longer than this are truncated by adapters that
+# support it, and fetched in full when their cell is opened
+MAX_CELL_VALUE_LENGTH = 10_000
+
+MS_PER_MINUTE = 60_000
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+# timestamps outside this range (in ms since the epoch) overflow python's
+# datetime, including after conversion to a timezone, and are shown by the
+# table as infinite. The day of slack covers any timezone's offset.
+MIN_TIMESTAMP_MS = (
+    datetime.min.replace(tzinfo=timezone.utc) + timedelta(days=1) - EPOCH
+) // timedelta(milliseconds=1)
+MAX_TIMESTAMP_MS = (
+    datetime.max.replace(tzinfo=timezone.utc) - timedelta(days=1) - EPOCH
+) // timedelta(milliseconds=1)
+# Arrow's timezone database stops applying daylight saving time rules after
+# 2037, but python's doesn't.
+MAX_ZONED_TIMESTAMP_MS = (
+    datetime(2038, 1, 1, tzinfo=timezone.utc) - EPOCH
+) // timedelta(milliseconds=1)
+UTC_ZONES = ("UTC", "Etc/UTC")
+
+
+def format_block(
+    values: pa.Array | pa.ChunkedArray,
+    col: Column | None,
+    null_rep: Text,
+    render_markup: bool = True,
+) -> list[RenderableType]:
+    """
+    Formats a block of one column's values into the same renderables as
+    textual_fastdatatable's cell_formatter. Timestamps are formatted with
+    Arrow compute functions, which is much faster than converting each
+    value to a (timezone-aware) datetime; other values are converted to
+    python in a single pass and then formatted one by one.
+
+    Raises OverflowError if the values can't be converted to python.
+    """
+    if pt.is_timestamp(values.type):
+        strings = iso_timestamps(values)
+        if strings is not None:
+            null_cell = Align(null_rep, align="center")
+            return [
+                null_cell if s is None else Align(s, align="right")
+                for s in strings.to_pylist()
+            ]
+    return [
+        cell_formatter(value, null_rep=null_rep, col=col, render_markup=render_markup)
+        for value in values.to_pylist()
+    ]
+
+
+def iso_timestamps(
+    values: pa.Array | pa.ChunkedArray,
+) -> pa.Array | pa.ChunkedArray | None:
+    """
+    Formats timestamps like datetime.isoformat(timespec="milliseconds"),
+    with a UTC offset of +00:00 shown as Z. Returns None if any value
+    can't be formatted the same way: if it overflows python's datetime, if
+    it is in a timezone that Arrow can't find (like a fixed offset) or
+    formats differently (after 2037), or if its timezone's offset isn't a
+    whole number of minutes (Arrow drops the seconds, but python shows them).
+    """
+    tz = values.type.tz
+    try:
+        floored = pc.floor_temporal(values, unit="millisecond").cast(
+            pa.timestamp("ms", tz=tz)
+        )
+        epoch_ms = floored.cast(pa.int64())
+        bounds = pc.min_max(epoch_ms)
+        lowest, highest = bounds["min"].as_py(), bounds["max"].as_py()
+        if lowest is None:  # every value is null
+            return pc.cast(values, pa.string())
+        if lowest < MIN_TIMESTAMP_MS or highest > MAX_TIMESTAMP_MS:
+            return None
+        if not tz:
+            return pc.strftime(floored, format="%Y-%m-%dT%H:%M:%S")
+        if tz in UTC_ZONES:
+            return pc.strftime(floored, format="%Y-%m-%dT%H:%M:%SZ")
+        if highest >= MAX_ZONED_TIMESTAMP_MS:
+            return None
+        offsets = pc.subtract(pc.local_timestamp(floored).cast(pa.int64()), epoch_ms)
+        whole_minutes = pc.multiply(pc.divide(offsets, MS_PER_MINUTE), MS_PER_MINUTE)
+        if not pc.all(pc.equal(offsets, whole_minutes)).as_py():
+            return None
+        strings = pc.strftime(floored, format="%Y-%m-%dT%H:%M:%S%z")
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        # e.g., the timezone database is missing
+        return None
+    strings = pc.replace_substring_regex(
+        strings, pattern=r"([+-]\d\d)(\d\d)$", replacement=r"\1:\2"
+    )
+    return pc.replace_substring(strings, pattern="+00:00", replacement="Z")
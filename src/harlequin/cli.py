@@ -1,5 +1,6 @@
 ﻿from __future__ import annotations
 
+import os
 import sys
 from pathlib import Path
 from typing import Any, Sequence
@@ -7,22 +8,25 @@ from typing import Any, Sequence
 import rich_click as click
 from importlib.metadata import version, PackageNotFoundError
 
-from harlequin import Harlequin
 from harlequin.adapter import HarlequinAdapter
 from harlequin.catalog_cache import get_connection_hash
 from harlequin.colors import GREEN, PINK, PURPLE, VALID_THEMES, YELLOW
 from harlequin.config import get_config_for_profile
-from harlequin.config_wizard import wizard
 from harlequin.exception import (
     HarlequinConfigError,
+    HarlequinConnectionError,
+    HarlequinCopyError,
     HarlequinLocaleError,
+    HarlequinQueryError,
     HarlequinTzDataError,
+    pretty_error_message,
     pretty_print_error,
 )
-from harlequin.keys_app import HarlequinKeys
+from harlequin.headless import OUTPUT_FORMATS, run_headless, split_queries
 from harlequin.locale_manager import set_locale
 from harlequin.options import AbstractOption
 from harlequin.plugins import load_adapter_plugins
+from harlequin.results_memory import DEFAULT_RESULTS_MEMORY_BUDGET
 from harlequin.windows_timezone import check_and_install_tzdata
 
 if sys.version_info < (3, 10):
@@ -81,11 +85,22 @@ click.rich_click.OPTION_GROUPS = {
                 "--theme",
                 "--keymap-name",
                 "--limit",
+                "--no-count-rows",
+                "--results-memory-budget",
                 "--config-path",
                 "--locale",
                 "--no-download-tzdata",
             ],
         },
+        {
+            "name": "Headless Options",
+            "options": [
+                "--execute",
+                "--question",
+                "--output-format",
+                "--output",
+            ],
+        },
         {
             "name": "Mini Apps",
             "options": [
@@ -128,6 +143,8 @@ def _version_option() -> str:
 def _config_wizard_callback(ctx: click.Context, param: Any, value: bool) -> None:
     if not value or ctx.resilient_parsing:
         return
+    from harlequin.config_wizard import wizard
+
     wizard(ctx.params.get("config_path", None))
     ctx.exit(0)
 
@@ -135,6 +152,8 @@ def _config_wizard_callback(ctx: click.Context, param: Any, value: bool) -> None
 def _keys_app_callback(ctx: click.Context, param: Any, value: bool) -> None:
     if not value or ctx.resilient_parsing:
         return
+    from harlequin.keys_app import HarlequinKeys
+
     profile_name = ctx.params.get("profile", None)
     if profile_name == "None":
         profile_name = None
@@ -148,6 +167,60 @@ def _keys_app_callback(ctx: click.Context, param: Any, value: bool) -> None:
     ctx.exit(0)
 
 
+def _run_headless(
+    ctx: click.Context,
+    adapter: HarlequinAdapter,
+    execute: Path | str | None,
+    question: str | None,
+    output_format: str,
+    output: Path | str | None,
+    limit: int | None,
+) -> None:
+    """
+    Runs the queries from --execute or --question without starting the IDE,
+    then exits. Errors are printed to stderr, so they don't end up in
+    results written to stdout.
+    """
+    from rich.console import Console
+
+    err_console = Console(stderr=True)
+    try:
+        if question is not None:
+            queries = []
+        elif str(execute) == "-":
+            queries = split_queries(sys.stdin.read())
+        else:
+            queries = split_queries(Path(str(execute)).read_text())
+        run_headless(
+            adapter,
+            queries,
+            output_format=output_format.lower(),
+            output_path=Path(output) if output is not None else None,
+            limit=limit,
+            question=question,
+        )
+    except (
+        HarlequinConnectionError,
+        HarlequinCopyError,
+        HarlequinQueryError,
+    ) as e:
+        err_console.print(pretty_error_message(e))
+        ctx.exit(1)
+    except BrokenPipeError:
+        # the reader closed stdout early (e.g., piped to head); that's fine,
+        # but stop Python from complaining when it flushes stdout at exit
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+    except OSError as e:
+        err_console.print(
+            pretty_error_message(
+                HarlequinQueryError(msg=str(e), title="Could not read your query.")
+            )
+        )
+        ctx.exit(1)
+    ctx.exit(0)
+
+
 def build_cli() -> click.Command:
     """
     Loads installed adapters and constructs a click Command that includes options
@@ -282,6 +355,62 @@ def build_cli() -> click.Command:
         ),
         is_flag=True,
     )
+    @click.option(
+        "--no-count-rows",
+        help=(
+            "Don't count the total number of records returned by a query whose "
+            "results were limited. By default, Harlequin counts them in the "
+            "background and shows the total above the results."
+        ),
+        is_flag=True,
+    )
+    @click.option(
+        "--results-memory-budget",
+        help=(
+            "The amount of memory that query results can use, across all result "
+            "tabs, like 500MB or 2GiB. When it is exceeded, the results of the "
+            "least-recently-viewed tabs are moved to disk. Set to 0 for no limit. "
+            f"Default is {DEFAULT_RESULTS_MEMORY_BUDGET}"
+        ),
+    )
+    @click.option(
+        "--execute",
+        help=(
+            "Run the queries in a SQL file (or - for stdin) without starting the "
+            "IDE, and write their results to stdout or --output."
+        ),
+        type=click.Path(
+            exists=True,
+            file_okay=True,
+            dir_okay=False,
+            allow_dash=True,
+            path_type=Path,
+        ),
+    )
+    @click.option(
+        "--question",
+        "-q",
+        help=(
+            "Translate a natural-language question into SQL and run it without "
+            "starting the IDE, writing its results to stdout or --output."
+        ),
+    )
+    @click.option(
+        "--output-format",
+        default="csv",
+        show_default=True,
+        type=click.Choice(OUTPUT_FORMATS, case_sensitive=False),
+        help="The format for the results of --execute or --question.",
+    )
+    @click.option(
+        "--output",
+        "-o",
+        help=(
+            "The path to a file to write the results of --execute or --question "
+            "to. Required for parquet output. Defaults to stdout."
+        ),
+        type=click.Path(file_okay=True, dir_okay=False, writable=True, path_type=Path),
+    )
     @click.pass_context
     def inner_cli(
         ctx: click.Context,
@@ -340,6 +469,9 @@ def build_cli() -> click.Command:
         conn_str: Sequence[str] = config.pop("conn_str", tuple())
         if isinstance(conn_str, str):
             conn_str = (conn_str,)
+        # the default limit is for the IDE; headless results are only limited
+        # if the user sets a limit
+        headless_limit: str | int | None = config.get("limit")
         max_results: str | int = config.pop("limit", DEFAULT_LIMIT)
         theme: str = config.pop("theme", DEFAULT_THEME)
         keymap_names: list[str] = config.pop("keymap_name", DEFAULT_KEYMAP_NAMES)
@@ -355,6 +487,14 @@ def build_cli() -> click.Command:
                 )
                 ctx.exit(2)
         show_s3: str | None = config.pop("show_s3", None)
+        count_rows = not config.pop("no_count_rows", False)
+        results_memory_budget: str | int = config.pop(
+            "results_memory_budget", DEFAULT_RESULTS_MEMORY_BUDGET
+        )
+        execute: Path | str | None = config.pop("execute", None)
+        question: str | None = config.pop("question", None)
+        output_format: str = config.pop("output_format", "csv")
+        output: Path | str | None = config.pop("output", None)
 
         # load and instantiate the adapter
         adapter: str = config.pop("adapter", DEFAULT_ADAPTER)
@@ -365,18 +505,33 @@ def build_cli() -> click.Command:
             pretty_print_error(e)
             ctx.exit(2)
 
+        if execute is not None or question is not None:
+            _run_headless(
+                ctx,
+                adapter=adapter_instance,
+                execute=execute,
+                question=question,
+                output_format=output_format,
+                output=output,
+                limit=int(headless_limit) if headless_limit is not None else None,
+            )
+
         connection_id = (
             adapter_instance.connection_id
             if adapter_instance.connection_id is not None
             else get_connection_hash(conn_str, config)
         )
 
+        from harlequin.app import Harlequin
+
         tui = Harlequin(
             adapter=adapter_instance,
             keymap_names=keymap_names,
             user_defined_keymaps=user_defined_keymaps,
             connection_hash=connection_id,
             max_results=max_results,
+            count_rows=count_rows,
+            results_memory_budget=results_memory_budget,
             theme=theme,
             show_files=show_files,
             show_s3=show_s3,
@@ -0,0 +1,147 @@
+﻿from __future__ import annotations
+
+from typing import Any
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.types as pt
+from rich.align import Align
+from rich.cells import cell_len
+from rich.text import Text
+from textual_fastdatatable.backend import (
+    ArrowBackend,
+    AutoBackendType,
+    DataTableBackend,
+    create_backend,
+)
+from textual_fastdatatable.formatter import cell_formatter
+
+# the number of rows measured to size each column. Half of the sample is the
+# first rows (which are shown first); the rest are spread across the table.
+WIDTH_SAMPLE_SIZE = 1_000
+# the width of an infinite date or timestamp, which pyarrow can't convert
+INFINITE_TEMPORAL_WIDTH = 26
+
+
+def sample_indices(
+    num_rows: int, sample_size: int = WIDTH_SAMPLE_SIZE
+) -> pa.Array | None:
+    """
+    Returns the indices of at most sample_size rows: the first rows, and
+    then evenly-spaced rows through the rest of the table. Returns None if
+    every row fits in the sample.
+    """
+    if num_rows <= sample_size:
+        return None
+    head = sample_size // 2
+    step = max(1, (num_rows - head) // (sample_size - head))
+    spread = range(head, num_rows, step)[: sample_size - head]
+    return pa.array([*range(head), *spread], type=pa.int64())
+
+
+def _is_cheap_to_measure(arr_type: pa.DataType) -> bool:
+    """
+    ArrowBackend measures these types from the min and max (or just the type)
+    of the whole column, which is a single vectorized pass and exact, so they
+    don't need to be sampled.
+    """
+    return bool(
+        pt.is_boolean(arr_type)
+        or pt.is_null(arr_type)
+        or pt.is_integer(arr_type)
+        or pt.is_floating(arr_type)
+        or pt.is_decimal(arr_type)
+    )
+
+
+def display_width(value: Any) -> int:
+    """
+    Returns the width, in terminal cells, of value as the results table
+    shows it.
+    """
+    renderable = cell_formatter(value, null_rep=Text(""))
+    if isinstance(renderable, Align):
+        renderable = renderable.renderable
+    if isinstance(renderable, str):
+        renderable = Text.from_markup(renderable)
+    if isinstance(renderable, Text):
+        return renderable.cell_len
+    return cell_len(str(renderable))
+
+
+def measure_column(arr: pa.Array | pa.ChunkedArray) -> int:
+    """
+    Returns the width, in terminal cells, of the widest value in arr.
+    Numbers, booleans, and temporal values are as wide as the column's min
+    or max; everything else is cast to strings and measured cell by cell,
+    so only pass a sample of a large column.
+    """
+    if len(arr) == 0 or arr.null_count == len(arr):
+        return 0
+    if _is_cheap_to_measure(arr.type) or pt.is_temporal(arr.type):
+        try:
+            min_max = pc.min_max(arr)
+        except pa.ArrowNotImplementedError:
+            # e.g., intervals, which aren't ordered
+            pass
+        else:
+            try:
+                return max(
+                    display_width(min_max[key].as_py()) for key in ("min", "max")
+                )
+            except OverflowError:
+                if pt.is_temporal(arr.type):
+                    return INFINITE_TEMPORAL_WIDTH
+                return max(len(str(min_max[key])) for key in ("min", "max"))
+    try:
+        strings = arr.cast(pa.string(), safe=False)
+    except (pa.ArrowNotImplementedError, pa.ArrowInvalid):
+        # some types can't be cast to strings by arrow, but python can
+        strings = pa.array([str(el) for el in arr.to_pylist()], type=pa.string())
+    return max(cell_len(s) for s in strings.fill_null("").to_pylist())
+
+
+class SampledArrowBackend(ArrowBackend):
+    """
+    An ArrowBackend that measures the content of string, temporal, and
+    nested columns from a bounded sample of rows, instead of casting and
+    measuring every cell before the table is first drawn. Values wider than
+    the sample's widest are truncated with an ellipsis, like values wider
+    than the table's max column width.
+
+    Widths are measured once and cached, until the data changes.
+    """
+
+    def __init__(
+        self,
+        data: pa.Table,
+        max_rows: int | None = None,
+        sample_size: int = WIDTH_SAMPLE_SIZE,
+    ) -> None:
+        super().__init__(data, max_rows=max_rows)
+        self.sample_size = sample_size
+
+    @property
+    def column_content_widths(self) -> list[int]:
+        if not self._column_content_widths:
+            indices = sample_indices(self.data.num_rows, self.sample_size)
+            widths: list[int] = []
+            for arr in self.data.columns:
+                if indices is not None and not _is_cheap_to_measure(arr.type):
+                    arr = arr.take(indices)
+                widths.append(measure_column(arr))
+            self._column_content_widths = widths
+        return self._column_content_widths
+
+
+def create_results_backend(
+    data: AutoBackendType, max_rows: int | None = None
+) -> DataTableBackend:
+    """
+    Like textual_fastdatatable's create_backend, but Arrow data gets a
+    SampledArrowBackend.
+    """
+    backend = create_backend(data, max_rows=max_rows)
+    if type(backend) is ArrowBackend:
+        return SampledArrowBackend(backend.source_data, max_rows=max_rows)
+    return backend
@@ -0,0 +1,112 @@
+﻿from __future__ import annotations
+
+import time
+
+from rich.style import Style
+from rich.text import Text
+from textual import events, on
+from textual.app import ComposeResult
+from textual.containers import Vertical
+from textual.screen import ModalScreen
+from textual.widgets import Input, OptionList
+from textual.widgets.option_list import Option
+
+from harlequin.catalog_index import CatalogIndex, CatalogSearchResult
+
+
+class CatalogSearchScreen(ModalScreen[CatalogSearchResult]):
+    """
+    Searches the names of every item in the Data Catalog as the user types,
+    using a prebuilt CatalogIndex. Dismisses with the highlighted result when
+    the user presses enter (or clicks a result); escape closes the modal
+    without calling the callback.
+    """
+
+    def __init__(
+        self,
+        index: CatalogIndex,
+        query: str = "",
+        name: str | None = None,
+        id: str | None = None,  # noqa: A002
+        classes: str | None = None,
+    ) -> None:
+        super().__init__(name, id, classes)
+        self.index = index
+        self.initial_query = query
+        self.results: list[CatalogSearchResult] = []
+
+    def compose(self) -> ComposeResult:
+        with Vertical(id="catalog_search_outer"):
+            yield Input(
+                value=self.initial_query,
+                placeholder="Search by name, like orders.id or sales ord",
+                id="catalog_search_input",
+            )
+            yield OptionList(id="catalog_search_results")
+
+    def on_mount(self) -> None:
+        container = self.query_one("#catalog_search_outer")
+        container.border_title = "Search Data Catalog"
+        container.border_subtitle = f"{len(self.index):,} items"
+        self.query_one(Input).focus()
+        self.search(self.initial_query)
+
+    def on_key(self, event: events.Key) -> None:
+        results = self.query_one(OptionList)
+        if event.key == "escape":
+            event.stop()
+            self.app.pop_screen()
+        elif event.key == "down" and not results.has_focus:
+            event.stop()
+            results.action_cursor_down()
+        elif event.key == "up" and not results.has_focus:
+            event.stop()
+            results.action_cursor_up()
+
+    @on(Input.Changed, "#catalog_search_input")
+    def update_results(self, message: Input.Changed) -> None:
+        message.stop()
+        self.search(message.value)
+
+    @on(Input.Submitted, "#catalog_search_input")
+    def select_highlighted(self, message: Input.Submitted) -> None:
+        message.stop()
+        highlighted = self.query_one(OptionList).highlighted
+        if highlighted is not None:
+            self.dismiss(self.results[highlighted])
+
+    @on(OptionList.OptionSelected, "#catalog_search_results")
+    def select_result(self, message: OptionList.OptionSelected) -> None:
+        message.stop()
+        self.dismiss(self.results[message.option_index])
+
+    def search(self, query: str) -> None:
+        start = time.monotonic()
+        self.results = self.index.search(query)
+        elapsed = time.monotonic() - start
+        results = self.query_one(OptionList)
+        results.clear_options()
+        results.add_options([self._build_option(result) for result in self.results])
+        if self.results:
+            results.highlighted = 0
+        container = self.query_one("#catalog_search_outer")
+        if query.strip():
+            container.border_subtitle = (
+                f"{len(self.results):,} "
+                f"{'match' if len(self.results) == 1 else 'matches'} "
+                f"in {elapsed * 1000:.1f} ms"
+            )
+        else:
+            container.border_subtitle = f"{len(self.index):,} items"
+
+    def _build_option(self, result: CatalogSearchResult) -> Option:
+        muted = Style(dim=True)
+        prompt = Text.assemble(
+            (result.item.label, "bold"), " ", (result.item.type_label, muted)
+        )
+        if len(result.path) > 1:
+            parents = ".".join(item.label for item in result.path[:-1])
+            prompt.append(f"  {parents}", style=muted)
+        prompt.no_wrap = True
+        prompt.overflow = "ellipsis"
+        return Option(prompt)
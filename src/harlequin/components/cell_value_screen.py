@@ -0,0 +1,96 @@
+﻿from __future__ import annotations
+
+import json
+from typing import Any
+
+from rich.markup import escape
+from textual import events
+from textual.app import ComposeResult
+from textual.containers import Vertical
+from textual.screen import ModalScreen
+from textual.widgets import Static, TextArea
+
+
+def format_cell_value(value: Any) -> str:
+    """
+    Formats a cell's value for reading: JSON documents and nested values
+    (structs, lists, and maps) are indented, and binary values are shown
+    as hex.
+    """
+    if value is None:
+        return "null"
+    if isinstance(value, bytes):
+        return value.hex(" ", 2)
+    if isinstance(value, str):
+        if value.lstrip().startswith(("{", "[")):
+            try:
+                return json.dumps(json.loads(value), indent=2, ensure_ascii=False)
+            except ValueError:
+                pass
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, indent=2, ensure_ascii=False, default=str)
+    return str(value)
+
+
+class CellValueScreen(ModalScreen):
+    """
+    Shows the value of one results cell in a read-only text area, which can
+    be scrolled and selected. If loading is True, the value is a truncated
+    preview, and the full value is shown with show_value() once it has been
+    fetched.
+    """
+
+    def __init__(
+        self,
+        title: str,
+        value: Any,
+        loading: bool = False,
+        name: str | None = None,
+        id: str | None = None,  # noqa: A002
+        classes: str | None = None,
+    ) -> None:
+        super().__init__(name, id, classes)
+        self.cell_title = title
+        self.value = value
+        self.is_loading = loading
+
+    def compose(self) -> ComposeResult:
+        with Vertical(id="cell_value_outer"):
+            yield Static(
+                "Loading the full value..." if self.is_loading else "",
+                id="cell_value_note",
+            )
+            yield TextArea(
+                format_cell_value(self.value),
+                read_only=True,
+                soft_wrap=True,
+                id="cell_value_text",
+            )
+            yield Static("Press Escape to close.", id="cell_value_footer")
+
+    def on_mount(self) -> None:
+        container = self.query_one("#cell_value_outer")
+        container.border_title = self.cell_title
+        self.query_one("#cell_value_note").display = self.is_loading
+        self.query_one(TextArea).focus()
+
+    def on_key(self, event: events.Key) -> None:
+        if event.key == "escape":
+            event.stop()
+            self.app.pop_screen()
+
+    def show_value(self, value: Any) -> None:
+        self.value = value
+        self.is_loading = False
+        self.query_one("#cell_value_note").display = False
+        self.query_one(TextArea).load_text(format_cell_value(value))
+
+    def show_error(self, error: BaseException) -> None:
+        self.is_loading = False
+        note = self.query_one("#cell_value_note", Static)
+        note.update(
+            "Showing a truncated value. The full value could not be loaded: "
+            f"{escape(str(error))}"
+        )
+        note.add_class("error")
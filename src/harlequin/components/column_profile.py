@@ -0,0 +1,86 @@
+﻿from __future__ import annotations
+
+from typing import Any, Sequence
+
+from rich.console import Group, RenderableType
+from rich.table import Table
+from rich.text import Text
+from textual.app import ComposeResult
+from textual.containers import VerticalScroll
+from textual.widgets import Static
+
+from harlequin.result_ops import ColumnProfile
+
+BAR_WIDTH = 16
+QUANTILE_LABELS = ("p25", "p50", "p75")
+
+
+class ColumnProfilePanel(VerticalScroll, can_focus=False):
+    """
+    A side panel that shows summary statistics for the columns of a
+    result tab. The panel only renders profiles; ResultsViewer computes
+    them in a worker and calls update_profiles.
+    """
+
+    BORDER_TITLE = "Column Profile"
+
+    def compose(self) -> ComposeResult:
+        yield Static(Text("Profiling...", style="italic"), id="profile_content")
+
+    def show_loading(self) -> None:
+        self.query_one(Static).update(Text("Profiling...", style="italic"))
+
+    def show_error(self) -> None:
+        self.query_one(Static).update(
+            Text("Could not profile these columns.", style="italic")
+        )
+
+    def update_profiles(
+        self, profiles: Sequence[ColumnProfile], note: str | None = None
+    ) -> None:
+        renderables: list[RenderableType] = [
+            self._render_profile(profile) for profile in profiles
+        ]
+        if note:
+            renderables.append(Text(note, style="italic"))
+        self.query_one(Static).update(Group(*renderables))
+
+    @staticmethod
+    def _render_profile(profile: ColumnProfile) -> RenderableType:
+        table = Table(
+            title=Text.assemble((profile.name, "bold"), " ", (profile.type, "dim")),
+            title_justify="left",
+            show_header=False,
+            box=None,
+            padding=(0, 1, 0, 0),
+            expand=True,
+        )
+        table.add_column("stat", style="dim", no_wrap=True)
+        table.add_column("value", overflow="ellipsis", no_wrap=True)
+        null_pct = profile.null_count / profile.row_count if profile.row_count else 0
+        table.add_row("rows", f"{profile.row_count:,}")
+        table.add_row("nulls", f"{profile.null_count:,} ({null_pct:.1%})")
+        if profile.approx_distinct is not None:
+            table.add_row("distinct", f"~{profile.approx_distinct:,}")
+            table.add_row("min", _format_value(profile.min))
+            table.add_row("max", _format_value(profile.max))
+        for label, value in zip(QUANTILE_LABELS, profile.quantiles):
+            table.add_row(label, _format_value(value))
+        if profile.histogram:
+            peak = max(count for _, count in profile.histogram) or 1
+            for label, count in profile.histogram:
+                bar = "█" * max(round(count / peak * BAR_WIDTH), 1 if count else 0)
+                table.add_row(
+                    Text(label, overflow="ellipsis"),
+                    Text.assemble((bar, "bold"), f" {count:,}"),
+                )
+        table.add_row("", "")
+        return table
+
+
+def _format_value(value: Any) -> str:
+    if value is None:
+        return "∅ null"
+    if isinstance(value, float):
+        return f"{value:.6g}"
+    return str(value)
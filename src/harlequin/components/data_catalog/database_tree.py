@@ -3,7 +3,7 @@
 from asyncio import PriorityQueue
 from contextlib import suppress
 from pathlib import Path
-from typing import TYPE_CHECKING, Generator, Iterable, TypeVar
+from typing import TYPE_CHECKING, Generator, Iterable, Sequence, TypeVar
 
 from rich.style import Style
 from rich.text import Text, TextType
@@ -345,6 +345,42 @@ class DatabaseTree(HarlequinTree[CatalogItem], inherit_bindings=False):
                     # Mark this iteration as done.
                     self._load_queue.task_done()
 
+    def select_path(self, path: Sequence[CatalogItem]) -> None:
+        """Move the cursor to the node of the last item in path.
+
+        Only the nodes of the item's ancestors are expanded (and populated);
+        if the item is no longer in the tree, the cursor moves to the
+        deepest ancestor that is.
+
+        Args:
+            path: A catalog item and its ancestors, from the top of the catalog
+                down to the item.
+        """
+        node = self.root
+        for depth, item in enumerate(path):
+            if node.data is not None and node.data.children and not node.children:
+                self._populate_node(node, content=node.data.children)
+            child = next(
+                (
+                    child
+                    for child in node.children
+                    if child.data is not None
+                    and child.data.qualified_identifier == item.qualified_identifier
+                ),
+                None,
+            )
+            if child is None:
+                break
+            node = child
+            if depth < len(path) - 1:
+                node.expand()
+        if node is self.root:
+            return
+        # make sure the tree lines (and the node's line) are up to date
+        _ = self._tree_lines
+        self.move_cursor(node)
+        self.scroll_to_node(node, animate=False)
+
     async def _on_tree_node_expanded(
         self, event: Tree.NodeExpanded[CatalogItem]
     ) -> None:
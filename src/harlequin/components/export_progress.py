@@ -0,0 +1,57 @@
+﻿from __future__ import annotations
+
+from rich.markup import escape
+from textual import events
+from textual.app import ComposeResult
+from textual.containers import Horizontal
+from textual.message import Message
+from textual.widgets import Static
+
+from harlequin.export import ExportProgress
+
+
+class ExportProgressToast(Horizontal, can_focus=False):
+    """
+    A toast that shows the progress of an export running in the background:
+    the records and bytes written so far, and the rate they are being
+    written. Clicking the toast cancels the export.
+    """
+
+    REFRESH_INTERVAL = 0.5
+
+    class CancelRequested(Message):
+        def __init__(self, progress: ExportProgress) -> None:
+            super().__init__()
+            self.progress = progress
+
+    def __init__(
+        self,
+        progress: ExportProgress,
+        name: str | None = None,
+        id: str | None = None,  # noqa: A002
+        classes: str | None = None,
+    ) -> None:
+        super().__init__(name=name, id=id, classes=classes)
+        self.progress = progress
+
+    def compose(self) -> ComposeResult:
+        self.message = Static(self._progress_text(), id="export_progress_message")
+        yield self.message
+
+    def on_mount(self) -> None:
+        self.set_interval(self.REFRESH_INTERVAL, self.refresh_progress)
+
+    def on_click(self, event: events.Click) -> None:
+        if event.widget is self.message and not self.progress.canceled:
+            self.post_message(self.CancelRequested(progress=self.progress))
+
+    def refresh_progress(self) -> None:
+        self.message.update(self._progress_text())
+
+    def _progress_text(self) -> str:
+        hint = "Canceling..." if self.progress.canceled else "Click to cancel."
+        return (
+            f"[b]Exporting {escape(self.progress.path.name)}[/]\n"
+            f"{self.progress.summary()}\n"
+            f"[dim]{hint}[/]"
+        )
@@ -1,7 +1,9 @@
 ﻿from __future__ import annotations
 
 from pathlib import Path
-from typing import Any, Callable, Dict, Sequence, Tuple
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from rich.markup import escape
 
 from textual import events
 from textual.app import ComposeResult
@@ -9,34 +11,98 @@ from textual.containers import Horizontal, Vertical, VerticalScroll
 from textual.css.query import QueryError
 from textual.screen import ModalScreen
 from textual.widget import Widget
-from textual.widgets import Button, Input, Label, Select, Static
+from textual.widgets import Button, Input, Label, Select, Static, Switch
 from textual_textarea import PathInput
 
+from harlequin.adapter import HarlequinConnection
 from harlequin.components.error_modal import ErrorModal
 from harlequin.components.results_viewer import ResultsTable
-from harlequin.exception import HarlequinCopyError
-from harlequin.export import copy
+from harlequin.exception import HarlequinCopyCanceled, HarlequinCopyError
+from harlequin.export import (
+    DIRECTORY_OUTPUT_OPTIONS,
+    ExportDestination,
+    ExportProgress,
+    copy,
+    copy_query_to_many,
+    copy_to_many,
+    split_column_list,
+)
 from harlequin.options import AbstractOption, HarlequinCopyFormat
 
 ExportOptions = Dict[str, Any]
 
 
 def export_callback(
-    screen_data: Tuple[Path, str, ExportOptions],
+    screen_data: Tuple[Sequence[ExportDestination], bool],
     table: ResultsTable,
-    success_callback: Callable[[], None],
+    success_callback: Callable[[bool], None],
     error_callback: Callable[[Exception], None],
+    connection: HarlequinConnection | None = None,
+    progress: ExportProgress | None = None,
 ) -> None:
+    """
+    Writes the table's data to one or more destinations. If the user chose to
+    export the full query (the last item in screen_data), the table's query is
+    run again by the connection and written straight to the destinations,
+    instead. The data is read once, and its record batches are written to
+    every destination concurrently.
+
+    If progress is given, it tracks the export, which may be canceled with
+    it. Anything written before an error or cancellation is deleted, and a
+    canceled export calls error_callback with a HarlequinCopyCanceled error.
+    """
+    destinations, full_query = screen_data
     try:
-        copy(
-            table=table,
-            path=screen_data[0],
-            format_name=screen_data[1],
-            options=screen_data[2],
-        )
-        success_callback()
+        if full_query:
+            if connection is None or table.query_text is None:
+                raise HarlequinCopyError(
+                    "Only the results of a query can be exported in full.",
+                    title="Harlequin could not export your query.",
+                )
+            if progress is not None:
+                progress.on_cancel(connection.cancel)
+                progress.check_canceled()
+            try:
+                if len(destinations) == 1:
+                    (destination,) = destinations
+                    connection.copy(
+                        query=table.query_text,
+                        path=destination.path,
+                        format_name=destination.format_name,
+                        options=destination.options,
+                    )
+                else:
+                    copy_query_to_many(
+                        connection=connection,
+                        query=table.query_text,
+                        destinations=destinations,
+                        progress=progress,
+                    )
+            finally:
+                if progress is not None:
+                    progress.on_cancel(None)
+        elif len(destinations) == 1:
+            (destination,) = destinations
+            copy(
+                table=table,
+                path=destination.path,
+                format_name=destination.format_name,
+                options=destination.options,
+                progress=progress,
+            )
+        else:
+            copy_to_many(table=table, destinations=destinations, progress=progress)
+        if progress is not None:
+            # a write may finish after it was interrupted
+            progress.check_canceled()
     except (OSError, HarlequinCopyError) as e:
+        if progress is not None:
+            progress.remove_partial_file()
+            if progress.canceled and not isinstance(e, HarlequinCopyCanceled):
+                e = progress.canceled_error()
         error_callback(e)
+    else:
+        success_callback(full_query)
 
 
 class NoFocusVerticalScroll(VerticalScroll, can_focus=False):
@@ -49,6 +115,7 @@ class CopyOptionsMenu(Widget, can_focus=False):
         format_name: str,
         options: Sequence[AbstractOption],
         *children: Widget,
+        column_names: Sequence[str] | None = None,
         name: str | None = None,
         id: str | None = None,  # noqa: A002
         classes: str | None = None,
@@ -59,6 +126,7 @@ class CopyOptionsMenu(Widget, can_focus=False):
         )
         self.format_name = format_name
         self.options = options
+        self.column_names = column_names
 
     def compose(self) -> ComposeResult:
         for option in self.options:
@@ -78,6 +146,47 @@ class CopyOptionsMenu(Widget, can_focus=False):
             for option in self.options
         }
 
+    @property
+    def writes_directory(self) -> bool:
+        """
+        True if the current options write a directory of files, instead of a
+        single file.
+        """
+        options = self.current_options
+        return any(options.get(name) for name in DIRECTORY_OUTPUT_OPTIONS)
+
+    def validate(self) -> list[str]:
+        """
+        Returns a list of problems with the current options, including
+        options that are invalid together, or an empty list if the options
+        are valid.
+        """
+        errors: list[str] = []
+        for option in self.options:
+            w = self._get_option_widget_by_name(option.name)
+            if isinstance(w, Input):
+                result = w.validate(w.value)
+                if result is not None and not result.is_valid:
+                    errors.extend(
+                        f"{option.label}: {description}"
+                        for description in result.failure_descriptions
+                    )
+        options = self.current_options
+        partition_by = split_column_list(options.get("partition_by"))
+        if partition_by:
+            if options.get("per_thread_output"):
+                errors.append("Partition By can't be combined with Per-Thread Output.")
+            if options.get("file_size_bytes"):
+                errors.append("Partition By can't be combined with File Size.")
+            if self.column_names:
+                known = {name.lower() for name in self.column_names}
+                errors.extend(
+                    f"Partition By: There is no column named {name!r}."
+                    for name in partition_by
+                    if name and name.lower() not in known
+                )
+        return errors
+
     def _get_option_widget_by_name(self, name: str) -> Widget | None:
         try:
             return self.query_one(f"#{name}")
@@ -92,16 +201,30 @@ class CopyOptionsMenu(Widget, can_focus=False):
             return None
 
 
-class ExportScreen(ModalScreen[Tuple[Path, str, ExportOptions]]):
+class ExportScreen(ModalScreen[Tuple[List[ExportDestination], bool]]):
     def __init__(
         self,
         formats: list[HarlequinCopyFormat],
+        can_export_query: bool = False,
+        column_names: Sequence[str] | None = None,
         name: str | None = None,
         id: str | None = None,  # noqa: A002
         classes: str | None = None,
     ) -> None:
+        """
+        Args:
+            formats (list[HarlequinCopyFormat]): The file formats to choose from.
+            can_export_query (bool): If True, the user can choose to export
+                the full query, by running it again with the adapter's copy(),
+                instead of the (limited) results.
+            column_names (Sequence[str] | None): The names of the exported
+                columns, used to validate options that name columns.
+        """
         super().__init__(name, id, classes)
         self.formats = formats
+        self.can_export_query = can_export_query
+        self.column_names = column_names
+        self.destinations: list[ExportDestination] = []
 
     def compose(self) -> ComposeResult:
         assert self.formats is not None
@@ -121,15 +244,21 @@ class ExportScreen(ModalScreen[Tuple[Path, str, ExportOptions]]):
                 tab_advances_focus=True,
             )
             yield Label("", id="validation_label")
+            yield Static("", id="destinations_label")
             with Horizontal(classes="option_row"):
                 yield Label("Format:", classes="select_label")
                 yield Select(
                     options=[(option.label, option.name) for option in self.formats],
                     id="format_select",
                 )
+            if self.can_export_query:
+                with Horizontal(classes="option_row"):
+                    yield Label("Export Full Query:", classes="switch_label")
+                    yield Switch(value=False, id="full_query")
             yield NoFocusVerticalScroll(id="options_container")
             with Horizontal(id="export_button_row"):
                 yield Button(label="Cancel", variant="error", id="cancel")
+                yield Button(label="Add Destination", id="add_destination")
                 yield Button(label="Export", variant="primary", id="export")
 
     def on_mount(self) -> None:
@@ -142,6 +271,17 @@ class ExportScreen(ModalScreen[Tuple[Path, str, ExportOptions]]):
             "#options_container", NoFocusVerticalScroll
         )
         self.export_button = self.query_one("#export", Button)
+        self.destinations_label = self.query_one("#destinations_label", Static)
+        self.destinations_label.display = False
+        self.query_one("#add_destination", Button).tooltip = (
+            "Add this file to the export, and choose another. Every file is "
+            "written in a single pass over the data."
+        )
+        if self.can_export_query:
+            self.query_one("#full_query", Switch).tooltip = (
+                "Run the query again and write all of its records straight to "
+                "the file, instead of the results shown in Harlequin."
+            )
         self.file_input.focus()
 
     def on_key(self, event: events.Key) -> None:
@@ -152,6 +292,8 @@ class ExportScreen(ModalScreen[Tuple[Path, str, ExportOptions]]):
         button = event.button
         if button.id == "export":
             self._export()
+        elif button.id == "add_destination":
+            self._add_destination()
         else:
             self.app.pop_screen()
 
@@ -193,39 +335,113 @@ class ExportScreen(ModalScreen[Tuple[Path, str, ExportOptions]]):
                 ]
             except (ValueError, IndexError, AssertionError):
                 return
-            menu = CopyOptionsMenu(str(event.value), options)
+            menu = CopyOptionsMenu(
+                str(event.value), options, column_names=self.column_names
+            )
             await self.options_container.mount(menu)
 
     def _export(self) -> None:
+        if not self.file_input.value and self.destinations:
+            # the user added destinations, and then cleared the path
+            self.dismiss((self.destinations, self._full_query))
+            return
+        destination = self._current_destination()
+        if destination is not None:
+            self.dismiss(([*self.destinations, destination], self._full_query))
+
+    def _add_destination(self) -> None:
+        destination = self._current_destination()
+        if destination is None:
+            return
+        self.destinations.append(destination)
+        self.destinations_label.update(
+            "Also exporting to: "
+            + ", ".join(
+                f"{escape(str(d.path))} ({d.format_name})" for d in self.destinations
+            )
+        )
+        self.destinations_label.display = True
+        self.file_input.value = ""
+        self.file_input.focus()
+
+    def _current_destination(self) -> ExportDestination | None:
+        """
+        Returns the destination in the form, or None (after showing the
+        user an error) if the form is invalid.
+        """
         path = Path(self.file_input.value)
-        if path.is_dir():
-            self.app.push_screen(
-                ErrorModal(
-                    title="Error Writing File",
-                    header="Path is not a file",
-                    error=OSError(f"Cannot write to {path}, since it is a directory."),
-                )
+        try:
+            options_menu: CopyOptionsMenu | None = self.query_one(CopyOptionsMenu)
+        except QueryError:
+            options_menu = None
+        if path.expanduser() in [d.path.expanduser() for d in self.destinations]:
+            self._show_error(
+                header="Duplicate destination",
+                error=OSError(f"You are already exporting to {path}."),
             )
-        elif self.format_select.value is None:
-            self.app.push_screen(
-                ErrorModal(
-                    title="Error Writing File",
-                    header="Must select format",
+        elif options_menu is not None and options_menu.writes_directory:
+            if path.exists() and not path.is_dir():
+                self._show_error(
+                    header="Path is not an empty directory",
                     error=OSError(
-                        "You must select a file format "
-                        f"{[fmt.label for fmt in self.formats]}"
+                        f"Cannot write a directory of files to {path}, since it "
+                        "is a file."
                     ),
                 )
-            )
-        else:
-            try:
-                options_menu = self.query_one(CopyOptionsMenu)
-            except QueryError:
-                return
-            else:
-                self.dismiss(
-                    (path, options_menu.format_name, options_menu.current_options)
+            elif path.is_dir() and any(path.iterdir()):
+                self._show_error(
+                    header="Path is not an empty directory",
+                    error=OSError(
+                        f"Cannot write a directory of files to {path}, since it "
+                        "is not empty."
+                    ),
                 )
+            elif self._options_are_valid(options_menu):
+                return self._destination(path, options_menu)
+        elif path.is_dir():
+            self._show_error(
+                header="Path is not a file",
+                error=OSError(f"Cannot write to {path}, since it is a directory."),
+            )
+        elif self.format_select.value is None:
+            self._show_error(
+                header="Must select format",
+                error=OSError(
+                    "You must select a file format "
+                    f"{[fmt.label for fmt in self.formats]}"
+                ),
+            )
+        elif options_menu is not None and self._options_are_valid(options_menu):
+            return self._destination(path, options_menu)
+        return None
+
+    def _options_are_valid(self, options_menu: CopyOptionsMenu) -> bool:
+        errors = options_menu.validate()
+        if errors:
+            self._show_error(
+                header="Invalid export options",
+                error=ValueError("\n".join(errors)),
+            )
+        return not errors
+
+    def _show_error(self, header: str, error: BaseException) -> None:
+        self.app.push_screen(
+            ErrorModal(title="Error Writing File", header=header, error=error)
+        )
+
+    @staticmethod
+    def _destination(path: Path, options_menu: CopyOptionsMenu) -> ExportDestination:
+        return ExportDestination(
+            path=path,
+            format_name=options_menu.format_name,
+            options=options_menu.current_options,
+        )
+
+    @property
+    def _full_query(self) -> bool:
+        if not self.can_export_query:
+            return False
+        return self.query_one("#full_query", Switch).value
 
     def _get_format_from_file_extension(self, input_value: str) -> str | None:
         mapping = {ext: fmt.name for fmt in self.formats for ext in fmt.extensions}
@@ -15,6 +15,7 @@ from textual.widgets import OptionList
 from textual.widgets.option_list import Option
 from textual_textarea import TextEditor
 
+from harlequin.components.profile_screen import ProfileScreen
 from harlequin.history import History, QueryExecution
 from harlequin.messages import WidgetMounted
 
@@ -48,6 +49,8 @@ class HistoryOption(Option):
             result = Text.assemble(
                 (res, "bold"), " in ", (elapsed, "bold"), justify="right"
             )
+            if self.item.profile is not None:
+                result.append(" (profiled)", style="italic")
         query_lines = self.item.query_text.strip().splitlines()
         if len(query_lines) > 8:
             continuation: RenderableType = Text(
@@ -125,6 +128,16 @@ class HistoryScreen(Screen[str]):
     def action_select(self) -> None:
         self.list.action_select()
 
+    def action_view_profile(self) -> None:
+        if self.list.highlighted is None:
+            return
+        option = self.list.get_option_at_index(self.list.highlighted)
+        profile = getattr(getattr(option, "item", None), "profile", None)
+        if profile is None:
+            self.app.notify("This query was not profiled.", severity="warning")
+            return
+        self.app.push_screen(ProfileScreen(profile=profile))
+
     @on(OptionList.OptionSelected)
     def insert_query(self, message: OptionList.OptionSelected) -> None:
         message.stop()
@@ -0,0 +1,46 @@
+﻿from __future__ import annotations
+
+from textual import events, on
+from textual.app import ComposeResult
+from textual.containers import Vertical
+from textual.screen import ModalScreen
+from textual.widgets import Input, Label
+
+
+class InputModal(ModalScreen[str]):
+    """
+    Prompts the user for a single line of text. Dismisses with the text
+    when the user presses enter; escape closes the modal without calling
+    the callback.
+    """
+
+    def __init__(
+        self, title: str, prompt: str, value: str = "", placeholder: str = ""
+    ) -> None:
+        super().__init__()
+        self.modal_title = title
+        self.prompt = prompt
+        self.value = value
+        self.placeholder = placeholder
+
+    def compose(self) -> ComposeResult:
+        with Vertical(id="outer"):
+            yield Label(self.prompt, id="prompt_label")
+            yield Input(
+                value=self.value, placeholder=self.placeholder, id="modal_input"
+            )
+
+    def on_mount(self) -> None:
+        container = self.query_one("#outer")
+        container.border_title = self.modal_title
+        self.query_one(Input).focus()
+
+    def on_key(self, event: events.Key) -> None:
+        if event.key == "escape":
+            event.stop()
+            self.app.pop_screen()
+
+    @on(Input.Submitted, "#modal_input")
+    def submit(self, message: Input.Submitted) -> None:
+        message.stop()
+        self.dismiss(message.value)
@@ -0,0 +1,113 @@
+﻿from __future__ import annotations
+
+from typing import ClassVar
+
+from rich.style import Style
+from rich.text import Text
+from textual import events
+from textual.app import ComposeResult
+from textual.containers import Vertical
+from textual.screen import ModalScreen
+from textual.widgets import Static, Tree
+from textual.widgets.tree import TreeNode
+
+from harlequin.query_profile import ProfileNode, QueryProfile
+
+
+def _format_seconds(seconds: float) -> str:
+    if seconds < 0.001:
+        return f"{seconds * 1_000_000:.0f}µs"
+    elif seconds < 1:
+        return f"{seconds * 1_000:.1f}ms"
+    return f"{seconds:.2f}s"
+
+
+class ProfileScreen(ModalScreen):
+    """
+    Shows a query's plan as a tree of operators, with the time and share of
+    the total time spent in each, and the number of rows it produced.
+    Operators that are hot spots are highlighted.
+    """
+
+    COMPONENT_CLASSES: ClassVar[set[str]] = {
+        "profile-screen--hot",
+    }
+
+    def __init__(
+        self,
+        profile: QueryProfile,
+        name: str | None = None,
+        id: str | None = None,  # noqa: A002
+        classes: str | None = None,
+    ) -> None:
+        super().__init__(name, id, classes)
+        self.profile = profile
+
+    def compose(self) -> ComposeResult:
+        hot_style = self.get_component_rich_style("profile-screen--hot")
+        hot_text_style = Style(
+            color=hot_style.color, italic=hot_style.italic, bold=hot_style.bold
+        )
+        with Vertical(id="profile_outer"):
+            yield Static(self._summary(), id="profile_summary")
+            tree: Tree[ProfileNode] = Tree(
+                self._label(self.profile.root, hot_text_style),
+                data=self.profile.root,
+                id="profile_tree",
+            )
+            self._add_profile_nodes(tree.root, self.profile.root, hot_text_style)
+            tree.root.expand_all()
+            yield tree
+            yield Static(
+                "Enter or click to collapse an operator; Escape to close.",
+                id="profile_footer",
+            )
+
+    def on_mount(self) -> None:
+        container = self.query_one("#profile_outer")
+        container.border_title = "Query Profile"
+        self.query_one(Tree).focus()
+
+    def on_key(self, event: events.Key) -> None:
+        if event.key == "escape":
+            event.stop()
+            self.app.pop_screen()
+
+    def _summary(self) -> Text:
+        profile = self.profile
+        parts: list[str] = []
+        if profile.elapsed is not None:
+            parts.append(f"Ran in {_format_seconds(profile.elapsed)}")
+        else:
+            parts.append("Planned only (the query was not run)")
+        if profile.row_count is not None:
+            parts.append(f"{profile.row_count:n} rows")
+        hot_count = sum(node.hot for node in profile.root.walk())
+        if hot_count:
+            parts.append(f"{hot_count} hot {'spot' if hot_count == 1 else 'spots'}")
+        return Text(" · ".join(parts))
+
+    def _add_profile_nodes(
+        self, parent: TreeNode[ProfileNode], node: ProfileNode, hot_style: Style
+    ) -> None:
+        for child in node.children:
+            if child.children:
+                branch = parent.add(self._label(child, hot_style), data=child)
+                self._add_profile_nodes(branch, child, hot_style)
+            else:
+                parent.add_leaf(self._label(child, hot_style), data=child)
+
+    def _label(self, node: ProfileNode, hot_style: Style) -> Text:
+        label = Text(node.name, style=hot_style if node.hot else "bold")
+        stats: list[str] = []
+        if node.time is not None:
+            stats.append(_format_seconds(node.time))
+        if (share := self.profile.share_of_total(node)) is not None:
+            stats.append(f"{share:.0%}")
+        if node.cardinality is not None:
+            stats.append(f"{node.cardinality:n} rows")
+        if stats:
+            label.append(f"  {' · '.join(stats)}")
+        if node.detail:
+            label.append(f"  {node.detail}", style="italic dim")
+        return label
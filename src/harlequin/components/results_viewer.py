@@ -1,25 +1,73 @@
 ﻿from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any, ClassVar, Literal
+import itertools
+import shutil
+import tempfile
+from contextlib import suppress
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, ClassVar, Iterator, Literal, Sequence
+from uuid import uuid4
 
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.types as pt
+
+from rich.console import RenderableType
+from rich.markup import escape
 from rich.style import Style
 from rich.text import Text
+from textual import work
+from textual.cache import LRUCache
+from textual.coordinate import Coordinate
 from textual.css.query import NoMatches
+from textual.message import Message
+from textual.widget import Widget
 from textual.widgets import (
     ContentSwitcher,
+    Static,
     TabbedContent,
     TabPane,
     Tabs,
 )
-from textual_fastdatatable import DataTable
+from textual.worker import get_current_worker
+from textual_fastdatatable import ArrowBackend, DataTable
 from textual_fastdatatable.backend import AutoBackendType
 
+from harlequin.cell_formatting import (
+    FORMAT_BLOCK_SIZE,
+    FORMAT_CACHE_BLOCKS,
+    MAX_CELL_VALUE_LENGTH,
+    format_block,
+)
+from harlequin.column_widths import SampledArrowBackend, create_results_backend
+from harlequin.components.cell_value_screen import CellValueScreen
+from harlequin.components.column_profile import ColumnProfilePanel
+from harlequin.components.input_modal import InputModal
+from harlequin.exception import HarlequinQueryError
 from harlequin.messages import WidgetMounted
+from harlequin.results_memory import format_byte_size, spill_to_disk
+from harlequin.result_ops import (
+    CHANGE_TYPE_COLUMN,
+    ColumnProfile,
+    ResultsDiff,
+    ResultsOperation,
+    SortOrder,
+    unique_column_names,
+)
 
 if TYPE_CHECKING:
     from textual_fastdatatable.backend import DataTableBackend
     from textual_fastdatatable.data_table import CursorType
 
+# tables wider than this are profiled one column at a time, following the cursor
+PROFILE_ALL_COLUMNS_LIMIT = 32
+# a column added to the results while they are sorted and filtered, to track
+# each row's position in the query's results
+ROW_LOCATOR_COLUMN = "__harlequin_row_locator__"
+DROPPED_RESULTS_MESSAGE = (
+    "These results were dropped to save memory. Run the query again to view them."
+)
+
 
 class ResultsTable(DataTable, inherit_bindings=False):
     DEFAULT_CSS = """
@@ -29,6 +77,32 @@ class ResultsTable(DataTable, inherit_bindings=False):
         }
     """
 
+    class SelectionCopied(DataTable.SelectionCopied):
+        """
+        Posted instead of DataTable.SelectionCopied, with the selected cells as
+        a slice of the table's Arrow data, so they can be copied without
+        converting each cell to a python object. values is only built from
+        data if it is used.
+        """
+
+        def __init__(self, data_table: ResultsTable, data: "pa.Table") -> None:
+            self.data = data
+            self._values: list[tuple[Any, ...]] | None = None
+            super().__init__(data_table=data_table, values=[])
+
+        @property  # type: ignore[override]
+        def values(self) -> list[tuple[Any, ...]]:
+            if self._values is None:
+                self._values = list(
+                    zip(*(column.to_pylist() for column in self.data.columns))
+                )
+            return self._values
+
+        @values.setter
+        def values(self, values: list[tuple[Any, ...]]) -> None:
+            # set to [] by DataTable.SelectionCopied; built lazily instead
+            pass
+
     def on_mount(self) -> None:
         self.post_message(WidgetMounted(widget=self))
 
@@ -39,6 +113,7 @@ class ResultsTable(DataTable, inherit_bindings=False):
         data: Any | None = None,
         column_labels: list[str | Text] | None = None,
         plain_column_labels: list[str | Text] | None = None,
+        column_types: list[str] | None = None,
         column_widths: list[int | None] | None = None,
         max_column_content_width: int | None = None,
         show_header: bool = True,
@@ -58,15 +133,44 @@ class ResultsTable(DataTable, inherit_bindings=False):
         disabled: bool = False,
         null_rep: str = "",
         render_markup: bool = True,
+        query_text: str | None = None,
+        truncated_columns: Sequence[int] = (),
     ):
         self.plain_column_labels: list[str] = (
             [str(label) for label in plain_column_labels]
             if plain_column_labels is not None
             else []
         )
+        self.column_types: list[str] = (
+            list(column_types) if column_types is not None else []
+        )
+        self.max_rows = max_rows
+        # the query that returned the data, and the columns whose long values
+        # were truncated by the adapter
+        self.query_text = query_text
+        self.truncated_columns: set[int] = set(truncated_columns)
+        self.sort_columns: list[tuple[int, SortOrder]] = []
+        self.filter_expression: str = ""
+        # the number of records the query returns without its limit, if it
+        # was counted
+        self.query_row_count: int | None = None
+        self.column_profiles: dict[int, ColumnProfile] = {}
+        self._original_data: "pa.Table" | None = None
+        # the position in the query's results of each row of sorted or
+        # filtered data; None if the data is in the query's order
+        self._row_locators: "pa.ChunkedArray" | None = None
+        # copies of this table's data that are memory-mapped from disk
+        self._spilled_data: list["pa.Table"] = []
+        self.spill_paths: list[Path] = []
+        # formatted cells, keyed by (row block, column, update count)
+        self._formatted_blocks: LRUCache[
+            tuple[int, int, int], list[RenderableType] | None
+        ] = LRUCache(FORMAT_CACHE_BLOCKS)
+        if backend is None and data is not None:
+            backend = create_results_backend(data, max_rows=max_rows)
         super().__init__(
             backend=backend,
-            data=data,
+            data=None,
             column_labels=column_labels,
             column_widths=column_widths,
             max_column_content_width=max_column_content_width,
@@ -89,6 +193,237 @@ class ResultsTable(DataTable, inherit_bindings=False):
             render_markup=render_markup,
         )
 
+    @property
+    def original_data(self) -> "pa.Table" | None:
+        """
+        The Arrow table returned by the query, before any sorts or filters
+        were applied. None if the table isn't backed by Arrow.
+        """
+        if self._original_data is not None:
+            return self._original_data
+        return getattr(self.backend, "source_data", None)
+
+    @property
+    def is_transformed(self) -> bool:
+        return bool(self.sort_columns or self.filter_expression)
+
+    @property
+    def data_tables(self) -> list["pa.Table"]:
+        """
+        The distinct Arrow tables held by this table: the original data and,
+        if it's sorted or filtered, the transformed data.
+        """
+        tables: list["pa.Table"] = []
+        for data in (self.original_data, getattr(self.backend, "source_data", None)):
+            if data is not None and not any(data is t for t in tables):
+                tables.append(data)
+        return tables
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The size of the data held in memory by this table; data that has been
+        spilled to disk isn't counted.
+        """
+        return sum(
+            data.nbytes for data in self.data_tables if not self.is_spilled(data)
+        )
+
+    @property
+    def spilled_nbytes(self) -> int:
+        return sum(data.nbytes for data in self.data_tables if self.is_spilled(data))
+
+    def is_spilled(self, data: "pa.Table") -> bool:
+        return any(data is spilled for spilled in self._spilled_data)
+
+    def use_spilled_data(self, spilled: list[tuple["pa.Table", "pa.Table"]]) -> None:
+        """
+        Swaps this table's data for copies that are memory-mapped from disk.
+        spilled is a list of (data, copy) pairs; data that was replaced
+        (e.g., by a new sort) after it was copied is left alone.
+        """
+        for data, copy in spilled:
+            if self._original_data is data:
+                self._original_data = copy
+                self._spilled_data.append(copy)
+            backend = self.backend
+            if isinstance(backend, ArrowBackend) and backend.source_data is data:
+                # the content is the same, so keep the measured widths
+                widths = backend._column_content_widths
+                self.backend = SampledArrowBackend(copy, max_rows=self.max_rows)
+                self.backend._column_content_widths = widths
+                self._spilled_data.append(copy)
+                self._update_count += 1
+                self._clear_caches()
+                self.refresh()
+        # forget copies that have since been replaced
+        self._spilled_data = [
+            data
+            for data in self._spilled_data
+            if any(data is t for t in self.data_tables)
+        ]
+
+    def row_locator(self, row: int) -> int:
+        """
+        Returns the position of a row of this table in the query's results.
+        """
+        if self._row_locators is None:
+            return row
+        return int(self._row_locators[row].as_py())
+
+    def is_truncated(self, row: int, column: int) -> bool:
+        """
+        True if the value in a cell was truncated by the adapter, and needs to
+        be fetched from the database to be shown in full.
+        """
+        if column not in self.truncated_columns or self.backend is None:
+            return False
+        value = self.backend.get_cell_at(row, column)
+        return value is not None and len(value) > MAX_CELL_VALUE_LENGTH
+
+    @property
+    def has_truncated_values(self) -> bool:
+        """
+        True if any value in this table was truncated by the adapter.
+        """
+        data: "pa.Table" | None = getattr(self.backend, "source_data", None)
+        if data is None:
+            return False
+        for column in self.truncated_columns:
+            values = data.column(column)
+            lengths = (
+                pc.utf8_length(values)
+                if pt.is_string(values.type) or pt.is_large_string(values.type)
+                else pc.binary_length(values)
+            )
+            if (pc.max(lengths).as_py() or 0) > MAX_CELL_VALUE_LENGTH:
+                return True
+        return False
+
+    def with_data(
+        self, data: "pa.Table", row_locators: "pa.ChunkedArray" | None = None
+    ) -> ResultsTable:
+        """
+        Returns a new table over data, which must have the same schema as
+        the original data, with this table's settings and state. DataTable
+        can't swap out its data, so the new table must be mounted in place
+        of this one. The original data is kept, so that later sorts and
+        filters can be applied to the full result. row_locators is the
+        position in the original data of each row of data, or None if data
+        is the original data.
+        """
+        table = ResultsTable(
+            id=self.id,
+            classes=" ".join(self.classes) or None,
+            column_labels=[column.label for column in self.ordered_columns],
+            plain_column_labels=list(self.plain_column_labels),
+            column_types=list(self.column_types),
+            data=data,
+            max_rows=self.max_rows,
+            cursor_type=self.cursor_type,
+            max_column_content_width=self.max_column_content_width,
+            null_rep=self.null_rep.markup,
+            render_markup=self.render_markup,
+            query_text=self.query_text,
+            truncated_columns=sorted(self.truncated_columns),
+        )
+        table.sort_columns = list(self.sort_columns)
+        table.filter_expression = self.filter_expression
+        table.query_row_count = self.query_row_count
+        table.column_profiles = dict(self.column_profiles)
+        table._original_data = self.original_data
+        table._row_locators = row_locators
+        table._spilled_data = [
+            spilled for spilled in self._spilled_data if spilled is table._original_data
+        ]
+        table.spill_paths = list(self.spill_paths)
+        return table
+
+    def action_copy_selection(self) -> None:
+        """
+        Slices the selected cells from the table's Arrow data, instead of
+        getting each cell as a python object.
+        """
+        if not isinstance(self.backend, ArrowBackend) or self.row_count == 0:
+            super().action_copy_selection()
+            return
+        cursor = self.cursor_coordinate
+        if self.cursor_type == "range" and self.selection_anchor_coordinate is not None:
+            bounds = self._order_bounding_coords(
+                cursor, self.selection_anchor_coordinate
+            )
+        elif self.cursor_type == "row":
+            bounds = (cursor.row, cursor.row, 0, self.column_count - 1)
+        elif self.cursor_type == "column":
+            bounds = (0, self.row_count - 1, cursor.column, cursor.column)
+        else:
+            bounds = (cursor.row, cursor.row, cursor.column, cursor.column)
+        min_row, max_row, min_col, max_col = bounds
+        data = self.backend.data.slice(min_row, max_row - min_row + 1).select(
+            list(range(min_col, max_col + 1))
+        )
+        self.post_message(self.SelectionCopied(data_table=self, data=data))
+
+    def _get_cell_renderable(
+        self, row_index: int, column_index: int
+    ) -> RenderableType | Text:
+        """
+        Formats the cells in a block of rows around row_index, one column at
+        a time, instead of converting and formatting each cell as it is
+        drawn. Blocks are cached, so scrolling back over them is free.
+        """
+        if row_index < 0 or not isinstance(self.backend, ArrowBackend):
+            return super()._get_cell_renderable(row_index, column_index)
+        block, offset = divmod(row_index, FORMAT_BLOCK_SIZE)
+        key = (block, column_index, self._update_count)
+        if key in self._formatted_blocks:
+            cells = self._formatted_blocks[key]
+        else:
+            cells = self._format_block(block, column_index)
+            self._formatted_blocks[key] = cells
+        if cells is None or offset >= len(cells):
+            return super()._get_cell_renderable(row_index, column_index)
+        return cells[offset]
+
+    def _format_block(
+        self, block: int, column_index: int
+    ) -> list[RenderableType] | None:
+        """
+        Returns None if the block has values that overflow python's types;
+        those are formatted one at a time, which handles the overflow.
+        """
+        assert isinstance(self.backend, ArrowBackend)
+        values = self.backend.data.column(column_index).slice(
+            block * FORMAT_BLOCK_SIZE, FORMAT_BLOCK_SIZE
+        )
+        try:
+            return format_block(
+                values,
+                col=self.ordered_columns[column_index],
+                null_rep=self.null_rep,
+                render_markup=self.render_markup,
+            )
+        except OverflowError:
+            return None
+
+    def _clear_caches(self) -> None:
+        super()._clear_caches()
+        self._formatted_blocks.clear()
+
+    def set_max_column_content_width(self, width: int) -> None:
+        """
+        Changes the widest a column can be drawn. The content widths measured
+        by the backend are kept, so this doesn't re-measure the data.
+        """
+        if width == self.max_column_content_width:
+            return
+        self.max_column_content_width = width
+        self._ordered_columns = None
+        self._update_count += 1
+        self._clear_caches()
+        self._require_update_dimensions = True
+        self.refresh(layout=True)
+
 
 class ResultsViewer(TabbedContent, can_focus=True):
     BORDER_TITLE = "Query Results"
@@ -96,12 +431,103 @@ class ResultsViewer(TabbedContent, can_focus=True):
         "results-viewer--type-label",
     }
 
+    class OperationError(Message):
+        def __init__(self, error: BaseException, group: str) -> None:
+            super().__init__()
+            self.error = error
+            self.group = group
+
+    class ProfileCompleted(Message):
+        def __init__(
+            self, table: ResultsTable, profiles: dict[int, ColumnProfile]
+        ) -> None:
+            super().__init__()
+            self.table = table
+            self.profiles = profiles
+
+    class DiffCompleted(Message):
+        def __init__(
+            self, diff: ResultsDiff, column_labels: list[tuple[str, str]], title: str
+        ) -> None:
+            super().__init__()
+            self.diff = diff
+            self.column_labels = column_labels
+            self.title = title
+
+    class TransformCompleted(Message):
+        def __init__(
+            self,
+            table: ResultsTable,
+            data: "pa.Table",
+            sort_columns: list[tuple[int, SortOrder]],
+            filter_expression: str,
+            row_locators: "pa.ChunkedArray" | None = None,
+        ) -> None:
+            super().__init__()
+            self.table = table
+            self.data = data
+            self.sort_columns = sort_columns
+            self.filter_expression = filter_expression
+            self.row_locators = row_locators
+
+    class FullValueRequested(Message):
+        """
+        Posted when the user opens a cell whose value was truncated, for the
+        app to fetch the full value from the database.
+        """
+
+        def __init__(
+            self, title: str, value: Any, query_text: str, row: int, column: int
+        ) -> None:
+            super().__init__()
+            self.title = title
+            self.value = value
+            self.query_text = query_text
+            self.row = row
+            self.column = column
+
+    class TableSpilled(Message):
+        def __init__(
+            self,
+            table: ResultsTable,
+            spilled: list[tuple["pa.Table", "pa.Table"]],
+            paths: list[Path],
+        ) -> None:
+            super().__init__()
+            self.table = table
+            self.spilled = spilled
+            self.paths = paths
+
+    class SpillFailed(Message):
+        def __init__(self, table: ResultsTable, error: BaseException) -> None:
+            super().__init__()
+            self.table = table
+            self.error = error
+
     def __init__(
         self,
         max_results: int = 10_000,
+        memory_budget: int = 0,
     ) -> None:
+        """
+        Args:
+            max_results (int): The maximum number of rows to show in each tab.
+            memory_budget (int): The number of bytes of results data to hold
+                in memory, across all tabs. When it is exceeded, the
+                least-recently-viewed tabs' data is moved to disk (or, if that
+                fails, dropped). 0 means no limit.
+        """
         super().__init__()
         self.max_results = max_results
+        self.memory_budget = memory_budget
+        self._results_operations: dict[str, ResultsOperation] = {}
+        # tables for tabs that haven't been shown yet, keyed by the pane's id
+        self._pending_tables: dict[str, ResultsTable] = {}
+        # when each tab was last viewed, keyed by the pane's id
+        self._view_ticks = itertools.count()
+        self._last_viewed: dict[str, int] = {}
+        self._spilling: set[ResultsTable] = set()
+        self._spill_dir: Path | None = None
 
     def on_mount(self) -> None:
         self.query_one(Tabs).can_focus = False
@@ -109,9 +535,30 @@ class ResultsViewer(TabbedContent, can_focus=True):
         self.max_col_width = self._get_max_col_width()
         self.post_message(WidgetMounted(widget=self))
 
+    def on_unmount(self) -> None:
+        if self._spill_dir is not None:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+
     def clear_all_tables(self) -> None:
+        self._cancel_operations("result_transforms")
+        self._cancel_operations("result_profiles")
+        self._cancel_operations("result_diffs")
+        self.workers.cancel_group(self, "result_spills")
+        for _, table in self._all_tables():
+            _remove_files(table.spill_paths)
+        self._pending_tables = {}
+        self._spilling = set()
+        self._last_viewed = {}
         self.clear_panes()
         self.add_class("hide-tabs")
+        self.border_subtitle = ""
+
+    @property
+    def memory_usage(self) -> int:
+        """
+        The number of bytes of results data held in memory, across all tabs.
+        """
+        return sum(table.nbytes for _, table in self._all_tables())
 
     def get_visible_table(self) -> ResultsTable | None:
         content = self.query_one(ContentSwitcher)
@@ -134,7 +581,18 @@ class ResultsViewer(TabbedContent, can_focus=True):
         table_id: str,
         column_labels: list[tuple[str, str]],
         data: AutoBackendType,
+        title: str | None = None,
+        summary: str | None = None,
+        lazy: bool = False,
+        query_text: str | None = None,
+        truncated_columns: Sequence[int] = (),
     ) -> ResultsTable:
+        """
+        Adds a tab with a table of data. If lazy is True, the tab only gets a
+        placeholder, and the table is mounted when the tab is first activated;
+        the returned table can still be used to read the data. query_text and
+        truncated_columns are used to fetch the full values of truncated cells.
+        """
         formatted_labels = [
             self._format_column_label(col_name, col_type)
             for col_name, col_type in column_labels
@@ -143,21 +601,35 @@ class ResultsViewer(TabbedContent, can_focus=True):
             id=table_id,
             column_labels=formatted_labels,  # type: ignore
             plain_column_labels=[col_name for (col_name, _) in column_labels],
+            column_types=[col_type for (_, col_type) in column_labels],
             data=data,
             max_rows=self.max_results,
             cursor_type="range",
             max_column_content_width=self.max_col_width,
             null_rep="[dim]âˆ… null[/]",
             render_markup=False,
+            query_text=query_text,
+            truncated_columns=truncated_columns,
         )
         n = self.tab_count + 1
         if n > 1:
             self.remove_class("hide-tabs")
-        pane = TabPane(f"Result {n}", table, id=f"result-{n}")
+        pane_id = f"result-{n}"
+        widgets: list[Widget] = []
+        if summary is not None:
+            widgets.append(Static(summary, classes="results-summary"))
+        if lazy:
+            self._pending_tables[pane_id] = table
+            widgets.append(Static("Loading results...", classes="results-placeholder"))
+        else:
+            widgets.append(table)
+        pane = TabPane(title or f"Result {n}", *widgets, id=pane_id)
         await self.add_pane(pane)
+        self._last_viewed[pane_id] = next(self._view_ticks)
         # need to manually refresh the table, since activating the tab
         # doesn't consistently cause a new layout calc.
         table.refresh(repaint=True, layout=True)
+        self._enforce_memory_budget()
         return table
 
     def show_loading(self) -> None:
@@ -175,31 +647,46 @@ class ResultsViewer(TabbedContent, can_focus=True):
             table = self.get_visible_table()
             if table is not None:
                 rows = table.source_row_count
-                if rows > 0:
-                    self.border_title = (
-                        f"Query Results {self._human_row_count(table.source_row_count)}"
-                    )
+                if rows > 0 or table.is_transformed:
+                    self.border_title = self._table_title(table)
                 else:
                     self.border_title = "Query Returned No Records"
             else:
                 self.border_title = "Query Results"
 
+    def set_query_row_count(self, table_id: str, count: int) -> None:
+        """
+        Records the number of records returned by a table's query without its
+        limit, and updates the border title if that table is visible.
+        """
+        for _, table in self._all_tables():
+            if table.id == table_id:
+                table.query_row_count = count
+                if table is self.get_visible_table():
+                    self.border_title = self._table_title(table)
+                return
+
     def on_focus(self) -> None:
         self._focus_on_visible_table()
 
     def on_resize(self) -> None:
-        # only impacts new tables pushed after the resize
-        self.max_col_width = self._get_max_col_width()
+        max_col_width = self._get_max_col_width()
+        if max_col_width == self.max_col_width:
+            return
+        self.max_col_width = max_col_width
+        for _, table in self._all_tables():
+            table.set_max_column_content_width(max_col_width)
 
     def on_tabbed_content_tab_activated(
         self, message: TabbedContent.TabActivated
     ) -> None:
         message.stop()
+        if message.pane.id is not None:
+            self._last_viewed[message.pane.id] = next(self._view_ticks)
+        self._mount_pending_table(message.pane)
         maybe_table = self.get_visible_table()
         if maybe_table is not None:
-            self.border_title = (
-                f"Query Results {self._human_row_count(maybe_table.source_row_count)}"
-            )
+            self.border_title = self._table_title(maybe_table)
             maybe_table.focus()
 
     def action_switch_tab(self, offset: int) -> None:
@@ -217,6 +704,256 @@ class ResultsViewer(TabbedContent, can_focus=True):
         self.active = f"{name_prefix}-{new_tab_number}"
         self._focus_on_visible_table()
 
+    def action_sort(self, order: SortOrder = "ascending") -> None:
+        """
+        Sorts the visible table by the column under the cursor, replacing
+        any earlier sort. Filters are preserved.
+        """
+        table = self.get_visible_table()
+        if table is None or table.original_data is None or not table.column_count:
+            return
+        self._transform_table(
+            table,
+            sort_columns=[(table.cursor_column, order)],
+            filter_expression=table.filter_expression,
+        )
+
+    def action_filter(self) -> None:
+        table = self.get_visible_table()
+        if table is None or table.original_data is None:
+            return
+
+        def apply_filter(expression: str | None) -> None:
+            if expression is None:
+                return
+            self._transform_table(
+                table,
+                sort_columns=table.sort_columns,
+                filter_expression=expression.strip(),
+            )
+
+        self.app.push_screen(
+            InputModal(
+                title="Filter Results",
+                prompt="Show rows WHERE (a SQL expression; leave blank to clear):",
+                value=table.filter_expression,
+                placeholder="e.g., amount > 100 and region = 'EU'",
+            ),
+            callback=apply_filter,
+        )
+
+    async def action_reset_transforms(self) -> None:
+        table = self.get_visible_table()
+        if table is None or not table.is_transformed:
+            return
+        self._cancel_operations("result_transforms")
+        if table.filter_expression:
+            table.column_profiles.clear()
+        table.sort_columns = []
+        table.filter_expression = ""
+        if table.original_data is not None:
+            table = await self._replace_table_data(table, table.original_data)
+        self.border_title = self._table_title(table)
+        self._refresh_profile(table)
+
+    def action_cancel_transform(self) -> None:
+        self._cancel_operations("result_transforms")
+        table = self.get_visible_table()
+        if table is not None:
+            self.border_title = self._table_title(table)
+
+    async def on_results_viewer_transform_completed(
+        self, message: ResultsViewer.TransformCompleted
+    ) -> None:
+        message.stop()
+        if self._get_pane_id(message.table) is None:
+            # the tab was closed, or the table was replaced
+            return
+        if message.filter_expression != message.table.filter_expression:
+            message.table.column_profiles.clear()
+        message.table.sort_columns = message.sort_columns
+        message.table.filter_expression = message.filter_expression
+        table = await self._replace_table_data(
+            message.table, message.data, row_locators=message.row_locators
+        )
+        if table is self.get_visible_table():
+            self.border_title = self._table_title(table)
+        self._refresh_profile(table)
+        self._enforce_memory_budget()
+
+    def on_results_viewer_table_spilled(
+        self, message: ResultsViewer.TableSpilled
+    ) -> None:
+        message.stop()
+        self._spilling.discard(message.table)
+        if self._get_pane_id(message.table) is None:
+            # the tab was closed while its data was being written
+            _remove_files(message.paths)
+            return
+        message.table.spill_paths.extend(message.paths)
+        message.table.use_spilled_data(message.spilled)
+        self._update_memory_usage()
+
+    def on_results_viewer_spill_failed(
+        self, message: ResultsViewer.SpillFailed
+    ) -> None:
+        message.stop()
+        self._spilling.discard(message.table)
+        pane_id = self._get_pane_id(message.table)
+        if pane_id is None or message.table is self.get_visible_table():
+            return
+        self._drop_table(pane_id, message.table)
+        self._update_memory_usage()
+        self.app.notify(
+            "Results could not be moved to disk, so they were dropped to save "
+            f"memory: {message.error}",
+            severity="warning",
+        )
+
+    def action_toggle_profile(self) -> None:
+        """
+        Shows or hides the column profile panel beside the visible table.
+        """
+        table = self.get_visible_table()
+        if table is None or table.original_data is None:
+            return
+        panel = self._get_profile_panel(table)
+        pane = table.parent
+        if panel is not None:
+            self._cancel_operations("result_profiles")
+            panel.remove()
+            if pane is not None:
+                pane.remove_class("profiled")
+            return
+        if not isinstance(pane, Widget):
+            return
+        pane.add_class("profiled")
+        pane.mount(ColumnProfilePanel())
+        self.call_after_refresh(self._refresh_profile, table)
+
+    def on_data_table_cell_highlighted(
+        self, message: DataTable.CellHighlighted
+    ) -> None:
+        table = message.data_table
+        if (
+            isinstance(table, ResultsTable)
+            and table.column_count > PROFILE_ALL_COLUMNS_LIMIT
+            and self._get_profile_panel(table) is not None
+        ):
+            self._refresh_profile(table)
+
+    def on_results_viewer_profile_completed(
+        self, message: ResultsViewer.ProfileCompleted
+    ) -> None:
+        message.stop()
+        message.table.column_profiles.update(message.profiles)
+        self._refresh_profile(message.table)
+
+    def action_view_cell(self) -> None:
+        """
+        Shows the value under the cursor in a modal. If the adapter truncated
+        the value, the app fetches the full value from the database.
+        """
+        table = self.get_visible_table()
+        if table is None or table.backend is None or table.row_count == 0:
+            return
+        row, column = table.cursor_coordinate
+        value = table.backend.get_cell_at(row, column)
+        title = (
+            table.plain_column_labels[column]
+            if column < len(table.plain_column_labels)
+            else f"Column {column + 1}"
+        )
+        title = f"{title} (Record {table.row_locator(row) + 1:,})"
+        if table.is_truncated(row, column) and table.query_text is not None:
+            self.post_message(
+                self.FullValueRequested(
+                    title=title,
+                    value=value[:MAX_CELL_VALUE_LENGTH],
+                    query_text=table.query_text,
+                    row=table.row_locator(row),
+                    column=column,
+                )
+            )
+        else:
+            self.app.push_screen(CellValueScreen(title=title, value=value))
+
+    def action_diff_tabs(self) -> None:
+        """
+        Compares the visible result with the previous tab (or, from the
+        first tab, the second tab), and shows the differences in a new tab.
+        """
+        if self.tab_count < 2 or not self.active:
+            self.app.notify("Run at least two queries to compare their results.")
+            return
+        active_number = int(self.active.rpartition("-")[2])
+        other_number = active_number - 1 if active_number > 1 else 2
+        left_number, right_number = sorted((active_number, other_number))
+        left, right = self._get_table(left_number), self._get_table(right_number)
+        if left is None or right is None:
+            return
+
+        def run_diff(key_text: str | None) -> None:
+            if key_text is None:
+                return
+            keys = [key.strip() for key in key_text.split(",") if key.strip()]
+            self._run_diff(
+                left=left,
+                right=right,
+                key_columns=keys,
+                labels=(str(left_number), str(right_number)),
+            )
+
+        self.app.push_screen(
+            InputModal(
+                title="Diff Results",
+                prompt=(
+                    f"Compare Result {left_number} with Result {right_number} on "
+                    "these key columns (comma-separated), or leave blank to "
+                    "compare whole rows:"
+                ),
+                placeholder="e.g., id, region",
+            ),
+            callback=run_diff,
+        )
+
+    async def on_results_viewer_diff_completed(
+        self, message: ResultsViewer.DiffCompleted
+    ) -> None:
+        message.stop()
+        diff = message.diff
+        summary = (
+            f"+{diff.added:,} added, -{diff.removed:,} removed, "
+            f"~{diff.changed:,} changed"
+        )
+        changed_columns = [
+            f"{name}: {count:,}" for name, count in diff.column_changes.items() if count
+        ]
+        if changed_columns:
+            summary = f"{summary} ({', '.join(changed_columns)})"
+        await self.push_table(
+            table_id=f"t{id(diff)}",
+            column_labels=message.column_labels,
+            data=diff.data,
+            title=message.title,
+            summary=summary,
+        )
+        self.active = f"result-{self.tab_count}"
+        self._focus_on_visible_table()
+        self.app.notify(f"{message.title}: {summary}")
+
+    def on_results_viewer_operation_error(
+        self, message: ResultsViewer.OperationError
+    ) -> None:
+        # don't stop the message; the app shows the error.
+        table = self.get_visible_table()
+        if table is None:
+            return
+        if message.group == "result_transforms":
+            self.border_title = self._table_title(table)
+        elif (panel := self._get_profile_panel(table)) is not None:
+            panel.show_error()
+
     def action_focus_data_catalog(self) -> None:
         if hasattr(self.app, "action_focus_data_catalog"):
             self.app.action_focus_data_catalog()
@@ -230,9 +967,385 @@ class ResultsViewer(TabbedContent, can_focus=True):
         if maybe_table is not None:
             maybe_table.focus()
 
-    def _human_row_count(self, total_rows: int) -> str:
-        if self.max_results > 0 and total_rows > self.max_results:
-            return f"(Showing {self.max_results:,} of {total_rows:,} Records)"
+    def _transform_table(
+        self,
+        table: ResultsTable,
+        sort_columns: list[tuple[int, SortOrder]],
+        filter_expression: str,
+    ) -> None:
+        self._cancel_operations("result_transforms")
+        self.border_title = "Sorting and Filtering Results"
+        self._run_transform(
+            table=table, sort_columns=sort_columns, filter_expression=filter_expression
+        )
+
+    @work(
+        thread=True,
+        exclusive=True,
+        exit_on_error=False,
+        group="result_transforms",
+        description="sorting and filtering results.",
+    )
+    def _run_transform(
+        self,
+        table: ResultsTable,
+        sort_columns: list[tuple[int, SortOrder]],
+        filter_expression: str,
+    ) -> None:
+        data = table.original_data
+        if data is None:
+            return
+        track_rows = bool(table.truncated_columns)
+        if track_rows:
+            data = data.append_column(
+                ROW_LOCATOR_COLUMN, pa.array(range(data.num_rows), type=pa.int64())
+            )
+        worker = get_current_worker()
+        operation = self._start_operation("result_transforms")
+        try:
+            result = operation.sort_and_filter(
+                data, order_by=sort_columns, where=filter_expression
+            )
+        except HarlequinQueryError as e:
+            self.post_message(self.OperationError(error=e, group="result_transforms"))
+            return
+        finally:
+            self._finish_operation("result_transforms", operation)
+        if result is None or worker.is_cancelled:
+            return
+        row_locators = None
+        if track_rows:
+            row_locators = result.column(ROW_LOCATOR_COLUMN)
+            result = result.drop_columns(ROW_LOCATOR_COLUMN)
+        self.post_message(
+            self.TransformCompleted(
+                table=table,
+                data=result,
+                sort_columns=sort_columns,
+                filter_expression=filter_expression,
+                row_locators=row_locators,
+            )
+        )
+
+    def _refresh_profile(self, table: ResultsTable) -> None:
+        """
+        Renders the cached profiles for table into its panel (if the panel
+        is open), and starts a worker to profile any columns that are
+        missing from the cache.
+        """
+        panel = self._get_profile_panel(table)
+        if panel is None:
+            return
+        if table.column_count > PROFILE_ALL_COLUMNS_LIMIT:
+            columns = [table.cursor_column]
+            note = (
+                f"Showing the cursor column of {table.column_count:,}. "
+                "Move the cursor to profile other columns."
+            )
+        else:
+            columns = list(range(table.column_count))
+            note = None
+        missing = [col for col in columns if col not in table.column_profiles]
+        if missing:
+            panel.show_loading()
+            self._cancel_operations("result_profiles")
+            self._run_profile(table=table, columns=missing)
+        else:
+            panel.update_profiles(
+                [table.column_profiles[col] for col in columns], note=note
+            )
+
+    @work(
+        thread=True,
+        exclusive=True,
+        exit_on_error=False,
+        group="result_profiles",
+        description="profiling results.",
+    )
+    def _run_profile(self, table: ResultsTable, columns: list[int]) -> None:
+        data: "pa.Table" | None = getattr(table.backend, "source_data", None)
+        if data is None:
+            return
+        worker = get_current_worker()
+        operation = self._start_operation("result_profiles")
+        try:
+            profiles = operation.profile_columns(data, columns)
+        except HarlequinQueryError as e:
+            self.post_message(self.OperationError(error=e, group="result_profiles"))
+            return
+        finally:
+            self._finish_operation("result_profiles", operation)
+        if profiles is not None and not worker.is_cancelled:
+            self.post_message(
+                self.ProfileCompleted(
+                    table=table, profiles=dict(zip(columns, profiles))
+                )
+            )
+
+    @work(
+        thread=True,
+        exclusive=True,
+        exit_on_error=False,
+        group="result_diffs",
+        description="comparing results.",
+    )
+    def _run_diff(
+        self,
+        left: ResultsTable,
+        right: ResultsTable,
+        key_columns: list[str],
+        labels: tuple[str, str],
+    ) -> None:
+        left_data: "pa.Table" | None = getattr(left.backend, "source_data", None)
+        right_data: "pa.Table" | None = getattr(right.backend, "source_data", None)
+        if left_data is None or right_data is None:
+            return
+        worker = get_current_worker()
+        operation = self._start_operation("result_diffs")
+        try:
+            diff = operation.diff(
+                left_data, right_data, key_columns=key_columns, labels=labels
+            )
+        except HarlequinQueryError as e:
+            self.post_message(self.OperationError(error=e, group="result_diffs"))
+            return
+        finally:
+            self._finish_operation("result_diffs", operation)
+        if diff is None or worker.is_cancelled:
+            return
+        left_types = dict(
+            zip(unique_column_names(left.plain_column_labels), left.column_types)
+        )
+        column_labels = [(CHANGE_TYPE_COLUMN, "s")]
+        for name in diff.data.column_names[1:]:
+            source_name = name
+            for label in labels:
+                source_name = source_name.removesuffix(f" ({label})")
+            column_labels.append((name, left_types.get(source_name, "")))
+        self.post_message(
+            self.DiffCompleted(
+                diff=diff, column_labels=column_labels, title=f"Diff {'-'.join(labels)}"
+            )
+        )
+
+    def _enforce_memory_budget(self) -> None:
+        """
+        If the tables' data is over the memory budget, moves the data of the
+        least-recently-viewed tables to disk, until the data in memory (less
+        the data that is already being moved) fits in the budget. The visible
+        table is moved last.
+        """
+        self._update_memory_usage()
+        if self.memory_budget <= 0:
+            return
+        visible = self.get_visible_table()
+        tables = sorted(
+            self._all_tables(),
+            key=lambda item: (
+                item[1] is visible,
+                self._last_viewed.get(item[0], -1),
+            ),
+        )
+        excess = sum(table.nbytes for _, table in tables) - self.memory_budget
+        excess -= sum(table.nbytes for table in self._spilling)
+        for _, table in tables:
+            if excess <= 0:
+                break
+            if table in self._spilling or table.nbytes == 0:
+                continue
+            self._spilling.add(table)
+            excess -= table.nbytes
+            self._spill_table(
+                table=table,
+                data=[data for data in table.data_tables if not table.is_spilled(data)],
+                directory=self._get_spill_dir(),
+            )
+
+    @work(
+        thread=True,
+        exit_on_error=False,
+        group="result_spills",
+        description="moving results to disk.",
+    )
+    def _spill_table(
+        self, table: ResultsTable, data: list["pa.Table"], directory: Path
+    ) -> None:
+        spilled: list[tuple["pa.Table", "pa.Table"]] = []
+        paths: list[Path] = []
+        try:
+            for original in data:
+                path = directory / f"{uuid4().hex}.arrow"
+                paths.append(path)
+                spilled.append((original, spill_to_disk(original, path)))
+        except (OSError, pa.ArrowException) as e:
+            _remove_files(paths)
+            self.post_message(self.SpillFailed(table=table, error=e))
+            return
+        self.post_message(self.TableSpilled(table=table, spilled=spilled, paths=paths))
+
+    def _get_spill_dir(self) -> Path:
+        if self._spill_dir is None:
+            self._spill_dir = Path(tempfile.mkdtemp(prefix="harlequin-results-"))
+        return self._spill_dir
+
+    def _drop_table(self, pane_id: str, table: ResultsTable) -> None:
+        """
+        Replaces a tab's table with a message asking the user to re-run the
+        query, so its data can be freed.
+        """
+        _remove_files(table.spill_paths)
+        if self._pending_tables.pop(pane_id, None) is not None:
+            self.query_one(f"#{pane_id}", TabPane).query_one(
+                ".results-placeholder", Static
+            ).update(DROPPED_RESULTS_MESSAGE)
+            return
+        pane = table.parent
+        panel = self._get_profile_panel(table)
+        if panel is not None:
+            panel.remove()
+        table.remove()
+        if isinstance(pane, TabPane):
+            pane.remove_class("profiled")
+            pane.mount(Static(DROPPED_RESULTS_MESSAGE, classes="results-placeholder"))
+
+    def _update_memory_usage(self) -> None:
+        tables = [table for _, table in self._all_tables()]
+        if not tables:
+            self.border_subtitle = ""
+            return
+        usage = f"Memory: {format_byte_size(sum(t.nbytes for t in tables))}"
+        if self.memory_budget > 0:
+            usage = f"{usage} of {format_byte_size(self.memory_budget)}"
+        spilled = sum(table.spilled_nbytes for table in tables)
+        if spilled:
+            usage = f"{usage} | Disk: {format_byte_size(spilled)}"
+        self.border_subtitle = usage
+
+    def _all_tables(self) -> Iterator[tuple[str, ResultsTable]]:
+        """
+        Yields the id of each tab's pane and its table, including tables that
+        aren't mounted yet.
+        """
+        for tab_number in range(1, self.tab_count + 1):
+            table = self._get_table(tab_number)
+            if table is not None:
+                yield f"result-{tab_number}", table
+
+    def _get_pane_id(self, table: ResultsTable) -> str | None:
+        for pane_id, other in self._all_tables():
+            if other is table:
+                return pane_id
+        return None
+
+    def _get_table(self, tab_number: int) -> ResultsTable | None:
+        """
+        Returns the table in a tab. The table may not be mounted yet, if
+        the tab hasn't been shown.
+        """
+        pane_id = f"result-{tab_number}"
+        if pane_id in self._pending_tables:
+            return self._pending_tables[pane_id]
+        try:
+            pane = self.query_one(f"#{pane_id}", TabPane)
+            return pane.query_one(ResultsTable)
+        except NoMatches:
+            return None
+
+    def _mount_pending_table(self, pane: TabPane | None) -> None:
+        """
+        Replaces the placeholder in a lazily-pushed tab with its table.
+        """
+        if pane is None or pane.id is None:
+            return
+        table = self._pending_tables.pop(pane.id, None)
+        if table is None:
+            return
+        pane.query(".results-placeholder").remove()
+        pane.mount(table)
+
+    async def _replace_table_data(
+        self,
+        table: ResultsTable,
+        data: "pa.Table",
+        row_locators: "pa.ChunkedArray" | None = None,
+    ) -> ResultsTable:
+        """
+        Mounts a new table over data (with the same settings and state) in
+        place of table, and returns it.
+        """
+        new_table = table.with_data(data, row_locators=row_locators)
+        self._spilling.discard(table)
+        pane = table.parent
+        if not isinstance(pane, Widget):
+            # a lazy tab's table, which hasn't been mounted yet
+            for pane_id, pending in self._pending_tables.items():
+                if pending is table:
+                    self._pending_tables[pane_id] = new_table
+            return new_table
+        had_focus = table.has_focus
+        siblings = list(pane.children)
+        position = siblings.index(table)
+        following = siblings[position + 1] if position + 1 < len(siblings) else None
+        await table.remove()
+        await pane.mount(new_table, before=following)
+        new_table.cursor_coordinate = Coordinate(0, table.cursor_column)
+        if had_focus:
+            new_table.focus()
+        return new_table
+
+    def _get_profile_panel(self, table: ResultsTable) -> ColumnProfilePanel | None:
+        if table.parent is None:
+            return None
+        try:
+            return table.parent.query_one(ColumnProfilePanel)
+        except NoMatches:
+            return None
+
+    def _start_operation(self, group: str) -> ResultsOperation:
+        operation = ResultsOperation()
+        self._results_operations[group] = operation
+        return operation
+
+    def _finish_operation(self, group: str, operation: ResultsOperation) -> None:
+        operation.close()
+        if self._results_operations.get(group) is operation:
+            del self._results_operations[group]
+
+    def _cancel_operations(self, group: str) -> None:
+        operation = self._results_operations.get(group)
+        if operation is not None:
+            operation.cancel()
+        self.workers.cancel_group(self, group)
+
+    def _table_title(self, table: ResultsTable) -> str:
+        # a filter's matches can't be compared to the unfiltered count
+        row_count = self._human_row_count(
+            table.source_row_count,
+            query_rows=None if table.filter_expression else table.query_row_count,
+        )
+        title = f"Query Results {row_count}"
+        transforms: list[str] = []
+        if table.filter_expression:
+            transforms.append("Filtered")
+        if table.sort_columns:
+            col, order = table.sort_columns[0]
+            name = (
+                table.plain_column_labels[col]
+                if col < len(table.plain_column_labels)
+                else str(col)
+            )
+            direction = "asc" if order == "ascending" else "desc"
+            transforms.append(f"Sorted by {escape(name)} {direction}")
+        return " | ".join([title, *transforms])
+
+    def _human_row_count(self, total_rows: int, query_rows: int | None = None) -> str:
+        shown_rows = (
+            min(total_rows, self.max_results) if self.max_results > 0 else total_rows
+        )
+        if query_rows is not None and query_rows > total_rows:
+            total_rows = query_rows
+        if shown_rows < total_rows:
+            return f"(Showing {shown_rows:,} of {total_rows:,} Records)"
         else:
             return f"({total_rows:,} Records)"
 
@@ -247,3 +1360,9 @@ class ResultsViewer(TabbedContent, can_focus=True):
         CELL_X_PADDING = 2
         parent_size = getattr(self.parent, "container_size", self.screen.container_size)
         return max(SMALLEST_MAX_WIDTH, parent_size.width // 2 - CELL_X_PADDING)
+
+
+def _remove_files(paths: list[Path]) -> None:
+    for path in paths:
+        with suppress(OSError):
+            path.unlink()
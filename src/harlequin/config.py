@@ -16,12 +16,18 @@ class Profile(TypedDict, total=False):
     conn_str: Sequence[str] | str
     adapter: str
     limit: str | int
+    no_count_rows: bool
+    results_memory_budget: str | int
     theme: str
     keymap_name: list[str]
     show_files: Path | str | None
     show_s3: str | None
     locale: str
     no_download_tzdata: bool
+    execute: Path | str | None
+    question: str | None
+    output_format: str
+    output: Path | str | None
     # many more keys for adapter options
 
 
@@ -1,11 +1,14 @@
 ﻿from __future__ import annotations
 
+from harlequin.exception import HarlequinConfigError
 from harlequin.options import (
+    AbstractOption,
     FlagOption,
     HarlequinCopyFormat,
     SelectOption,
     TextOption,
 )
+from harlequin.results_memory import parse_byte_size
 
 
 def _validate_int(raw: str) -> tuple[bool, str | None]:
@@ -33,6 +36,62 @@ def _validate_float(raw: str) -> tuple[bool, str | None]:
         return True, None
 
 
+def _validate_byte_size_or_empty(raw: str) -> tuple[bool, str | None]:
+    if raw == "":
+        return True, None
+    try:
+        parse_byte_size(raw)
+    except HarlequinConfigError:
+        return False, "Must be a number of bytes, or a size like 100MB."
+    else:
+        return True, None
+
+
+def _validate_column_list(raw: str) -> tuple[bool, str | None]:
+    if raw.strip() and not all(name.strip() for name in raw.split(",")):
+        return False, "Must be a list of column names, separated by commas."
+    else:
+        return True, None
+
+
+# DuckDB writes CSV and Parquet files in parallel, and can split them into a
+# directory of files with these options.
+_directory_options: list[AbstractOption] = [
+    TextOption(
+        name="partition_by",
+        description=(
+            "Columns to partition the export by, separated by commas. Writes a "
+            "directory of files, with a subdirectory (like year=2024) for each "
+            "value, so readers can skip the partitions they don't need. Can't be "
+            "combined with Per-Thread Output or File Size."
+        ),
+        label="Partition By",
+        default="",
+        placeholder="year, month",
+        validator=_validate_column_list,
+    ),
+    FlagOption(
+        name="per_thread_output",
+        description=(
+            "Switch on to write one file per thread, into a directory, so every "
+            "core writes at once."
+        ),
+        label="Per-Thread Output",
+    ),
+    TextOption(
+        name="file_size_bytes",
+        description=(
+            "Start a new file after this many bytes have been written (like "
+            "100000000 or 100MB). Writes a directory of files."
+        ),
+        label="File Size",
+        default="",
+        placeholder="100MB",
+        validator=_validate_byte_size_or_empty,
+    ),
+]
+
+
 csv = HarlequinCopyFormat(
     name="csv",
     label="CSV",
@@ -111,6 +170,7 @@ csv = HarlequinCopyFormat(
             label="Encoding",
             default="UTF8",
         ),
+        *_directory_options,
     ],
 )
 
@@ -133,7 +193,20 @@ parquet = HarlequinCopyFormat(
                 ("Uncompressed", "uncompressed"),
             ],
             default="snappy",
-        )
+        ),
+        TextOption(
+            name="row_group_size",
+            description=(
+                "The number of records in each row group. Larger row groups "
+                "compress better; smaller ones let readers skip more data. "
+                "Default 122880."
+            ),
+            label="Row Group Size",
+            default="",
+            placeholder="122880",
+            validator=_validate_int_or_empty,
+        ),
+        *_directory_options,
     ],
 )
 
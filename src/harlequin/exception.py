@@ -24,6 +24,10 @@ class HarlequinCopyError(HarlequinError):
     pass
 
 
+class HarlequinCopyCanceled(HarlequinCopyError):
+    pass
+
+
 class HarlequinQueryError(HarlequinError):
     pass
 
@@ -1,133 +1,622 @@
 ﻿from __future__ import annotations
 
+import itertools
+import os
+import queue
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Protocol
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    Protocol,
+    Sequence,
+)
 
 from textual_fastdatatable.backend import ArrowBackend
 
-from harlequin.exception import HarlequinCopyError
+from harlequin.exception import (
+    HarlequinConfigError,
+    HarlequinCopyCanceled,
+    HarlequinCopyError,
+    HarlequinQueryError,
+)
+from harlequin.result_ops import unique_column_names
+from harlequin.results_memory import format_byte_size, parse_byte_size
 
 if TYPE_CHECKING:
+    import duckdb
     import pyarrow as pa
 
+    from harlequin.adapter import HarlequinConnection
     from harlequin.components.results_viewer import ResultsTable
 
+# the number of records written at a time by exporters that write batches, and
+# so check for cancellation between batches
+EXPORT_BATCH_SIZE = 100_000
+# the default number of records in each row group of Parquet files written from
+# record batches, which matches DuckDB's default
+PARQUET_ROW_GROUP_SIZE = 122_880
+# the number of batches that a writer can fall behind the reader, when an
+# export is written to several destinations at once
+FAN_OUT_QUEUE_SIZE = 4
+# the formats that DuckDB writes with its COPY statement
+# selections of more cells than this are copied to the clipboard by a worker,
+# instead of on the UI thread
+CLIPBOARD_WORKER_CELLS = 10_000
+# before copying a selection of more cells than this, the user is offered an
+# export to a file, instead, since most apps are slow to paste so much data
+CLIPBOARD_CONFIRM_CELLS = 1_000_000
+DUCKDB_FORMAT_LABELS = {"csv": "CSV", "parquet": "Parquet", "json": "JSON"}
+# with any of these options, DuckDB writes a directory of files, instead of
+# a single file
+DIRECTORY_OUTPUT_OPTIONS = ("partition_by", "per_thread_output", "file_size_bytes")
+
+
+@dataclass
+class ExportDestination:
+    """
+    A file (or a directory of files) that an export writes, in one format,
+    with that format's options from Harlequin's export screen.
+    """
+
+    path: Path
+    format_name: str
+    options: Dict[str, Any] = field(default_factory=dict)
+
+
+class ExportProgress:
+    """
+    Tracks an export that runs in a background thread: the number of records
+    written so far, the size of the file (or directory) being written, and
+    whether the user has canceled the export. An export written to several
+    destinations at once also passes their other_paths, and its size is the
+    size of all of them.
+
+    Exporters that write in batches check for cancellation between batches;
+    writes that can't be checked (like a DuckDB COPY) register a callback with
+    on_cancel, which interrupts them.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        total_rows: int | None = None,
+        other_paths: Sequence[Path] = (),
+    ) -> None:
+        self.path = path.expanduser()
+        self.paths = [self.path, *(p.expanduser() for p in other_paths)]
+        self.total_rows = total_rows
+        self.rows_written = 0
+        self.started_at = time.monotonic()
+        self._start_time = time.time()
+        self._existed = {p: p.exists() for p in self.paths}
+        self._canceled = False
+        self._interrupt: Callable[[], None] | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def canceled(self) -> bool:
+        return self._canceled
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    @property
+    def bytes_written(self) -> int:
+        return sum(_size_on_disk(p) for p in self.paths)
+
+    def add_rows(self, count: int) -> None:
+        self.rows_written += count
+
+    def cancel(self) -> None:
+        with self._lock:
+            self._canceled = True
+            interrupt = self._interrupt
+        if interrupt is not None:
+            interrupt()
+
+    def on_cancel(self, interrupt: Callable[[], None] | None) -> None:
+        """
+        Registers a callback that interrupts the current write, or clears it
+        if interrupt is None.
+        """
+        with self._lock:
+            self._interrupt = interrupt
+
+    def check_canceled(self) -> None:
+        """
+        Raises: HarlequinCopyCanceled if the export was canceled.
+        """
+        if self._canceled:
+            raise self.canceled_error()
+
+    def canceled_error(self) -> HarlequinCopyCanceled:
+        return HarlequinCopyCanceled(
+            f"The export to {', '.join(str(p) for p in self.paths)} was canceled.",
+            title="Export canceled.",
+        )
+
+    def remove_partial_file(self) -> None:
+        """
+        Deletes whatever the export wrote before it failed or was canceled.
+        Files that existed before the export are only deleted if the export
+        had started overwriting them; directories are only deleted if the
+        export created them.
+        """
+        for path in self.paths:
+            try:
+                if path.is_dir():
+                    if not self._existed[path]:
+                        shutil.rmtree(path)
+                elif path.exists() and (
+                    not self._existed[path] or path.stat().st_mtime >= self._start_time
+                ):
+                    path.unlink()
+            except OSError:
+                pass
+
+    @property
+    def names(self) -> str:
+        """The names of the files (or directories) being written."""
+        return ", ".join(p.name for p in self.paths)
+
+    def summary(self) -> str:
+        """
+        Returns a description of the export's progress, like
+        "1,000 of 5,000 records, 12.3 MB (4.1 MB/s)".
+        """
+        if self.total_rows is not None and self.rows_written < self.total_rows:
+            records = f"{self.rows_written:,} of {self.total_rows:,} records, "
+        elif self.rows_written:
+            records = f"{self.rows_written:,} records, "
+        else:
+            records = ""
+        size = self.bytes_written
+        rate = format_byte_size(int(size / max(self.elapsed, 0.001)))
+        return f"{records}{format_byte_size(size)} ({rate}/s)"
+
+
+def _size_on_disk(path: Path) -> int:
+    try:
+        if path.is_dir():
+            return sum(
+                os.path.getsize(os.path.join(root, f))
+                for root, _, files in os.walk(path)
+                for f in files
+            )
+        return path.stat().st_size
+    except OSError:
+        # the file hasn't been created yet, or was replaced while we looked
+        return 0
+
 
 class ExporterCallable(Protocol):
-    def __call__(self, data: "pa.Table", dest_path: str, **kwargs: Any) -> None: ...
+    def __call__(
+        self,
+        data: "pa.Table",
+        dest_path: str,
+        progress: ExportProgress | None,
+        **kwargs: Any,
+    ) -> None: ...
 
 
 def copy(
-    table: "ResultsTable", path: Path, format_name: str, options: dict[str, Any]
+    table: "ResultsTable",
+    path: Path,
+    format_name: str,
+    options: dict[str, Any],
+    progress: ExportProgress | None = None,
 ) -> None:
-    if table.row_count == 0:
-        raise HarlequinCopyError("Cannot export empty table.")
-
-    assert isinstance(table.backend, ArrowBackend)
-    if table.plain_column_labels:
-        # Arrow allows duplicate field names, but DuckDB will typically throw an error
-        # when trying to export CSV, JSON, or PQ files with those dupe field names.
-        export_names: list[str] = []
-        for label in table.plain_column_labels:
-            export_label = label
-            n = 0
-            while export_label in export_names:
-                export_label = f"{label}_{n}"
-                n += 1
-            export_names.append(export_label)
-        data = table.backend.source_data.rename_columns(export_names)
-    else:
-        data = table.backend.source_data
-
+    data = _table_data(table)
     dest_path = str(path.expanduser())
     # only include options that aren't None/Empty
     kwargs = {k: v for k, v in options.items() if v}
     exporters: dict[str, ExporterCallable] = {
-        "csv": _export_csv,
-        "parquet": _export_parquet,
-        "json": _export_json,
+        "csv": partial(_export_with_duckdb, format_name="csv"),
+        "parquet": partial(_export_with_duckdb, format_name="parquet"),
+        "json": partial(_export_with_duckdb, format_name="json"),
         "orc": _export_orc,
         "feather": _export_feather,
     }
-    exporters[format_name](data, dest_path, **kwargs)
+    exporters[format_name](data, dest_path, progress, **kwargs)
+    if progress is not None:
+        progress.rows_written = data.num_rows
 
 
-def _export_csv(
-    data: "pa.Table",
-    dest_path: str,
-    **kwargs: Any,
+def copy_to_many(
+    table: "ResultsTable",
+    destinations: Sequence[ExportDestination],
+    progress: ExportProgress | None = None,
 ) -> None:
-    import duckdb
+    """
+    Like copy(), but writes the table's data to several destinations in a
+    single pass; see write_to_many().
+    """
+    data = _table_data(table)
+    write_to_many(
+        data.to_reader(max_chunksize=EXPORT_BATCH_SIZE), destinations, progress
+    )
+
+
+def copy_query_to_many(
+    connection: "HarlequinConnection",
+    query: str,
+    destinations: Sequence[ExportDestination],
+    progress: ExportProgress | None = None,
+) -> None:
+    """
+    Runs query with the connection, and writes all of its records to several
+    destinations in a single pass; see write_to_many(). The query is run once,
+    and its records are fetched in batches, so they are never all held in
+    memory.
+    """
+    import pyarrow as pa
 
-    if kwargs.get("quoting"):
-        kwargs["quoting"] = "ALL"
-    if "header" not in kwargs:
-        kwargs["header"] = False
     try:
-        relation = duckdb.arrow(data)  # type: ignore[arg-type]
-        relation.write_csv(file_name=dest_path, **kwargs)
-    except (duckdb.Error, OSError) as e:
+        cursor = connection.execute(query)
+        batches = iter(
+            cursor.fetch_record_batches(EXPORT_BATCH_SIZE) if cursor else []
+        )
+        first = next(batches, None)
+    except HarlequinQueryError as e:
+        raise HarlequinCopyError(e.msg, title=e.title) from e
+    if first is None:
         raise HarlequinCopyError(
-            str(e),
-            title=("DuckDB raised an error when writing your query to a CSV file."),
-        ) from e
+            "The query did not return any records.",
+            title="Harlequin could not export your query.",
+        )
+    # like copy(), make the column names unique, since most writers can't
+    # handle duplicate names
+    schema = pa.schema(
+        [
+            field.with_name(name)
+            for field, name in zip(
+                first.schema, unique_column_names(first.schema.names)
+            )
+        ]
+    )
 
+    def renamed_batches() -> Iterator["pa.RecordBatch"]:
+        for batch in itertools.chain([first], batches):
+            yield pa.RecordBatch.from_arrays(batch.columns, schema=schema)
 
-def _export_parquet(
-    data: "pa.Table",
-    dest_path: str,
-    **kwargs: Any,
+    reader = pa.RecordBatchReader.from_batches(schema, renamed_batches())
+    write_to_many(reader, destinations, progress)
+
+
+def write_to_many(
+    reader: "pa.RecordBatchReader",
+    destinations: Sequence[ExportDestination],
+    progress: ExportProgress | None = None,
 ) -> None:
-    import duckdb
+    """
+    Writes the batches from reader to every destination in a single pass.
+    Each batch is read once, and handed to one writer per destination; the
+    writers run at the same time, each in its own thread, and the slowest
+    writer sets the pace. CSV, Parquet, and JSON files are written by DuckDB
+    (with the same options as copy()), and ORC and Feather files by Arrow.
+
+    If progress is given, it counts the records read, and the export stops
+    if it is canceled.
+
+    Raises: HarlequinCopyError (HarlequinCopyCanceled if canceled), from the
+        first writer to fail.
+    """
+    import pyarrow.lib as pl
 
+    queues = [_BatchQueue(reader.schema, d) for d in destinations]
+    for q in queues:
+        q.start()
+    error: BaseException | None = None
     try:
-        relation = duckdb.arrow(data)  # type: ignore[arg-type]
-        relation.write_parquet(
-            file_name=dest_path, compression=kwargs.get("compression")
+        for batch in reader:
+            if progress is not None:
+                progress.check_canceled()
+            for q in queues:
+                q.put(batch)
+            if progress is not None:
+                progress.add_rows(batch.num_rows)
+            error = next((q.error for q in queues if q.error is not None), None)
+            if error is not None:
+                break
+        if progress is not None:
+            # a reader may stop early if it is interrupted
+            progress.check_canceled()
+    except HarlequinCopyError as e:
+        error = e
+    except (HarlequinQueryError, pl.ArrowException, OSError) as e:
+        error = HarlequinCopyError(
+            str(e), title="Harlequin could not read your data for export."
         )
-    except (duckdb.Error, OSError) as e:
-        raise HarlequinCopyError(
-            str(e),
-            title=("DuckDB raised an error when writing your query to a Parquet file."),
-        ) from e
+    for q in queues:
+        if error is None:
+            q.finish()
+        else:
+            q.abort(error)
+    for q in queues:
+        q.join()
+    error = error or next((q.error for q in queues if q.error is not None), None)
+    if error is not None:
+        raise error
 
 
-def _export_json(
-    data: "pa.Table",
+class _BatchQueue:
+    """
+    Hands the batches read by write_to_many() to the writer for one
+    destination, which runs in its own thread and reads the batches from a
+    RecordBatchReader.
+    """
+
+    _DONE = object()
+
+    def __init__(self, schema: "pa.Schema", destination: ExportDestination) -> None:
+        import pyarrow as pa
+
+        self.destination = destination
+        self.error: BaseException | None = None
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=FAN_OUT_QUEUE_SIZE)
+        self._reader = pa.RecordBatchReader.from_batches(schema, self._batches())
+        self._thread = threading.Thread(target=self._write, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def put(self, batch: "pa.RecordBatch") -> None:
+        """
+        Blocks until the writer has room for batch, unless it has stopped.
+        """
+        while self._thread.is_alive():
+            try:
+                self._queue.put(batch, timeout=0.1)
+            except queue.Full:
+                continue
+            else:
+                return
+
+    def finish(self) -> None:
+        self.put(self._DONE)  # type: ignore[arg-type]
+
+    def abort(self, error: BaseException) -> None:
+        self.put(error)  # type: ignore[arg-type]
+
+    def join(self) -> None:
+        self._thread.join()
+
+    def _batches(self) -> Iterator["pa.RecordBatch"]:
+        while True:
+            item = self._queue.get()
+            if item is self._DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+    def _write(self) -> None:
+        destination = self.destination
+        kwargs = {k: v for k, v in destination.options.items() if v}
+        try:
+            if destination.format_name in DUCKDB_FORMAT_LABELS:
+                _export_with_duckdb(
+                    self._reader,
+                    str(destination.path.expanduser()),
+                    format_name=destination.format_name,
+                    **kwargs,
+                )
+            else:
+                write_record_batches(
+                    self._reader,
+                    destination.path,
+                    destination.format_name,
+                    kwargs,
+                )
+        except HarlequinCopyError as e:
+            self.error = e
+        except Exception as e:
+            self.error = HarlequinCopyError(
+                str(e),
+                title=f"Harlequin could not write to {destination.path}.",
+            )
+
+
+def _table_data(table: "ResultsTable") -> "pa.Table":
+    if table.row_count == 0:
+        raise HarlequinCopyError("Cannot export empty table.")
+
+    assert isinstance(table.backend, ArrowBackend)
+    if table.plain_column_labels:
+        # Arrow allows duplicate field names, but DuckDB will typically throw an error
+        # when trying to export CSV, JSON, or PQ files with those dupe field names.
+        export_names = unique_column_names(table.plain_column_labels)
+        return table.backend.source_data.rename_columns(export_names)
+    return table.backend.source_data
+
+
+@contextmanager
+def _interruptible_connection(
+    progress: ExportProgress | None,
+) -> Iterator["duckdb.DuckDBPyConnection"]:
+    """
+    Yields a new DuckDB connection for a single export, so that canceling the
+    export interrupts only its own write.
+    """
+    import duckdb
+
+    conn = duckdb.connect()
+    try:
+        if progress is not None:
+            progress.on_cancel(conn.interrupt)
+            progress.check_canceled()
+        yield conn
+    finally:
+        if progress is not None:
+            progress.on_cancel(None)
+        conn.close()
+
+
+def _export_with_duckdb(
+    data: "pa.Table | pa.RecordBatchReader",
     dest_path: str,
+    progress: ExportProgress | None = None,
+    *,
+    format_name: str,
     **kwargs: Any,
 ) -> None:
     import duckdb
 
-    array = f"{', ARRAY TRUE' if kwargs.get('array') else ''}"
-    compression = f", COMPRESSION {kwargs.get('compression')}"
-    date_format = (
-        f", DATEFORMAT '{kwargs.get('''date_format''')}'"
-        if kwargs.get("date_format")
-        else ""
-    )
-    ts_format = (
-        f", TIMESTAMPFORMAT '{kwargs.get('''options.timestamp_format''')}'"
-        if kwargs.get("options.timestamp_format")
-        else ""
-    )
     try:
-        duckdb.execute(
-            f"copy (select * from data) to '{dest_path}' "
-            "(FORMAT JSON"
-            f"{array}{compression}{date_format}{ts_format}"
-            ")"
-        )
+        with _interruptible_connection(progress) as conn:
+            conn.register("harlequin_export_data", data)
+            conn.execute(
+                duckdb_copy_statement(
+                    "select * from harlequin_export_data",
+                    dest_path,
+                    format_name,
+                    kwargs,
+                )
+            )
     except (duckdb.Error, OSError) as e:
         raise HarlequinCopyError(
             str(e),
-            title=("DuckDB raised an error when writing your query to a JSON file."),
+            title=(
+                "DuckDB raised an error when writing your query to a "
+                f"{DUCKDB_FORMAT_LABELS[format_name]} file."
+            ),
         ) from e
 
 
-def _export_orc(
-    data: "pa.Table",
-    dest_path: str,
+def to_tsv(data: "pa.Table") -> str:
+    """
+    Serializes data as tab-separated values, without a header, which is the
+    format that spreadsheets (and Snowsight) use for copied cells. Values are
+    written by Arrow's CSV writer, and are only quoted if a value contains a
+    tab, a newline, or a quote. Nulls are empty. Columns of types that the
+    writer doesn't support (like lists and structs) are converted to strings
+    in python.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pcsv
+
+    columns = []
+    for arr in data.columns:
+        try:
+            pcsv.write_csv(
+                pa.table([arr.slice(0, 0)], names=["a"]), pa.BufferOutputStream()
+            )
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            arr = pa.array(
+                [None if value is None else str(value) for value in arr.to_pylist()],
+                type=pa.string(),
+            )
+        columns.append(arr)
+    table = pa.table(columns, names=[str(i) for i in range(len(columns))])
+    for quoting_style in ("none", "needed"):
+        sink = pa.BufferOutputStream()
+        write_options = pcsv.WriteOptions(
+            include_header=False, delimiter="\t", quoting_style=quoting_style
+        )
+        try:
+            pcsv.write_csv(table, sink, write_options=write_options)
+        except pa.ArrowInvalid:
+            # a value contains a tab, newline, or quote, so values must be quoted
+            continue
+        break
+    text = sink.getvalue().to_pybytes().decode("utf-8").removesuffix("\n")
+    if os.linesep != "\n":
+        text = text.replace("\n", os.linesep)
+    return text
+
+
+def split_column_list(raw: str | None) -> list[str]:
+    """
+    Splits a comma-separated list of column names, like "year, month".
+    """
+    if not raw:
+        return []
+    return [name.strip() for name in raw.split(",")]
+
+
+def _sql_string(value: Any) -> str:
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _sql_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def duckdb_copy_options(format_name: str, options: dict[str, Any]) -> list[str]:
+    """
+    Translates the options from Harlequin's export screen (see
+    harlequin.copy_formats) into options for DuckDB's COPY statement.
+    """
+    copy_options = [f"FORMAT {format_name.upper()}"]
+    compression = options.get("compression")
+    if compression and compression != "auto":
+        copy_options.append(f"COMPRESSION {compression}")
+    if format_name == "csv":
+        copy_options.append(f"HEADER {bool(options.get('header'))}")
+        if options.get("quoting"):
+            copy_options.append("FORCE_QUOTE *")
+        for option_name, copy_option_name in (
+            ("sep", "DELIMITER"),
+            ("quotechar", "QUOTE"),
+            ("escapechar", "ESCAPE"),
+            ("na_rep", "NULLSTR"),
+        ):
+            if options.get(option_name):
+                copy_options.append(
+                    f"{copy_option_name} {_sql_string(options[option_name])}"
+                )
+    if format_name == "json" and options.get("array"):
+        copy_options.append("ARRAY TRUE")
+    if format_name in ("csv", "json"):
+        if options.get("date_format"):
+            copy_options.append(f"DATEFORMAT {_sql_string(options['date_format'])}")
+        if options.get("timestamp_format"):
+            copy_options.append(
+                f"TIMESTAMPFORMAT {_sql_string(options['timestamp_format'])}"
+            )
+    try:
+        if format_name == "parquet" and options.get("row_group_size"):
+            copy_options.append(f"ROW_GROUP_SIZE {int(options['row_group_size'])}")
+        if options.get("file_size_bytes"):
+            file_size = parse_byte_size(options["file_size_bytes"])
+            copy_options.append(f"FILE_SIZE_BYTES {file_size}")
+    except (ValueError, HarlequinConfigError) as e:
+        raise HarlequinCopyError(
+            str(e), title="Harlequin could not export your data."
+        ) from e
+    partition_by = split_column_list(options.get("partition_by"))
+    if partition_by:
+        columns = ", ".join(_sql_identifier(name) for name in partition_by)
+        copy_options.append(f"PARTITION_BY ({columns})")
+    if options.get("per_thread_output"):
+        copy_options.append("PER_THREAD_OUTPUT TRUE")
+    return copy_options
+
+
+def duckdb_copy_statement(
+    select: str, dest_path: str, format_name: str, options: dict[str, Any]
+) -> str:
+    """
+    Returns a DuckDB COPY statement that writes the records returned by
+    select to dest_path, with the options from Harlequin's export screen.
+
+    Raises: HarlequinCopyError if an option's value is invalid.
+    """
+    copy_options = ", ".join(duckdb_copy_options(format_name, options))
+    return f"copy ({select}) to {_sql_string(dest_path)} ({copy_options})"
+
+
+def _orc_options(
     batch_size: int | str = 1024,
     stripe_size: int | str = 67108864,
     compression_block_size: int | str = 65536,
@@ -137,77 +626,299 @@ def _export_orc(
     bloom_filter_columns: list[str] | str | None = None,
     bloom_filter_fpp: float | str = 0.05,
     **kwargs: Any,
-) -> None:
-    import pyarrow.lib as pl
-    import pyarrow.orc as po
-
+) -> dict[str, Any]:
     try:
         if bloom_filter_columns and isinstance(bloom_filter_columns, str):
             bloom_filter_columns = bloom_filter_columns.split(",")
-        batch_size = int(batch_size)
-        compression_block_size = int(compression_block_size)
-        stripe_size = int(stripe_size)
-        row_index_stride = int(row_index_stride)
-        bloom_filter_fpp = float(bloom_filter_fpp)
-        padding_tolerance = float(padding_tolerance)
-        dictionary_key_size_threshold = float(dictionary_key_size_threshold)
+        return dict(
+            batch_size=int(batch_size),
+            compression_block_size=int(compression_block_size),
+            stripe_size=int(stripe_size),
+            row_index_stride=int(row_index_stride),
+            bloom_filter_fpp=float(bloom_filter_fpp),
+            padding_tolerance=float(padding_tolerance),
+            dictionary_key_size_threshold=float(dictionary_key_size_threshold),
+            bloom_filter_columns=bloom_filter_columns,
+            **kwargs,
+        )
     except (ValueError, TypeError, KeyError) as e:
         raise HarlequinCopyError(
             str(e),
             title=("Arrow raised an error when writing your data to an ORC file."),
         ) from e
+
+
+def _export_orc(
+    data: "pa.Table",
+    dest_path: str,
+    progress: ExportProgress | None = None,
+    **kwargs: Any,
+) -> None:
+    write_record_batches(
+        data.to_reader(max_chunksize=EXPORT_BATCH_SIZE),
+        Path(dest_path),
+        "orc",
+        kwargs,
+        progress=progress,
+    )
+
+
+def _feather_options(
+    compression: str | None = None,
+    compression_level: str | int | None = None,
+    chunksize: str | int | None = None,
+    **kwargs: Any,
+) -> dict[str, Any]:
     try:
-        po.write_table(
-            data,
-            dest_path,
-            batch_size=batch_size,
-            compression_block_size=compression_block_size,
-            stripe_size=stripe_size,
-            row_index_stride=row_index_stride,
-            bloom_filter_fpp=bloom_filter_fpp,
-            padding_tolerance=padding_tolerance,
-            dictionary_key_size_threshold=dictionary_key_size_threshold,
-            bloom_filter_columns=bloom_filter_columns,  # type: ignore
+        return dict(
+            compression=compression,
+            compression_level=int(compression_level) if compression_level else None,
+            chunksize=int(chunksize) if chunksize else None,
             **kwargs,
         )
-    except (pl.ArrowException, OSError, IOError, TypeError) as e:
+    except (ValueError, TypeError, KeyError) as e:
         raise HarlequinCopyError(
             str(e),
-            title=("Arrow raised an error when writing your data to an ORC file."),
+            title=("Arrow raised an error when writing your data to a Feather file."),
         ) from e
 
 
 def _export_feather(
     data: "pa.Table",
     dest_path: str,
-    compression: str | None = None,
-    compression_level: str | int | None = None,
-    chunksize: str | int | None = None,
+    progress: ExportProgress | None = None,
     **kwargs: Any,
 ) -> None:
     import pyarrow.feather as pf
     import pyarrow.lib as pl
 
+    feather_options = _feather_options(**kwargs)
+    if progress is not None:
+        progress.check_canceled()
     try:
-        compression_level = int(compression_level) if compression_level else None
-        chunksize = int(chunksize) if chunksize else None
-    except (ValueError, TypeError, KeyError) as e:
+        pf.write_feather(data, dest_path, **feather_options)
+    except (pl.ArrowException, OSError, IOError, TypeError) as e:
         raise HarlequinCopyError(
             str(e),
             title=("Arrow raised an error when writing your data to a Feather file."),
         ) from e
 
-    try:
-        pf.write_feather(
-            data,
-            dest_path,
-            compression=compression,
-            compression_level=compression_level,
-            chunksize=chunksize,
-            **kwargs,
+
+def write_record_batches(
+    reader: "pa.RecordBatchReader",
+    path: Path,
+    format_name: str,
+    options: dict[str, Any],
+    progress: ExportProgress | None = None,
+) -> None:
+    """
+    Writes the batches from reader to a file at path one at a time, so the
+    data is never held in memory all at once. Adapters can use this to
+    implement copy() for formats their database can't write itself.
+
+    Supports the csv, parquet, json (written by DuckDB, from the reader), orc
+    and feather (version 2 only, which is an Arrow IPC file) formats, with
+    the same options as copy(), except for the options that write a
+    directory of files, and csv quote and escape characters other than
+    '"', which only DuckDB supports. Parquet files are written one row group
+    at a time. If progress is given, it is updated after each batch, and the
+    write stops if it is canceled.
+
+    Raises: HarlequinCopyError (HarlequinCopyCanceled if canceled)
+    """
+    import pyarrow as pa
+    import pyarrow.lib as pl
+
+    dest_path = str(path.expanduser())
+    kwargs = {k: v for k, v in options.items() if v}
+    if any(kwargs.get(name) for name in DIRECTORY_OUTPUT_OPTIONS):
+        raise HarlequinCopyError(
+            "Partitioned and multi-file exports can only be written by DuckDB.",
+            title="Harlequin could not export your data.",
         )
-    except (pl.ArrowException, OSError, IOError, TypeError) as e:
+
+    def batches() -> Iterator["pa.RecordBatch"]:
+        for batch in reader:
+            if progress is not None:
+                progress.check_canceled()
+            yield batch
+            if progress is not None:
+                progress.add_rows(batch.num_rows)
+
+    try:
+        if format_name == "csv":
+            _write_csv_batches(batches(), reader.schema, dest_path, kwargs)
+        elif format_name == "parquet":
+            _write_parquet_batches(batches(), reader.schema, dest_path, kwargs)
+        elif format_name == "json":
+            # DuckDB streams JSON from the reader several times faster than
+            # encoding each record in python
+            try:
+                _export_with_duckdb(
+                    pa.RecordBatchReader.from_batches(reader.schema, batches()),
+                    dest_path,
+                    progress=progress,
+                    format_name="json",
+                    **kwargs,
+                )
+            except HarlequinCopyError:
+                if progress is not None:
+                    # DuckDB wraps the error raised by batches() when canceled
+                    progress.check_canceled()
+                raise
+        elif format_name == "orc":
+            import pyarrow.orc as po
+
+            with po.ORCWriter(dest_path, **_orc_options(**kwargs)) as writer:
+                for batch in batches():
+                    writer.write(pa.Table.from_batches([batch]))
+        elif format_name == "feather":
+            feather_options = _feather_options(**kwargs)
+            if str(feather_options.get("version", "2")) != "2":
+                raise HarlequinCopyError(
+                    "Only version 2 Feather files can be written from a query.",
+                    title="Harlequin could not write your data to a Feather file.",
+                )
+            compression = feather_options.get("compression")
+            write_options = pa.ipc.IpcWriteOptions(
+                compression=(
+                    pa.Codec(compression, feather_options.get("compression_level"))
+                    if compression and compression != "uncompressed"
+                    else None
+                )
+            )
+            with pa.ipc.new_file(
+                dest_path, reader.schema, options=write_options
+            ) as writer:
+                for batch in batches():
+                    writer.write_table(
+                        pa.Table.from_batches([batch]),
+                        max_chunksize=feather_options.get("chunksize"),
+                    )
+        else:
+            raise HarlequinCopyError(
+                f"Cannot write {format_name} files from record batches.",
+                title="Harlequin could not export your data.",
+            )
+    except (pl.ArrowException, OSError, TypeError, ValueError) as e:
         raise HarlequinCopyError(
             str(e),
-            title=("Arrow raised an error when writing your data to a Feather file."),
+            title=f"Arrow raised an error when writing your {format_name} file.",
         ) from e
+
+
+def _output_stream(dest_path: str, compression: str | None) -> "pa.NativeFile":
+    """
+    Opens dest_path for writing, compressed with compression, or detected from
+    the file's extension (like file.csv.gz) if compression is "auto".
+    """
+    import pyarrow as pa
+
+    if compression in (None, "auto"):
+        return pa.output_stream(dest_path, compression="detect")
+    if compression in ("none", "uncompressed"):
+        return pa.output_stream(dest_path, compression=None)
+    return pa.output_stream(dest_path, compression=compression)
+
+
+def _format_batch(
+    batch: "pa.RecordBatch",
+    date_format: str | None = None,
+    timestamp_format: str | None = None,
+    na_rep: str | None = None,
+) -> "pa.RecordBatch":
+    """
+    Formats dates and timestamps as strings, and (if na_rep is set) casts
+    every column to strings, with NULLs replaced by na_rep.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    arrays = []
+    for arr in batch.columns:
+        if date_format and pa.types.is_date(arr.type):
+            arr = pc.strftime(arr, format=date_format)
+        elif timestamp_format and pa.types.is_timestamp(arr.type):
+            arr = pc.strftime(arr, format=timestamp_format)
+        if na_rep:
+            arr = pc.fill_null(arr.cast(pa.string()), na_rep)
+        arrays.append(arr)
+    return pa.RecordBatch.from_arrays(arrays, names=batch.schema.names)
+
+
+def _write_csv_batches(
+    batches: Iterator["pa.RecordBatch"],
+    schema: "pa.Schema",
+    dest_path: str,
+    options: dict[str, Any],
+) -> None:
+    import pyarrow as pa
+    import pyarrow.csv as pcsv
+
+    for option_name in ("quotechar", "escapechar"):
+        if options.get(option_name, '"') != '"':
+            raise HarlequinCopyError(
+                f"Only DuckDB can write CSV files with a {option_name} other "
+                """than '"'.""",
+                title="Harlequin could not export your data.",
+            )
+    if str(options.get("encoding", "utf8")).replace("-", "").lower() != "utf8":
+        raise HarlequinCopyError(
+            "CSV files can only be written with the UTF8 encoding.",
+            title="Harlequin could not export your data.",
+        )
+    format_options = {
+        "date_format": options.get("date_format"),
+        "timestamp_format": options.get("timestamp_format"),
+        "na_rep": options.get("na_rep"),
+    }
+    write_options = pcsv.WriteOptions(
+        include_header=bool(options.get("header")),
+        delimiter=options.get("sep") or ",",
+        quoting_style="all_valid" if options.get("quoting") else "needed",
+    )
+    out_schema = _format_batch(
+        pa.RecordBatch.from_pylist([], schema=schema), **format_options
+    ).schema
+    with _output_stream(dest_path, options.get("compression")) as stream:
+        with pcsv.CSVWriter(stream, out_schema, write_options=write_options) as w:
+            for batch in batches:
+                w.write_batch(_format_batch(batch, **format_options))
+
+
+def _write_parquet_batches(
+    batches: Iterator["pa.RecordBatch"],
+    schema: "pa.Schema",
+    dest_path: str,
+    options: dict[str, Any],
+) -> None:
+    """
+    Buffers batches until they fill a row group, so a reader that yields
+    small batches doesn't write a file of tiny row groups.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    compression = options.get("compression", "snappy")
+    row_group_size = int(options.get("row_group_size") or PARQUET_ROW_GROUP_SIZE)
+    with pq.ParquetWriter(
+        dest_path,
+        schema,
+        compression="none" if compression == "uncompressed" else compression,
+    ) as writer:
+        buffered: list["pa.RecordBatch"] = []
+        buffered_rows = 0
+        for batch in batches:
+            buffered.append(batch)
+            buffered_rows += batch.num_rows
+            if buffered_rows >= row_group_size:
+                writer.write_table(
+                    pa.Table.from_batches(buffered, schema=schema),
+                    row_group_size=row_group_size,
+                )
+                buffered, buffered_rows = [], 0
+        if buffered:
+            writer.write_table(
+                pa.Table.from_batches(buffered, schema=schema),
+                row_group_size=row_group_size,
+            )
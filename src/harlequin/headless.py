@@ -0,0 +1,331 @@
+﻿from __future__ import annotations
+
+import json
+import math
+import sys
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, Sequence
+
+from harlequin.exception import HarlequinCopyError, HarlequinQueryError
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+    from harlequin.adapter import HarlequinAdapter, HarlequinConnection
+
+OUTPUT_FORMATS = ("csv", "jsonl", "parquet")
+DEFAULT_BATCH_SIZE = 10_000
+PARQUET_PENDING_ROWS = 100_000
+
+
+def split_queries(text: str) -> list[str]:
+    """
+    Splits a script into individual queries on semicolons, ignoring
+    semicolons inside quoted strings, quoted identifiers, and comments.
+    Queries that are empty or only contain comments are dropped.
+    """
+    queries: list[str] = []
+    start = 0
+    has_code = False
+    i = 0
+    n = len(text)
+    while i < n:
+        char = text[i]
+        if char in ("'", '"'):
+            # an escaped (doubled) quote is read as two adjacent strings
+            end = text.find(char, i + 1)
+            i = n if end == -1 else end + 1
+            has_code = True
+        elif text.startswith("--", i):
+            end = text.find("\n", i)
+            i = n if end == -1 else end + 1
+        elif text.startswith("/*", i):
+            end = text.find("*/", i + 2)
+            i = n if end == -1 else end + 2
+        elif char == ";":
+            if has_code:
+                queries.append(text[start:i].strip())
+            i += 1
+            start = i
+            has_code = False
+        else:
+            has_code = has_code or not char.isspace()
+            i += 1
+    if has_code:
+        queries.append(text[start:].strip())
+    return queries
+
+
+def translate_question(question: str, connection: HarlequinConnection) -> str:
+    """
+    Translates a natural-language question into a SQL query, using the
+    tables and columns in the connected database's catalog.
+    """
+    from harlequin.nl_to_sql import (
+        build_parser,
+        schema_from_catalog,
+        translate_nl_to_sql,
+    )
+
+    # the translator prints progress and debugging messages, which must not
+    # end up in results written to stdout
+    with redirect_stdout(sys.stderr):
+        parser = build_parser(schema_from_catalog(connection.get_catalog()))
+        sql = translate_nl_to_sql(question, parser)
+    if sql.startswith("-- Error"):
+        raise HarlequinQueryError(
+            msg=sql[len("-- ") :], title="Could not translate your question to SQL."
+        )
+    return sql
+
+
+class BatchWriter:
+    """
+    Writes a stream of record batches from one result set. Subclasses
+    implement write and may override close.
+    """
+
+    def write(self, batch: pa.RecordBatch) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        return None
+
+
+class CsvBatchWriter(BatchWriter):
+    def __init__(self, sink: IO[bytes]) -> None:
+        self.sink = sink
+        self._has_header = False
+
+    def write(self, batch: pa.RecordBatch) -> None:
+        import pyarrow.csv as csv
+
+        csv.write_csv(
+            batch,
+            self.sink,
+            write_options=csv.WriteOptions(include_header=not self._has_header),
+        )
+        self._has_header = True
+        self.sink.flush()
+
+
+class JsonLinesBatchWriter(BatchWriter):
+    def __init__(self, sink: IO[bytes]) -> None:
+        self.sink = sink
+
+    def write(self, batch: pa.RecordBatch) -> None:
+        self.sink.write(
+            b"".join(_dump_json(row).encode() + b"\n" for row in batch.to_pylist())
+        )
+        self.sink.flush()
+
+
+class ParquetBatchWriter(BatchWriter):
+    """
+    Writes batches to a Parquet file, one row group at a time. Parquet files
+    have a single schema, so every batch is cast to the schema of the first.
+    Some adapters infer types batch by batch, so while a column has only
+    contained nulls, batches are held back (up to PARQUET_PENDING_ROWS rows)
+    until a later batch reveals the column's type.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._writer: Any = None
+        self._pending: list[pa.Table] = []
+        self._pending_rows = 0
+
+    def write(self, batch: pa.RecordBatch) -> None:
+        import pyarrow as pa
+
+        table = pa.Table.from_batches([batch])
+        if self._writer is not None:
+            self._write_table(table)
+            return
+        self._pending.append(table)
+        self._pending_rows += table.num_rows
+        if (
+            not any(pa.types.is_null(t) for t in _first_non_null_types(self._pending))
+            or self._pending_rows >= PARQUET_PENDING_ROWS
+        ):
+            self._flush_pending()
+
+    def close(self) -> None:
+        self._flush_pending()
+        if self._writer is not None:
+            self._writer.close()
+
+    def _flush_pending(self) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if not self._pending:
+            return
+        schema = pa.schema(
+            [
+                field.with_type(typ)
+                for field, typ in zip(
+                    self._pending[0].schema, _first_non_null_types(self._pending)
+                )
+            ]
+        )
+        self._writer = pq.ParquetWriter(self.path, schema)
+        pending, self._pending, self._pending_rows = self._pending, [], 0
+        for table in pending:
+            self._write_table(table)
+
+    def _write_table(self, table: pa.Table) -> None:
+        import pyarrow as pa
+
+        if table.schema != self._writer.schema:
+            try:
+                table = table.cast(self._writer.schema)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+                raise HarlequinCopyError(
+                    msg=(
+                        f"{e}\n\nThe types of the result's columns changed after "
+                        "the first batch of rows. Cast the columns to a single "
+                        "type in your query, or write CSV or JSONL instead."
+                    ),
+                    title="Could not write the results to a Parquet file.",
+                ) from e
+        self._writer.write_table(table)
+
+
+def _first_non_null_types(tables: Sequence[pa.Table]) -> list[pa.DataType]:
+    import pyarrow as pa
+
+    types = list(tables[0].schema.types)
+    for table in tables[1:]:
+        types = [
+            new if pa.types.is_null(existing) else existing
+            for existing, new in zip(types, table.schema.types)
+        ]
+    return types
+
+
+def run_headless(
+    adapter: HarlequinAdapter,
+    queries: Sequence[str],
+    output_format: str = "csv",
+    output_path: Path | None = None,
+    limit: int | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    question: str | None = None,
+) -> int:
+    """
+    Connects to the database with adapter and runs each query in order,
+    without starting the TUI. A question is translated into SQL (see
+    translate_question) once connected, and run after the queries. The results of every query that returns rows
+    are streamed to output_path (or stdout), one record batch at a time, so
+    memory use doesn't grow with the size of the results. CSV and JSONL
+    results from later queries are appended to the same output; Parquet
+    results are written to numbered files next to output_path
+    (e.g., out_1.parquet).
+
+    Returns the total number of rows written.
+
+    Raises HarlequinConnectionError, HarlequinQueryError, or HarlequinCopyError.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise HarlequinCopyError(
+            msg=f"Output format must be one of {', '.join(OUTPUT_FORMATS)}.",
+            title="Invalid output format.",
+        )
+    if output_format == "parquet" and output_path is None:
+        raise HarlequinCopyError(
+            msg="Use --output to choose a file to write the Parquet results to.",
+            title="Parquet results cannot be written to stdout.",
+        )
+    connection = adapter.connect()
+    sink: IO[bytes] | None = None
+    result_count = 0
+    row_count = 0
+    try:
+        if output_format != "parquet":
+            sink = (
+                open(output_path, "wb")  # noqa: SIM115
+                if output_path is not None
+                else sys.stdout.buffer
+            )
+        if question is not None:
+            queries = [*queries, translate_question(question, connection)]
+        for query in queries:
+            cursor = connection.execute(query)
+            if cursor is None:
+                continue
+            if limit:
+                cursor = cursor.set_limit(limit)
+            writer: BatchWriter | None = None
+            try:
+                for batch in cursor.fetch_record_batches(batch_size):
+                    if writer is None:
+                        writer = _get_writer(
+                            output_format, sink, output_path, result_count
+                        )
+                    writer.write(batch)
+                    row_count += batch.num_rows
+            finally:
+                if writer is not None:
+                    writer.close()
+            if writer is not None:
+                result_count += 1
+    except OSError as e:
+        if isinstance(e, BrokenPipeError):
+            raise
+        raise HarlequinCopyError(
+            msg=str(e), title="Could not write the results of your query."
+        ) from e
+    finally:
+        if sink is not None and output_path is not None:
+            sink.close()
+        connection.close()
+    return row_count
+
+
+def _get_writer(
+    output_format: str,
+    sink: IO[bytes] | None,
+    output_path: Path | None,
+    result_index: int,
+) -> BatchWriter:
+    if output_format == "parquet":
+        assert output_path is not None
+        path = (
+            output_path
+            if result_index == 0
+            else output_path.with_name(
+                f"{output_path.stem}_{result_index}{output_path.suffix}"
+            )
+        )
+        return ParquetBatchWriter(path)
+    assert sink is not None
+    if output_format == "jsonl":
+        return JsonLinesBatchWriter(sink)
+    if result_index > 0:
+        # separate the results of each query with a blank line
+        sink.write(b"\n")
+    return CsvBatchWriter(sink)
+
+
+def _dump_json(row: dict[str, Any]) -> str:
+    try:
+        return json.dumps(row, default=_json_default, allow_nan=False)
+    except ValueError:
+        # NaN and infinity aren't valid JSON
+        return json.dumps(
+            {
+                key: None
+                if isinstance(value, float) and not math.isfinite(value)
+                else value
+                for key, value in row.items()
+            },
+            default=_json_default,
+        )
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, bytes):
+        return value.hex()
+    return str(value)
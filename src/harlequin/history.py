@@ -9,6 +9,8 @@ from rich.columns import Columns
 from rich.console import Group, RenderableType
 from rich.text import Text
 
+from harlequin.query_profile import QueryProfile
+
 
 @dataclass
 class QueryExecution:
@@ -16,6 +18,7 @@ class QueryExecution:
     executed_at: datetime
     result_row_count: int
     elapsed: float
+    profile: QueryProfile | None = None
 
     def __rich__(self) -> RenderableType:
         ts = self.executed_at.strftime("%a, %b %d %H:%M:%S")
@@ -58,13 +61,20 @@ class History:
     def __iter__(self) -> Iterator[QueryExecution]:
         return iter(self.queries)
 
-    def append(self, query_text: str, result_row_count: int, elapsed: float) -> None:
+    def append(
+        self,
+        query_text: str,
+        result_row_count: int,
+        elapsed: float,
+        profile: QueryProfile | None = None,
+    ) -> None:
         self.queries.append(
             QueryExecution(
                 query_text=query_text.strip(),
                 executed_at=datetime.now(),
                 result_row_count=result_row_count,
                 elapsed=elapsed,
+                profile=profile,
             )
         )
 
@@ -1,11 +1,17 @@
-﻿from pathlib import Path
+﻿from functools import lru_cache
+from pathlib import Path
 from lark import Lark, Transformer
-from typing import List, Union
+from typing import TYPE_CHECKING, Dict, List, Optional, Union
 import sys
 
 import duckdb
 import re
 
+from harlequin.catalog import InteractiveCatalogItem
+
+if TYPE_CHECKING:
+    from harlequin.catalog import Catalog
+
 def get_schema_info(db_path: str):
     """Extract {table: [columns]} mapping from the DuckDB database."""
     conn = duckdb.connect(db_path, read_only=True)
@@ -35,13 +41,45 @@ def get_schema_info(db_path: str):
     return schema
 
 
+def schema_from_catalog(catalog: "Catalog") -> Dict[str, List[str]]:
+    """
+    Extract {table: [columns]} mapping from a connected adapter's catalog.
+    Relations are the items whose children are all columns (items without
+    children); unloaded items are loaded along the way.
+    """
+    schema: Dict[str, List[str]] = {}
+    to_check = list(catalog.items)
+    while to_check:
+        item = to_check.pop()
+        if isinstance(item, InteractiveCatalogItem) and not item.loaded:
+            item.children = list(item.fetch_children())
+            item.loaded = True
+        if not item.children:
+            continue
+        if all(not child.children for child in item.children):
+            schema.setdefault(item.label, [child.label for child in item.children])
+        else:
+            to_check.extend(item.children)
+    return schema
+
+
 def load_dynamic_grammar(grammar_path: Path, db_path: str) -> str:
     """Load base grammar and inject table/column literals based on DB schema."""
-    base_grammar = grammar_path.read_text()
     schema = get_schema_info(db_path)
+    if not schema:
+        print("âš ï¸ No tables found in database â€” using dummy placeholders.")
+    grammar = build_grammar(grammar_path, schema)
+    if schema:
+        print("ðŸ§  Injected tables:", list(schema.keys()))
+        print("âœ… Injected schema into grammar successfully.")
+    return grammar
+
+
+def build_grammar(grammar_path: Path, schema: Dict[str, List[str]]) -> str:
+    """Load base grammar and inject table/column literals from schema."""
+    base_grammar = grammar_path.read_text()
 
     if not schema:
-        print("âš ï¸ No tables found in database â€” using dummy placeholders.")
         return re.sub(r"table: CNAME", 'table: "dummy_table"', base_grammar)
 
     # Build literal rules
@@ -62,9 +100,6 @@ def load_dynamic_grammar(grammar_path: Path, db_path: str) -> str:
         filler_regex = rf"(?!(?:{pattern})\b)[A-Za-z]+"
         grammar = re.sub(r"FILLER\s*:\s*/\[A-Za-z\]\+\//", f'FILLER: /{filler_regex}/', grammar, flags=re.IGNORECASE)
 
-
-    print("ðŸ§  Injected tables:", list(schema.keys()))
-    print("âœ… Injected schema into grammar successfully.")
     return grammar
 
 
@@ -441,13 +476,34 @@ class EnhancedNL2SQL(Transformer):
 
 
 default_db_path = str(Path(__file__).parent / "example.db")
-if len(sys.argv) > 1:
-    DB_PATH = Path(sys.argv[1]).resolve()
-else:
-    DB_PATH = default_db_path
-dynamic_grammar = load_dynamic_grammar(grammar_path, DB_PATH)
-# Create enhanced parser
-enhanced_parser = Lark(dynamic_grammar, start="start", parser="lalr", transformer = EnhancedNL2SQL())
+
+
+def build_parser(schema: Dict[str, List[str]]) -> Lark:
+    """Create an enhanced parser for the tables and columns in schema."""
+    return Lark(
+        build_grammar(grammar_path, schema),
+        start="start",
+        parser="lalr",
+        transformer=EnhancedNL2SQL(),
+    )
+
+
+@lru_cache(maxsize=1)
+def get_default_parser() -> Lark:
+    """
+    Create the parser for the database named on the command line (or the
+    example database) the first time it is needed, rather than on import.
+    """
+    if len(sys.argv) > 1:
+        db_path = str(Path(sys.argv[1]).resolve())
+    else:
+        db_path = default_db_path
+    return Lark(
+        load_dynamic_grammar(grammar_path, db_path),
+        start="start",
+        parser="lalr",
+        transformer=EnhancedNL2SQL(),
+    )
 
 # enhanced_parser = Lark(
 #     nl_grammar,
@@ -459,10 +515,15 @@ enhanced_parser = Lark(dynamic_grammar, start="start", parser="lalr", transforme
 # )
 
 
-def translate_nl_to_sql(text: str) -> str:
-    """Convert natural language into an SQL query string using enhanced grammar."""
+def translate_nl_to_sql(text: str, parser: Optional[Lark] = None) -> str:
+    """
+    Convert natural language into an SQL query string using enhanced grammar.
+    Without a parser (see build_parser), uses get_default_parser().
+    """
+    if parser is None:
+        parser = get_default_parser()
     try:
-        result = enhanced_parser.parse(text.lower())
+        result = parser.parse(text.lower())
         # Convert Tree to string if needed
         if hasattr(result, 'children') and len(result.children) == 1:
             return str(result.children[0])
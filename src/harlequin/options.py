@@ -47,6 +47,35 @@ def concatenate(first: str, second: str) -> str:
     return f"{first}\n----or----\n{second}"
 
 
+def int_validator(s: str | None) -> tuple[bool, str]:
+    if s is None:
+        return True, ""
+    try:
+        _ = int(s)
+    except ValueError:
+        return False, f"Cannot convert {s} to an int!"
+    else:
+        return True, ""
+
+
+def flag_value(value: bool | str | None) -> bool:
+    """
+    Returns the value of a FlagOption, which is a bool when passed on the
+    command line, but may be a string (like "false") when read from a
+    config file or env variable.
+
+    Raises: ValueError if value is a string that isn't a boolean.
+    """
+    if not isinstance(value, str):
+        return bool(value)
+    normalized = value.strip().lower()
+    if normalized in ("true", "t", "yes", "y", "on", "1"):
+        return True
+    if normalized in ("false", "f", "no", "n", "off", "0", ""):
+        return False
+    raise ValueError(f"Cannot convert {value} to a bool!")
+
+
 class AbstractOption(ABC):
     """
     The ABC for Harlequin options that are used as both command-line options and
@@ -0,0 +1,71 @@
+﻿from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Iterator
+
+# operators that take at least this share of the total operator time are
+# highlighted as hot spots
+HOT_SPOT_SHARE = 0.2
+
+
+@dataclass
+class ProfileNode:
+    """
+    One operator in a query plan. time is the number of seconds spent in
+    this operator (excluding its children), and cardinality is the number
+    of rows it produced; either may be None if the database doesn't report
+    it. Adapters may set hot to flag an operator that is likely to be slow
+    (e.g., a full table scan) when the database doesn't report timings.
+    """
+
+    name: str
+    detail: str = ""
+    time: float | None = None
+    cardinality: int | None = None
+    hot: bool = False
+    children: list[ProfileNode] = field(default_factory=list)
+
+    def walk(self) -> Iterator[ProfileNode]:
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+
+@dataclass
+class QueryProfile:
+    """
+    The result of running a query with profiling enabled. elapsed is
+    the wall-clock time (in seconds) to run the query, and row_count is
+    the number of rows it returned; either may be None if the query was
+    only planned, not run.
+    """
+
+    query_text: str
+    elapsed: float | None
+    root: ProfileNode
+    row_count: int | None = None
+
+    def __post_init__(self) -> None:
+        total = self.operator_time
+        if not total:
+            return
+        for node in self.root.walk():
+            if node.time is not None and node.time / total >= HOT_SPOT_SHARE:
+                node.hot = True
+
+    @property
+    def operator_time(self) -> float:
+        """
+        The sum of the time spent in every operator.
+        """
+        return sum(node.time or 0.0 for node in self.root.walk())
+
+    def share_of_total(self, node: ProfileNode) -> float | None:
+        """
+        Returns the fraction (0-1) of the total operator time spent in node,
+        or None if timings aren't available.
+        """
+        total = self.operator_time
+        if node.time is None or not total:
+            return None
+        return node.time / total
@@ -0,0 +1,457 @@
+﻿from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Literal, Sequence
+
+from harlequin.exception import HarlequinQueryError
+
+if TYPE_CHECKING:
+    import duckdb
+    import pyarrow as pa
+
+SortOrder = Literal["ascending", "descending"]
+
+HISTOGRAM_BINS = 10
+TOP_VALUES = 5
+PROFILE_VIEW = "harlequin_profile_data"
+DIFF_VIEWS = ("harlequin_diff_left", "harlequin_diff_right")
+DIFF_PRESENT_COLUMN = "__harlequin_present"
+CHANGE_TYPE_COLUMN = "change_type"
+
+
+@dataclass
+class ColumnProfile:
+    """
+    Summary statistics for one column of a result. approx_distinct,
+    min, and max are None for nested types, which DuckDB can't compare.
+    quantiles (p25, p50, p75) are only computed for numeric and temporal
+    columns. histogram is a list of (label, count) pairs: equal-width bins
+    for numeric columns, and the most frequent values for everything else.
+    """
+
+    name: str
+    type: str
+    row_count: int
+    null_count: int
+    approx_distinct: int | None = None
+    min: Any = None
+    max: Any = None
+    quantiles: list[Any] = field(default_factory=list)
+    histogram: list[tuple[str, int]] = field(default_factory=list)
+
+
+def quote_identifier(name: str) -> str:
+    escaped = name.replace('"', '""')
+    return f'"{escaped}"'
+
+
+def unique_column_names(names: Sequence[str]) -> list[str]:
+    """
+    Arrow allows duplicate field names, but DuckDB will raise an error when
+    scanning or writing tables with duplicate names. This appends a suffix
+    to repeated names, so that "a, a, a" becomes "a, a_0, a_1".
+    """
+    unique_names: list[str] = []
+    for name in names:
+        unique_name = name
+        n = 0
+        while unique_name in unique_names:
+            unique_name = f"{name}_{n}"
+            n += 1
+        unique_names.append(unique_name)
+    return unique_names
+
+
+@dataclass
+class ResultsDiff:
+    """
+    The rows that differ between two results. data has a change_type
+    column ("added", "removed", or "changed"), followed by the key columns
+    and then a pair of columns (one from each side) for every compared
+    column. Without key columns, rows can only be added or removed, and
+    data has a single copy of each column.
+
+    column_changes counts the changed rows that differ in each column.
+    """
+
+    data: "pa.Table"
+    added: int
+    removed: int
+    changed: int
+    column_changes: dict[str, int] = field(default_factory=dict)
+
+
+class ResultsOperation:
+    """
+    Runs vectorized queries over the Arrow table that backs a result tab.
+
+    Each operation uses its own in-memory DuckDB connection, which scans
+    the Arrow table without copying it. This keeps the work off the user's
+    database connection, and allows the operation to be canceled (from
+    any thread) without interrupting anything else.
+    """
+
+    def __init__(self) -> None:
+        import duckdb
+
+        self._conn: duckdb.DuckDBPyConnection = duckdb.connect(":memory:")
+        self.canceled = False
+
+    def cancel(self) -> None:
+        self.canceled = True
+        self._conn.interrupt()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def sort_and_filter(
+        self,
+        data: "pa.Table",
+        order_by: Sequence[tuple[int, SortOrder]] | None = None,
+        where: str | None = None,
+    ) -> "pa.Table" | None:
+        """
+        Returns a new table with the rows of data that match the where
+        clause (a SQL expression), sorted by the columns at the given
+        indexes. Returns None if the operation is canceled.
+
+        Columns with duplicate names are renamed with a suffix (see
+        unique_column_names) before the where clause is applied.
+
+        Raises:
+            HarlequinQueryError if DuckDB cannot compile or run the query.
+        """
+        import duckdb
+
+        if self.canceled:
+            return None
+        names = data.column_names
+        try:
+            relation = self._relation(data)
+            if where:
+                relation = relation.filter(where)
+            if order_by:
+                unique_names = unique_column_names(names)
+                relation = relation.order(
+                    ", ".join(
+                        f"{quote_identifier(unique_names[col])} "
+                        f"{'asc' if order == 'ascending' else 'desc'} nulls last"
+                        for col, order in order_by
+                    )
+                )
+            result = relation.arrow()
+        except duckdb.InterruptException:
+            return None
+        except duckdb.Error as e:
+            if self.canceled:
+                return None
+            raise HarlequinQueryError(
+                msg=str(e),
+                title="DuckDB raised an error when sorting or filtering your results:",
+            ) from e
+        if self.canceled:
+            return None
+        return result.rename_columns(names)
+
+    def profile_columns(
+        self, data: "pa.Table", columns: Sequence[int] | None = None
+    ) -> list[ColumnProfile] | None:
+        """
+        Profiles the columns at the given indexes (or all columns), using
+        one vectorized DuckDB scan for the summary statistics, plus one
+        grouped scan per column for its histogram. Returns None if the
+        operation is canceled.
+
+        Raises:
+            HarlequinQueryError if DuckDB cannot compute the profile.
+        """
+        import duckdb
+        import pyarrow as pa
+
+        if self.canceled:
+            return None
+        indexes = list(range(data.num_columns)) if columns is None else list(columns)
+        if not indexes:
+            return []
+        names = unique_column_names(data.column_names)
+        fields = [data.schema.field(i) for i in indexes]
+        try:
+            self._conn.register(PROFILE_VIEW, data.rename_columns(names))
+            exprs = ["count(*)"]
+            for i, f in zip(indexes, fields):
+                col = quote_identifier(names[i])
+                exprs.append(f"count({col})")
+                if _is_comparable(f.type):
+                    exprs.extend(
+                        [f"approx_count_distinct({col})", f"min({col})", f"max({col})"]
+                    )
+                if _has_quantiles(f.type):
+                    exprs.append(f"approx_quantile({col}, [0.25, 0.5, 0.75])")
+            row = self._conn.execute(
+                f"select {', '.join(exprs)} from {PROFILE_VIEW}"
+            ).fetchone()
+            assert row is not None
+            values = iter(row)
+            row_count = next(values)
+            profiles: list[ColumnProfile] = []
+            for i, f in zip(indexes, fields):
+                non_null = next(values)
+                profile = ColumnProfile(
+                    name=data.column_names[i],
+                    type=str(f.type),
+                    row_count=row_count,
+                    null_count=row_count - non_null,
+                )
+                if _is_comparable(f.type):
+                    profile.approx_distinct = next(values)
+                    profile.min = next(values)
+                    profile.max = next(values)
+                if _has_quantiles(f.type):
+                    profile.quantiles = list(next(values) or [])
+                if non_null and not pa.types.is_nested(f.type):
+                    if self.canceled:
+                        return None
+                    profile.histogram = self._histogram(
+                        quote_identifier(names[i]), f.type
+                    )
+                profiles.append(profile)
+        except duckdb.InterruptException:
+            return None
+        except duckdb.Error as e:
+            if self.canceled:
+                return None
+            raise HarlequinQueryError(
+                msg=str(e),
+                title="DuckDB raised an error when profiling your results:",
+            ) from e
+        finally:
+            self._conn.unregister(PROFILE_VIEW)
+        if self.canceled:
+            return None
+        return profiles
+
+    def _histogram(self, col: str, col_type: "pa.DataType") -> list[tuple[str, int]]:
+        import pyarrow as pa
+
+        if (
+            pa.types.is_integer(col_type)
+            or pa.types.is_floating(col_type)
+            or pa.types.is_decimal(col_type)
+        ):
+            finite = f"isfinite({col}::double)"
+            lo, hi = self._conn.execute(
+                f"select min({col}::double), max({col}::double) "
+                f"from {PROFILE_VIEW} where {finite}"
+            ).fetchone() or (None, None)
+            if lo is not None and hi is not None and lo < hi:
+                width = (hi - lo) / HISTOGRAM_BINS
+                bin_expr = (
+                    f"least(floor(({col}::double - {lo!r}) / {width!r}), "
+                    f"{HISTOGRAM_BINS - 1})::int"
+                )
+                counts = dict(
+                    self._conn.execute(
+                        f"select {bin_expr} as bin, count(*) from {PROFILE_VIEW} "
+                        f"where {finite} group by bin"
+                    ).fetchall()
+                )
+                return [
+                    (f"{lo + n * width:.4g}", counts.get(n, 0))
+                    for n in range(HISTOGRAM_BINS)
+                ]
+        return [
+            (str(value), count)
+            for value, count in self._conn.execute(
+                f"select {col}::varchar, count(*) from {PROFILE_VIEW} "
+                f"where {col} is not null group by 1 order by 2 desc, 1 "
+                f"limit {TOP_VALUES}"
+            ).fetchall()
+        ]
+
+    def diff(
+        self,
+        left: "pa.Table",
+        right: "pa.Table",
+        key_columns: Sequence[str] | None = None,
+        labels: tuple[str, str] = ("left", "right"),
+    ) -> ResultsDiff | None:
+        """
+        Compares two results in DuckDB. With key_columns, the results are
+        joined (full outer) on the keys, and rows whose other columns
+        differ are reported as changed. Without keys, whole rows are
+        compared as a multiset (EXCEPT ALL), which uses DuckDB's row
+        hashing. Only columns that appear (by name) in both results are
+        compared. labels suffix the left and right copies of each column.
+        Returns None if the operation is canceled.
+
+        Raises:
+            HarlequinQueryError if the results can't be compared.
+        """
+        import duckdb
+
+        if self.canceled:
+            return None
+        left_names = unique_column_names(left.column_names)
+        right_names = unique_column_names(right.column_names)
+        common = [name for name in left_names if name in right_names]
+        keys = list(key_columns or [])
+        missing = [key for key in keys if key not in common]
+        if missing or not common:
+            raise HarlequinQueryError(
+                msg=(
+                    f"Key columns not found in both results: {', '.join(missing)}"
+                    if missing
+                    else "These results have no column names in common."
+                ),
+                title="Harlequin could not compare these results.",
+            )
+        left_view, right_view = DIFF_VIEWS
+        try:
+            self._conn.register(left_view, left.rename_columns(left_names))
+            self._conn.register(right_view, right.rename_columns(right_names))
+            if keys:
+                result = self._keyed_diff(keys, common, labels)
+            else:
+                result = self._row_diff(common)
+        except duckdb.InterruptException:
+            return None
+        except duckdb.Error as e:
+            if self.canceled:
+                return None
+            raise HarlequinQueryError(
+                msg=str(e),
+                title="DuckDB raised an error when comparing your results:",
+            ) from e
+        finally:
+            self._conn.unregister(left_view)
+            self._conn.unregister(right_view)
+        if self.canceled:
+            return None
+        return result
+
+    def _keyed_diff(
+        self, keys: list[str], common: list[str], labels: tuple[str, str]
+    ) -> ResultsDiff:
+        left_view, right_view = DIFF_VIEWS
+        self._check_unique_keys(keys, labels)
+        present = quote_identifier(DIFF_PRESENT_COLUMN)
+        values = [name for name in common if name not in keys]
+        select_exprs = [
+            f"case when l.{present} is null then 'added' "
+            f"when r.{present} is null then 'removed' "
+            f"else 'changed' end as {CHANGE_TYPE_COLUMN}",
+            *[
+                f"coalesce(l.{quote_identifier(k)}, r.{quote_identifier(k)}) "
+                f"as {quote_identifier(k)}"
+                for k in keys
+            ],
+        ]
+        left_label, right_label = labels
+        differs = [f"l.{present} is null", f"r.{present} is null"]
+        counts_exprs = [
+            f"count_if({CHANGE_TYPE_COLUMN} = '{change_type}')"
+            for change_type in ("added", "removed", "changed")
+        ]
+        for name in values:
+            col = quote_identifier(name)
+            left_col = quote_identifier(f"{name} ({left_label})")
+            right_col = quote_identifier(f"{name} ({right_label})")
+            select_exprs.extend([f"l.{col} as {left_col}", f"r.{col} as {right_col}"])
+            differs.append(f"l.{col} is distinct from r.{col}")
+            counts_exprs.append(
+                f"count_if({CHANGE_TYPE_COLUMN} = 'changed' "
+                f"and {left_col} is distinct from {right_col})"
+            )
+        join_condition = " and ".join(
+            f"l.{quote_identifier(k)} is not distinct from r.{quote_identifier(k)}"
+            for k in keys
+        )
+        data = self._conn.execute(
+            f"select {', '.join(select_exprs)} "
+            f"from (select *, true as {present} from {left_view}) as l "
+            f"full outer join (select *, true as {present} from {right_view}) as r "
+            f"on {join_condition} "
+            f"where {' or '.join(differs)} "
+            f"order by {', '.join(quote_identifier(k) for k in keys)}"
+        ).arrow()
+        counts = (
+            self._conn.from_arrow(data).aggregate(", ".join(counts_exprs)).fetchone()
+        )
+        assert counts is not None
+        added, removed, changed, *column_counts = counts
+        return ResultsDiff(
+            data=data,
+            added=added,
+            removed=removed,
+            changed=changed,
+            column_changes=dict(zip(values, column_counts)),
+        )
+
+    def _check_unique_keys(self, keys: list[str], labels: tuple[str, str]) -> None:
+        """
+        Raises HarlequinQueryError if the keys repeat in either result, since
+        joining on them would pair every copy of a row with every other copy.
+        Null keys match each other, like they do in the join.
+        """
+        key_row = f"row({', '.join(quote_identifier(k) for k in keys)})"
+        for view, label in zip(DIFF_VIEWS, labels):
+            counts = self._conn.execute(
+                f"select count(*), count(distinct {key_row}) from {view}"
+            ).fetchone()
+            assert counts is not None
+            total, distinct = counts
+            if total > distinct:
+                raise HarlequinQueryError(
+                    msg=(
+                        f"The key columns ({', '.join(keys)}) are not unique in "
+                        f"results ({label}): {total - distinct} rows repeat a "
+                        "key. Choose columns that identify each row, or "
+                        "compare whole rows without keys."
+                    ),
+                    title="Harlequin could not compare these results.",
+                )
+
+    def _row_diff(self, common: list[str]) -> ResultsDiff:
+        import pyarrow.compute as pc
+
+        left_view, right_view = DIFF_VIEWS
+        cols = ", ".join(quote_identifier(name) for name in common)
+        left_rows = f"select {cols} from {left_view}"
+        right_rows = f"select {cols} from {right_view}"
+        data = self._conn.execute(
+            f"select 'added' as {CHANGE_TYPE_COLUMN}, * from "
+            f"({right_rows} except all {left_rows}) "
+            "union all "
+            f"select 'removed' as {CHANGE_TYPE_COLUMN}, * from "
+            f"({left_rows} except all {right_rows})"
+        ).arrow()
+        is_added = pc.equal(data.column(CHANGE_TYPE_COLUMN), "added")
+        added: int = pc.sum(is_added).as_py() or 0
+        return ResultsDiff(
+            data=data,
+            added=added,
+            removed=data.num_rows - added,
+            changed=0,
+        )
+
+    def _relation(self, data: "pa.Table") -> "duckdb.DuckDBPyRelation":
+        unique_data = data.rename_columns(unique_column_names(data.column_names))
+        return self._conn.from_arrow(unique_data)
+
+
+def _is_comparable(col_type: "pa.DataType") -> bool:
+    import pyarrow as pa
+
+    return not (pa.types.is_nested(col_type) or pa.types.is_null(col_type))
+
+
+def _has_quantiles(col_type: "pa.DataType") -> bool:
+    import pyarrow as pa
+
+    return bool(
+        pa.types.is_integer(col_type)
+        or pa.types.is_floating(col_type)
+        or pa.types.is_decimal(col_type)
+        or pa.types.is_timestamp(col_type)
+        or pa.types.is_date(col_type)
+    )
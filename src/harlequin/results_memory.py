@@ -0,0 +1,62 @@
+﻿from __future__ import annotations
+
+import re
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from harlequin.exception import HarlequinConfigError
+
+DEFAULT_RESULTS_MEMORY_BUDGET = "2GB"
+BYTE_SIZE_PROG = re.compile(
+    r"^\s*(?P<number>\d+(\.\d+)?)\s*(?P<unit>([kmgt]i?)?b?)\s*$", flags=re.IGNORECASE
+)
+
+
+def parse_byte_size(value: int | str) -> int:
+    """
+    Parses a number of bytes, like 500000000, "500MB", or "2 GiB". Zero means
+    no limit.
+
+    Raises: HarlequinConfigError if value isn't a valid size.
+    """
+    if isinstance(value, int) and not isinstance(value, bool) and value >= 0:
+        return value
+    match = BYTE_SIZE_PROG.match(str(value))
+    if match is None:
+        raise HarlequinConfigError(
+            f"{value!r} is not a valid size. Use a number of bytes, or a size with "
+            "units, like '500MB' or '2GiB'.",
+            title="Harlequin Config Error",
+        )
+    # like DuckDB's memory_limit, KB, MB, etc. are powers of 1000, and KiB,
+    # MiB, etc. are powers of 1024
+    unit = match.group("unit").lower().rstrip("b")
+    multiplier = 1
+    if unit:
+        base = 1024 if unit.endswith("i") else 1000
+        multiplier = base ** ("kmgt".index(unit[0]) + 1)
+    return int(float(match.group("number")) * multiplier)
+
+
+def format_byte_size(n: int) -> str:
+    size = float(n)
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1000:
+            return f"{size:,.0f} {unit}" if unit == "B" else f"{size:,.1f} {unit}"
+        size /= 1000
+    return f"{size:,.1f} TB"
+
+
+def spill_to_disk(data: pa.Table, path: Path) -> pa.Table:
+    """
+    Writes data to an Arrow IPC file at path, and returns a copy of it that
+    is memory-mapped from the file, so the operating system can page it out
+    instead of holding it in memory.
+    """
+    with pa.OSFile(str(path), "wb") as sink:
+        with ipc.new_file(sink, data.schema) as writer:
+            writer.write_table(data)
+    source = pa.memory_map(str(path), "r")
+    return ipc.open_file(source).read_all()
@@ -1,40 +1,174 @@
 ﻿from __future__ import annotations
 
 import json
+import re
+import time
+from contextlib import suppress
 from pathlib import Path
-from typing import Any, Sequence
+from typing import Any, Iterator, Sequence
 
 import duckdb
+import pyarrow as pa
 from duckdb.typing import DuckDBPyType
 from textual_fastdatatable.backend import AutoBackendType
 
 from harlequin.adapter import HarlequinAdapter, HarlequinConnection, HarlequinCursor
 from harlequin.autocomplete.completion import HarlequinCompletion
-from harlequin.catalog import Catalog, CatalogItem
+from harlequin.catalog import Catalog
 from harlequin.exception import (
     HarlequinConfigError,
     HarlequinConnectionError,
+    HarlequinCopyError,
     HarlequinQueryError,
 )
-from harlequin_duckdb.catalog import DatabaseCatalogItem
+from harlequin.export import (
+    EXPORT_BATCH_SIZE,
+    duckdb_copy_statement,
+    write_record_batches,
+)
+from harlequin.options import flag_value
+from harlequin.query_profile import ProfileNode, QueryProfile
+from harlequin.result_ops import unique_column_names
+from harlequin_duckdb.catalog import (
+    DatabaseCatalogItem,
+    SchemaCatalogItem,
+    build_catalog,
+)
 from harlequin_duckdb.cli_options import DUCKDB_OPTIONS
 from harlequin_duckdb.completions import get_completion_data
 
 IN_MEMORY_CONN_STR = (":memory:",)
 
+# get_catalog loads the entire catalog with a single query, unless the
+# databases have more columns than this; then each relation's columns are
+# loaded when it is expanded (or prefetched) in the Data Catalog.
+CATALOG_MAX_BULK_COLUMNS = 250_000
+
+# A comment at the top of a query like:
+#   -- harlequin:set threads=16, memory_limit='32GB'
+# overrides those settings while that query runs.
+SETTINGS_DIRECTIVE_PROG = re.compile(
+    r"^\s*--\s*harlequin:set\s+(?P<settings>.*)$", flags=re.IGNORECASE
+)
+SETTING_PROG = re.compile(
+    r"(?P<name>[a-z_][a-z0-9_]*)\s*=\s*"
+    r"(?:'(?P<single>[^']*)'|\"(?P<double>[^\"]*)\"|(?P<bare>[^\s,]+))",
+    flags=re.IGNORECASE,
+)
+
+# nodes in DuckDB's JSON profile that wrap the plan, rather than being a part
+# of it
+PROFILE_WRAPPER_OPERATORS = ("", "INVALID", "EXPLAIN_ANALYZE", "QUERY")
+
+
+def _count_query(query: str) -> str:
+    # the editor includes each query's terminating semicolon, and the newlines
+    # keep a trailing line comment from swallowing the paren
+    return f"select count(*) from (\n{query.strip().rstrip(';')}\n)"
+
+
+def _value_query(query: str, row: int, column: int) -> str:
+    # columns are selected by position, since their names may not be unique
+    return (
+        f"select #{column + 1} from (\n{query.strip().rstrip(';')}\n) "
+        f"limit 1 offset {row}"
+    )
+
+
+def _truncated_expression(ref: str, native_type: str, length: int) -> str | None:
+    """
+    Returns an expression for the first length characters (or bytes) of
+    the column at ref, or None if the column's values aren't truncated.
+    """
+    if native_type in ("VARCHAR", "JSON"):
+        # truncated JSON isn't valid JSON, so it is returned as a string
+        return f"left({ref}::varchar, {length})"
+    if native_type == "BLOB":
+        # DuckDB can't slice blobs, so this slices their hex encoding
+        return f"unhex(left(hex({ref}), {2 * length}))"
+    return None
+
+
+def _parse_profile_nodes(node: dict[str, Any]) -> list[ProfileNode]:
+    """
+    Converts a node from DuckDB's JSON profiling output into ProfileNodes.
+    Newer versions of DuckDB use operator_* keys and a dict of extra info;
+    older versions use name/timing/cardinality and an extra_info string.
+    """
+    children = [
+        parsed
+        for child in node.get("children", [])
+        for parsed in _parse_profile_nodes(child)
+    ]
+    name = str(node.get("operator_type", node.get("name", ""))).strip()
+    if name in PROFILE_WRAPPER_OPERATORS:
+        return children
+    timing = node.get("operator_timing", node.get("timing"))
+    cardinality = node.get("operator_cardinality", node.get("cardinality"))
+    extra_info = node.get("extra_info", "")
+    if isinstance(extra_info, dict):
+        detail = "; ".join(
+            f"{key}: {', '.join(map(str, value)) if isinstance(value, list) else value}"
+            for key, value in extra_info.items()
+        )
+    else:
+        detail = " ".join(str(extra_info).split())
+    return [
+        ProfileNode(
+            name=name,
+            detail=detail,
+            time=float(timing) if timing is not None else None,
+            cardinality=int(cardinality) if cardinality is not None else None,
+            children=children,
+        )
+    ]
+
+
+def _profile_root(nodes: list[ProfileNode]) -> ProfileNode:
+    return nodes[0] if len(nodes) == 1 else ProfileNode(name="QUERY", children=nodes)
+
+
+def _parse_settings_directives(query: str) -> dict[str, str]:
+    """
+    Returns the settings from any harlequin:set directives in the comment
+    lines at the top of query, as a dict of setting names to values.
+    """
+    settings: dict[str, str] = {}
+    for line in query.lstrip().splitlines():
+        if not line.strip():
+            continue
+        if not line.lstrip().startswith("--"):
+            break
+        if (match := SETTINGS_DIRECTIVE_PROG.match(line)) is None:
+            continue
+        for setting in SETTING_PROG.finditer(match.group("settings")):
+            value = next(
+                v for v in setting.group("single", "double", "bare") if v is not None
+            )
+            settings[setting.group("name").lower()] = value
+    return settings
+
 
 class DuckDbCursor(HarlequinCursor):
     def __init__(
-        self, conn: DuckDbConnection, relation: duckdb.DuckDBPyRelation
+        self,
+        conn: DuckDbConnection,
+        relation: duckdb.DuckDBPyRelation,
+        overrides_settings: bool = False,
     ) -> None:
         self.conn = conn
         self.relation = relation
+        self._overrides_settings = overrides_settings
+        self._dtypes: list[DuckDBPyType] | None = None
+        self._truncated_columns: list[int] = []
 
     def columns(self) -> list[tuple[str, str]]:
+        # truncated JSON columns are fetched as strings, but keep their type
+        dtypes = self._dtypes if self._dtypes is not None else self.relation.dtypes
         return list(
             zip(
                 self.relation.columns,
-                map(self.conn._short_column_type, self.relation.dtypes),
+                map(self.conn._short_column_type, dtypes),
             )
         )
 
@@ -45,6 +179,31 @@ class DuckDbCursor(HarlequinCursor):
             pass
         return self
 
+    def set_max_value_length(self, length: int) -> HarlequinCursor:
+        expressions: list[str] = []
+        truncated: list[int] = []
+        try:
+            dtypes = self.relation.dtypes
+            for i, (name, dtype) in enumerate(zip(self.relation.columns, dtypes)):
+                ref = f"#{i + 1}"
+                expression = _truncated_expression(ref, str(dtype), length + 1)
+                if expression is not None:
+                    truncated.append(i)
+                    ref = expression
+                quoted_name = name.replace('"', '""')
+                expressions.append(f'{ref} as "{quoted_name}"')
+            if truncated:
+                self.relation = self.relation.project(", ".join(expressions))
+        except duckdb.Error:
+            return self
+        if truncated:
+            self._dtypes = dtypes
+            self._truncated_columns = truncated
+        return self
+
+    def truncated_columns(self) -> list[int]:
+        return self._truncated_columns
+
     def fetchall(self) -> AutoBackendType | None:
         try:
             result = self.relation.fetch_arrow_table()
@@ -54,8 +213,24 @@ class DuckDbCursor(HarlequinCursor):
             raise HarlequinQueryError(
                 msg=str(e), title="DuckDB raised an error when running your query:"
             ) from e
+        finally:
+            self._restore_settings()
         return result
 
+    def fetch_record_batches(
+        self, batch_size: int = 10_000
+    ) -> Iterator[pa.RecordBatch]:
+        try:
+            yield from self.relation.record_batch(batch_size)
+        except duckdb.InterruptException:
+            return
+        except (duckdb.Error, pa.ArrowException) as e:
+            raise HarlequinQueryError(
+                msg=str(e), title="DuckDB raised an error when running your query:"
+            ) from e
+        finally:
+            self._restore_settings()
+
     def fetchone(self) -> tuple | None:
         try:
             result = self.relation.fetchone()
@@ -65,8 +240,19 @@ class DuckDbCursor(HarlequinCursor):
             raise HarlequinQueryError(
                 msg=str(e), title="DuckDB raised an error when running your query:"
             ) from e
+        finally:
+            self._restore_settings()
         return result
 
+    def _restore_settings(self) -> None:
+        """
+        Relations are lazy, so settings overridden by a directive stay in
+        effect until the results are fetched.
+        """
+        if self._overrides_settings:
+            self.conn._release_setting_overrides()
+        self._overrides_settings = False
+
 
 class DuckDbConnection(HarlequinConnection):
     RELATION_TYPE_MAPPING = {
@@ -115,34 +301,156 @@ class DuckDbConnection(HarlequinConnection):
     def __init__(self, conn: duckdb.DuckDBPyConnection, init_message: str = "") -> None:
         self.conn: duckdb.DuckDBPyConnection = conn
         self.init_message = init_message
+        self._original_settings: dict[str, str] = {}
+        self._active_setting_overrides = 0
+        self._row_counters: set[duckdb.DuckDBPyConnection] = set()
+        self._copiers: set[duckdb.DuckDBPyConnection] = set()
 
     def execute(self, query: str) -> DuckDbCursor | None:
+        overrides_settings = self._override_settings(query)
         try:
             rel = self.conn.sql(query)
         except duckdb.InterruptException:
-            return None
+            rel = None
         except duckdb.Error as e:
+            if overrides_settings:
+                self._release_setting_overrides()
             raise HarlequinQueryError(
                 msg=str(e),
                 title="DuckDB raised an error when compiling or running your query:",
             ) from e
 
         if rel is not None:
-            return DuckDbCursor(conn=self, relation=rel)
+            return DuckDbCursor(
+                conn=self, relation=rel, overrides_settings=overrides_settings
+            )
         else:
+            if overrides_settings:
+                self._release_setting_overrides()
             return None
 
+    def _override_settings(self, query: str) -> bool:
+        """
+        Applies the settings from any harlequin:set directives at the top of
+        the query. The original values are restored once every cursor that
+        overrides settings has been fetched, since other lazy relations
+        created in the meantime will also run with the overridden settings.
+
+        Returns True if any settings were overridden.
+        """
+        overrides = _parse_settings_directives(query)
+        if not overrides:
+            return False
+        try:
+            for name in overrides:
+                if name not in self._original_settings:
+                    (value,) = self.conn.execute(  # type: ignore[misc]
+                        "select current_setting(?)", [name]
+                    ).fetchone()
+                    self._original_settings[name] = str(value)
+            self._set_settings(overrides)
+        except duckdb.Error as e:
+            if not self._active_setting_overrides:
+                self._set_settings(self._original_settings)
+                self._original_settings = {}
+            raise HarlequinQueryError(
+                msg=str(e),
+                title=(
+                    "DuckDB raised an error when applying the settings in your "
+                    "query's harlequin:set directive:"
+                ),
+            ) from e
+        self._active_setting_overrides += 1
+        return True
+
+    def _release_setting_overrides(self) -> None:
+        self._active_setting_overrides = max(0, self._active_setting_overrides - 1)
+        if self._active_setting_overrides == 0:
+            settings, self._original_settings = self._original_settings, {}
+            with suppress(duckdb.Error):
+                self._set_settings(settings)
+
+    def _set_settings(self, settings: dict[str, str]) -> None:
+        for name, value in settings.items():
+            escaped = value.replace("'", "''")
+            self.conn.execute(f"set {name} = '{escaped}'")
+
     def cancel(self) -> None:
         self.conn.interrupt()
 
     def get_catalog(self) -> Catalog:
-        catalog_items: list[CatalogItem] = []
-        databases = self._get_databases()
-        for (database_label,) in databases:
-            catalog_items.append(
+        """
+        Builds the catalog from a single query over DuckDB's metadata
+        functions, rather than one query per schema and relation. If that
+        query fails, the catalog falls back to loading each node's children
+        lazily.
+        """
+        databases = [database_label for (database_label,) in self._get_databases()]
+        try:
+            database_items = self._load_catalog(databases)
+        except duckdb.Error:
+            database_items = [
                 DatabaseCatalogItem.from_label(label=database_label, connection=self)
+                for database_label in databases
+            ]
+        return Catalog(items=list(database_items))
+
+    def get_catalog_fingerprints(self) -> dict[str, str]:
+        """
+        Hashes the DDL of each schema's tables and views, which DuckDB
+        generates from its catalog, so it reflects any later ALTERs.
+        """
+        cur = self.conn.cursor()
+        result = cur.execute(
+            "select "
+            "    s.database_name, s.schema_name, "
+            "    md5(string_agg(coalesce(r.sql, ''), ';' order by r.sql)) "
+            "from duckdb_schemas() s "
+            "left join ( "
+            "    select database_name, schema_name, sql from duckdb_tables() "
+            "    union all "
+            "    select database_name, schema_name, sql from duckdb_views() "
+            "    where not internal "
+            ") r using (database_name, schema_name) "
+            "where s.schema_name not in ('pg_catalog', 'information_schema') "
+            "group by all"
+        ).fetchall()
+        return {
+            f'"{database_label}"."{schema_label}"': fingerprint
+            for database_label, schema_label, fingerprint in result
+        }
+
+    def refresh_catalog(self, catalog: Catalog, changed: set[str]) -> Catalog:
+        """
+        Fetches the changed schemas with a single query, and reuses the
+        other schemas from catalog.
+        """
+        databases = [database_label for (database_label,) in self._get_databases()]
+        cached = {
+            item.label: item
+            for item in catalog.items
+            if isinstance(item, DatabaseCatalogItem) and item.loaded
+        }
+        if any(database_label not in cached for database_label in databases):
+            return self.get_catalog()
+        try:
+            database_items = self._load_catalog(databases, schemas=changed)
+        except duckdb.Error:
+            return self.get_catalog()
+        for database_item in database_items:
+            kept = [
+                schema_item
+                for schema_item in cached[database_item.label].children
+                if schema_item.qualified_identifier not in changed
+            ]
+            for schema_item in kept:
+                if isinstance(schema_item, SchemaCatalogItem):
+                    schema_item.parent = database_item
+            database_item.children = sorted(
+                [*kept, *database_item.children], key=lambda item: item.label
             )
-        return Catalog(items=catalog_items)
+            database_item.loaded = True
+        return Catalog(items=list(database_items))
 
     def get_completions(self) -> list[HarlequinCompletion]:
         cur = self.conn.cursor()
@@ -173,10 +481,290 @@ class DuckDbConnection(HarlequinConnection):
         else:
             return text
 
+    def copy(
+        self, query: str, path: Path, format_name: str, options: dict[str, Any]
+    ) -> None:
+        """
+        Runs query again inside DuckDB's COPY statement, so CSV, Parquet,
+        and JSON files are written by DuckDB, without the results' limit
+        and without fetching the records into Python. DuckDB can't write ORC
+        or Feather files, so those are streamed to Arrow's writers in batches.
+
+        Like count_rows, copies run on a new cursor, so cancel_copy() can
+        interrupt them alone. Cursors can't see the main connection's temp
+        objects, so queries that reference them are copied on the main
+        connection instead, and can't be canceled.
+        """
+        cur = self.conn.cursor()
+        self._copiers.add(cur)
+        try:
+            try:
+                self._copy_on(cur, query, path, format_name, options)
+            except duckdb.CatalogException:
+                self._copiers.discard(cur)
+                self._copy_on(self.conn, query, path, format_name, options)
+        except duckdb.Error as e:
+            raise HarlequinCopyError(
+                str(e),
+                title=f"DuckDB raised an error when exporting your query to {path}:",
+            ) from e
+        finally:
+            self._copiers.discard(cur)
+            with suppress(duckdb.Error):
+                cur.close()
+
+    def cancel_copy(self) -> None:
+        for cur in list(self._copiers):
+            with suppress(duckdb.Error):
+                cur.interrupt()
+
+    def _copy_on(
+        self,
+        conn: duckdb.DuckDBPyConnection,
+        query: str,
+        path: Path,
+        format_name: str,
+        options: dict[str, Any],
+    ) -> None:
+        select = self._export_query(conn, query)
+        if format_name in ("orc", "feather"):
+            reader = conn.execute(select).fetch_record_batch(EXPORT_BATCH_SIZE)
+            write_record_batches(reader, path, format_name, options)
+        else:
+            dest_path = str(path.expanduser())
+            conn.execute(duckdb_copy_statement(select, dest_path, format_name, options))
+
+    @staticmethod
+    def _export_query(conn: duckdb.DuckDBPyConnection, query: str) -> str:
+        """
+        Wraps query in a select that renames any duplicate columns, which
+        DuckDB can't write to most formats.
+        """
+        query = query.strip().rstrip(";")
+        description = conn.execute(f"select * from (\n{query}\n) limit 0").description
+        names = unique_column_names([col[0] for col in description or []])
+        projection = ", ".join(
+            f'#{i + 1} as "{name.replace(chr(34), chr(34) * 2)}"'
+            for i, name in enumerate(names)
+        )
+        return f"select {projection} from (\n{query}\n)"
+
+    def profile(self, query: str) -> QueryProfile:
+        """
+        Profiles SELECT statements with EXPLAIN ANALYZE, which runs them.
+        Other statements are only planned (with EXPLAIN), since running them
+        could modify the database, so their profiles have no timings.
+        """
+        overrides_settings = self._override_settings(query)
+        try:
+            if not self._is_select_query(query):
+                return self._profile_plan(query)
+            previous = self.conn.execute(
+                "select current_setting('enable_profiling')"
+            ).fetchone()
+            self.conn.execute("pragma enable_profiling='json'")
+            try:
+                start = time.monotonic()
+                rows = self.conn.execute(f"explain analyze {query}").fetchall()
+                elapsed = time.monotonic() - start
+            finally:
+                with suppress(duckdb.Error):
+                    self._restore_profiling(previous[0] if previous else None)
+        except duckdb.Error as e:
+            raise HarlequinQueryError(
+                msg=str(e),
+                title="DuckDB raised an error when profiling your query:",
+            ) from e
+        finally:
+            if overrides_settings:
+                self._release_setting_overrides()
+        try:
+            nodes = _parse_profile_nodes(json.loads(rows[0][1]))
+        except (IndexError, ValueError, TypeError, AttributeError) as e:
+            raise HarlequinQueryError(
+                msg=f"Could not parse the profiling output: {e}",
+                title="DuckDB raised an error when profiling your query:",
+            ) from e
+        root = _profile_root(nodes)
+        return QueryProfile(
+            query_text=query,
+            elapsed=elapsed,
+            root=root,
+            row_count=root.cardinality,
+        )
+
+    def _is_select_query(self, query: str) -> bool:
+        statements = self.conn.extract_statements(query)
+        return (
+            len(statements) == 1 and statements[0].type == duckdb.StatementType.SELECT
+        )
+
+    def _profile_plan(self, query: str) -> QueryProfile:
+        rows = self.conn.execute(f"explain (format json) {query}").fetchall()
+        try:
+            nodes = [
+                parsed
+                for node in json.loads(rows[0][1])
+                for parsed in _parse_profile_nodes(node)
+            ]
+        except (IndexError, ValueError, TypeError, AttributeError) as e:
+            raise HarlequinQueryError(
+                msg=f"Could not parse the query plan: {e}",
+                title="DuckDB raised an error when profiling your query:",
+            ) from e
+        root = _profile_root(nodes)
+        return QueryProfile(query_text=query, elapsed=None, root=root)
+
+    def _restore_profiling(self, previous: str | None) -> None:
+        if previous is None:
+            self.conn.execute("pragma disable_profiling")
+        else:
+            escaped = previous.replace("'", "''")
+            self.conn.execute(f"pragma enable_profiling='{escaped}'")
+
+    def count_rows(self, query: str) -> int:
+        """
+        Counts on a new cursor, which can run alongside queries on the main
+        connection and be interrupted on its own. Cursors don't share the main
+        connection's temp objects, so queries that reference temp tables can't
+        be counted.
+        """
+        cur = self.conn.cursor()
+        self._row_counters.add(cur)
+        try:
+            (count,) = cur.execute(_count_query(query)).fetchone()  # type: ignore[misc]
+        except duckdb.Error as e:
+            raise HarlequinQueryError(
+                msg=str(e),
+                title="DuckDB raised an error when counting your query's records:",
+            ) from e
+        finally:
+            self._row_counters.discard(cur)
+            with suppress(duckdb.Error):
+                cur.close()
+        return int(count)
+
+    def fetch_value(
+        self, query: str, row: int, column: int, preview: Any = None
+    ) -> Any:
+        """
+        Like count_rows, fetches the value on a new cursor, so it can't see
+        the main connection's temp objects. The record is selected by its
+        position, which is only stable if the query sorts its records.
+        """
+        cur = self.conn.cursor()
+        try:
+            result = cur.execute(_value_query(query, row, column)).fetchone()
+        except duckdb.Error as e:
+            raise HarlequinQueryError(
+                msg=str(e),
+                title="DuckDB raised an error when fetching the full value:",
+            ) from e
+        finally:
+            with suppress(duckdb.Error):
+                cur.close()
+        if result is None:
+            raise HarlequinQueryError(
+                msg=f"The query no longer returns record {row + 1:,}.",
+                title="DuckDB raised an error when fetching the full value:",
+            )
+        value = result[0]
+        if preview is not None and not (
+            isinstance(value, (str, bytes))
+            and isinstance(preview, type(value))
+            and value.startswith(preview)
+        ):
+            raise HarlequinQueryError(
+                msg=(
+                    f"The query returned a different record {row + 1:,} when "
+                    "it ran again, since it doesn't sort its records. Add an "
+                    "ORDER BY clause that gives every record a unique "
+                    "position, and run the query again."
+                ),
+                title="DuckDB could not fetch the full value:",
+            )
+        return value
+
+    def cancel_count_rows(self) -> None:
+        for cur in list(self._row_counters):
+            with suppress(duckdb.Error):
+                cur.interrupt()
+
     def _get_databases(self) -> list[tuple[str]]:
         cur = self.conn.cursor()
         return cur.execute("pragma show_databases").fetchall()
 
+    def _load_catalog(
+        self, databases: Sequence[str], schemas: set[str] | None = None
+    ) -> list[DatabaseCatalogItem]:
+        cur = self.conn.cursor()
+        (column_count,) = cur.execute(  # type: ignore[misc]
+            "select count(*) from duckdb_columns()"
+        ).fetchone()
+        columns_loaded = column_count <= CATALOG_MAX_BULK_COLUMNS
+        rows = self._get_catalog_rows(include_columns=columns_loaded, schemas=schemas)
+        return build_catalog(
+            connection=self,
+            databases=databases,
+            rows=rows,
+            columns_loaded=columns_loaded,
+        )
+
+    def _get_catalog_rows(
+        self, include_columns: bool = True, schemas: set[str] | None = None
+    ) -> Iterator[tuple[str, str, str | None, str | None, str | None, str | None]]:
+        """
+        Returns a row of (database, schema, relation, relation type, column,
+        column type) for every column in every schema, ordered by each of
+        the names, with nulls for schemas without relations. Relation types
+        match information_schema.tables. If include_columns is False, returns
+        one row per relation instead, with null columns. If schemas is given,
+        only returns rows for the schemas with those qualified identifiers.
+        """
+        columns, columns_join = (
+            (
+                "c.column_name, c.data_type ",
+                "left join duckdb_columns() c "
+                "    using (database_name, schema_name, table_name) ",
+            )
+            if include_columns
+            else ("null, null ", "")
+        )
+        schemas_filter = (
+            "and '\"' || s.database_name || '\".\"' || s.schema_name || '\"' "
+            "    in (select unnest(?)) "
+            if schemas is not None
+            else ""
+        )
+        cur = self.conn.cursor()
+        result = cur.execute(
+            "select "
+            "    s.database_name, s.schema_name, r.table_name, r.table_type, "
+            f"    {columns}"
+            "from duckdb_schemas() s "
+            "left join ( "
+            "    select "
+            "        database_name, schema_name, table_name, "
+            "        case "
+            "            when temporary then 'LOCAL TEMPORARY' "
+            "            else 'BASE TABLE' "
+            "        end as table_type "
+            "    from duckdb_tables() "
+            "    union all "
+            "    select database_name, schema_name, view_name, 'VIEW' "
+            "    from duckdb_views() "
+            "    where not internal "
+            ") r using (database_name, schema_name) "
+            f"{columns_join}"
+            "where s.schema_name not in ('pg_catalog', 'information_schema') "
+            f"{schemas_filter}"
+            "order by 1, 2, 3, 5",
+            [sorted(schemas)] if schemas is not None else None,
+        ).arrow()
+        # converting whole columns to python is much faster than
+        # fetching the rows one at a time
+        return zip(*(column.to_pylist() for column in result.columns))
+
     def _get_schemas(self, database: str) -> list[tuple[str]]:
         cur = self.conn.cursor()
         schemas = cur.execute(
@@ -257,6 +845,10 @@ class DuckDbAdapter(HarlequinAdapter):
         custom_extension_repo: str | None = None,
         md_token: str | None = None,
         md_saas: bool = False,
+        memory_limit: str | None = None,
+        threads: str | int | None = None,
+        temp_directory: Path | str | None = None,
+        no_preserve_insertion_order: bool | str = False,
         **_: Any,
     ) -> None:
         try:
@@ -276,6 +868,14 @@ class DuckDbAdapter(HarlequinAdapter):
             self.custom_extension_repo = custom_extension_repo
             self.md_token = md_token
             self.md_saas = md_saas
+            self.memory_limit = memory_limit
+            self.threads = int(threads) if threads is not None else None
+            self.temp_directory = (
+                Path(temp_directory).expanduser().resolve()
+                if temp_directory is not None
+                else None
+            )
+            self.preserve_insertion_order = not flag_value(no_preserve_insertion_order)
         except (ValueError, TypeError) as e:
             raise HarlequinConfigError(
                 msg=f"DuckDB adapter received bad config value: {e}",
@@ -297,6 +897,14 @@ class DuckDbAdapter(HarlequinAdapter):
         config = {
             "allow_unsigned_extensions": str(self.allow_unsigned_extensions).lower()
         }
+        if self.memory_limit is not None:
+            config["memory_limit"] = self.memory_limit
+        if self.threads is not None:
+            config["threads"] = str(self.threads)
+        if self.temp_directory is not None:
+            config["temp_directory"] = self.temp_directory.as_posix()
+        if not self.preserve_insertion_order:
+            config["preserve_insertion_order"] = "false"
 
         try:
             connection = duckdb.connect(
@@ -308,7 +916,12 @@ class DuckDbAdapter(HarlequinAdapter):
                 connection.execute(
                     f"attach '{db}'{' (READ_ONLY)' if self.read_only else ''}"
                 )
-        except (duckdb.CatalogException, duckdb.IOException) as e:
+        except (
+            duckdb.CatalogException,
+            duckdb.IOException,
+            duckdb.InvalidInputException,
+            duckdb.ParserException,
+        ) as e:
             if "sqlite_scanner" in (msg := str(e)):
                 msg = (
                     "DuckDB raised the following error when trying to open "
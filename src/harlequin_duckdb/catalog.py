@@ -1,7 +1,7 @@
 ﻿from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterable, Sequence
 
 from harlequin.catalog import InteractiveCatalogItem
 from harlequin_duckdb.interactions import (
@@ -171,32 +171,24 @@ class SchemaCatalogItem(InteractiveCatalogItem["DuckDbConnection"]):
     def fetch_children(self) -> list[RelationCatalogItem]:
         if self.parent is None or self.connection is None:
             return []
-        children: list[RelationCatalogItem] = []
         result = self.connection._get_tables(self.parent.label, self.label)
-        for table_label, table_type in result:
-            if table_type == "VIEW":
-                children.append(
-                    ViewCatalogItem.from_parent(
-                        parent=self,
-                        label=table_label,
-                    )
-                )
-            elif table_type == "LOCAL TEMPORARY":
-                children.append(
-                    TempTableCatalogItem.from_parent(
-                        parent=self,
-                        label=table_label,
-                    )
-                )
-            else:
-                children.append(
-                    TableCatalogItem.from_parent(
-                        parent=self,
-                        label=table_label,
-                    )
-                )
-
-        return children
+        return [
+            relation_class(table_type).from_parent(parent=self, label=table_label)
+            for table_label, table_type in result
+        ]
+
+
+def relation_class(table_type: str | None) -> type[RelationCatalogItem]:
+    """
+    Returns the catalog item class for a relation with table_type, as
+    reported by information_schema.tables.
+    """
+    if table_type == "VIEW":
+        return ViewCatalogItem
+    elif table_type == "LOCAL TEMPORARY":
+        return TempTableCatalogItem
+    else:
+        return TableCatalogItem
 
 
 class DatabaseCatalogItem(InteractiveCatalogItem["DuckDbConnection"]):
@@ -229,3 +221,64 @@ class DatabaseCatalogItem(InteractiveCatalogItem["DuckDbConnection"]):
             )
             for (schema_label,) in schemas
         ]
+
+
+def build_catalog(
+    connection: "DuckDbConnection",
+    databases: Sequence[str],
+    rows: Iterable[
+        tuple[str, str, str | None, str | None, str | None, str | None]
+    ],
+    columns_loaded: bool = True,
+) -> list[DatabaseCatalogItem]:
+    """
+    Builds the catalog tree for databases in a single pass over rows of
+    (database, schema, relation, relation type, column, column type), as
+    returned by DuckDbConnection._get_catalog_rows(). The rows must be
+    ordered by database, schema, relation, and column; schemas without
+    relations have null relations (and relations without columns, null
+    columns). Databases, schemas, and relations are marked as loaded, so
+    they never call fetch_children(), unless columns_loaded is False, in
+    which case the rows have no columns and each relation lazy-loads them.
+    Rows for databases that aren't in databases are ignored.
+    """
+    database_items = {
+        label: DatabaseCatalogItem.from_label(label=label, connection=connection)
+        for label in databases
+    }
+    short_types: dict[str, str] = {}
+    database: DatabaseCatalogItem | None = None
+    schema: SchemaCatalogItem | None = None
+    relation: RelationCatalogItem | None = None
+    for db_label, schema_label, rel_label, rel_type, col_label, col_type in rows:
+        if database is None or database.label != db_label:
+            database = database_items.get(db_label)
+            if database is None:
+                continue
+            database.loaded = True
+            schema = relation = None
+        if schema is None or schema.label != schema_label:
+            schema = SchemaCatalogItem.from_parent(parent=database, label=schema_label)
+            schema.loaded = True
+            database.children.append(schema)
+            relation = None
+        if rel_label is None:
+            continue
+        if relation is None or relation.label != rel_label:
+            relation = relation_class(rel_type).from_parent(
+                parent=schema, label=rel_label
+            )
+            relation.loaded = columns_loaded
+            schema.children.append(relation)
+        if col_label is None or col_type is None:
+            continue
+        if (type_label := short_types.get(col_type)) is None:
+            type_label = short_types[col_type] = connection._short_column_type(
+                col_type
+            )
+        relation.children.append(
+            ColumnCatalogItem.from_parent(
+                parent=relation, label=col_label, type_label=type_label
+            )
+        )
+    return list(database_items.values())
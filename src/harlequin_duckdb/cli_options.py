@@ -1,10 +1,13 @@
-﻿from pathlib import Path
+﻿from __future__ import annotations
+
+from pathlib import Path
 
 from harlequin.options import (
     FlagOption,
     ListOption,
     PathOption,
     TextOption,
+    int_validator,
 )
 
 init = PathOption(
@@ -73,6 +76,44 @@ md_saas = FlagOption(
     description="Run MotherDuck in SaaS mode (no local privileges).",
 )
 
+
+memory_limit = TextOption(
+    name="memory-limit",
+    description=(
+        "The maximum amount of memory DuckDB may use, e.g., 4GB. Larger "
+        "operations will spill to the temp directory. Defaults to 80% of RAM."
+    ),
+)
+
+threads = TextOption(
+    name="threads",
+    description=(
+        "The number of threads DuckDB may use to execute queries. Defaults to "
+        "the number of cores."
+    ),
+    validator=int_validator,
+)
+
+temp_directory = PathOption(
+    name="temp-directory",
+    description=(
+        "The directory DuckDB uses to spill data that does not fit in memory."
+    ),
+    exists=False,
+    file_okay=False,
+    dir_okay=True,
+    resolve_path=True,
+    path_type=Path,
+)
+
+no_preserve_insertion_order = FlagOption(
+    name="no-preserve-insertion-order",
+    description=(
+        "Allow DuckDB to reorder the results of queries without an ORDER BY "
+        "clause. This can reduce memory use for large queries."
+    ),
+)
+
 DUCKDB_OPTIONS = [
     init,
     no_init,
@@ -83,4 +124,8 @@ DUCKDB_OPTIONS = [
     custom_extension_repo,
     md_token,
     md_saas,
+    memory_limit,
+    threads,
+    temp_directory,
+    no_preserve_insertion_order,
 ]
@@ -1,12 +1,16 @@
 ﻿from __future__ import annotations
 
+import re
 import sqlite3
-from contextlib import suppress
-from itertools import cycle, zip_longest
+import time
+from contextlib import contextmanager, suppress
+from functools import partial
+from itertools import chain, cycle, zip_longest
 from pathlib import Path
-from typing import Any, Literal, Sequence
+from typing import Any, Callable, Iterator, Literal, Sequence
 from urllib.parse import unquote, urlparse
 
+import pyarrow as pa
 from textual_fastdatatable.backend import AutoBackendType
 
 from harlequin.adapter import HarlequinAdapter, HarlequinConnection, HarlequinCursor
@@ -15,72 +19,403 @@ from harlequin.catalog import Catalog, CatalogItem
 from harlequin.exception import (
     HarlequinConfigError,
     HarlequinConnectionError,
+    HarlequinCopyCanceled,
+    HarlequinCopyError,
     HarlequinQueryError,
 )
+from harlequin.export import write_record_batches
 from harlequin.options import HarlequinAdapterOption, HarlequinCopyFormat
+from harlequin.query_profile import ProfileNode, QueryProfile
+from harlequin.result_ops import unique_column_names
 from harlequin.transaction_mode import HarlequinTransactionMode
 from harlequin_sqlite.catalog import DatabaseCatalogItem
-from harlequin_sqlite.cli_options import SQLITE_OPTIONS
+from harlequin_sqlite.cli_options import PERFORMANCE_PRESETS, SQLITE_OPTIONS
 from harlequin_sqlite.completions import get_completion_data
+from harlequin_sqlite.pool import (
+    ReadOnlyConnectionPool,
+    is_pragma_query,
+    is_read_only_query,
+)
 
 IN_MEMORY_CONN_STR = (":memory:",)
+# Performance PRAGMAs, in the order they are applied. The values of the
+# last four are per-connection, so they are also applied to pooled connections.
+PERFORMANCE_PRAGMAS = (
+    "journal_mode",
+    "synchronous",
+    "mmap_size",
+    "cache_size",
+    "temp_store",
+    "threads",
+)
+CONNECTION_PRAGMAS = ("mmap_size", "cache_size", "temp_store", "threads")
+PRAGMA_CHOICES = {
+    "journal_mode": ("delete", "truncate", "persist", "memory", "wal", "off"),
+    "synchronous": ("off", "normal", "full", "extra"),
+    "temp_store": ("default", "file", "memory"),
+}
+FETCH_BATCH_SIZE = 10_000
+# when exporting, batches are read ahead until every column's type is known
+# from a non-NULL value, up to this many records
+EXPORT_READ_AHEAD_ROWS = 100_000
+# SQLite renames repeated column names in a subquery to "name:1", "name:2", etc.
+SUBQUERY_COLUMN_NAME_PROG = re.compile(r"^(?P<name>.*):\d+$", flags=re.DOTALL)
+
+# SQLite doesn't report timings for each step of a query plan, so these
+# steps, which visit every row of a table or sort rows in a temp b-tree, are
+# flagged as likely hot spots instead.
+HOT_PLAN_STEP_PROG = re.compile(
+    r"^(SCAN (?!CONSTANT ROW)|USE TEMP B-TREE)", flags=re.IGNORECASE
+)
+
+# SQLite values are always stored as one of these classes (or NULL); the
+# Arrow types are ordered from narrowest to widest, so that a column
+# with mixed storage classes can be widened to fit all of its values.
+STORAGE_CLASS_TYPES: dict[type, pa.DataType] = {
+    int: pa.int64(),
+    float: pa.float64(),
+    str: pa.string(),
+    bytes: pa.binary(),
+}
+TYPE_PRECEDENCE: list[pa.DataType] = [pa.null(), *STORAGE_CLASS_TYPES.values()]
+
+
+def _widest_type(a: pa.DataType, b: pa.DataType) -> pa.DataType:
+    if a == b or pa.types.is_null(b):
+        return a
+    if pa.types.is_null(a):
+        return b
+    if a in TYPE_PRECEDENCE and b in TYPE_PRECEDENCE:
+        return max(a, b, key=TYPE_PRECEDENCE.index)
+    # types created by user-registered converters; strings are the only
+    # safe common denominator
+    return pa.string()
+
+
+def _column_to_array(values: Sequence[Any]) -> pa.Array:
+    """
+    Builds an Arrow array from a column of values returned by sqlite3.
+    The type is inferred from every value in the column (not just the first),
+    so NULLs and mixed storage classes are handled correctly.
+    """
+    py_types = {type(value) for value in values if value is not None}
+    if py_types <= STORAGE_CLASS_TYPES.keys():
+        arrow_type: pa.DataType = pa.null()
+        for py_type in py_types:
+            arrow_type = _widest_type(arrow_type, STORAGE_CLASS_TYPES[py_type])
+        if pa.types.is_string(arrow_type) and py_types != {str}:
+            values = [None if value is None else str(value) for value in values]
+        elif pa.types.is_binary(arrow_type) and py_types != {bytes}:
+            values = [
+                value
+                if value is None or isinstance(value, bytes)
+                else str(value).encode()
+                for value in values
+            ]
+        return pa.array(values, type=arrow_type)
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array(
+            [None if value is None else str(value) for value in values],
+            type=pa.string(),
+        )
+
+
+def _cast_array(arr: pa.Array, arrow_type: pa.DataType) -> pa.Array:
+    if arr.type == arrow_type:
+        return arr
+    try:
+        if pa.types.is_binary(arrow_type) and not pa.types.is_string(arr.type):
+            arr = arr.cast(pa.string())
+        return arr.cast(arrow_type)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        return _column_to_array(
+            [None if value is None else str(value) for value in arr.to_pylist()]
+        ).cast(arrow_type)
+
+
+def _rows_to_batch(rows: list[tuple[Any, ...]], names: list[str]) -> pa.RecordBatch:
+    arrays = [_column_to_array(column) for column in zip(*rows)]
+    return pa.RecordBatch.from_arrays(arrays, names=names)
+
+
+def _batches_to_table(batches: list[pa.RecordBatch], names: list[str]) -> pa.Table:
+    """
+    Combines record batches into a single table. Types inferred for one
+    batch may be narrower than the types of later batches (e.g., a column
+    that is entirely NULL in the first chunk), so batches are cast to the
+    widest type for each column before they are combined.
+    """
+    column_types: list[pa.DataType] = [pa.null()] * len(names)
+    for batch in batches:
+        column_types = [
+            _widest_type(existing, new)
+            for existing, new in zip(column_types, batch.schema.types)
+        ]
+    schema = pa.schema(
+        [pa.field(name, typ) for name, typ in zip(names, column_types)]
+    )
+    return pa.Table.from_batches(
+        [
+            pa.RecordBatch.from_arrays(
+                [
+                    _cast_array(arr, typ)
+                    for arr, typ in zip(batch.columns, column_types)
+                ],
+                schema=schema,
+            )
+            for batch in batches
+        ],
+        schema=schema,
+    )
+
+
+def _record_batch_reader(
+    batches: Iterator[pa.RecordBatch], names: list[str]
+) -> pa.RecordBatchReader:
+    """
+    Wraps batches in a reader with a single schema, which streaming writers
+    need before the first batch is written. Types are inferred separately for
+    each batch, so batches are read ahead until every column has a type (or
+    EXPORT_READ_AHEAD_ROWS have been read); columns that are still entirely
+    NULL are written as strings. Later batches are cast to the schema.
+
+    Raises HarlequinCopyError (from the reader) if a later batch's values
+    can't be cast to the schema, e.g., strings in a column of integers.
+    """
+    buffered: list[pa.RecordBatch] = []
+    buffered_rows = 0
+    column_types: list[pa.DataType] = [pa.null()] * len(names)
+    for batch in batches:
+        buffered.append(batch)
+        buffered_rows += batch.num_rows
+        column_types = [
+            _widest_type(existing, new)
+            for existing, new in zip(column_types, batch.schema.types)
+        ]
+        if buffered_rows >= EXPORT_READ_AHEAD_ROWS or not any(
+            pa.types.is_null(typ) for typ in column_types
+        ):
+            break
+    schema = pa.schema(
+        [
+            pa.field(name, pa.string() if pa.types.is_null(typ) else typ)
+            for name, typ in zip(names, column_types)
+        ]
+    )
+
+    def cast_batches() -> Iterator[pa.RecordBatch]:
+        for batch in chain(buffered, batches):
+            try:
+                arrays = [
+                    _cast_array(arr, typ)
+                    for arr, typ in zip(batch.columns, schema.types)
+                ]
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+                raise HarlequinCopyError(
+                    f"A column's type changed partway through the results ({e}). "
+                    "Cast the column to a single type in your query, and try again.",
+                    title="Harlequin could not export your query.",
+                ) from e
+            yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    return pa.RecordBatchReader.from_batches(schema, cast_batches())
+
+
+def _limit_query(query: str, limit: int) -> str:
+    # the newlines keep a trailing line comment from swallowing the paren
+    return f"select * from (\n{query}\n) limit {int(limit)}"
+
+
+def _count_query(query: str) -> str:
+    # the editor includes each query's terminating semicolon
+    return f"select count(*) from (\n{query.strip().rstrip(';')}\n)"
+
+
+def _is_interrupt(e: sqlite3.Error) -> bool:
+    return isinstance(e, sqlite3.OperationalError) and str(e) == "interrupted"
+
+
+def _unwrapped_column_names(names: Sequence[str]) -> list[str]:
+    """
+    Reverses SQLite's renaming of repeated column names (a, a:1) in a
+    subquery, so a wrapped query has the same column names as the original.
+    """
+    seen: set[str] = set()
+    unwrapped: list[str] = []
+    for name in names:
+        match = SUBQUERY_COLUMN_NAME_PROG.match(name)
+        if match is not None and match.group("name") in seen:
+            name = match.group("name")
+        seen.add(name)
+        unwrapped.append(name)
+    return unwrapped
 
 
 class HarlequinSqliteCursor(HarlequinCursor):
-    def __init__(self, conn: HarlequinSqliteConnection, cur: sqlite3.Cursor) -> None:
+    """
+    If deferred_query is provided, cur has only been used to compile the
+    query (with a LIMIT 0 wrapper), and the query is not run until the
+    cursor is started. This allows the limit set by set_limit to be pushed
+    into the SQL, so SQLite can stop early, instead of computing a full sort
+    or aggregate before the first row is fetched.
+    """
+
+    def __init__(
+        self,
+        conn: HarlequinSqliteConnection,
+        cur: sqlite3.Cursor,
+        release: Callable[[], None] | None = None,
+        deferred_query: str | None = None,
+    ) -> None:
         self.conn = conn
         self.cur = cur
+        self._release = release
+        self._deferred_query = deferred_query
+        self._start_error: sqlite3.Error | None = None
         self._limit: int | None = None
-        try:
-            _first_row = cur.fetchone()
-        except sqlite3.Error:  # maybe canceled query here
-            _first_row = None
-        self.has_records = _first_row is not None
-        self._first_row: tuple[Any, ...] = _first_row or tuple(
-            [None] * len(cur.description)
+        self._column_names: list[str] = [col[0] for col in cur.description]
+        if deferred_query is not None:
+            self._column_names = _unwrapped_column_names(self._column_names)
+        self._column_types: list[pa.DataType] = [pa.null()] * len(
+            self._column_names
         )
 
     def columns(self) -> list[tuple[str, str]]:
-        col_names = [col[0] for col in self.cur.description]
         col_types = [
-            self.conn._short_column_type_from_python_object(value)
-            for value in self._first_row
+            self.conn._short_column_type_from_arrow_type(col_type)
+            for col_type in self._column_types
         ]
-        return list(zip_longest(col_names, col_types, fillvalue="?"))
+        return list(zip_longest(self._column_names, col_types, fillvalue="?"))
 
     def set_limit(self, limit: int) -> "HarlequinSqliteCursor":
         self._limit = limit
         return self
 
     def fetchall(self) -> AutoBackendType | None:
-        if self.has_records:
-            try:
-                remaining_rows = (
-                    self.cur.fetchall()
-                    if self._limit is None
-                    else self.cur.fetchmany(self._limit - 1)
-                )
-            except sqlite3.OperationalError:  # maybe canceled here
+        try:
+            self._start()
+            batches = list(self._fetch_batches())
+        except sqlite3.Error as e:
+            if _is_interrupt(e):  # canceled
                 return None
-            except sqlite3.Error as e:
-                raise HarlequinQueryError(
-                    msg=str(e),
-                    title=(
-                        "SQLite raised an error when fetching results for your query:"
-                    ),
-                ) from e
-            return [self._first_row, *remaining_rows]
-        else:
+            raise HarlequinQueryError(
+                msg=str(e),
+                title="SQLite raised an error when fetching results for your query:",
+            ) from e
+        finally:
+            self._close_pooled_cursor()
+        if not batches:
             return None
+        return _batches_to_table(batches, names=self._column_names)
+
+    def fetch_record_batches(
+        self, batch_size: int = FETCH_BATCH_SIZE
+    ) -> Iterator[pa.RecordBatch]:
+        """
+        Types are inferred separately for each batch, so a column's type may
+        widen (e.g., from null to int64) from one batch to the next.
+        """
+        try:
+            self._start()
+            yield from self._fetch_batches(batch_size)
+        except sqlite3.Error as e:
+            if _is_interrupt(e):  # canceled
+                return
+            raise HarlequinQueryError(
+                msg=str(e),
+                title="SQLite raised an error when fetching results for your query:",
+            ) from e
+        finally:
+            self._close_pooled_cursor()
 
     def fetchone(self) -> tuple | None:
-        return self._first_row
+        self._start()
+        return self.cur.fetchone()
+
+    @property
+    def is_deferred(self) -> bool:
+        return self._deferred_query is not None
+
+    def _start(self) -> None:
+        """
+        Runs a deferred query, wrapped with the cursor's limit, if there is
+        one. Errors are raised here and on every later call, so a failure
+        while starting from HarlequinSqliteConnection.execute is reported
+        when the results are fetched.
+        """
+        if self._start_error is not None:
+            raise self._start_error
+        if self._deferred_query is None:
+            return
+        query, self._deferred_query = self._deferred_query, None
+        try:
+            if self._limit is not None:
+                try:
+                    self.cur.execute(_limit_query(query, self._limit))
+                    return
+                except sqlite3.Error as e:
+                    if _is_interrupt(e):
+                        raise
+            self.cur.execute(query)
+        except sqlite3.Error as e:
+            self._start_error = e
+            raise
+
+    def _close_pooled_cursor(self) -> None:
+        """
+        Cursors on pooled connections hold a read transaction open until they
+        are closed, so close the cursor before returning its connection
+        to the pool.
+        """
+        if self._release is None:
+            return
+        with suppress(sqlite3.Error):
+            self.cur.close()
+        self._release()
+        self._release = None
+
+    def _fetch_batches(
+        self, batch_size: int = FETCH_BATCH_SIZE
+    ) -> Iterator[pa.RecordBatch]:
+        """
+        Fetches rows from the sqlite cursor in chunks of batch_size, and
+        converts each chunk to an Arrow record batch, one column at a time.
+        Stops after self._limit rows, if a limit is set.
+        """
+        remaining = self._limit
+        while remaining is None or remaining > 0:
+            size = batch_size if remaining is None else min(batch_size, remaining)
+            rows = self.cur.fetchmany(size)
+            if not rows:
+                break
+            batch = _rows_to_batch(rows, names=self._column_names)
+            self._column_types = [
+                _widest_type(existing, new)
+                for existing, new in zip(self._column_types, batch.schema.types)
+            ]
+            yield batch
+            if remaining is not None:
+                remaining -= len(rows)
+            if len(rows) < size:
+                break
 
 
 class HarlequinSqliteConnection(HarlequinConnection):
-    def __init__(self, conn: sqlite3.Connection, init_message: str = "") -> None:
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        init_message: str = "",
+        read_pool: ReadOnlyConnectionPool | None = None,
+    ) -> None:
         self.conn = conn
         self.init_message = init_message
+        self._read_pool = read_pool
+        self._deferred_cursor: HarlequinSqliteCursor | None = None
+        self._row_counters: set[sqlite3.Connection] = set()
+        self._copiers: set[sqlite3.Connection] = set()
+        self._is_wal = self._get_is_wal()
         self._transaction_modes: list[HarlequinTransactionMode | None] = (
             [
                 HarlequinTransactionMode(label="Auto"),
@@ -96,6 +431,10 @@ class HarlequinSqliteConnection(HarlequinConnection):
         self._sync_connection_transaction_mode()
 
     def execute(self, query: str) -> HarlequinSqliteCursor | None:
+        self._start_deferred_cursor()
+        if (pooled_cursor := self._execute_on_read_pool(query)) is not None:
+            self._deferred_cursor = pooled_cursor
+            return pooled_cursor
         # the behavior on manual mode is really counter-intuitive; if a
         # transaction isn't explicitly began, it's basically the same as
         # auto. By forcing an explicit begin, the behavior is more like
@@ -107,6 +446,9 @@ class HarlequinSqliteConnection(HarlequinConnection):
         ):
             with suppress(sqlite3.Error):
                 self.conn.execute("begin;")
+        if (deferred_cursor := self._defer(self.conn, query)) is not None:
+            self._deferred_cursor = deferred_cursor
+            return deferred_cursor
         try:
             cur = self.conn.execute(query)
         except sqlite3.Error as e:
@@ -121,6 +463,10 @@ class HarlequinSqliteConnection(HarlequinConnection):
                 title="SQLite raised an error when compiling or running your query:",
             ) from e
 
+        if is_pragma_query(query):
+            # the user may have changed the journal mode
+            self._is_wal = self._get_is_wal()
+
         if cur.description is not None:
             return HarlequinSqliteCursor(conn=self, cur=cur)
         else:
@@ -128,18 +474,53 @@ class HarlequinSqliteConnection(HarlequinConnection):
 
     def cancel(self) -> None:
         self.conn.interrupt()
+        if self._read_pool is not None:
+            self._read_pool.interrupt()
 
     def get_catalog(self) -> Catalog:
+        """
+        Builds each database's catalog from a single query that joins
+        sqlite_schema to pragma_table_info, rather than one query per
+        relation. If that query fails (e.g., because a virtual table's
+        module isn't loaded), the database's relations and columns are
+        loaded lazily instead.
+        """
         catalog_items: list[CatalogItem] = []
         databases = self._get_databases()
         for database_label in databases:
-            catalog_items.append(
-                DatabaseCatalogItem.from_label(label=database_label, connection=self)
-            )
+            catalog_items.append(self._load_database(database_label))
+        return Catalog(items=catalog_items)
+
+    def get_catalog_fingerprints(self) -> dict[str, str]:
+        """
+        Uses each database's schema_version, which SQLite increments on
+        every change to its schema.
+        """
+        fingerprints: dict[str, str] = {}
+        for database_label in self._get_databases():
+            with self._read_connection(database_label) as conn:
+                (version,) = conn.execute(
+                    f'pragma "{database_label}".schema_version'
+                ).fetchone()
+            fingerprints[f'"{database_label}"'] = str(version)
+        return fingerprints
+
+    def refresh_catalog(self, catalog: Catalog, changed: set[str]) -> Catalog:
+        """
+        Fetches the changed databases, and reuses the others from catalog.
+        """
+        cached = {item.qualified_identifier: item for item in catalog.items}
+        catalog_items: list[CatalogItem] = []
+        for database_label in self._get_databases():
+            item = cached.get(f'"{database_label}"')
+            if item is None or item.qualified_identifier in changed:
+                item = self._load_database(database_label)
+            catalog_items.append(item)
         return Catalog(items=catalog_items)
 
     def get_completions(self) -> list[HarlequinCompletion]:
-        return get_completion_data(self.conn)
+        with self._read_connection() as conn:
+            return get_completion_data(conn)
 
     @property
     def transaction_mode(self) -> HarlequinTransactionMode | None:
@@ -152,8 +533,102 @@ class HarlequinSqliteConnection(HarlequinConnection):
         return new_mode
 
     def close(self) -> None:
+        if self._read_pool is not None:
+            self._read_pool.close()
         self.conn.close()
 
+    def _execute_on_read_pool(self, query: str) -> HarlequinSqliteCursor | None:
+        """
+        Runs a side-effect-free query on a pooled read-only connection, so it
+        doesn't contend with other work on the primary connection. Returns
+        None if the query must run on the primary instead.
+
+        Queries are only routed to the pool if the primary is not in a
+        transaction (whose uncommitted writes the pool can't see) and if the
+        database is in WAL mode; otherwise a long read on the pool would
+        block writes on the primary. Queries that fail on the pool (e.g.,
+        because they reference a temp table) are retried on the primary.
+        """
+        pool = self._read_pool
+        if pool is None or not self._can_use_read_pool(query):
+            return None
+        if (pooled_conn := pool.acquire()) is None:
+            return None
+        release = partial(pool.release, pooled_conn)
+        if (cursor := self._defer(pooled_conn, query, release)) is not None:
+            return cursor
+        try:
+            cur = pooled_conn.execute(query)
+        except sqlite3.Error:
+            release()
+            return None
+        if cur.description is None:
+            cur.close()
+            release()
+            return None
+        return HarlequinSqliteCursor(conn=self, cur=cur, release=release)
+
+    def _can_use_read_pool(self, query: str) -> bool:
+        return not (
+            self._read_pool is None
+            or not self._is_wal
+            or self.conn.in_transaction
+            or (self.transaction_mode and self.transaction_mode.label == "Manual")
+            or not is_read_only_query(query)
+        )
+
+    def _defer(
+        self,
+        conn: sqlite3.Connection,
+        query: str,
+        release: Callable[[], None] | None = None,
+    ) -> HarlequinSqliteCursor | None:
+        """
+        Compiles a read-only query inside a LIMIT 0 wrapper, which gets the
+        result's columns without running the query, and returns a cursor
+        that will run it later (see HarlequinSqliteCursor). Returns None for
+        queries that can't be wrapped; those are run right away instead.
+        """
+        if not is_read_only_query(query):
+            return None
+        try:
+            cur = conn.execute(_limit_query(query, 0))
+        except sqlite3.Error:
+            return None
+        return HarlequinSqliteCursor(
+            conn=self, cur=cur, release=release, deferred_query=query
+        )
+
+    def _start_deferred_cursor(self) -> None:
+        """
+        Starts the query from the last deferred cursor, so that it runs
+        before any later statement, as it would have without the deferral.
+        Cursors from earlier queries have already been started.
+        """
+        cursor, self._deferred_cursor = self._deferred_cursor, None
+        if cursor is not None:
+            with suppress(sqlite3.Error):
+                cursor._start()
+
+    @contextmanager
+    def _read_connection(self, db_name: str = "main") -> Iterator[sqlite3.Connection]:
+        """
+        Yields a pooled read-only connection that has the database db_name
+        attached, or the primary connection if there isn't one available.
+        """
+        if self._read_pool is None or db_name not in self._read_pool.database_names:
+            yield self.conn
+            return
+        with self._read_pool.connection() as pooled_conn:
+            yield pooled_conn if pooled_conn is not None else self.conn
+
+    def _get_is_wal(self) -> bool:
+        try:
+            (journal_mode,) = self.conn.execute("pragma journal_mode").fetchone()
+        except (sqlite3.Error, TypeError):
+            return False
+        return str(journal_mode).lower() == "wal"
+
     def _sync_connection_transaction_mode(self) -> None:
         if not self._transaction_mode or not hasattr(self.conn, "autocommit"):
             return
@@ -172,17 +647,44 @@ class HarlequinSqliteConnection(HarlequinConnection):
         ).fetchall()
         return [db_name for _, db_name, _ in objects]
 
+    def _load_database(self, db_name: str) -> DatabaseCatalogItem:
+        try:
+            rows = self._get_catalog_rows(db_name)
+        except sqlite3.Error:
+            return DatabaseCatalogItem.from_label(label=db_name, connection=self)
+        return DatabaseCatalogItem.from_rows(label=db_name, connection=self, rows=rows)
+
+    def _get_catalog_rows(
+        self, db_name: str
+    ) -> list[tuple[str, str, str | None, str | None]]:
+        """
+        Returns a row of (relation, relation type, column, column type) for
+        every column of every table and view in the database, ordered by
+        relation and column name.
+        """
+        with self._read_connection(db_name) as conn:
+            return conn.execute(
+                "select m.name, m.type, p.name, p.type "
+                f'from "{db_name}".sqlite_schema as m '
+                "left join pragma_table_info(m.name, ?) as p "
+                "where m.type in ('table', 'view') "
+                "order by m.name, p.name",
+                [db_name],
+            ).fetchall()
+
     def _get_relations(self, db_name: str) -> list[tuple[str, str]]:
-        objects = self.conn.execute(
-            f'select type, name from "{db_name}".sqlite_schema'
-        ).fetchall()
+        with self._read_connection(db_name) as conn:
+            objects = conn.execute(
+                f'select type, name from "{db_name}".sqlite_schema'
+            ).fetchall()
         relations = [(name, typ) for typ, name in objects if typ in ("table", "view")]
         return relations
 
     def _get_columns(self, db_name: str, rel_name: str) -> list[tuple[str, str, str]]:
-        return self.conn.execute(
-            f"pragma {db_name}.table_info('{rel_name}')"
-        ).fetchall()
+        with self._read_connection(db_name) as conn:
+            return conn.execute(
+                f"pragma {db_name}.table_info('{rel_name}')"
+            ).fetchall()
 
     @staticmethod
     def _short_column_type(raw_type: str) -> str:
@@ -214,15 +716,22 @@ class HarlequinSqliteConnection(HarlequinConnection):
         return mapping.get(affinity, "?")
 
     @staticmethod
-    def _short_column_type_from_python_object(obj: object) -> str:
-        mapping: dict[type | None, str] = {
-            None: "",
-            str: "s",
-            float: "#.#",
-            int: "##",
-            object: "b",
-        }
-        return mapping.get(type(obj), "?")
+    def _short_column_type_from_arrow_type(arrow_type: pa.DataType) -> str:
+        if pa.types.is_null(arrow_type):
+            return ""
+        elif pa.types.is_integer(arrow_type):
+            return "##"
+        elif pa.types.is_floating(arrow_type):
+            return "#.#"
+        elif pa.types.is_string(arrow_type):
+            return "s"
+        elif pa.types.is_binary(arrow_type):
+            return "b"
+        elif pa.types.is_date(arrow_type):
+            return "d"
+        elif pa.types.is_timestamp(arrow_type):
+            return "ts"
+        return "?"
 
     @staticmethod
     def _short_relation_type(raw_type: str) -> str:
@@ -232,7 +741,137 @@ class HarlequinSqliteConnection(HarlequinConnection):
     def copy(
         self, query: str, path: Path, format_name: str, options: dict[str, Any]
     ) -> None:
-        raise NotImplementedError
+        """
+        Runs query again, without the results' limit, and streams its records
+        to Arrow's writers in batches (see harlequin.export.write_record_batches),
+        so they are never all held in memory. Copies that run on a pooled
+        read-only connection can be canceled with cancel_copy().
+        """
+        try:
+            cursor = self.execute(query)
+        except HarlequinQueryError as e:
+            raise HarlequinCopyError(e.msg, title=e.title) from e
+        if cursor is None:
+            raise HarlequinCopyError(
+                "Only queries that return records can be exported.",
+                title="Harlequin could not export your query.",
+            )
+        names = unique_column_names(cursor._column_names)
+        reader = _record_batch_reader(
+            cursor.fetch_record_batches(FETCH_BATCH_SIZE), names=names
+        )
+        # like counts, only copies on pooled connections can be canceled
+        conn = cursor.cur.connection
+        if conn is not self.conn:
+            self._copiers.add(conn)
+        try:
+            write_record_batches(reader, path, format_name, options)
+        except HarlequinQueryError as e:
+            raise HarlequinCopyError(e.msg, title=e.title) from e
+        finally:
+            # an interrupted cursor stops fetching without an error, so a copy
+            # that cancel_copy() removed from _copiers was canceled
+            canceled = conn is not self.conn and conn not in self._copiers
+            self._copiers.discard(conn)
+        if canceled:
+            raise HarlequinCopyCanceled(
+                f"The export to {path} was canceled.", title="Export canceled."
+            )
+
+    def cancel_copy(self) -> None:
+        while self._copiers:
+            self._copiers.pop().interrupt()
+
+    def profile(self, query: str) -> QueryProfile:
+        """
+        Builds the plan from EXPLAIN QUERY PLAN. Read-only queries are then
+        run and timed as a whole; other queries are only planned, since
+        running them would modify the database.
+        """
+        self._start_deferred_cursor()
+        try:
+            plan = self.conn.execute(f"explain query plan {query}").fetchall()
+        except sqlite3.Error as e:
+            raise HarlequinQueryError(
+                msg=str(e),
+                title="SQLite raised an error when profiling your query:",
+            ) from e
+        root = ProfileNode(name="QUERY PLAN")
+        nodes: dict[int, ProfileNode] = {0: root}
+        for node_id, parent_id, _, detail in plan:
+            node = ProfileNode(
+                name=str(detail), hot=bool(HOT_PLAN_STEP_PROG.match(str(detail)))
+            )
+            nodes.get(parent_id, root).children.append(node)
+            nodes[node_id] = node
+        if not is_read_only_query(query):
+            return QueryProfile(query_text=query, elapsed=None, root=root)
+        row_count = 0
+        cur = self.conn.cursor()
+        try:
+            start = time.monotonic()
+            cur.execute(query)
+            while rows := cur.fetchmany(FETCH_BATCH_SIZE):
+                row_count += len(rows)
+            elapsed = time.monotonic() - start
+        except sqlite3.Error as e:
+            raise HarlequinQueryError(
+                msg=str(e),
+                title="SQLite raised an error when profiling your query:",
+            ) from e
+        finally:
+            cur.close()
+        root.cardinality = row_count
+        return QueryProfile(
+            query_text=query, elapsed=elapsed, root=root, row_count=row_count
+        )
+
+    def count_rows(self, query: str) -> int:
+        """
+        Counts on a pooled read-only connection if the query could have run
+        on one (see _execute_on_read_pool); otherwise, or if that fails, on
+        the primary. Only read-only queries are counted, since counting runs
+        the query again. Only counts on pooled connections can be canceled;
+        interrupting the primary would also cancel the user's queries.
+        """
+        if not is_read_only_query(query):
+            raise HarlequinQueryError(
+                msg="Only read-only queries can be counted.",
+                title="SQLite could not count your query's records:",
+            )
+        pool = self._read_pool
+        try:
+            if pool is not None and self._can_use_read_pool(query):
+                with pool.connection() as pooled_conn:
+                    if pooled_conn is not None:
+                        self._row_counters.add(pooled_conn)
+                        try:
+                            return self._count_rows_on(pooled_conn, query)
+                        except sqlite3.Error as e:
+                            # retry on the primary unless canceled, e.g.,
+                            # if the query references a temp table
+                            if _is_interrupt(e):
+                                raise
+                        finally:
+                            self._row_counters.discard(pooled_conn)
+            return self._count_rows_on(self.conn, query)
+        except sqlite3.Error as e:
+            raise HarlequinQueryError(
+                msg=str(e),
+                title="SQLite raised an error when counting your query's records:",
+            ) from e
+
+    def _count_rows_on(self, conn: sqlite3.Connection, query: str) -> int:
+        (count,) = conn.execute(_count_query(query)).fetchone()
+        return int(count)
+
+    def cancel_count_rows(self) -> None:
+        """
+        Interrupts counts on pooled connections; counts on the primary
+        connection run to completion.
+        """
+        for conn in list(self._row_counters):
+            conn.interrupt()
 
     def validate_sql(self, text: str) -> str:
         raise NotImplementedError
@@ -255,6 +894,16 @@ class HarlequinSqliteAdapter(HarlequinAdapter):
         isolation_level: Literal["DEFERRED", "EXCLUSIVE", "IMMEDIATE"] = "DEFERRED",
         cached_statements: str | int = 128,
         extension: list[str] | None = None,
+        read_pool_size: str | int = 4,
+        preset: str | None = None,
+        mmap_size: str | int | None = None,
+        cache_size: str | int | None = None,
+        temp_store: Literal["default", "file", "memory"] | None = None,
+        journal_mode: (
+            Literal["delete", "truncate", "persist", "memory", "wal", "off"] | None
+        ) = None,
+        synchronous: Literal["off", "normal", "full", "extra"] | None = None,
+        threads: str | int | None = None,
         **_: Any,
     ) -> None:
         try:
@@ -276,6 +925,16 @@ class HarlequinSqliteAdapter(HarlequinAdapter):
             self.isolation_level = isolation_level
             self.cached_statements = int(cached_statements)
             self.extensions = extension if extension is not None else []
+            self.read_pool_size = int(read_pool_size)
+            self.pragmas = self._get_performance_pragmas(
+                preset=preset,
+                mmap_size=mmap_size,
+                cache_size=cache_size,
+                temp_store=temp_store,
+                journal_mode=journal_mode,
+                synchronous=synchronous,
+                threads=threads,
+            )
             self.can_load_extensions = hasattr(
                 sqlite3.Connection, "enable_load_extension"
             )
@@ -400,6 +1059,15 @@ class HarlequinSqliteAdapter(HarlequinAdapter):
                     str(e), title="SQLite couldn't load your extension."
                 ) from e
 
+        for pragma, value in self.pragmas.items():
+            try:
+                conn.execute(f"pragma {pragma} = {value}")
+            except sqlite3.Error as e:
+                raise HarlequinConnectionError(
+                    f"Could not set {pragma} to {value}:\n{e}",
+                    title="SQLite couldn't apply your performance options.",
+                ) from e
+
         init_msg = ""
         if self.init_path is not None and not self.no_init:
             init_script = self._read_init_script(self.init_path)
@@ -439,7 +1107,92 @@ class HarlequinSqliteAdapter(HarlequinAdapter):
                     f"Executed {count} {'command' if count == 1 else 'commands'} "
                     f"from {self.init_path}"
                 )
-        return HarlequinSqliteConnection(conn=conn, init_message=init_msg)
+        if self.pragmas:
+            pragma_report = self._get_pragma_report(conn)
+            init_msg = f"{init_msg}\n{pragma_report}" if init_msg else pragma_report
+        try:
+            read_pool = ReadOnlyConnectionPool.from_connection(
+                conn,
+                size=self.read_pool_size,
+                timeout=self.timeout,
+                detect_types=self.detect_types,
+                cached_statements=self.cached_statements,
+                extensions=self.extensions,
+                pragmas={
+                    pragma: value
+                    for pragma, value in self.pragmas.items()
+                    if pragma in CONNECTION_PRAGMAS
+                },
+            )
+        except sqlite3.Error:
+            read_pool = None
+        return HarlequinSqliteConnection(
+            conn=conn, init_message=init_msg, read_pool=read_pool
+        )
+
+    @staticmethod
+    def _get_performance_pragmas(
+        preset: str | None, **options: str | int | None
+    ) -> dict[str, str]:
+        """
+        Merges the PRAGMA values of the named preset with the values passed
+        explicitly (which take precedence), and validates them. Returns
+        a dict of PRAGMA names to values, in the order they should be applied.
+        Raises ValueError for bad values.
+        """
+        if preset is not None and preset not in PERFORMANCE_PRESETS:
+            raise ValueError(
+                f"Unknown preset {preset}. Options are: "
+                f"{', '.join(PERFORMANCE_PRESETS)}"
+            )
+        merged: dict[str, str] = (
+            dict(PERFORMANCE_PRESETS[preset]) if preset is not None else {}
+        )
+        merged.update(
+            {
+                pragma: str(value)
+                for pragma, value in options.items()
+                if value is not None and value != ""
+            }
+        )
+        pragmas: dict[str, str] = {}
+        for pragma in PERFORMANCE_PRAGMAS:
+            if (value := merged.get(pragma)) is None:
+                continue
+            if pragma in PRAGMA_CHOICES:
+                value = value.lower()
+                if value not in PRAGMA_CHOICES[pragma]:
+                    raise ValueError(
+                        f"{value} is not a valid value for {pragma}. Options are: "
+                        f"{', '.join(PRAGMA_CHOICES[pragma])}"
+                    )
+            else:
+                value = str(int(value))
+            pragmas[pragma] = value
+        return pragmas
+
+    def _get_pragma_report(self, conn: sqlite3.Connection) -> str:
+        """
+        Reads back the performance PRAGMAs from the connection, since SQLite
+        silently caps or ignores some values (e.g., mmap_size is capped at
+        a compile-time maximum).
+        """
+        effective: list[str] = []
+        for pragma in PERFORMANCE_PRAGMAS:
+            try:
+                row = conn.execute(f"pragma {pragma}").fetchone()
+            except sqlite3.Error:
+                continue
+            if row is None:
+                continue
+            value = str(row[0]).lower()
+            if pragma in ("synchronous", "temp_store") and value.isdigit():
+                value = PRAGMA_CHOICES[pragma][int(value)]
+            requested = self.pragmas.get(pragma)
+            if requested is not None and requested != value:
+                value = f"{value} (requested {requested})"
+            effective.append(f"{pragma}={value}")
+        return f"SQLite PRAGMAs in effect: {', '.join(effective)}"
 
     @staticmethod
     def _read_init_script(init_path: Path) -> str:
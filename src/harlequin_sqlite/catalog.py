@@ -1,7 +1,7 @@
 ﻿from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterable
 
 from harlequin.catalog import InteractiveCatalogItem
 from harlequin_sqlite.interactions import (
@@ -130,22 +130,55 @@ class DatabaseCatalogItem(InteractiveCatalogItem["HarlequinSqliteConnection"]):
     def fetch_children(self) -> list[RelationCatalogItem]:
         if self.connection is None:
             return []
-        children: list[RelationCatalogItem] = []
         result = self.connection._get_relations(self.label)
-        for table_label, table_type in result:
-            if table_type == "view":
-                children.append(
-                    ViewCatalogItem.from_parent(
-                        parent=self,
-                        label=table_label,
-                    )
+        return [
+            relation_class(table_type).from_parent(parent=self, label=table_label)
+            for table_label, table_type in result
+        ]
+
+    @classmethod
+    def from_rows(
+        cls,
+        label: str,
+        connection: "HarlequinSqliteConnection",
+        rows: Iterable[tuple[str, str, str | None, str | None]],
+    ) -> "DatabaseCatalogItem":
+        """
+        Builds a fully-loaded database item, with all of its relations and
+        columns, in a single pass over rows of (relation, relation type,
+        column, column type), as returned by
+        HarlequinSqliteConnection._get_catalog_rows(). The rows must be
+        ordered by relation and column.
+        """
+        database = cls.from_label(label=label, connection=connection)
+        database.loaded = True
+        short_types: dict[str, str] = {}
+        relation: RelationCatalogItem | None = None
+        for rel_label, rel_type, col_label, col_type in rows:
+            if relation is None or relation.label != rel_label:
+                relation = relation_class(rel_type).from_parent(
+                    parent=database, label=rel_label
+                )
+                relation.loaded = True
+                database.children.append(relation)
+            if col_label is None:
+                continue
+            col_type = col_type or ""
+            if (type_label := short_types.get(col_type)) is None:
+                type_label = short_types[col_type] = connection._short_column_type(
+                    col_type
                 )
-            else:
-                children.append(
-                    TableCatalogItem.from_parent(
-                        parent=self,
-                        label=table_label,
-                    )
+            relation.children.append(
+                ColumnCatalogItem.from_parent(
+                    parent=relation, label=col_label, type_label=type_label
                 )
+            )
+        return database
+
 
-        return children
+def relation_class(table_type: str) -> type[RelationCatalogItem]:
+    """
+    Returns the catalog item class for a relation with table_type, as
+    stored in sqlite_schema.
+    """
+    return ViewCatalogItem if table_type == "view" else TableCatalogItem
@@ -9,6 +9,7 @@ from harlequin.options import (
     PathOption,
     SelectOption,
     TextOption,
+    int_validator,
 )
 
 read_only = FlagOption(
@@ -58,17 +59,6 @@ timeout = TextOption(
 )
 
 
-def _int_validator(s: str | None) -> tuple[bool, str]:
-    if s is None:
-        return True, ""
-    try:
-        _ = int(s)
-    except ValueError:
-        return False, f"Cannot convert {s} to an int!"
-    else:
-        return True, ""
-
-
 detect_types = TextOption(
     name="detect-types",
     description=(
@@ -81,7 +71,7 @@ detect_types = TextOption(
         "detect_types parameter is set; str will be returned instead. By default (0), "
         "type detection is disabled."
     ),
-    validator=_int_validator,
+    validator=int_validator,
 )
 
 isolation_level = SelectOption(
@@ -102,7 +92,108 @@ cached_statements = TextOption(
         "The number of statements that sqlite3 should internally cache for this "
         "connection, to avoid parsing overhead. By default, 128 statements."
     ),
-    validator=_int_validator,
+    validator=int_validator,
+)
+
+
+read_pool_size = TextOption(
+    name="read-pool-size",
+    description=(
+        "The maximum number of additional read-only connections to open to the "
+        "database file(s). Catalog queries, completions and, for databases in WAL "
+        "mode, SELECT queries run on these connections, so they do not wait for "
+        "each other. Writes and transactions always use the primary connection. "
+        "Set to 0 to use a single connection. Default 4."
+    ),
+    validator=int_validator,
+)
+
+
+# Values for the performance PRAGMAs applied by each named preset. Options
+# passed explicitly take precedence over the preset's values.
+PERFORMANCE_PRESETS: dict[str, dict[str, str]] = {
+    "analytics-readonly": {
+        "mmap_size": "1073741824",
+        "cache_size": "-262144",
+        "temp_store": "memory",
+        "threads": "4",
+    },
+    "bulk-load": {
+        "journal_mode": "wal",
+        "synchronous": "off",
+        "cache_size": "-524288",
+        "temp_store": "memory",
+    },
+}
+
+preset = SelectOption(
+    name="preset",
+    description=(
+        "Apply a named set of performance PRAGMAs. 'analytics-readonly' memory-maps "
+        "up to 1 GiB of the database, uses a 256 MiB page cache, keeps temp tables "
+        "in memory and allows 4 sorter threads. 'bulk-load' switches the database "
+        "to WAL mode with synchronous=off (fast, but a power loss can corrupt the "
+        "database), uses a 512 MiB page cache and keeps temp tables in memory. "
+        "Other performance options override the values set by the preset."
+    ),
+    choices=list(PERFORMANCE_PRESETS),
+)
+
+mmap_size = TextOption(
+    name="mmap-size",
+    description=(
+        "The maximum number of bytes of the database file(s) that SQLite will "
+        "memory-map (PRAGMA mmap_size). Large values can speed up reads of big "
+        "databases. SQLite may cap this value at its compile-time maximum."
+    ),
+    validator=int_validator,
+)
+
+cache_size = TextOption(
+    name="cache-size",
+    description=(
+        "The size of the page cache (PRAGMA cache_size). Positive values are a "
+        "number of pages; negative values are a size in KiB, e.g., -262144 for "
+        "256 MiB."
+    ),
+    validator=int_validator,
+)
+
+temp_store = SelectOption(
+    name="temp-store",
+    description=(
+        "Where temporary tables and indices are stored (PRAGMA temp_store). "
+        "'memory' avoids writing large sorts to disk."
+    ),
+    choices=["default", "file", "memory"],
+)
+
+journal_mode = SelectOption(
+    name="journal-mode",
+    description=(
+        "The journal mode of the database(s) (PRAGMA journal_mode). In 'wal' "
+        "mode, readers and writers do not block each other. WAL mode is "
+        "persistent, and cannot be set on a read-only database."
+    ),
+    choices=["delete", "truncate", "persist", "memory", "wal", "off"],
+)
+
+synchronous = SelectOption(
+    name="synchronous",
+    description=(
+        "How often SQLite waits for data to be written to disk (PRAGMA "
+        "synchronous). 'normal' is safe in WAL mode; 'off' is fastest."
+    ),
+    choices=["off", "normal", "full", "extra"],
+)
+
+threads = TextOption(
+    name="threads",
+    description=(
+        "The maximum number of auxiliary threads SQLite may use to sort large "
+        "results (PRAGMA threads)."
+    ),
+    validator=int_validator,
 )
 
 
@@ -142,6 +233,14 @@ SQLITE_OPTIONS = [
     timeout,
     detect_types,
     cached_statements,
+    read_pool_size,
+    preset,
+    mmap_size,
+    cache_size,
+    temp_store,
+    journal_mode,
+    synchronous,
+    threads,
 ]
 
 if hasattr(Connection, "enable_load_extension"):
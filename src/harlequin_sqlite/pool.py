@@ -0,0 +1,185 @@
+﻿from __future__ import annotations
+
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager, suppress
+from pathlib import Path
+from typing import Iterator, Sequence
+
+LEADING_COMMENTS_PROG = re.compile(
+    r"^(\s*(--[^\n]*(\n|$)|/\*.*?\*/))*\s*", flags=re.DOTALL
+)
+READ_ONLY_STATEMENT_PROG = re.compile(r"^(select|with|values)\b", flags=re.IGNORECASE)
+PRAGMA_STATEMENT_PROG = re.compile(r"^pragma\b", flags=re.IGNORECASE)
+SIDE_EFFECT_FUNCTIONS = ("load_extension",)
+
+
+def is_read_only_query(query: str) -> bool:
+    """
+    Returns True if the query is a single statement that looks like it
+    only reads data (a SELECT, VALUES, or CTE). This is a cheap heuristic;
+    the pool's connections are opened with mode=ro, so SQLite will refuse
+    any statement that slips through and tries to write.
+    """
+    stripped = LEADING_COMMENTS_PROG.sub("", query, count=1)
+    if not READ_ONLY_STATEMENT_PROG.match(stripped):
+        return False
+    lowered = stripped.lower()
+    return not any(func in lowered for func in SIDE_EFFECT_FUNCTIONS)
+
+
+def is_pragma_query(query: str) -> bool:
+    return bool(PRAGMA_STATEMENT_PROG.match(LEADING_COMMENTS_PROG.sub("", query, 1)))
+
+
+class ReadOnlyConnectionPool:
+    """
+    A small pool of read-only (mode=ro) connections to the same database
+    files as a primary connection. Each pooled connection attaches the same
+    file-backed databases, under the same names, as the primary connection
+    had when the pool was created.
+
+    Connections are opened lazily, up to size. acquire() never blocks: if
+    every connection is in use, it returns None and the caller should use
+    the primary connection instead.
+    """
+
+    def __init__(
+        self,
+        databases: Sequence[tuple[str, str]],
+        size: int,
+        timeout: float = 5.0,
+        detect_types: int = 0,
+        cached_statements: int = 128,
+        extensions: Sequence[str] | None = None,
+        pragmas: dict[str, str] | None = None,
+    ) -> None:
+        self.databases = list(databases)
+        self.database_names = {name for name, _ in self.databases}
+        self.size = size
+        self.timeout = timeout
+        self.detect_types = detect_types
+        self.cached_statements = cached_statements
+        self.extensions = list(extensions) if extensions is not None else []
+        self.pragmas = pragmas if pragmas is not None else {}
+        self._idle: list[sqlite3.Connection] = []
+        self._in_use: set[sqlite3.Connection] = set()
+        self._lock = threading.Lock()
+        self._disabled = False
+
+    @classmethod
+    def from_connection(
+        cls,
+        conn: sqlite3.Connection,
+        size: int,
+        timeout: float = 5.0,
+        detect_types: int = 0,
+        cached_statements: int = 128,
+        extensions: Sequence[str] | None = None,
+        pragmas: dict[str, str] | None = None,
+    ) -> ReadOnlyConnectionPool | None:
+        """
+        Creates a pool that mirrors the databases attached to conn. Returns
+        None if size is zero or if the main database is not backed by a file
+        (e.g., an in-memory database), since other connections can't see it.
+        """
+        if size <= 0:
+            return None
+        databases: list[tuple[str, str]] = [
+            (name, file)
+            for _, name, file in conn.execute("pragma database_list").fetchall()
+            if file and name != "temp"
+        ]
+        if not databases or databases[0][0] != "main":
+            return None
+        return cls(
+            databases=databases,
+            size=size,
+            timeout=timeout,
+            detect_types=detect_types,
+            cached_statements=cached_statements,
+            extensions=extensions,
+            pragmas=pragmas,
+        )
+
+    def acquire(self) -> sqlite3.Connection | None:
+        with self._lock:
+            if self._disabled:
+                return None
+            if self._idle:
+                conn = self._idle.pop()
+            elif len(self._in_use) < self.size:
+                try:
+                    conn = self._open()
+                except sqlite3.Error:
+                    # e.g., a WAL database in a read-only directory without
+                    # a -shm file. Stop trying; the primary will do.
+                    self._disabled = True
+                    return None
+            else:
+                return None
+            self._in_use.add(conn)
+            return conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            self._in_use.discard(conn)
+            if self._disabled:
+                conn.close()
+            else:
+                self._idle.append(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection | None]:
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            if conn is not None:
+                self.release(conn)
+
+    def interrupt(self) -> None:
+        with self._lock:
+            for conn in self._in_use:
+                conn.interrupt()
+
+    def close(self) -> None:
+        with self._lock:
+            self._disabled = True
+            for conn in self._idle:
+                conn.close()
+            self._idle = []
+
+    def _open(self) -> sqlite3.Connection:
+        (_, main_file), *others = self.databases
+        conn = sqlite3.connect(
+            database=self._read_only_uri(main_file),
+            timeout=self.timeout,
+            detect_types=self.detect_types,
+            cached_statements=self.cached_statements,
+            check_same_thread=False,
+            uri=True,
+        )
+        if hasattr(conn, "autocommit"):
+            conn.autocommit = True
+        try:
+            for name, file in others:
+                conn.execute(
+                    f"attach database '{self._read_only_uri(file)}' as \"{name}\""
+                )
+            if self.extensions and hasattr(conn, "enable_load_extension"):
+                conn.enable_load_extension(True)
+                for extension in self.extensions:
+                    conn.load_extension(extension)
+            for pragma, value in self.pragmas.items():
+                conn.execute(f"pragma {pragma} = {value}")
+        except sqlite3.Error:
+            with suppress(sqlite3.Error):
+                conn.close()
+            raise
+        return conn
+
+    @staticmethod
+    def _read_only_uri(file: str) -> str:
+        return f"{Path(file).as_uri()}?mode=ro"
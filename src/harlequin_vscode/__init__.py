@@ -6,11 +6,13 @@ VSCODE_APP_BINDINGS = [
     HarlequinKeyBinding("f2", "focus_query_editor"),
     HarlequinKeyBinding("f5", "focus_results_viewer"),
     HarlequinKeyBinding("f6", "focus_data_catalog"),
+    HarlequinKeyBinding("f7", "profile_query"),
     HarlequinKeyBinding("f8", "show_query_history"),
     HarlequinKeyBinding("ctrl+b,f9", "toggle_sidebar"),
     HarlequinKeyBinding("f10", "toggle_full_screen"),
     HarlequinKeyBinding("ctrl+e", "show_data_exporter"),
     HarlequinKeyBinding("ctrl+r", "refresh_catalog"),
+    HarlequinKeyBinding("ctrl+t", "search_catalog"),
     HarlequinKeyBinding("tab", "focus_next"),
     HarlequinKeyBinding("shift+tab", "focus_previous"),
 ]
@@ -116,11 +118,20 @@ VSCODE_RESULTS_VIEWER_BINDINGS = [
     HarlequinKeyBinding("ctrl+shift+home", "results_viewer.select_table_start"),
     HarlequinKeyBinding("ctrl+shift+end", "results_viewer.select_table_end"),
     HarlequinKeyBinding("ctrl+a", "results_viewer.select_all"),
+    HarlequinKeyBinding("s", "results_viewer.sort_ascending"),
+    HarlequinKeyBinding("S", "results_viewer.sort_descending"),
+    HarlequinKeyBinding("f", "results_viewer.filter"),
+    HarlequinKeyBinding("r", "results_viewer.reset_transforms"),
+    HarlequinKeyBinding("escape", "results_viewer.cancel_transform"),
+    HarlequinKeyBinding("p", "results_viewer.toggle_profile"),
+    HarlequinKeyBinding("d", "results_viewer.diff_tabs"),
+    HarlequinKeyBinding("v", "results_viewer.view_cell"),
 ]
 
 VSCODE_HISTORY_SCREEN_BINDINGS = [
     HarlequinKeyBinding("enter", "history_screen.select_query"),
     HarlequinKeyBinding("escape", "history_screen.cancel"),
+    HarlequinKeyBinding("f7", "history_screen.view_profile"),
 ]
 
 
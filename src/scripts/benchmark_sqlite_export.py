@@ -0,0 +1,88 @@
+﻿import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from harlequin.export import _export_with_duckdb
+from harlequin_duckdb import DuckDbAdapter
+from harlequin_sqlite import HarlequinSqliteAdapter
+from harlequin_sqlite.adapter import FETCH_BATCH_SIZE, _record_batch_reader
+
+# Compares the throughput of the SQLite adapter's copy(), which streams
+# batches to Arrow's writers, with the DuckDB adapter's copy() of the same
+# records, and with streaming SQLite's batches into DuckDB's COPY instead.
+# Usage: python src/scripts/benchmark_sqlite_export.py [number of records]
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+FORMATS = ("csv", "parquet", "json", "feather")
+QUERY = "select * from bench"
+COLUMNS = """
+    i as id,
+    i * 0.5 as amount,
+    'customer ' || (i % 1000) as customer,
+    case when i % 7 = 0 then null else 'note ' || (i % 97) end as note
+"""
+SQLITE_CREATE = f"""
+create table bench as
+with recursive r(i) as (select 0 union all select i + 1 from r where i < {ROWS - 1})
+select {COLUMNS} from r
+"""
+DUCKDB_CREATE = f"""
+create table bench as
+select {COLUMNS} from (select range as i from range({ROWS}))
+"""
+
+
+def timed(label: str, fn: Callable[[], None], path: Path) -> None:
+    start = time.monotonic()
+    fn()
+    elapsed = time.monotonic() - start
+    size = path.stat().st_size
+    print(
+        f"{label:<30}{elapsed:>8.2f}s{ROWS / elapsed:>14,.0f} rows/s"
+        f"{size / elapsed / 1e6:>10.1f} MB/s"
+    )
+
+
+def sqlite_batches_to_duckdb(
+    conn: HarlequinSqliteAdapter, path: Path, format_name: str
+) -> None:
+    cursor = conn.execute(QUERY)
+    assert cursor is not None
+    reader = _record_batch_reader(
+        cursor.fetch_record_batches(FETCH_BATCH_SIZE),
+        names=[name for name, _ in cursor.columns()],
+    )
+    _export_with_duckdb(reader, str(path), format_name=format_name, header=True)
+
+
+with tempfile.TemporaryDirectory() as tmp:
+    tmp_path = Path(tmp)
+    sqlite_conn = HarlequinSqliteAdapter((str(tmp_path / "bench.sqlite"),)).connect()
+    sqlite_conn.execute(SQLITE_CREATE)
+    duckdb_conn = DuckDbAdapter((str(tmp_path / "bench.duckdb"),)).connect()
+    duckdb_conn.execute(DUCKDB_CREATE)
+    print(f"Exporting {ROWS:,} records.")
+    for format_name in FORMATS:
+        print(f"\n{format_name}")
+        sqlite_path = tmp_path / f"sqlite.{format_name}"
+        timed(
+            "sqlite copy()",
+            lambda: sqlite_conn.copy(QUERY, sqlite_path, format_name, {"header": True}),
+            sqlite_path,
+        )
+        duckdb_path = tmp_path / f"duckdb.{format_name}"
+        timed(
+            "duckdb copy()",
+            lambda: duckdb_conn.copy(QUERY, duckdb_path, format_name, {"header": True}),
+            duckdb_path,
+        )
+        if format_name == "feather":
+            continue
+        path = tmp_path / f"sqlite_duckdb.{format_name}"
+        timed(
+            "sqlite batches to duckdb COPY",
+            lambda: sqlite_batches_to_duckdb(sqlite_conn, path, format_name),
+            path,
+        )
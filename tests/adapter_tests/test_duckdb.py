@@ -1,13 +1,22 @@
 from __future__ import annotations
 
 import sys
+import threading
+import time
 from pathlib import Path
+from typing import Any
 
+import duckdb
 import pytest
 
 from harlequin.catalog import Catalog, CatalogItem, InteractiveCatalogItem
-from harlequin.exception import HarlequinConnectionError
-from harlequin_duckdb.adapter import DuckDbAdapter
+from harlequin.exception import (
+    HarlequinConfigError,
+    HarlequinConnectionError,
+    HarlequinCopyError,
+    HarlequinQueryError,
+)
+from harlequin_duckdb.adapter import DuckDbAdapter, DuckDbConnection
 
 
 def test_connect(tiny_duck: Path, small_duck: Path, tmp_path: Path) -> None:
@@ -105,11 +114,9 @@ def test_get_columns(small_duck: Path) -> None:
     ]
 
 
-def test_get_catalog(tiny_duck: Path, small_duck: Path) -> None:
-    conn = DuckDbAdapter(
-        [str(tiny_duck), str(small_duck)], read_only=True, no_init=True
-    ).connect()
-    expected = Catalog(
+@pytest.fixture
+def expected_catalog() -> Catalog:
+    return Catalog(
         items=[
             CatalogItem(
                 qualified_identifier='"small"',
@@ -228,6 +235,77 @@ def test_get_catalog(tiny_duck: Path, small_duck: Path) -> None:
             ),
         ]
     )
+
+
+def _assert_same_tree(items: list[CatalogItem], expected: list[CatalogItem]) -> None:
+    assert [(item.label, item.type_label) for item in items] == [
+        (item.label, item.type_label) for item in expected
+    ]
+    for item, expected_item in zip(items, expected):
+        assert isinstance(item, InteractiveCatalogItem)
+        assert item.loaded
+        _assert_same_tree(item.children, expected_item.children)
+
+
+def test_get_catalog(
+    tiny_duck: Path, small_duck: Path, expected_catalog: Catalog
+) -> None:
+    conn = DuckDbAdapter(
+        [str(tiny_duck), str(small_duck)], read_only=True, no_init=True
+    ).connect()
+    catalog = conn.get_catalog()
+    _assert_same_tree(catalog.items, expected_catalog.items)
+
+
+def test_get_catalog_lazy_columns(
+    tiny_duck: Path,
+    small_duck: Path,
+    expected_catalog: Catalog,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr("harlequin_duckdb.adapter.CATALOG_MAX_BULK_COLUMNS", 1)
+    conn = DuckDbAdapter(
+        [str(tiny_duck), str(small_duck)], read_only=True, no_init=True
+    ).connect()
+    catalog = conn.get_catalog()
+    relations = [
+        relation
+        for database in catalog.items
+        for schema in database.children
+        for relation in schema.children
+    ]
+    expected_relations = [
+        relation
+        for database in expected_catalog.items
+        for schema in database.children
+        for relation in schema.children
+    ]
+    assert [r.qualified_identifier for r in relations] == [
+        r.qualified_identifier for r in expected_relations
+    ]
+    for relation_item, expected_relation in zip(relations, expected_relations):
+        assert isinstance(relation_item, InteractiveCatalogItem)
+        assert not relation_item.loaded
+        assert relation_item.children == []
+        _assert_same_tree(
+            list(relation_item.fetch_children()), expected_relation.children
+        )
+
+
+def test_get_catalog_lazy_fallback(
+    tiny_duck: Path,
+    small_duck: Path,
+    expected_catalog: Catalog,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def fail(*_: Any, **__: Any) -> None:
+        raise duckdb.Error("catalog functions are unavailable")
+
+    monkeypatch.setattr(DuckDbConnection, "_get_catalog_rows", fail)
+    conn = DuckDbAdapter(
+        [str(tiny_duck), str(small_duck)], read_only=True, no_init=True
+    ).connect()
+    expected = expected_catalog
     catalog = conn.get_catalog()
     assert [item.label for item in catalog.items] == [
         item.label for item in expected.items
@@ -257,6 +335,42 @@ def test_get_catalog(tiny_duck: Path, small_duck: Path) -> None:
                 ]
 
 
+def test_refresh_catalog() -> None:
+    conn = DuckDbAdapter([":memory:"], no_init=True).connect()
+    conn.execute("create schema kept")
+    conn.execute("create table kept.a (x int)")
+    conn.execute("create schema altered")
+    conn.execute("create table altered.b (y int)")
+    catalog = conn.get_catalog()
+    fingerprints = conn.get_catalog_fingerprints()
+    assert conn.get_catalog_fingerprints() == fingerprints
+
+    conn.execute("insert into kept.a values (1)")
+    conn.execute("alter table altered.b add column z varchar")
+    conn.execute("create schema added")
+    current = conn.get_catalog_fingerprints()
+    changed = {
+        key
+        for key in current.keys() | fingerprints.keys()
+        if current.get(key) != fingerprints.get(key)
+    }
+    assert changed == {'"memory"."altered"', '"memory"."added"'}
+
+    refreshed = conn.refresh_catalog(catalog, changed)
+    (database,) = refreshed.items
+    assert [schema.label for schema in database.children] == [
+        "added",
+        "altered",
+        "kept",
+        "main",
+    ]
+    added, altered, kept, _ = database.children
+    assert kept is catalog.items[0].children[1]
+    assert kept.parent is database  # type: ignore[attr-defined]
+    assert added.children == []
+    assert [column.label for column in altered.children[0].children] == ["y", "z"]
+
+
 def test_init_script(tiny_duck: Path, tmp_path: Path) -> None:
     script = (
         f".bail on\nselect \n1;\n.bail off\n.open {tiny_duck}\n"
@@ -291,3 +405,329 @@ def test_transaction_mode() -> None:
     assert conn.transaction_mode is None
     assert conn.toggle_transaction_mode() is None
     assert conn.transaction_mode is None
+
+
+def _get_setting(conn: DuckDbConnection, name: str) -> object:
+    return conn.conn.sql(f"select current_setting('{name}')").fetchone()[0]  # type: ignore
+
+
+def test_resource_options(tmp_path: Path) -> None:
+    conn = DuckDbAdapter(
+        (":memory:",),
+        memory_limit="1GB",
+        threads="2",
+        temp_directory=tmp_path,
+        no_preserve_insertion_order=True,
+    ).connect()
+    assert _get_setting(conn, "memory_limit") == "953.6 MiB"
+    assert _get_setting(conn, "threads") == 2
+    assert _get_setting(conn, "temp_directory") == tmp_path.resolve().as_posix()
+    assert _get_setting(conn, "preserve_insertion_order") is False
+
+    with pytest.raises(HarlequinConnectionError):
+        DuckDbAdapter((":memory:",), memory_limit="lots").connect()
+
+    # flags read from a config file may be strings
+    conn = DuckDbAdapter((":memory:",), no_preserve_insertion_order="false").connect()
+    assert _get_setting(conn, "preserve_insertion_order") is True
+    with pytest.raises(HarlequinConfigError):
+        DuckDbAdapter((":memory:",), no_preserve_insertion_order="maybe")
+
+
+def test_settings_directive() -> None:
+    conn = DuckDbAdapter((":memory:",), threads="2").connect()
+    cur = conn.execute(
+        "-- harlequin:set threads=3, memory_limit='500MB'\n"
+        "select current_setting('threads') as t"
+    )
+    assert cur is not None
+    assert _get_setting(conn, "threads") == 3
+    data = cur.fetchall()
+    assert data.to_pylist() == [{"t": 3}]  # type: ignore
+    assert _get_setting(conn, "threads") == 2
+
+    # ddl queries restore settings right away
+    assert conn.execute("-- harlequin:set threads=4\ncreate table foo(a int)") is None
+    assert _get_setting(conn, "threads") == 2
+
+    # directives must be in the header
+    cur = conn.execute("select 1\n-- harlequin:set threads=4")
+    assert cur is not None
+    assert _get_setting(conn, "threads") == 2
+
+    with pytest.raises(HarlequinQueryError):
+        conn.execute("-- harlequin:set not_a_setting=4\nselect 1")
+    assert _get_setting(conn, "threads") == 2
+
+    with pytest.raises(HarlequinQueryError):
+        conn.execute("-- harlequin:set threads=4\nselect * from not_a_table")
+    assert _get_setting(conn, "threads") == 2
+
+
+def test_profile() -> None:
+    conn = DuckDbAdapter((":memory:",)).connect()
+    conn.execute(
+        "create table foo as select range as a, range % 7 as g from range(1000)"
+    )
+    profile = conn.profile("select g, count(*) from foo group by g")
+    assert profile.row_count == 7
+    assert profile.elapsed is not None
+    nodes = list(profile.root.walk())
+    names = [node.name for node in nodes]
+    assert "EXPLAIN_ANALYZE" not in names
+    assert any("GROUP_BY" in name for name in names)
+    assert any(node.cardinality == 1000 for node in nodes)
+    assert all(node.time is not None for node in nodes)
+    assert any(node.hot for node in nodes)
+    shares = [profile.share_of_total(node) or 0.0 for node in nodes]
+    assert sum(shares) == pytest.approx(1.0)
+
+    # profiling is turned off afterward
+    assert _get_setting(conn, "enable_profiling") is None
+    cur = conn.execute("select 1 as a")
+    assert cur is not None
+    assert cur.fetchall().to_pylist() == [{"a": 1}]  # type: ignore
+
+    with pytest.raises(HarlequinQueryError):
+        conn.profile("select * from not_a_table")
+
+    # a profiling setting chosen by the user is kept
+    conn.execute("pragma enable_profiling='query_tree'")
+    conn.profile("select 1")
+    assert _get_setting(conn, "enable_profiling") == "query_tree"
+    conn.execute("pragma disable_profiling")
+
+
+def test_profile_plans_other_statements() -> None:
+    conn = DuckDbAdapter((":memory:",)).connect()
+    conn.execute("create table foo as select range as a from range(10)")
+    profile = conn.profile("delete from foo where a > 4")
+    assert profile.elapsed is None
+    assert profile.row_count is None
+    names = [node.name for node in profile.root.walk()]
+    assert any("DELETE" in name for name in names)
+    assert all(node.time is None for node in profile.root.walk())
+    # the statement was only planned, not run
+    cur = conn.execute("select count(*) as n from foo")
+    assert cur is not None
+    assert cur.fetchall().to_pylist() == [{"n": 10}]  # type: ignore
+
+    with pytest.raises(HarlequinQueryError):
+        conn.profile("delete from not_a_table")
+
+
+def test_fetch_record_batches() -> None:
+    conn = DuckDbAdapter((":memory:",)).connect()
+    cur = conn.execute("select range as a from range(25000)")
+    assert cur is not None
+    batches = list(cur.fetch_record_batches(batch_size=10_000))
+    assert sum(batch.num_rows for batch in batches) == 25_000
+    assert all(batch.num_rows <= 10_000 for batch in batches)
+
+    cur = conn.execute("select range as a from range(25000)")
+    assert cur is not None
+    cur = cur.set_limit(5)
+    assert sum(batch.num_rows for batch in cur.fetch_record_batches()) == 5
+
+    cur = conn.execute("select 'a'::int")
+    assert cur is not None
+    with pytest.raises(HarlequinQueryError):
+        list(cur.fetch_record_batches())
+
+
+def test_count_rows() -> None:
+    conn = DuckDbAdapter((":memory:",)).connect()
+    conn.execute("create table foo as select range as a from range(2500)")
+    assert conn.count_rows("select * from foo -- a trailing comment") == 2500
+    assert conn.count_rows("select * from foo where a < 10;") == 10
+
+    with pytest.raises(HarlequinQueryError):
+        conn.count_rows("select * from not_a_table")
+
+    # canceling with nothing to cancel is a no-op
+    conn.cancel_count_rows()
+    assert conn.count_rows("select 1") == 1
+
+
+def test_fetch_value_checks_preview() -> None:
+    conn = DuckDbAdapter((":memory:",), threads=1).connect()
+    # a GROUP BY doesn't sort its records, so they may come back in a
+    # different order when the query runs again
+    query = (
+        "select g, repeat(g::varchar, 20) as v "
+        "from (select range % 5 as g from range(100)) group by g"
+    )
+    cur = conn.execute(query)
+    assert cur is not None
+    data = cur.set_max_value_length(5).fetchall()
+    assert data is not None
+    previews = [v[:5] for v in data.column(1).to_pylist()]  # type: ignore
+    assert conn.fetch_value(query, row=2, column=1, preview=previews[2]) == (
+        previews[2][0] * 20
+    )
+    with pytest.raises(HarlequinQueryError, match="ORDER BY"):
+        conn.fetch_value(query, row=2, column=1, preview=previews[3])
+    with pytest.raises(HarlequinQueryError, match="ORDER BY"):
+        conn.fetch_value(query, row=2, column=0, preview=previews[2])
+
+
+def test_set_max_value_length() -> None:
+    conn = DuckDbAdapter((":memory:",)).connect()
+    query = (
+        "select repeat('x', 20) as a, 1 as a, repeat('ab', 10)::blob as b, "
+        "'{\"k\": [1, 2, 3]}'::json as j from range(3);"
+    )
+    cur = conn.execute(query)
+    assert cur is not None
+    columns = cur.columns()
+    cur = cur.set_limit(2).set_max_value_length(5)
+    assert cur.columns() == columns
+    assert cur.truncated_columns() == [0, 2, 3]
+    data = cur.fetchall()
+    assert data is not None
+    assert data.num_rows == 2  # type: ignore
+    # values are truncated to one more than the max length
+    assert data.column(0).to_pylist() == ["xxxxxx"] * 2  # type: ignore
+    assert data.column(1).to_pylist() == [1, 1]  # type: ignore
+    assert data.column(2).to_pylist() == [b"ababab"] * 2  # type: ignore
+    assert data.column(3).to_pylist() == ['{"k": '] * 2  # type: ignore
+
+    assert conn.fetch_value(query, row=1, column=0) == "x" * 20
+    assert conn.fetch_value(query, row=1, column=2) == b"ab" * 10
+    assert conn.fetch_value(query, row=1, column=3) == '{"k": [1, 2, 3]}'
+    with pytest.raises(HarlequinQueryError):
+        conn.fetch_value(query, row=3, column=0)
+    assert conn.fetch_value(query, row=1, column=0, preview="xxxxx") == "x" * 20
+    assert conn.fetch_value(query, row=1, column=2, preview=b"ababa") == b"ab" * 10
+
+    cur = conn.execute("select 1 as a")
+    assert cur is not None
+    assert cur.set_max_value_length(5).truncated_columns() == []
+
+
+@pytest.mark.parametrize(
+    "format_name,options",
+    [
+        ("csv", {"header": True, "sep": "|", "compression": "auto", "na_rep": ""}),
+        ("parquet", {"compression": "zstd"}),
+        ("json", {"array": False, "compression": "auto"}),
+        ("orc", {"compression": "ZSTD", "batch_size": "1024"}),
+        ("feather", {"compression": "lz4", "version": "2"}),
+    ],
+)
+def test_copy(tmp_path: Path, format_name: str, options: dict[str, Any]) -> None:
+    import pyarrow.csv as pcsv
+    import pyarrow.feather as pf
+    import pyarrow.json as pjson
+    import pyarrow.orc as po
+    import pyarrow.parquet as pq
+
+    conn = DuckDbAdapter((":memory:",)).connect()
+    # temp tables are visible, and duplicate column names are made unique
+    conn.execute(
+        "create temp table foo as select range as a, range * 2 as a from range(250000)"
+    )
+    path = tmp_path / f"foo.{format_name}"
+    conn.copy("select * from foo;", path, format_name, options)
+    readers = {
+        "csv": lambda p: pcsv.read_csv(
+            p, parse_options=pcsv.ParseOptions(delimiter="|")
+        ),
+        "parquet": pq.read_table,
+        "json": pjson.read_json,
+        "orc": po.read_table,
+        "feather": pf.read_table,
+    }
+    data = readers[format_name](path)
+    assert data.num_rows == 250000
+    assert data.column_names == ["a", "a_1"]
+    assert data.column(1)[-1].as_py() == 2 * 249999
+
+
+def test_cancel_copy(tmp_path: Path) -> None:
+    conn = DuckDbAdapter((":memory:",)).connect()
+    errors: list[HarlequinCopyError] = []
+
+    def copy() -> None:
+        try:
+            # slow, but writes a single record
+            conn.copy(
+                "select sum(range) as s from range(1000000000000)",
+                tmp_path / "sum.csv",
+                "csv",
+                {},
+            )
+        except HarlequinCopyError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=copy)
+    thread.start()
+    time.sleep(0.2)
+    # the copy runs on its own cursor, so it doesn't block other queries, and
+    # canceling it doesn't cancel them
+    cur = conn.execute("select 1 as a")
+    assert cur is not None
+    conn.cancel_copy()
+    assert cur.fetchall().to_pylist() == [{"a": 1}]  # type: ignore
+    thread.join(timeout=10)
+    assert not thread.is_alive()
+    assert len(errors) == 1
+
+    # canceling with nothing to cancel is a no-op
+    conn.cancel_copy()
+    conn.copy("select 1 as a", tmp_path / "one.csv", "csv", {})
+    assert (tmp_path / "one.csv").read_text().splitlines() == ["1"]
+
+
+@pytest.mark.parametrize(
+    "format_name,options,expected_files",
+    [
+        ("parquet", {"partition_by": "b", "row_group_size": "1000"}, 3),
+        ("csv", {"partition_by": "b", "header": True}, 3),
+        ("parquet", {"file_size_bytes": "100KB"}, None),
+        ("csv", {"per_thread_output": True, "header": True}, None),
+    ],
+)
+def test_copy_to_directory(
+    tmp_path: Path,
+    format_name: str,
+    options: dict[str, Any],
+    expected_files: int | None,
+) -> None:
+    import pyarrow.dataset as ds
+
+    conn = DuckDbAdapter((":memory:",)).connect()
+    path = tmp_path / "foo"
+    conn.copy(
+        "select range as a, range % 3 as b from range(100000);",
+        path,
+        format_name,
+        options,
+    )
+    assert path.is_dir()
+    files = [p for p in path.rglob("*") if p.is_file()]
+    if expected_files is None:
+        assert files
+    else:
+        assert len(files) == expected_files
+    data = ds.dataset(path, format=format_name, partitioning="hive").to_table()
+    assert data.num_rows == 100000
+
+
+def test_copy_errors(tmp_path: Path) -> None:
+    conn = DuckDbAdapter((":memory:",)).connect()
+    with pytest.raises(HarlequinCopyError):
+        conn.copy("select * from not_a_table", tmp_path / "foo.csv", "csv", {})
+    with pytest.raises(HarlequinCopyError):
+        conn.copy(
+            "select 1 as a", tmp_path / "foo.feather", "feather", {"version": "1"}
+        )
+    with pytest.raises(HarlequinCopyError):
+        conn.copy("select 1 as a", tmp_path / "no" / "foo.csv", "csv", {})
+    with pytest.raises(HarlequinCopyError):
+        conn.copy(
+            "select 1 as a",
+            tmp_path / "foo",
+            "csv",
+            {"partition_by": "a", "per_thread_output": True},
+        )
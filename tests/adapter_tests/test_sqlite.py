@@ -1,13 +1,24 @@
 from __future__ import annotations
 
+import json
 import sqlite3
 import sys
+import threading
+import time
 from pathlib import Path
+from typing import Any
 
+import pyarrow as pa
 import pytest
 
 from harlequin.catalog import Catalog, CatalogItem, InteractiveCatalogItem
-from harlequin.exception import HarlequinConfigError, HarlequinConnectionError
+from harlequin.exception import (
+    HarlequinConfigError,
+    HarlequinConnectionError,
+    HarlequinCopyCanceled,
+    HarlequinCopyError,
+    HarlequinQueryError,
+)
 from harlequin_sqlite import HarlequinSqliteAdapter
 
 
@@ -79,11 +90,9 @@ def test_get_columns(small_sqlite: Path) -> None:
     ]
 
 
-def test_get_catalog(tiny_sqlite: Path, small_sqlite: Path) -> None:
-    conn = HarlequinSqliteAdapter(
-        [str(tiny_sqlite), str(small_sqlite)], read_only=True
-    ).connect()
-    expected = Catalog(
+@pytest.fixture
+def expected_catalog() -> Catalog:
+    return Catalog(
         items=[
             CatalogItem(
                 qualified_identifier='"main"',
@@ -179,6 +188,46 @@ def test_get_catalog(tiny_sqlite: Path, small_sqlite: Path) -> None:
             ),
         ]
     )
+
+
+def _assert_same_tree(items: list[CatalogItem], expected: list[CatalogItem]) -> None:
+    # the bulk catalog is sorted by label, like the Data Catalog
+    expected = sorted(expected, key=lambda item: item.label)
+    assert [(item.label, item.type_label) for item in items] == [
+        (item.label, item.type_label) for item in expected
+    ]
+    for item, expected_item in zip(items, expected):
+        assert isinstance(item, InteractiveCatalogItem)
+        assert item.loaded
+        _assert_same_tree(item.children, expected_item.children)
+
+
+def test_get_catalog(
+    tiny_sqlite: Path, small_sqlite: Path, expected_catalog: Catalog
+) -> None:
+    conn = HarlequinSqliteAdapter(
+        [str(tiny_sqlite), str(small_sqlite)], read_only=True
+    ).connect()
+    catalog = conn.get_catalog()
+    _assert_same_tree(catalog.items, expected_catalog.items)
+
+
+def test_get_catalog_lazy_fallback(
+    tiny_sqlite: Path,
+    small_sqlite: Path,
+    expected_catalog: Catalog,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def fail(*_: Any, **__: Any) -> None:
+        raise sqlite3.OperationalError("no such module: fts5")
+
+    monkeypatch.setattr(
+        "harlequin_sqlite.adapter.HarlequinSqliteConnection._get_catalog_rows", fail
+    )
+    conn = HarlequinSqliteAdapter(
+        [str(tiny_sqlite), str(small_sqlite)], read_only=True
+    ).connect()
+    expected = expected_catalog
     catalog = conn.get_catalog()
     assert [item.label for item in catalog.items] == [
         item.label for item in expected.items
@@ -208,6 +257,28 @@ def test_get_catalog(tiny_sqlite: Path, small_sqlite: Path) -> None:
                 ]
 
 
+def test_refresh_catalog(tmp_path: Path) -> None:
+    conn = HarlequinSqliteAdapter(
+        [str(tmp_path / "kept.db"), str(tmp_path / "altered.db")]
+    ).connect()
+    conn.execute("create table a (x int)")
+    conn.execute("create table altered.b (y int)")
+    catalog = conn.get_catalog()
+    fingerprints = conn.get_catalog_fingerprints()
+    assert set(fingerprints) == {'"main"', '"altered"'}
+
+    conn.execute("insert into a values (1)")
+    conn.execute("alter table altered.b add column z text")
+    current = conn.get_catalog_fingerprints()
+    assert current['"main"'] == fingerprints['"main"']
+    assert current['"altered"'] != fingerprints['"altered"']
+
+    refreshed = conn.refresh_catalog(catalog, {'"altered"'})
+    main, altered = refreshed.items
+    assert main is catalog.items[0]
+    assert [column.label for column in altered.children[0].children] == ["y", "z"]
+
+
 def test_init_script(tiny_sqlite: Path, tmp_path: Path) -> None:
     script = (
         f".bail on\nselect \n1;\n.bail off\n.open {tiny_sqlite}\n"
@@ -230,7 +301,9 @@ def test_init_script(tiny_sqlite: Path, tmp_path: Path) -> None:
     ).connect()
     cur = conn.execute("select * from test_init")
     assert cur
-    assert cur.fetchall() == [(2,)]
+    data = cur.fetchall()
+    assert isinstance(data, pa.Table)
+    assert data.to_pylist() == [{"2": 2}]
 
 
 def test_rewrite_load(extension_path: Path) -> None:
@@ -283,6 +356,102 @@ def test_limit(small_sqlite: Path) -> None:
     assert len(results) == 100  # type: ignore
 
 
+def test_limit_pushdown(small_sqlite: Path) -> None:
+    conn = HarlequinSqliteAdapter((str(small_sqlite),)).connect()
+    statements: list[str] = []
+    conn.conn.set_trace_callback(statements.append)
+
+    cur = conn.execute("select * from drivers order by dob desc -- newest first")
+    assert cur is not None
+    assert cur.is_deferred
+    results = cur.set_limit(5).fetchall()
+    assert isinstance(results, pa.Table)
+    assert results.num_rows == 5
+    assert statements[-1].endswith(") limit 5")
+
+    # duplicate column names survive the wrapper
+    cur = conn.execute("select 1 as a, 2 as a, 3 as b")
+    assert cur is not None
+    assert [name for name, _ in cur.columns()] == ["a", "a", "b"]
+    results = cur.set_limit(1).fetchall()
+    assert isinstance(results, pa.Table)
+    assert results.column_names == ["a", "a", "b"]
+    conn.close()
+
+
+def test_limit_pushdown_fallback(small_sqlite: Path) -> None:
+    conn = HarlequinSqliteAdapter((str(small_sqlite),)).connect()
+    statements: list[str] = []
+    conn.conn.set_trace_callback(statements.append)
+    # pragmas can't be wrapped in a subquery; the limit is applied on fetch
+    cur = conn.execute("pragma table_info(drivers)")
+    assert cur is not None
+    assert not cur.is_deferred
+    results = cur.set_limit(2).fetchall()
+    assert isinstance(results, pa.Table)
+    assert results.num_rows == 2
+    assert not any("limit" in statement for statement in statements)
+    conn.close()
+
+
+def test_deferred_query_runs_before_next_statement() -> None:
+    conn = HarlequinSqliteAdapter((":memory:",)).connect()
+    statements: list[str] = []
+    conn.conn.set_trace_callback(statements.append)
+    conn.execute("create table foo as select 1 as a")
+    cur = conn.execute("select * from foo")
+    assert cur is not None
+    assert cur.is_deferred
+    conn.execute("create table bar as select 2 as b")
+    assert not cur.is_deferred
+    assert statements.index("select * from foo") < statements.index(
+        "create table bar as select 2 as b"
+    )
+    results = cur.fetchall()
+    assert isinstance(results, pa.Table)
+    assert results.to_pylist() == [{"a": 1}]
+
+    # runtime errors are raised when the results are fetched
+    cur = conn.execute("select json_extract('not json', '$.a')")
+    assert cur is not None
+    with pytest.raises(HarlequinQueryError):
+        cur.fetchall()
+    conn.close()
+
+
+def test_fetchall_infers_types_from_all_rows() -> None:
+    conn = HarlequinSqliteAdapter((":memory:",)).connect()
+    cur = conn.execute(
+        "select * from (values "
+        "(null, 1, 'a', null), (2, 2.5, 3, null), (3, null, x'00', null)"
+        ")"
+    )
+    assert cur
+    data = cur.fetchall()
+    assert isinstance(data, pa.Table)
+    assert data.schema.types == [pa.int64(), pa.float64(), pa.binary(), pa.null()]
+    assert data.column(0).to_pylist() == [None, 2, 3]
+    assert data.column(1).to_pylist() == [1.0, 2.5, None]
+    assert data.column(2).to_pylist() == [b"a", b"3", b"\x00"]
+    assert [col_type for _, col_type in cur.columns()] == ["##", "#.#", "b", ""]
+
+
+def test_fetchall_widens_types_across_batches(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr("harlequin_sqlite.adapter.FETCH_BATCH_SIZE", 2)
+    conn = HarlequinSqliteAdapter((":memory:",)).connect()
+    cur = conn.execute(
+        "select * from (values (null), (1), (2), ('three'), (null))"
+    )
+    assert cur
+    data = cur.fetchall()
+    assert isinstance(data, pa.Table)
+    assert data.schema.types == [pa.string()]
+    assert data.column(0).to_pylist() == [None, "1", "2", "three", None]
+    assert cur.columns() == [("column1", "s")]
+
+
 @pytest.mark.skipif(
     sys.version_info < (3, 12), reason="Transactions only supported on py3.12+"
 )
@@ -301,3 +470,321 @@ def test_transaction_mode() -> None:
     assert conn.transaction_mode.label == "Manual"
     assert conn.toggle_transaction_mode()
     assert conn.transaction_mode.label == "Auto"
+
+
+@pytest.fixture
+def wal_sqlite(tmp_path: Path) -> Path:
+    db_path = tmp_path / "wal.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("pragma journal_mode=wal")
+    conn.execute("create table foo as select 1 as foo_col")
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+def test_read_pool_runs_selects(wal_sqlite: Path) -> None:
+    conn = HarlequinSqliteAdapter((str(wal_sqlite),)).connect()
+    assert conn._read_pool is not None
+    cur = conn.execute("-- a comment\nselect * from foo")
+    assert cur is not None
+    assert cur.cur.connection is not conn.conn
+    data = cur.fetchall()
+    assert isinstance(data, pa.Table)
+    assert data.to_pylist() == [{"foo_col": 1}]
+    # the pooled connection was returned after the fetch
+    assert not conn._read_pool._in_use
+
+    # writes, temp objects, and catalog queries still work
+    assert conn.execute("insert into foo values (2)") is None
+    assert conn.execute("create temp table bar as select 3 as bar_col") is None
+    cur = conn.execute("select * from bar")
+    assert cur is not None
+    assert cur.cur.connection is conn.conn
+    assert cur.fetchall().to_pylist() == [{"bar_col": 3}]  # type: ignore
+    cur = conn.execute("select count(*) as n from foo")
+    assert cur is not None
+    assert cur.fetchall().to_pylist() == [{"n": 2}]  # type: ignore
+    assert conn._get_relations("main") == [("foo", "table")]
+    conn.close()
+
+
+def test_read_pool_not_used(tiny_sqlite: Path, wal_sqlite: Path) -> None:
+    conn = HarlequinSqliteAdapter((":memory:",)).connect()
+    assert conn._read_pool is None
+
+    conn = HarlequinSqliteAdapter((str(wal_sqlite),), read_pool_size="0").connect()
+    assert conn._read_pool is None
+
+    # rollback-journal databases only use the pool for the catalog
+    conn = HarlequinSqliteAdapter((str(tiny_sqlite),), read_only=True).connect()
+    assert conn._read_pool is not None
+    cur = conn.execute("select * from foo")
+    assert cur is not None
+    assert cur.cur.connection is conn.conn
+    assert conn._get_relations("main") == [("foo", "table")]
+
+
+def test_performance_pragmas(tmp_path: Path) -> None:
+    db_path = tmp_path / "perf.db"
+    conn = HarlequinSqliteAdapter(
+        (str(db_path),), preset="bulk-load", cache_size="-1024", threads=2
+    ).connect()
+    assert conn.conn.execute("pragma journal_mode").fetchone() == ("wal",)
+    assert conn.conn.execute("pragma synchronous").fetchone() == (0,)
+    assert conn.conn.execute("pragma cache_size").fetchone() == (-1024,)
+    assert conn.conn.execute("pragma temp_store").fetchone() == (2,)
+    assert conn.conn.execute("pragma threads").fetchone() == (2,)
+    assert "SQLite PRAGMAs in effect: journal_mode=wal" in conn.init_message
+    assert "cache_size=-1024," in conn.init_message
+    conn.close()
+
+
+def test_performance_pragmas_report_ignored_values() -> None:
+    conn = HarlequinSqliteAdapter((":memory:",), journal_mode="wal").connect()
+    assert "journal_mode=memory (requested wal)" in conn.init_message
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"preset": "foo"},
+        {"temp_store": "disk"},
+        {"mmap_size": "a lot"},
+    ],
+)
+def test_bad_performance_options(options: dict[str, str]) -> None:
+    with pytest.raises(HarlequinConfigError):
+        HarlequinSqliteAdapter((":memory:",), **options)  # type: ignore[arg-type]
+
+
+def test_performance_pragmas_read_only(tiny_sqlite: Path) -> None:
+    with pytest.raises(HarlequinConnectionError):
+        HarlequinSqliteAdapter(
+            (str(tiny_sqlite),), read_only=True, journal_mode="wal"
+        ).connect()
+    conn = HarlequinSqliteAdapter(
+        (str(tiny_sqlite),), read_only=True, preset="analytics-readonly"
+    ).connect()
+    assert "mmap_size=" in conn.init_message
+    assert conn._read_pool is not None
+    with conn._read_pool.connection() as pooled_conn:
+        assert pooled_conn is not None
+        assert pooled_conn.execute("pragma cache_size").fetchone() == (-262144,)
+
+
+def test_profile() -> None:
+    conn = HarlequinSqliteAdapter((":memory:",)).connect()
+    conn.execute("create table foo as select 1 as a union all select 2")
+    profile = conn.profile("select a, count(*) from foo group by a")
+    assert profile.row_count == 2
+    assert profile.elapsed is not None
+    details = [node.name for node in profile.root.walk()]
+    assert details[0] == "QUERY PLAN"
+    assert "SCAN foo" in details
+    assert all(
+        node.hot for node in profile.root.walk() if node.name.startswith("SCAN")
+    )
+
+    # writes are only planned, not run
+    profile = conn.profile("delete from foo")
+    assert profile.elapsed is None
+    assert profile.row_count is None
+    cur = conn.execute("select count(*) as n from foo")
+    assert cur is not None
+    assert cur.fetchall().to_pylist() == [{"n": 2}]  # type: ignore
+
+    with pytest.raises(HarlequinQueryError):
+        conn.profile("select * from not_a_table")
+    conn.close()
+
+
+def test_fetch_record_batches() -> None:
+    conn = HarlequinSqliteAdapter((":memory:",)).connect()
+    cur = conn.execute(
+        "with recursive c(i) as (select 0 union all select i + 1 from c where i < 24)"
+        " select i from c"
+    )
+    assert cur is not None
+    batches = list(cur.fetch_record_batches(batch_size=10))
+    assert [batch.num_rows for batch in batches] == [10, 10, 5]
+    assert [i for batch in batches for i in batch.column(0).to_pylist()] == list(
+        range(25)
+    )
+
+    cur = conn.execute("select json_extract('not json', '$.a')")
+    assert cur is not None
+    with pytest.raises(HarlequinQueryError):
+        list(cur.fetch_record_batches())
+    conn.close()
+
+
+def test_count_rows(wal_sqlite: Path) -> None:
+    conn = HarlequinSqliteAdapter((str(wal_sqlite),)).connect()
+    assert conn._read_pool is not None
+    conn.execute("insert into foo values (2), (3)")
+    assert conn.count_rows("select * from foo -- a trailing comment") == 3
+    assert not conn._read_pool._in_use
+
+    # temp tables aren't visible to the pool, so they're counted on the primary
+    conn.execute("create temp table bar as select 1 as bar_col")
+    assert conn.count_rows("select * from bar;") == 1
+
+    with pytest.raises(HarlequinQueryError):
+        conn.count_rows("delete from foo")
+    with pytest.raises(HarlequinQueryError):
+        conn.count_rows("select * from not_a_table")
+    assert conn.count_rows("select * from foo") == 3
+    conn.close()
+
+
+@pytest.mark.parametrize("temp", [False, True])
+def test_cancel_count_rows(wal_sqlite: Path, temp: bool) -> None:
+    conn = HarlequinSqliteAdapter((str(wal_sqlite),)).connect()
+    conn.execute("create temp table bar as select 1 as bar_col")
+    # a slow query, which can only run on the primary if it uses a temp table
+    query = (
+        "with recursive c(i) as (select 0 union all select i + 1 from c "
+        "where i < 3000000) "
+        f"select * from c{', bar' if temp else ''}"
+    )
+    results: list[int | Exception] = []
+
+    def count() -> None:
+        try:
+            results.append(conn.count_rows(query))
+        except HarlequinQueryError as e:
+            results.append(e)
+
+    thread = threading.Thread(target=count)
+    thread.start()
+    time.sleep(0.1)
+    conn.cancel_count_rows()
+    thread.join()
+    if temp:
+        # counts on the primary connection aren't interrupted
+        assert results == [3000001]
+    else:
+        assert len(results) == 1 and isinstance(results[0], HarlequinQueryError)
+    assert conn.count_rows("select * from foo") == 1
+    conn.close()
+
+
+def test_cancel_copy(wal_sqlite: Path, tmp_path: Path) -> None:
+    conn = HarlequinSqliteAdapter((str(wal_sqlite),)).connect()
+    errors: list[HarlequinCopyError] = []
+
+    def copy() -> None:
+        try:
+            # slow, but writes no records; runs on a pooled connection
+            conn.copy(
+                "with recursive c(i) as (select 0 union all select i + 1 from c "
+                "where i < 1000000000) select i from c where i < 0",
+                tmp_path / "n.csv",
+                "csv",
+                {},
+            )
+        except HarlequinCopyError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=copy)
+    thread.start()
+    time.sleep(0.2)
+    conn.cancel_copy()
+    thread.join(timeout=10)
+    assert not thread.is_alive()
+    assert len(errors) == 1
+    assert isinstance(errors[0], HarlequinCopyCanceled)
+    # the primary connection wasn't interrupted
+    cur = conn.execute("select * from foo")
+    assert cur is not None
+    assert cur.fetchall().to_pylist() == [{"foo_col": 1}]  # type: ignore
+    conn.close()
+
+
+@pytest.mark.parametrize(
+    "format_name,options",
+    [
+        ("csv", {"header": True, "sep": "|"}),
+        ("csv", {"header": True, "na_rep": "NULL", "compression": "gzip"}),
+        ("parquet", {"compression": "zstd", "row_group_size": "10000"}),
+        ("json", {}),
+        ("json", {"array": True}),
+        ("feather", {}),
+    ],
+)
+def test_copy(tmp_path: Path, format_name: str, options: dict[str, Any]) -> None:
+    import pyarrow.csv as pcsv
+    import pyarrow.feather as pf
+    import pyarrow.json as pjson
+    import pyarrow.parquet as pq
+
+    conn = HarlequinSqliteAdapter((":memory:",)).connect()
+    # temp tables are visible, and duplicate column names are made unique
+    conn.execute(
+        "create temp table foo as with recursive c(i) as "
+        "(select 0 union all select i + 1 from c where i < 24999) "
+        "select i as a, i * 2 as b, nullif(i % 3, 0) as c from c"
+    )
+    path = tmp_path / f"foo.{format_name}"
+    conn.copy("select a, b as a, c from foo;", path, format_name, options)
+    if format_name == "csv":
+        data = pcsv.read_csv(
+            pa.input_stream(str(path), compression=options.get("compression")),
+            parse_options=pcsv.ParseOptions(delimiter=options.get("sep", ",")),
+            convert_options=pcsv.ConvertOptions(null_values=["", "NULL"]),
+        )
+    elif format_name == "json" and options.get("array"):
+        records = json.loads(path.read_text())
+        data = pa.Table.from_pylist(records)
+    elif format_name == "json":
+        data = pjson.read_json(path)
+    elif format_name == "parquet":
+        data = pq.read_table(path)
+        assert pq.ParquetFile(path).metadata.num_row_groups == 3
+    else:
+        data = pf.read_table(path)
+    assert data.num_rows == 25000
+    assert data.column_names == ["a", "a_0", "c"]
+    assert data.column(1)[-1].as_py() == 2 * 24999
+    assert data.column(2).null_count == 8334
+
+
+def test_copy_widens_types(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    import pyarrow.parquet as pq
+
+    monkeypatch.setattr("harlequin_sqlite.adapter.FETCH_BATCH_SIZE", 2)
+    conn = HarlequinSqliteAdapter((":memory:",)).connect()
+    path = tmp_path / "foo.parquet"
+    # the first batch has no types, so batches are read ahead
+    conn.copy(
+        "select * from (values (null, null), (null, null), (1, null), (2.5, null))",
+        path,
+        "parquet",
+        {},
+    )
+    data = pq.read_table(path)
+    assert data.schema.types == [pa.float64(), pa.string()]
+    assert data.column(0).to_pylist() == [None, None, 1.0, 2.5]
+
+    monkeypatch.setattr("harlequin_sqlite.adapter.EXPORT_READ_AHEAD_ROWS", 2)
+    with pytest.raises(HarlequinCopyError):
+        conn.copy(
+            "select * from (values (1), (2), ('three'), (4))", path, "parquet", {}
+        )
+
+
+def test_copy_errors(tmp_path: Path) -> None:
+    conn = HarlequinSqliteAdapter((":memory:",)).connect()
+    with pytest.raises(HarlequinCopyError):
+        conn.copy("select * from not_a_table", tmp_path / "foo.csv", "csv", {})
+    with pytest.raises(HarlequinCopyError):
+        conn.copy("create table foo (a int)", tmp_path / "foo.csv", "csv", {})
+    with pytest.raises(HarlequinCopyError):
+        conn.copy("select 1 as a", tmp_path / "no" / "foo.csv", "csv", {})
+    with pytest.raises(HarlequinCopyError):
+        conn.copy("select 1 as a", tmp_path / "foo.csv", "csv", {"quotechar": "'"})
+    with pytest.raises(HarlequinCopyError):
+        conn.copy("select 1 as a", tmp_path / "foo", "csv", {"partition_by": "a"})
@@ -9,6 +9,7 @@ from textual.message import Message
 from harlequin import Harlequin
 from harlequin.app import QueriesExecuted, QuerySubmitted, ResultsFetched
 from harlequin.components import ErrorModal
+from harlequin.components.profile_screen import ProfileScreen
 
 
 def transaction_button_visible(app: Harlequin) -> bool:
@@ -344,3 +345,70 @@ async def test_rich_markup(
         await wait_for_workers(app)
         await pilot.pause()
         assert await app_snapshot(app, "select markup")
+
+
+@pytest.mark.asyncio
+async def test_profile_query(
+    app: Harlequin,
+    wait_for_workers: Callable[[Harlequin], Awaitable[None]],
+) -> None:
+    async with app.run_test() as pilot:
+        await wait_for_workers(app)
+        while app.editor is None:
+            await pilot.pause()
+        app.editor.text = "select range % 3 as g, count(*) from range(100) group by 1"
+        await pilot.press("f7")
+        await pilot.pause()
+        await wait_for_workers(app)
+        await pilot.pause()
+
+        assert isinstance(app.screen, ProfileScreen)
+        assert app.screen.profile.row_count == 3
+        assert app.history is not None
+        *_, last = app.history
+        assert last.profile is app.screen.profile
+        assert last.result_row_count == 3
+
+        await pilot.press("escape")
+        await pilot.pause()
+        assert len(app.screen_stack) == 1
+
+        # errors are shown in a modal
+        app.editor.text = "select * from not_a_table"
+        await pilot.press("f7")
+        await pilot.pause()
+        await wait_for_workers(app)
+        await pilot.pause()
+        assert isinstance(app.screen, ErrorModal)
+
+
+@pytest.mark.asyncio
+async def test_count_limited_rows(
+    app: Harlequin,
+    wait_for_workers: Callable[[Harlequin], Awaitable[None]],
+) -> None:
+    async with app.run_test() as pilot:
+        await wait_for_workers(app)
+        while app.editor is None:
+            await pilot.pause()
+        app.run_query_bar.limit_input.value = "10"
+        await pilot.pause()
+        assert app.run_query_bar.limit_value == 10
+        app.editor.text = "select 1 as a; select * from range(2500)"
+        app.editor.focus()
+        await pilot.press("ctrl+a")
+        await pilot.press("ctrl+j")
+        await pilot.pause()
+        await wait_for_workers(app)
+        await pilot.pause()
+
+        # only the limited query is counted
+        first = app.results_viewer._get_table(1)
+        second = app.results_viewer._get_table(2)
+        assert first is not None and second is not None
+        assert first.query_row_count is None
+        assert second.source_row_count == 10
+        assert second.query_row_count == 2500
+        app.results_viewer.action_switch_tab(1)
+        await pilot.pause()
+        assert "Showing 10 of 2,500 Records" in app.results_viewer.border_title
@@ -1,11 +1,13 @@
 import pickle
 from pathlib import Path
-from typing import List
+from typing import Any, List, Set
 
 import pytest
 from textual.widgets.text_area import Selection
 
 from harlequin import Harlequin
+from harlequin.catalog import Catalog
+from harlequin.catalog_cache import get_catalog_cache, update_catalog_cache
 from harlequin.editor_cache import (
     BufferState,
     Cache,
@@ -41,6 +43,9 @@ def cache(buffer_states: List[BufferState]) -> Cache:
 @pytest.fixture(autouse=True)
 def mock_user_cache_dir(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Path:
     monkeypatch.setattr("harlequin.editor_cache.user_cache_dir", lambda **_: tmp_path)
+    monkeypatch.setattr(
+        "harlequin.catalog_cache.user_cache_dir", lambda **_: tmp_path / "catalog"
+    )
     return tmp_path
 
 
@@ -92,3 +97,59 @@ async def test_harlequin_writes_cache(app: Harlequin) -> None:
         cache = pickle.load(f)
     assert isinstance(cache, Cache)
     assert [buffer.text for buffer in cache.buffers] == ["first", "second"]
+
+
+@pytest.mark.use_cache
+@pytest.mark.asyncio
+@pytest.mark.parametrize("stale", [False, True])
+async def test_harlequin_loads_catalog_cache(
+    app_small_duck: Harlequin, monkeypatch: pytest.MonkeyPatch, stale: bool
+) -> None:
+    app = app_small_duck
+    connection = app.adapter.connect()
+    fingerprints = connection.get_catalog_fingerprints()
+    if stale:
+        fingerprints['"small"."main"'] = "stale"
+    update_catalog_cache(
+        connection_hash="small",
+        catalog=connection.get_catalog(),
+        s3_tree=None,
+        history=None,
+        fingerprints=fingerprints,
+    )
+    connection.close()
+
+    refreshed: List[Set[str]] = []
+
+    def no_get_catalog(*_: Any) -> Catalog:
+        raise AssertionError("the cached catalog should be shown")
+
+    def record_refresh(self: Any, catalog: Catalog, changed: Set[str]) -> Catalog:
+        refreshed.append(changed)
+        return catalog
+
+    monkeypatch.setattr(
+        "harlequin_duckdb.adapter.DuckDbConnection.get_catalog", no_get_catalog
+    )
+    monkeypatch.setattr(
+        "harlequin_duckdb.adapter.DuckDbConnection.refresh_catalog", record_refresh
+    )
+    async with app.run_test() as pilot:
+        while app.catalog is None or any(
+            worker.group == "schema_updaters" and not worker.is_finished
+            for worker in app.workers
+        ):
+            await pilot.pause()
+        assert [item.label for item in app.catalog.items] == ["small"]
+        assert [item.label for item in app.catalog.items[0].children] == [
+            "empty",
+            "main",
+        ]
+        assert app.catalog.items[0].connection is app.connection  # type: ignore
+        assert refreshed == ([{'"small"."main"'}] if stale else [])
+
+        await pilot.press("ctrl+q")
+    cache = get_catalog_cache()
+    assert cache is not None
+    assert cache.get_db("small") is not None
+    assert cache.get_fingerprints("small") == connection.get_catalog_fingerprints()
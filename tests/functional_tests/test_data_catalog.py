@@ -286,3 +286,41 @@ async def test_context_menu(
         snap_results.append(await app_snapshot(app, "table context menu expanded"))
 
         assert all(snap_results)
+
+
+@pytest.mark.asyncio
+async def test_search_catalog(
+    app_multi_duck: Harlequin,
+    wait_for_workers: Callable[[Harlequin], Awaitable[None]],
+) -> None:
+    app = app_multi_duck
+    async with app.run_test(size=(120, 36)) as pilot:
+        await wait_for_workers(app)
+        while app.editor is None or app.catalog_index is None:
+            await pilot.pause()
+        tree = app.data_catalog.database_tree
+        assert all(not node.is_expanded for node in tree.root.children)
+
+        await pilot.press("ctrl+t")
+        await pilot.pause()
+        assert app.screen.id == "catalog_search_screen"
+        for key in "drivers dob":
+            await pilot.press(key if key != " " else "space")
+        await pilot.pause()
+        await pilot.press("enter")
+        await pilot.pause()
+
+        assert app.screen.id != "catalog_search_screen"
+        assert tree.has_focus
+        assert tree.cursor_node is not None
+        assert tree.cursor_node.data is not None
+        assert (
+            tree.cursor_node.data.qualified_identifier
+            == '"small"."main"."drivers"."dob"'
+        )
+        # only the path to the column is expanded
+        small, tiny = tree.root.children
+        assert small.is_expanded and not tiny.is_expanded
+        empty, main = small.children
+        assert main.is_expanded and not empty.is_expanded
+        assert main.children[0].is_expanded
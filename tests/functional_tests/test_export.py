@@ -1,11 +1,16 @@
 import sys
+import time
 from pathlib import Path
-from typing import Awaitable, Callable, List
+from typing import Any, Awaitable, Callable, List
 
 import pytest
+from textual.widgets import Input, Switch
 
 from harlequin import Harlequin
-from harlequin.components import ExportScreen
+from harlequin.components import ErrorModal, ExportScreen
+from harlequin.components.confirm_modal import ConfirmModal
+from harlequin.components.export_progress import ExportProgressToast
+from harlequin.export import ExportProgress
 
 
 def transaction_button_visible(app: Harlequin) -> bool:
@@ -86,3 +91,204 @@ async def test_export(
 
         if not transaction_button_visible(app):
             assert all(snap_results)
+
+
+@pytest.mark.asyncio
+async def test_export_full_query(
+    app: Harlequin,
+    tmp_path: Path,
+    wait_for_workers: Callable[[Harlequin], Awaitable[None]],
+) -> None:
+    async with app.run_test(size=(120, 36)) as pilot:
+        await wait_for_workers(app)
+        while app.editor is None:
+            await pilot.pause()
+        app.run_query_bar.limit_input.value = "10"
+        await pilot.pause()
+        app.editor.text = "select range as a from range(2500);"
+        await pilot.press("ctrl+j")
+        await wait_for_workers(app)
+        await pilot.pause()
+        table = app.results_viewer.get_visible_table()
+        assert table is not None
+        assert table.source_row_count == 10
+
+        for full_query, expected_rows in [(False, 10), (True, 2500)]:
+            await pilot.press("ctrl+e")
+            await pilot.pause()
+            screen = app.screen
+            assert isinstance(screen, ExportScreen)
+            export_path = tmp_path / f"full-{full_query}.csv"
+            screen.file_input.value = str(export_path)
+            screen.query_one("#full_query", Switch).value = full_query
+            await pilot.pause()
+            await pilot.press("enter")
+            await wait_for_workers(app)
+            await pilot.pause()
+
+            assert len(app.screen_stack) == 1
+            with export_path.open("r") as f:
+                lines = f.readlines()
+            assert lines[0] == "a\n"
+            assert len(lines) == expected_rows + 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("cancel_with", ["click", "confirm"])
+async def test_cancel_export(
+    app: Harlequin,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    wait_for_workers: Callable[[Harlequin], Awaitable[None]],
+    cancel_with: str,
+) -> None:
+    def slow_copy(path: Path, progress: ExportProgress, **_: Any) -> None:
+        path.write_text("a\n0\n")
+        while not progress.canceled:
+            time.sleep(0.01)
+
+    monkeypatch.setattr("harlequin.components.export_screen.copy", slow_copy)
+    async with app.run_test(size=(120, 36)) as pilot:
+        await wait_for_workers(app)
+        while app.editor is None:
+            await pilot.pause()
+        app.editor.text = "select range as a from range(2500);"
+        await pilot.press("ctrl+j")
+        await wait_for_workers(app)
+        await pilot.pause()
+
+        await pilot.press("ctrl+e")
+        await pilot.pause()
+        screen = app.screen
+        assert isinstance(screen, ExportScreen)
+        export_path = tmp_path / "canceled.csv"
+        screen.file_input.value = str(export_path)
+        await pilot.pause()
+        await pilot.press("enter")
+        while not export_path.exists():
+            await pilot.pause()
+        assert app.export_progress is not None
+        assert len(app.query(ExportProgressToast)) == 1
+
+        if cancel_with == "click":
+            await pilot.click("#export_progress_message")
+        else:
+            await pilot.press("ctrl+e")
+            await pilot.pause()
+            assert isinstance(app.screen, ConfirmModal)
+            await pilot.click("#yes")
+        await wait_for_workers(app)
+        await pilot.pause()
+
+        assert app.export_progress is None
+        assert len(app.query(ExportProgressToast)) == 0
+        assert len(app.screen_stack) == 1
+        assert not export_path.exists()
+
+
+@pytest.mark.asyncio
+async def test_export_partitioned(
+    app: Harlequin,
+    tmp_path: Path,
+    wait_for_workers: Callable[[Harlequin], Awaitable[None]],
+) -> None:
+    import pyarrow.dataset as ds
+
+    async with app.run_test(size=(120, 36)) as pilot:
+        await wait_for_workers(app)
+        while app.editor is None:
+            await pilot.pause()
+        app.editor.text = "select range as a, range % 3 as b from range(2500);"
+        await pilot.press("ctrl+j")
+        await wait_for_workers(app)
+        await pilot.pause()
+
+        await pilot.press("ctrl+e")
+        await pilot.pause()
+        screen = app.screen
+        assert isinstance(screen, ExportScreen)
+        export_path = tmp_path / "parts"
+        screen.file_input.value = str(export_path)
+        screen.format_select.value = "parquet"
+        await pilot.pause()
+
+        screen.query_one("#partition_by", Input).value = "b, c"
+        screen.query_one("#per_thread_output", Switch).value = True
+        await pilot.pause()
+        screen.export_button.press()
+        await pilot.pause()
+        assert isinstance(app.screen, ErrorModal)
+        error = str(app.screen.error)
+        assert "Per-Thread Output" in error
+        assert "'c'" in error
+        await pilot.press("space")
+        await pilot.pause()
+
+        assert app.screen is screen
+        screen.query_one("#partition_by", Input).value = "b"
+        screen.query_one("#per_thread_output", Switch).value = False
+        await pilot.pause()
+        screen.export_button.press()
+        await wait_for_workers(app)
+        await pilot.pause()
+
+        assert len(app.screen_stack) == 1
+        assert sorted(p.name for p in export_path.iterdir()) == ["b=0", "b=1", "b=2"]
+        data = ds.dataset(export_path, format="parquet", partitioning="hive")
+        assert data.count_rows() == 2500
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("full_query", [False, True])
+async def test_export_to_many(
+    app: Harlequin,
+    tmp_path: Path,
+    wait_for_workers: Callable[[Harlequin], Awaitable[None]],
+    full_query: bool,
+) -> None:
+    import pyarrow.csv as pcsv
+    import pyarrow.parquet as pq
+
+    async with app.run_test(size=(120, 36)) as pilot:
+        await wait_for_workers(app)
+        while app.editor is None:
+            await pilot.pause()
+        app.editor.text = "select range as a from range(2500);"
+        await pilot.press("ctrl+j")
+        await wait_for_workers(app)
+        await pilot.pause()
+
+        await pilot.press("ctrl+e")
+        await pilot.pause()
+        screen = app.screen
+        assert isinstance(screen, ExportScreen)
+        screen.query_one("#full_query", Switch).value = full_query
+        parquet_path = tmp_path / "many.parquet"
+        screen.file_input.value = str(parquet_path)
+        screen.format_select.value = "parquet"
+        await pilot.pause()
+        screen.query_one("#add_destination").press()
+        await pilot.pause()
+        assert screen.destinations[0].path == parquet_path
+        assert screen.file_input.value == ""
+
+        # the same path can't be added twice
+        screen.file_input.value = str(parquet_path)
+        await pilot.pause()
+        screen.export_button.press()
+        await pilot.pause()
+        assert isinstance(app.screen, ErrorModal)
+        await pilot.press("space")
+        await pilot.pause()
+
+        csv_path = tmp_path / "many.csv"
+        screen.file_input.value = str(csv_path)
+        screen.format_select.value = "csv"
+        await pilot.pause()
+        screen.export_button.press()
+        await wait_for_workers(app)
+        await pilot.pause()
+
+        assert len(app.screen_stack) == 1
+        assert pq.read_table(parquet_path).num_rows == 2500
+        assert pcsv.read_csv(csv_path).num_rows == 2500
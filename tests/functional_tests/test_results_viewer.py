@@ -6,11 +6,18 @@ from typing import Awaitable, Callable
 from unittest.mock import MagicMock
 
 import pytest
+from rich.console import Console, RenderableType
+from textual.coordinate import Coordinate
 from textual.message import Message
+from textual.widgets import TextArea
 from textual_fastdatatable import DataTable
 
 from harlequin import Harlequin
-from harlequin.components.results_viewer import ResultsViewer
+from harlequin.cell_formatting import MAX_CELL_VALUE_LENGTH
+from harlequin.components.cell_value_screen import CellValueScreen
+from harlequin.components.column_profile import ColumnProfilePanel
+from harlequin.components.results_viewer import ResultsTable, ResultsViewer
+from harlequin.results_memory import format_byte_size
 
 
 def transaction_button_visible(app: Harlequin) -> bool:
@@ -148,3 +155,473 @@ async def test_infinity_timestamp(
         ]
 
         assert await app_snapshot(app, "hover over truncated value")
+
+
+@pytest.mark.asyncio
+async def test_sort_and_filter(
+    app: Harlequin,
+    wait_for_workers: Callable[[Harlequin], Awaitable[None]],
+) -> None:
+    query = "select * from (values (2, 'b'), (3, 'c'), (1, 'a')) as t(id, name)"
+    async with app.run_test() as pilot:
+        await wait_for_workers(app)
+        while app.editor is None:
+            await pilot.pause()
+        app.editor.text = query
+        await pilot.press("ctrl+j")
+        await wait_for_workers(app)
+        await pilot.pause()
+        await wait_for_workers(app)
+        await pilot.pause()
+        assert app.results_viewer._has_focus_within
+        table = app.results_viewer.get_visible_table()
+        assert table is not None
+
+        await pilot.press("s")
+        await wait_for_workers(app)
+        await pilot.pause()
+        table = app.results_viewer.get_visible_table()
+        assert table is not None
+        assert table.has_focus
+        assert list(table.get_column_at(0)) == [1, 2, 3]
+        assert "Sorted by id asc" in str(app.results_viewer.border_title)
+
+        await pilot.press("S")
+        await wait_for_workers(app)
+        await pilot.pause()
+        table = app.results_viewer.get_visible_table()
+        assert table is not None
+        assert list(table.get_column_at(0)) == [3, 2, 1]
+
+        await pilot.press("f")
+        await pilot.pause()
+        await pilot.press(*"id < 3", "enter")
+        await wait_for_workers(app)
+        await pilot.pause()
+        table = app.results_viewer.get_visible_table()
+        assert table is not None
+        assert list(table.get_column_at(0)) == [2, 1]
+        assert table.source_row_count == 2
+        assert "Filtered" in str(app.results_viewer.border_title)
+
+        await pilot.press("r")
+        await pilot.pause()
+        table = app.results_viewer.get_visible_table()
+        assert table is not None
+        assert list(table.get_column_at(0)) == [2, 3, 1]
+        assert not table.is_transformed
+
+
+@pytest.mark.asyncio
+async def test_column_profile(
+    app: Harlequin,
+    wait_for_workers: Callable[[Harlequin], Awaitable[None]],
+) -> None:
+    query = "select * from (values (2, 'b'), (3, 'c'), (1, null)) as t(id, name)"
+    async with app.run_test() as pilot:
+        await wait_for_workers(app)
+        while app.editor is None:
+            await pilot.pause()
+        app.editor.text = query
+        await pilot.press("ctrl+j")
+        await wait_for_workers(app)
+        await pilot.pause()
+        await wait_for_workers(app)
+        await pilot.pause()
+        table = app.results_viewer.get_visible_table()
+        assert table is not None
+
+        await pilot.press("p")
+        await pilot.pause()
+        await wait_for_workers(app)
+        await pilot.pause()
+        assert app.results_viewer.query(ColumnProfilePanel)
+        assert sorted(table.column_profiles) == [0, 1]
+        assert table.column_profiles[1].null_count == 1
+
+        # filtering invalidates the cached profiles
+        await pilot.press("f")
+        await pilot.pause()
+        await pilot.press(*"id > 1", "enter")
+        await wait_for_workers(app)
+        await pilot.pause()
+        await wait_for_workers(app)
+        await pilot.pause()
+        table = app.results_viewer.get_visible_table()
+        assert table is not None
+        assert table.column_profiles[1].null_count == 0
+
+        await pilot.press("p")
+        await pilot.pause()
+        assert not app.results_viewer.query(ColumnProfilePanel)
+
+
+@pytest.mark.asyncio
+async def test_diff_tabs(
+    app: Harlequin,
+    wait_for_workers: Callable[[Harlequin], Awaitable[None]],
+) -> None:
+    query = (
+        "select * from (values (1, 'a'), (2, 'b'), (3, 'c')) as t(id, name);\n"
+        "select * from (values (2, 'b'), (3, 'z'), (4, 'd')) as t(id, name);"
+    )
+    async with app.run_test() as pilot:
+        await wait_for_workers(app)
+        while app.editor is None:
+            await pilot.pause()
+        app.editor.text = query
+        await pilot.press("ctrl+a")
+        await pilot.press("ctrl+j")
+        await wait_for_workers(app)
+        await pilot.pause()
+        await wait_for_workers(app)
+        await pilot.pause()
+        assert app.results_viewer.tab_count == 2
+
+        await pilot.press("d")
+        await pilot.pause()
+        await pilot.press(*"id", "enter")
+        await wait_for_workers(app)
+        await pilot.pause()
+        await wait_for_workers(app)
+        await pilot.pause()
+
+        assert app.results_viewer.tab_count == 3
+        table = app.results_viewer.get_visible_table()
+        assert table is not None
+        assert table.plain_column_labels == [
+            "change_type",
+            "id",
+            "name (1)",
+            "name (2)",
+        ]
+        assert list(table.get_column_at(0)) == ["removed", "changed", "added"]
+
+
+@pytest.mark.asyncio
+async def test_lazy_tabs(
+    app: Harlequin,
+    wait_for_workers: Callable[[Harlequin], Awaitable[None]],
+) -> None:
+    async with app.run_test() as pilot:
+        await wait_for_workers(app)
+        while app.editor is None:
+            await pilot.pause()
+        app.editor.text = "select 1 as a; select 2 as b; select 3 as c"
+        await pilot.press("ctrl+a")
+        await pilot.press("ctrl+j")
+        await wait_for_workers(app)
+        await pilot.pause()
+        await wait_for_workers(app)
+        await pilot.pause()
+
+        viewer = app.results_viewer
+        assert viewer.tab_count == 3
+        # only the visible tab has a mounted table
+        assert len(viewer.query(ResultsTable)) == 1
+        assert app.focused == viewer.get_visible_table()
+        assert app.history is not None
+        assert [q.result_row_count for q in app.history][-3:] == [1, 1, 1]
+
+        # pending tables can still be read, e.g., to diff them
+        pending = viewer._get_table(3)
+        assert pending is not None
+        assert pending.plain_column_labels == ["c"]
+        assert not pending.is_mounted
+
+        await pilot.press("k")
+        await pilot.pause()
+        assert viewer.active == "result-2"
+        table = viewer.get_visible_table()
+        assert table is not None
+        assert table.plain_column_labels == ["b"]
+        assert app.focused == table
+        assert len(viewer.query(ResultsTable)) == 2
+        assert not viewer.query_one("#result-2").query(".results-placeholder")
+
+
+@pytest.mark.asyncio
+async def test_resize_keeps_column_widths(
+    app: Harlequin,
+    wait_for_workers: Callable[[Harlequin], Awaitable[None]],
+) -> None:
+    async with app.run_test(size=(120, 36)) as pilot:
+        await wait_for_workers(app)
+        while app.editor is None:
+            await pilot.pause()
+        app.editor.text = "select repeat('x', 300) as a; select 1 as b"
+        await pilot.press("ctrl+a")
+        await pilot.press("ctrl+j")
+        await wait_for_workers(app)
+        await pilot.pause()
+        await wait_for_workers(app)
+        await pilot.pause()
+
+        viewer = app.results_viewer
+        table = viewer.get_visible_table()
+        pending = viewer._get_table(2)
+        assert table is not None and pending is not None
+        assert table.max_column_content_width == viewer.max_col_width
+        content_widths = table.backend.column_content_widths  # type: ignore
+        assert content_widths == [300]
+        column_width = table.ordered_columns[0].render_width
+
+        await pilot.resize_terminal(200, 36)
+        await pilot.pause()
+        assert viewer.max_col_width > column_width
+        # every tab gets the new max width, but the content isn't re-measured
+        assert table.max_column_content_width == viewer.max_col_width
+        assert pending.max_column_content_width == viewer.max_col_width
+        assert table.backend.column_content_widths is content_widths  # type: ignore
+        assert table.ordered_columns[0].render_width > column_width
+
+
+def _render_plain(renderable: RenderableType) -> str:
+    console = Console(width=60, color_system=None)
+    with console.capture() as capture:
+        console.print(renderable)
+    return capture.get()
+
+
+@pytest.mark.asyncio
+async def test_block_formatting(
+    app: Harlequin,
+    wait_for_workers: Callable[[Harlequin], Awaitable[None]],
+) -> None:
+    query = """
+        select
+            range as i,
+            range / 7 as f,
+            '2024-01-01 12:34:56.789123'::timestamptz + to_seconds(range) as tz,
+            case when range % 3 = 0 then 'infinity'::timestamp end as inf,
+            case when range % 2 = 0 then {'a': range, 'b': [range]} end as s
+        from range(300)
+        """
+    async with app.run_test(size=(120, 36)) as pilot:
+        await wait_for_workers(app)
+        while app.editor is None:
+            await pilot.pause()
+        app.editor.text = query
+        await pilot.press("ctrl+j")
+        await wait_for_workers(app)
+        await pilot.pause()
+
+        table = app.results_viewer.get_visible_table()
+        assert table is not None
+        assert table._formatted_blocks
+        # blocks are formatted exactly as the table formats each cell
+        for row in (0, 1, 127, 128, 299):
+            for col in range(table.column_count):
+                assert _render_plain(
+                    table._get_cell_renderable(row, col)
+                ) == _render_plain(DataTable._get_cell_renderable(table, row, col))
+
+
+@pytest.mark.asyncio
+async def test_memory_budget_spills_old_tabs(
+    app: Harlequin,
+    wait_for_workers: Callable[[Harlequin], Awaitable[None]],
+) -> None:
+    async with app.run_test() as pilot:
+        await wait_for_workers(app)
+        while app.editor is None:
+            await pilot.pause()
+        viewer = app.results_viewer
+        # each result is about 80 KB
+        viewer.memory_budget = 100_000
+        app.editor.text = ";\n".join(
+            f"select range as c{i} from range(10000)" for i in range(3)
+        )
+        await pilot.press("ctrl+a")
+        await pilot.press("ctrl+j")
+        await wait_for_workers(app)
+        await pilot.pause()
+        await wait_for_workers(app)
+        await pilot.pause()
+
+        assert viewer.tab_count == 3
+        visible = viewer.get_visible_table()
+        tables = [table for _, table in viewer._all_tables()]
+        assert len(tables) == 3
+        assert visible is not None and visible is tables[0]
+        # the visible table stays in memory; the others are read from disk
+        size = visible.nbytes
+        assert 80_000 <= size < 100_000
+        assert [t.nbytes for t in tables] == [size, 0, 0]
+        assert viewer.memory_usage == size
+        assert str(viewer.border_subtitle) == (
+            f"Memory: {format_byte_size(size)} of 100.0 KB | "
+            f"Disk: {format_byte_size(sum(t.spilled_nbytes for t in tables[1:]))}"
+        )
+        spilled = tables[2]
+        assert all(path.exists() for path in spilled.spill_paths)
+        assert spilled.original_data is not None
+        assert spilled.original_data["c2"][9_999].as_py() == 9_999
+
+        await pilot.press("j")
+        await pilot.pause()
+        assert viewer.get_visible_table() is spilled
+        assert "9" in _render_plain(spilled._get_cell_renderable(9, 0))
+
+        paths = spilled.spill_paths
+        viewer.clear_all_tables()
+        assert not any(path.exists() for path in paths)
+
+
+@pytest.mark.asyncio
+async def test_memory_budget_drops_tabs_that_cannot_spill(
+    app: Harlequin,
+    wait_for_workers: Callable[[Harlequin], Awaitable[None]],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def fail(*_: object) -> None:
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr("harlequin.components.results_viewer.spill_to_disk", fail)
+    async with app.run_test() as pilot:
+        await wait_for_workers(app)
+        while app.editor is None:
+            await pilot.pause()
+        viewer = app.results_viewer
+        viewer.memory_budget = 100_000
+        app.editor.text = (
+            "select range as a from range(10000); select range as b from range(10000)"
+        )
+        await pilot.press("ctrl+a")
+        await pilot.press("ctrl+j")
+        await wait_for_workers(app)
+        await pilot.pause()
+        await wait_for_workers(app)
+        await pilot.pause()
+
+        assert viewer.tab_count == 2
+        visible = viewer.get_visible_table()
+        assert visible is not None and visible is viewer._get_table(1)
+        assert viewer._get_table(2) is None
+        assert str(viewer.border_subtitle) == (
+            f"Memory: {format_byte_size(visible.nbytes)} of 100.0 KB"
+        )
+        await pilot.press("j")
+        await pilot.pause()
+        placeholder = viewer.query_one("#result-2").query_one(".results-placeholder")
+        assert "Run the query again" in str(placeholder.render())
+
+
+@pytest.mark.asyncio
+async def test_view_truncated_cell(
+    app: Harlequin,
+    wait_for_workers: Callable[[Harlequin], Awaitable[None]],
+) -> None:
+    long_length = MAX_CELL_VALUE_LENGTH * 2
+    query = (
+        "select range as id, "
+        f"case when range = 1 then repeat('y', {long_length}) else 'short' end as body "
+        "from range(3)"
+    )
+    async with app.run_test() as pilot:
+        await wait_for_workers(app)
+        while app.editor is None:
+            await pilot.pause()
+        app.editor.text = query
+        await pilot.press("ctrl+j")
+        await wait_for_workers(app)
+        await pilot.pause()
+        await wait_for_workers(app)
+        await pilot.pause()
+        table = app.results_viewer.get_visible_table()
+        assert table is not None
+        # the long value is truncated by the adapter
+        assert table.truncated_columns == {1}
+        assert len(table.get_cell_at(Coordinate(1, 1))) == MAX_CELL_VALUE_LENGTH + 1
+        assert table.has_truncated_values
+
+        # sorted and filtered rows still find their record in the query's results
+        await pilot.press("S")
+        await wait_for_workers(app)
+        await pilot.pause()
+        table = app.results_viewer.get_visible_table()
+        assert table is not None
+        assert list(table.get_column_at(0)) == [2, 1, 0]
+        assert table.row_locator(1) == 1
+        assert table.is_truncated(1, 1)
+        assert not table.is_truncated(0, 1)
+
+        await pilot.press("down", "right", "v")
+        await wait_for_workers(app)
+        await pilot.pause()
+        screen = app.screen
+        assert isinstance(screen, CellValueScreen)
+        assert screen.query_one(TextArea).text == "y" * long_length
+        await pilot.press("escape")
+        await pilot.pause()
+        assert not isinstance(app.screen, CellValueScreen)
+
+        # values that aren't truncated are shown without querying again
+        await pilot.press("up", "v")
+        await pilot.pause()
+        screen = app.screen
+        assert isinstance(screen, CellValueScreen)
+        assert screen.query_one(TextArea).text == "short"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("export_instead", [False, True])
+async def test_copy_large_selection(
+    app: Harlequin,
+    monkeypatch: pytest.MonkeyPatch,
+    wait_for_workers: Callable[[Harlequin], Awaitable[None]],
+    export_instead: bool,
+) -> None:
+    from harlequin.components import ExportScreen
+    from harlequin.components.confirm_modal import ConfirmModal
+
+    monkeypatch.setattr("harlequin.app.CLIPBOARD_WORKER_CELLS", 100)
+    monkeypatch.setattr("harlequin.app.CLIPBOARD_CONFIRM_CELLS", 1_000)
+    async with app.run_test() as pilot:
+        await wait_for_workers(app)
+        while app.editor is None:
+            await pilot.pause()
+        app.editor.text = (
+            "select range as a, 'x' || range as b, "
+            "case when range % 2 = 0 then [range] end as c from range(400)"
+        )
+        await pilot.press("ctrl+j")
+        await wait_for_workers(app)
+        await pilot.pause()
+        table = app.results_viewer.get_visible_table()
+        assert table is not None
+        assert app.editor.text_input is not None
+
+        # 200 cells are copied by a worker
+        table.focus()
+        table.cursor_type = "range"
+        table.selection_anchor_coordinate = Coordinate(1, 0)
+        table.cursor_coordinate = Coordinate(100, 1)
+        await pilot.pause()
+        table.action_copy_selection()
+        await pilot.pause()
+        await wait_for_workers(app)
+        await pilot.pause()
+        lines = app.editor.text_input.clipboard.splitlines()
+        assert len(lines) == 100
+        assert lines[0] == "1\tx1"
+        assert lines[-1] == "100\tx100"
+
+        # 1,200 cells ask to export instead
+        table.action_select_all()
+        await pilot.pause()
+        table.action_copy_selection()
+        await pilot.pause()
+        assert isinstance(app.screen, ConfirmModal)
+        await pilot.click("#yes" if export_instead else "#no")
+        await pilot.pause()
+        await wait_for_workers(app)
+        await pilot.pause()
+        if export_instead:
+            assert isinstance(app.screen, ExportScreen)
+        else:
+            assert len(app.screen_stack) == 1
+            lines = app.editor.text_input.clipboard.splitlines()
+            assert len(lines) == 400
+            assert lines[0] == "0\tx0\t[0]"
+            assert lines[1] == "1\tx1\t"
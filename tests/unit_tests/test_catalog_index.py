@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import pytest
+
+from harlequin.catalog import Catalog, CatalogItem
+from harlequin.catalog_index import CatalogIndex
+
+
+def _item(
+    parent: str, label: str, type_label: str, children: list[CatalogItem] | None = None
+) -> CatalogItem:
+    qualified_identifier = f'{parent}."{label}"' if parent else f'"{label}"'
+    return CatalogItem(
+        qualified_identifier=qualified_identifier,
+        query_name=f'"{label}"',
+        label=label,
+        type_label=type_label,
+        children=children or [],
+    )
+
+
+def _table(parent: str, label: str, columns: list[str]) -> CatalogItem:
+    table = _item(parent, label, "t")
+    table.children = [
+        _item(table.qualified_identifier, column, "#") for column in columns
+    ]
+    return table
+
+
+@pytest.fixture
+def index() -> CatalogIndex:
+    sales = _item('"db"', "sales", "sch")
+    sales.children = [
+        _table(sales.qualified_identifier, "orders", ["id", "customer_id", "total"]),
+        _table(sales.qualified_identifier, "customers", ["id", "name"]),
+        _table(sales.qualified_identifier, "order_items", ["id", "order_id"]),
+    ]
+    hr = _item('"db"', "hr", "sch")
+    hr.children = [
+        _table(hr.qualified_identifier, "employees", ["id", "name", "Orders"]),
+    ]
+    db = _item("", "db", "db", children=[sales, hr])
+    return CatalogIndex(Catalog(items=[db]))
+
+
+def _identifiers(index: CatalogIndex, query: str, limit: int = 50) -> list[str]:
+    return [
+        result.item.qualified_identifier for result in index.search(query, limit=limit)
+    ]
+
+
+def test_catalog_index_len(index: CatalogIndex) -> None:
+    assert len(index) == 17
+
+
+def test_search_ranks_exact_then_prefix_then_contained(index: CatalogIndex) -> None:
+    assert _identifiers(index, "orders") == [
+        '"db"."sales"."orders"',
+        '"db"."hr"."employees"."Orders"',
+    ]
+    # tables rank before columns, then items are in the catalog's order
+    assert _identifiers(index, "order") == [
+        '"db"."sales"."orders"',
+        '"db"."sales"."order_items"',
+        '"db"."sales"."order_items"."order_id"',
+        '"db"."hr"."employees"."Orders"',
+    ]
+    assert _identifiers(index, "STOMER") == [
+        '"db"."sales"."customers"',
+        '"db"."sales"."orders"."customer_id"',
+    ]
+    assert _identifiers(index, "zzz") == []
+    assert _identifiers(index, "  ") == []
+
+
+def test_search_short_terms_match_prefixes(index: CatalogIndex) -> None:
+    assert _identifiers(index, "hr") == ['"db"."hr"']
+    # "id" is contained in customer_id and order_id, but they're only found
+    # by terms of at least three characters
+    assert _identifiers(index, "id") == [
+        '"db"."sales"."orders"."id"',
+        '"db"."sales"."customers"."id"',
+        '"db"."sales"."order_items"."id"',
+        '"db"."hr"."employees"."id"',
+    ]
+    assert _identifiers(index, "_id") == [
+        '"db"."sales"."orders"."customer_id"',
+        '"db"."sales"."order_items"."order_id"',
+    ]
+
+
+@pytest.mark.parametrize(
+    "query,expected",
+    [
+        ("orders.id", ['"db"."sales"."orders"."id"']),
+        ("orders id", ['"db"."sales"."orders"."id"']),
+        ('"orders"."id"', ['"db"."sales"."orders"."id"']),
+        (
+            "sales.order.id",
+            ['"db"."sales"."order_items"."id"', '"db"."sales"."orders"."id"'],
+        ),
+        ("db empl id", ['"db"."hr"."employees"."id"']),
+    ],
+)
+def test_search_qualifiers(
+    index: CatalogIndex, query: str, expected: list[str]
+) -> None:
+    assert sorted(_identifiers(index, query)) == expected
+
+
+def test_search_qualifiers_match_ancestors_only(index: CatalogIndex) -> None:
+    assert _identifiers(index, "hr.name") == ['"db"."hr"."employees"."name"']
+    assert _identifiers(index, "sales hr name") == []
+    assert _identifiers(index, "nope.id") == []
+    # the qualifiers' scopes are reused while the last term changes
+    assert _identifiers(index, "customers n") == ['"db"."sales"."customers"."name"']
+    assert _identifiers(index, "customers na") == ['"db"."sales"."customers"."name"']
+
+
+def test_search_limit_and_path(index: CatalogIndex) -> None:
+    assert len(index.search("id", limit=2)) == 2
+    assert index.search("id", limit=0) == []
+    result = index.search("order_id")[0]
+    assert [item.label for item in result.path] == [
+        "db",
+        "sales",
+        "order_items",
+        "order_id",
+    ]
+    assert result.item is result.path[-1]
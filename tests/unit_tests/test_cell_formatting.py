@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pyarrow as pa
+import pytest
+from rich.console import Console, RenderableType
+from rich.text import Text
+from textual_fastdatatable.formatter import cell_formatter
+
+from harlequin.cell_formatting import format_block, iso_timestamps
+
+VALUES = [
+    datetime(2024, 1, 1, 5, 6, 7, 1234),
+    datetime(1969, 12, 31, 23, 59, 59, 998500),
+    None,
+    datetime(2037, 6, 1),
+]
+
+
+def _render_plain(renderable: RenderableType) -> str:
+    console = Console(width=60, color_system=None)
+    with console.capture() as capture:
+        console.print(renderable)
+    return capture.get()
+
+
+@pytest.mark.parametrize("tz", [None, "UTC", "Asia/Kolkata", "US/Eastern"])
+@pytest.mark.parametrize("unit", ["s", "ms", "us", "ns"])
+def test_iso_timestamps(tz: str | None, unit: str) -> None:
+    arr = pa.array(VALUES, pa.timestamp("us", tz=tz)).cast(
+        pa.timestamp(unit, tz=tz), safe=False
+    )
+    strings = iso_timestamps(arr)
+    assert strings is not None
+    assert strings.to_pylist() == [
+        v.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+        if v is not None
+        else None
+        for v in arr.to_pylist()
+    ]
+
+
+def test_iso_timestamps_falls_back() -> None:
+    # overflows python's datetime
+    arr = pa.array([0, 2**63 - 1], pa.timestamp("us"))
+    assert iso_timestamps(arr) is None
+    # local mean time has an offset with seconds
+    arr = pa.array([datetime(1850, 1, 1)], pa.timestamp("us", tz="Asia/Kolkata"))
+    assert iso_timestamps(arr) is None
+    # daylight saving time after 2037
+    arr = pa.array([datetime(2040, 6, 1)], pa.timestamp("us", tz="US/Eastern"))
+    assert iso_timestamps(arr) is None
+    # Arrow can't find fixed offsets in its timezone database
+    arr = pa.array([datetime(2024, 6, 1)], pa.timestamp("us", tz="+05:30"))
+    assert iso_timestamps(arr) is None
+    # UTC isn't limited to 2037
+    arr = pa.array([datetime(9000, 6, 1)], pa.timestamp("us", tz="UTC"))
+    strings = iso_timestamps(arr)
+    assert strings is not None
+    assert strings.to_pylist() == ["9000-06-01T00:00:00.000Z"]
+    # only nulls
+    strings = iso_timestamps(pa.nulls(3, pa.timestamp("us", tz="UTC")))
+    assert strings is not None
+    assert strings.to_pylist() == [None, None, None]
+
+
+@pytest.mark.parametrize(
+    "arr",
+    [
+        pa.array(VALUES, pa.timestamp("us", tz="UTC")),
+        pa.array([1, None, -12345]),
+        pa.array([{"a": 1}, None, {"a": 2}]),
+        pa.chunked_array([["[b]bold[/b]", None], ["plain"]]),
+        pa.array([timedelta(days=1), None]),
+    ],
+)
+def test_format_block(arr: pa.Array) -> None:
+    null_rep = Text("null")
+    expected = [
+        _render_plain(cell_formatter(v, null_rep=null_rep)) for v in arr.to_pylist()
+    ]
+    assert [_render_plain(c) for c in format_block(arr, None, null_rep)] == expected
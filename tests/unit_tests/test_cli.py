@@ -8,6 +8,7 @@ from click.testing import CliRunner
 from harlequin import Harlequin
 from harlequin.cli import DEFAULT_KEYMAP_NAMES, DEFAULT_LIMIT, DEFAULT_THEME, build_cli
 from harlequin.config import Config
+from harlequin.results_memory import DEFAULT_RESULTS_MEMORY_BUDGET
 from harlequin_duckdb import DUCKDB_OPTIONS, DuckDbAdapter
 from harlequin_sqlite import SQLITE_OPTIONS, HarlequinSqliteAdapter
 
@@ -41,7 +42,7 @@ def mock_sqlite_adapter(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
 @pytest.fixture()
 def mock_harlequin(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
     mock = MagicMock(spec=Harlequin)
-    monkeypatch.setattr("harlequin.cli.Harlequin", mock)
+    monkeypatch.setattr("harlequin.app.Harlequin", mock)
     return mock
 
 
@@ -75,6 +76,8 @@ def test_default(
         adapter=mock_adapter.return_value,
         connection_hash=mock_adapter.return_value.connection_id,
         max_results=DEFAULT_LIMIT,
+        count_rows=True,
+        results_memory_budget=DEFAULT_RESULTS_MEMORY_BUDGET,
         keymap_names=DEFAULT_KEYMAP_NAMES,
         user_defined_keymaps=[],
         theme=DEFAULT_THEME,
@@ -344,3 +347,29 @@ def test_sqlite_extension_not_supported(
     )
     assert res.exit_code == 2
     assert "No such option" in res.stdout
+
+
+def test_headless(
+    mock_harlequin: MagicMock,
+    mock_empty_config: None,
+    tmp_path: Path,
+) -> None:
+    script = tmp_path / "script.sql"
+    script.write_text("create table foo as select 1 as a;\nselect a from foo;")
+    runner = CliRunner()
+    res = runner.invoke(build_cli(), args=[":memory:", "--execute", str(script)])
+    assert res.exit_code == 0
+    assert res.output.splitlines() == ['"a"', "1"]
+    mock_harlequin.assert_not_called()
+
+    res = runner.invoke(
+        build_cli(),
+        args=["--execute", "-", "--output-format", "jsonl", "--limit", "2"],
+        input="select * from range(5) as t(n)",
+    )
+    assert res.exit_code == 0
+    assert res.output.splitlines() == ['{"n": 0}', '{"n": 1}']
+
+    res = runner.invoke(build_cli(), args=["--execute", "-"], input="select 1/")
+    assert res.exit_code == 1
+    mock_harlequin.assert_not_called()
@@ -0,0 +1,87 @@
+import pyarrow as pa
+import pytest
+from textual_fastdatatable.backend import ArrowBackend
+
+from harlequin.column_widths import (
+    INFINITE_TEMPORAL_WIDTH,
+    SampledArrowBackend,
+    create_results_backend,
+    measure_column,
+    sample_indices,
+)
+
+
+@pytest.mark.parametrize("num_rows", [0, 10, 1_000])
+def test_sample_indices_small(num_rows: int) -> None:
+    assert sample_indices(num_rows, sample_size=1_000) is None
+
+
+@pytest.mark.parametrize("num_rows", [1_001, 2_500, 1_000_000])
+def test_sample_indices(num_rows: int) -> None:
+    indices = sample_indices(num_rows, sample_size=1_000)
+    assert indices is not None
+    values = indices.to_pylist()
+    assert len(values) <= 1_000
+    assert values[:500] == list(range(500))
+    assert values == sorted(set(values))
+    assert values[-1] < num_rows
+    # the sample reaches the end of the table
+    assert values[-1] >= num_rows - num_rows // 500
+
+
+def test_sampled_widths_match_for_small_tables() -> None:
+    data = pa.table(
+        {
+            "s": ["a", "bbb", None],
+            "i": [1, -12345, None],
+            "b": [True, False, None],
+            "l": [[1, 2], None, [3]],
+        }
+    )
+    assert (
+        SampledArrowBackend(data).column_content_widths
+        == ArrowBackend(data).column_content_widths
+    )
+
+
+@pytest.mark.parametrize(
+    "arr,expected",
+    [
+        (pa.array([], type=pa.string()), 0),
+        (pa.array([None, None], type=pa.int64()), 0),
+        (pa.array(["a", None, "bbb"]), 3),
+        # wide characters take two cells each
+        (pa.array(["日本語", "abcd"]), 6),
+        (pa.array([1, -12345, None]), 6),
+        (pa.array([True, None]), 7),
+        (pa.array([[1, 2], [3]]), 6),
+        (
+            pa.array([2**63 - 1], type=pa.int64()).cast(pa.timestamp("us")),
+            INFINITE_TEMPORAL_WIDTH,
+        ),
+    ],
+)
+def test_measure_column(arr: pa.Array, expected: int) -> None:
+    assert measure_column(arr) == expected
+    assert measure_column(pa.chunked_array([arr], type=arr.type)) == expected
+
+
+def test_sampled_widths() -> None:
+    n = 10_000
+    strings = ["x"] * n
+    strings[7_777] = "y" * 500
+    ints = list(range(n))
+    ints[7_777] = -(10**12)
+    data = pa.table({"s": strings, "i": ints})
+    backend = SampledArrowBackend(data, sample_size=100)
+    # the long string isn't in the sample, but numbers are measured exactly
+    assert backend.column_content_widths == [1, len(str(-(10**12)))]
+    # widths are cached
+    assert backend.column_content_widths is backend.column_content_widths
+
+
+def test_create_results_backend() -> None:
+    backend = create_results_backend([(1, "a"), (2, "b")], max_rows=1)
+    assert isinstance(backend, SampledArrowBackend)
+    assert backend.row_count == 1
+    assert backend.source_row_count == 2
@@ -0,0 +1,165 @@
+import os
+import time
+from pathlib import Path
+from typing import Iterator
+
+import pyarrow as pa
+import pyarrow.csv as pcsv
+import pyarrow.feather as pf
+import pyarrow.parquet as pq
+import pytest
+
+from harlequin.exception import HarlequinCopyCanceled, HarlequinCopyError
+from harlequin.export import (
+    ExportDestination,
+    ExportProgress,
+    duckdb_copy_options,
+    to_tsv,
+    write_record_batches,
+    write_to_many,
+)
+
+
+def test_export_progress_summary(tmp_path: Path) -> None:
+    path = tmp_path / "out.csv"
+    progress = ExportProgress(path=path, total_rows=2_000)
+    assert progress.bytes_written == 0
+    path.write_bytes(b"x" * 1_500)
+    progress.add_rows(1_000)
+    assert progress.bytes_written == 1_500
+    summary = progress.summary()
+    assert summary.startswith("1,000 of 2,000 records, 1.5 KB (")
+    assert summary.endswith("/s)")
+
+    progress.add_rows(1_000)
+    assert progress.summary().startswith("2,000 records, 1.5 KB (")
+
+
+def test_export_progress_measures_directories(tmp_path: Path) -> None:
+    path = tmp_path / "out"
+    progress = ExportProgress(path=path)
+    (path / "year=2024").mkdir(parents=True)
+    (path / "year=2024" / "data_0.parquet").write_bytes(b"x" * 10)
+    (path / "data_0.parquet").write_bytes(b"x" * 5)
+    assert progress.bytes_written == 15
+    assert progress.summary().startswith("15 B (")
+
+    progress.remove_partial_file()
+    assert not path.exists()
+
+
+@pytest.mark.parametrize("format_name", ["feather", "csv", "parquet", "json"])
+def test_write_record_batches_canceled(tmp_path: Path, format_name: str) -> None:
+    path = tmp_path / f"out.{format_name}"
+    progress = ExportProgress(path=path)
+    batch = pa.record_batch({"a": list(range(100))})
+
+    def batches() -> Iterator[pa.RecordBatch]:
+        yield batch
+        progress.cancel()
+        yield batch
+
+    reader = pa.RecordBatchReader.from_batches(batch.schema, batches())
+    with pytest.raises(HarlequinCopyCanceled):
+        write_record_batches(reader, path, format_name, {}, progress=progress)
+    assert progress.rows_written == 100
+    assert path.exists()
+
+    progress.remove_partial_file()
+    assert not path.exists()
+
+
+def test_remove_partial_file_keeps_untouched_files(tmp_path: Path) -> None:
+    path = tmp_path / "out.csv"
+    path.write_text("a\n1\n")
+    an_hour_ago = time.time() - 3600
+    os.utime(path, (an_hour_ago, an_hour_ago))
+    progress = ExportProgress(path=path)
+    progress.cancel()
+    progress.remove_partial_file()
+    assert path.read_text() == "a\n1\n"
+
+
+def test_duckdb_copy_options() -> None:
+    options = {
+        "compression": "zstd",
+        "row_group_size": "10000",
+        "partition_by": 'year, "month"',
+        "per_thread_output": False,
+        "file_size_bytes": "",
+    }
+    assert duckdb_copy_options("parquet", options) == [
+        "FORMAT PARQUET",
+        "COMPRESSION zstd",
+        "ROW_GROUP_SIZE 10000",
+        'PARTITION_BY ("year", """month""")',
+    ]
+    assert duckdb_copy_options(
+        "csv", {"per_thread_output": True, "file_size_bytes": "1.5MB"}
+    ) == [
+        "FORMAT CSV",
+        "HEADER False",
+        "FILE_SIZE_BYTES 1500000",
+        "PER_THREAD_OUTPUT TRUE",
+    ]
+    with pytest.raises(HarlequinCopyError):
+        duckdb_copy_options("csv", {"file_size_bytes": "lots"})
+
+
+def test_write_to_many(tmp_path: Path) -> None:
+    table = pa.table({"a": list(range(1_000)), "b": [str(i) for i in range(1_000)]})
+    destinations = [
+        ExportDestination(path=tmp_path / "out.parquet", format_name="parquet"),
+        ExportDestination(
+            path=tmp_path / "out.csv", format_name="csv", options={"header": True}
+        ),
+        ExportDestination(path=tmp_path / "out.feather", format_name="feather"),
+    ]
+    progress = ExportProgress(
+        path=destinations[0].path, other_paths=[d.path for d in destinations[1:]]
+    )
+    write_to_many(table.to_reader(max_chunksize=100), destinations, progress)
+    assert progress.rows_written == 1_000
+    assert progress.bytes_written == sum(d.path.stat().st_size for d in destinations)
+    assert pq.read_table(tmp_path / "out.parquet").equals(table)
+    assert pcsv.read_csv(tmp_path / "out.csv").num_rows == 1_000
+    assert pf.read_table(tmp_path / "out.feather").equals(table)
+
+
+def test_write_to_many_errors(tmp_path: Path) -> None:
+    table = pa.table({"a": list(range(1_000))})
+    destinations = [
+        ExportDestination(path=tmp_path / "out.parquet", format_name="parquet"),
+        ExportDestination(path=tmp_path / "missing" / "out.csv", format_name="csv"),
+    ]
+    progress = ExportProgress(
+        path=destinations[0].path, other_paths=[d.path for d in destinations[1:]]
+    )
+    with pytest.raises(HarlequinCopyError):
+        write_to_many(table.to_reader(max_chunksize=100), destinations, progress)
+    progress.remove_partial_file()
+    assert not any(tmp_path.iterdir())
+
+    progress = ExportProgress(path=destinations[0].path)
+
+    def batches() -> Iterator[pa.RecordBatch]:
+        for batch in table.to_batches(max_chunksize=100):
+            yield batch
+            progress.cancel()
+
+    reader = pa.RecordBatchReader.from_batches(table.schema, batches())
+    with pytest.raises(HarlequinCopyCanceled):
+        write_to_many(reader, destinations[:1], progress)
+
+
+def test_to_tsv() -> None:
+    data = pa.table(
+        {
+            "a": [1, None],
+            "b": ["x", "y\tz"],
+            "c": [[1, 2], None],
+        }
+    )
+    # strings are only quoted if one of them must be
+    assert to_tsv(data).split(os.linesep) == ['1\t"x"\t"[1, 2]"', '\t"y\tz"\t']
+    assert to_tsv(data.select(["a", "c"])).split(os.linesep) == ["1\t[1, 2]", "\t"]
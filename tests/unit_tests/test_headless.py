@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pyarrow.parquet as pq
+import pytest
+
+from harlequin.exception import HarlequinCopyError, HarlequinQueryError
+from harlequin.headless import run_headless, split_queries
+from harlequin_duckdb import DuckDbAdapter
+from harlequin_sqlite import HarlequinSqliteAdapter
+
+
+@pytest.mark.parametrize(
+    "text,expected",
+    [
+        ("select 1", ["select 1"]),
+        ("select 1;\nselect 2;", ["select 1", "select 2"]),
+        ("select ';' as a; select \"b;c\"", ["select ';' as a", 'select "b;c"']),
+        ("-- a; comment\nselect 1; -- trailing;", ["-- a; comment\nselect 1"]),
+        ("/* a; b */ select 1;;", ["/* a; b */ select 1"]),
+        ("select 'it''s; fine'", ["select 'it''s; fine'"]),
+        ("  ; -- nothing here", []),
+    ],
+)
+def test_split_queries(text: str, expected: list[str]) -> None:
+    assert split_queries(text) == expected
+
+
+def test_run_headless_csv(tmp_path: Path) -> None:
+    out = tmp_path / "out.csv"
+    rows = run_headless(
+        DuckDbAdapter((":memory:",)),
+        [
+            "create table foo as select range as a from range(25)",
+            "select a from foo where a < 2",
+            "select count(*) as n from foo",
+        ],
+        output_format="csv",
+        output_path=out,
+        batch_size=1,
+    )
+    assert rows == 3
+    assert out.read_text().splitlines() == ['"a"', "0", "1", "", '"n"', "25"]
+
+
+def test_run_headless_jsonl_limit(tmp_path: Path) -> None:
+    out = tmp_path / "out.jsonl"
+    rows = run_headless(
+        HarlequinSqliteAdapter((":memory:",)),
+        ["select 1 as a, 'x' as b union all select 2, null union all select 3, 'z'"],
+        output_format="jsonl",
+        output_path=out,
+        limit=2,
+    )
+    assert rows == 2
+    assert [json.loads(line) for line in out.read_text().splitlines()] == [
+        {"a": 1, "b": "x"},
+        {"a": 2, "b": None},
+    ]
+
+
+def test_run_headless_parquet(tmp_path: Path) -> None:
+    out = tmp_path / "out.parquet"
+    rows = run_headless(
+        HarlequinSqliteAdapter((":memory:",)),
+        [
+            # the type of b widens from null to int64 after the first batch
+            "select 1 as a, null as b union all select 2, 5",
+            "select 'x' as c",
+        ],
+        output_format="parquet",
+        output_path=out,
+        batch_size=1,
+    )
+    assert rows == 3
+    assert pq.read_table(out).to_pylist() == [
+        {"a": 1, "b": None},
+        {"a": 2, "b": 5},
+    ]
+    assert pq.read_table(tmp_path / "out_1.parquet").to_pylist() == [{"c": "x"}]
+
+
+def test_run_headless_errors(tmp_path: Path) -> None:
+    with pytest.raises(HarlequinCopyError):
+        run_headless(DuckDbAdapter((":memory:",)), ["select 1"], "parquet")
+    with pytest.raises(HarlequinQueryError):
+        run_headless(
+            DuckDbAdapter((":memory:",)),
+            ["select * from not_a_table"],
+            output_path=tmp_path / "out.csv",
+        )
+
+
+def test_run_headless_question(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    db = tmp_path / "app.db"
+    conn = DuckDbAdapter((str(db),)).connect()
+    conn.execute("create table users as select 1 as id, 'ann' as name")
+    conn.close()
+
+    rows = run_headless(
+        DuckDbAdapter((str(db),)), [], output_format="jsonl", question="show all users"
+    )
+    assert rows == 1
+    captured = capsys.readouterr()
+    # only the results are written to stdout
+    assert captured.out.splitlines() == ['{"id": 1, "name": "ann"}']
+
+    with pytest.raises(HarlequinQueryError):
+        run_headless(DuckDbAdapter((str(db),)), [], question="show all orders")
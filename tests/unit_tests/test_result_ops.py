@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import pyarrow as pa
+import pytest
+
+from harlequin.exception import HarlequinQueryError
+from harlequin.result_ops import ResultsOperation, unique_column_names
+
+
+@pytest.fixture
+def data() -> pa.Table:
+    return pa.table(
+        {
+            "id": [1, 2, 3, 4],
+            "name": ["b", None, "a", "c"],
+            "amount": [10.5, 3.0, None, 7.25],
+        }
+    )
+
+
+def test_unique_column_names() -> None:
+    assert unique_column_names(["a", "b", "a", "a", "a_0"]) == [
+        "a",
+        "b",
+        "a_0",
+        "a_1",
+        "a_0_0",
+    ]
+
+
+@pytest.mark.parametrize(
+    "order_by,expected_ids",
+    [
+        ([(1, "ascending")], [3, 1, 4, 2]),
+        ([(1, "descending")], [4, 1, 3, 2]),
+        ([(2, "ascending")], [2, 4, 1, 3]),
+        ([(2, "descending")], [1, 4, 2, 3]),
+    ],
+)
+def test_sort(data: pa.Table, order_by: list, expected_ids: list[int]) -> None:
+    op = ResultsOperation()
+    result = op.sort_and_filter(data, order_by=order_by)
+    assert result is not None
+    assert result.schema == data.schema
+    assert result.column("id").to_pylist() == expected_ids
+
+
+def test_filter(data: pa.Table) -> None:
+    op = ResultsOperation()
+    result = op.sort_and_filter(
+        data, order_by=[(0, "descending")], where="amount > 5 and name is not null"
+    )
+    assert result is not None
+    assert result.column("id").to_pylist() == [4, 1]
+
+
+def test_filter_no_rows(data: pa.Table) -> None:
+    op = ResultsOperation()
+    result = op.sort_and_filter(data, where="id > 100")
+    assert result is not None
+    assert result.num_rows == 0
+    assert result.schema == data.schema
+
+
+def test_dupe_column_names() -> None:
+    data = pa.Table.from_arrays(
+        [pa.array([1, 2, 3]), pa.array([3, 1, 2])], names=["a", "a"]
+    )
+    op = ResultsOperation()
+    result = op.sort_and_filter(data, order_by=[(1, "ascending")], where="a_0 < 3")
+    assert result is not None
+    assert result.column_names == ["a", "a"]
+    assert result.columns[0].to_pylist() == [2, 3]
+    assert result.columns[1].to_pylist() == [1, 2]
+
+
+def test_bad_filter_raises(data: pa.Table) -> None:
+    op = ResultsOperation()
+    with pytest.raises(HarlequinQueryError):
+        op.sort_and_filter(data, where="nonexistent_column = 1")
+
+
+def test_canceled_operation_returns_none(data: pa.Table) -> None:
+    op = ResultsOperation()
+    op.cancel()
+    assert op.sort_and_filter(data, where="id = 1") is None
+
+
+def test_profile_columns(data: pa.Table) -> None:
+    op = ResultsOperation()
+    profiles = op.profile_columns(data)
+    assert profiles is not None
+    id_profile, name_profile, amount_profile = profiles
+
+    assert id_profile.name == "id"
+    assert id_profile.row_count == 4
+    assert id_profile.null_count == 0
+    assert id_profile.approx_distinct == 4
+    assert (id_profile.min, id_profile.max) == (1, 4)
+    assert len(id_profile.quantiles) == 3
+    assert len(id_profile.histogram) == 10
+    assert sum(count for _, count in id_profile.histogram) == 4
+
+    assert name_profile.null_count == 1
+    assert (name_profile.min, name_profile.max) == ("a", "c")
+    assert name_profile.quantiles == []
+    assert name_profile.histogram == [("a", 1), ("b", 1), ("c", 1)]
+
+    assert amount_profile.null_count == 1
+    assert sum(count for _, count in amount_profile.histogram) == 3
+
+
+def test_profile_some_columns(data: pa.Table) -> None:
+    op = ResultsOperation()
+    profiles = op.profile_columns(data, columns=[2])
+    assert profiles is not None
+    assert [p.name for p in profiles] == ["amount"]
+
+
+def test_profile_nested_and_null_columns() -> None:
+    data = pa.table({"l": [[1], None, []], "n": pa.nulls(3), "x": [1.0, 1.0, None]})
+    op = ResultsOperation()
+    profiles = op.profile_columns(data)
+    assert profiles is not None
+    nested, nulls, constant = profiles
+    assert nested.null_count == 1
+    assert nested.min is None and nested.histogram == []
+    assert nulls.null_count == 3
+    assert nulls.histogram == []
+    assert constant.histogram == [("1.0", 2)]
+
+
+@pytest.fixture
+def diff_inputs() -> tuple[pa.Table, pa.Table]:
+    left = pa.table(
+        {
+            "id": [1, 2, 3, None],
+            "amount": [1.0, 2.0, 3.0, 4.0],
+            "name": ["x", "y", "z", "w"],
+            "only_left": [1, 1, 1, 1],
+        }
+    )
+    right = pa.table(
+        {
+            "id": [2, 3, 4, None],
+            "amount": [2.0, 3.5, 4.0, 4.0],
+            "name": ["y", "q", "z", "w"],
+        }
+    )
+    return left, right
+
+
+def test_diff_on_keys(diff_inputs: tuple[pa.Table, pa.Table]) -> None:
+    op = ResultsOperation()
+    diff = op.diff(*diff_inputs, key_columns=["id"], labels=("1", "2"))
+    assert diff is not None
+    assert (diff.added, diff.removed, diff.changed) == (1, 1, 1)
+    assert diff.column_changes == {"amount": 1, "name": 1}
+    assert diff.data.column_names == [
+        "change_type",
+        "id",
+        "amount (1)",
+        "amount (2)",
+        "name (1)",
+        "name (2)",
+    ]
+    assert diff.data.column("change_type").to_pylist() == [
+        "removed",
+        "changed",
+        "added",
+    ]
+    assert diff.data.column("id").to_pylist() == [1, 3, 4]
+
+
+def test_diff_full_rows(diff_inputs: tuple[pa.Table, pa.Table]) -> None:
+    op = ResultsOperation()
+    diff = op.diff(*diff_inputs)
+    assert diff is not None
+    assert (diff.added, diff.removed, diff.changed) == (2, 2, 0)
+    assert diff.data.column_names == ["change_type", "id", "amount", "name"]
+
+
+def test_diff_identical() -> None:
+    data = pa.table({"a": [1, 1, 2]})
+    op = ResultsOperation()
+    diff = op.diff(data, data)
+    assert diff is not None
+    assert diff.data.num_rows == 0
+    assert (diff.added, diff.removed) == (0, 0)
+    diff = op.diff(data, pa.table({"a": [1, 2]}))
+    assert diff is not None
+    assert (diff.added, diff.removed) == (0, 1)
+
+
+def test_diff_bad_keys(diff_inputs: tuple[pa.Table, pa.Table]) -> None:
+    op = ResultsOperation()
+    with pytest.raises(HarlequinQueryError):
+        op.diff(*diff_inputs, key_columns=["only_left"])
+
+
+def test_diff_duplicate_keys() -> None:
+    left = pa.table({"id": [1, 2, 3], "name": ["a", "b", "c"]})
+    right = pa.table({"id": [1, 2, 2, None, None], "name": list("abxyz")})
+    op = ResultsOperation()
+    with pytest.raises(HarlequinQueryError, match=r"not unique in results \(2\)"):
+        op.diff(left, right, key_columns=["id"], labels=("1", "2"))
+    with pytest.raises(HarlequinQueryError, match=r"not unique in results \(1\)"):
+        op.diff(right, left, key_columns=["id"], labels=("1", "2"))
+    # a compound key can be unique when its parts are not
+    diff = op.diff(left, right, key_columns=["id", "name"])
+    assert diff is not None
+    assert (diff.added, diff.removed, diff.changed) == (3, 1, 0)
@@ -0,0 +1,56 @@
+from pathlib import Path
+
+import pyarrow as pa
+import pytest
+
+from harlequin.exception import HarlequinConfigError
+from harlequin.results_memory import format_byte_size, parse_byte_size, spill_to_disk
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        (0, 0),
+        (1234, 1234),
+        ("1234", 1234),
+        ("500MB", 500_000_000),
+        ("2 GB", 2_000_000_000),
+        ("1.5kb", 1_500),
+        ("2GiB", 2 * 1024**3),
+        ("64 MiB", 64 * 1024**2),
+        ("1T", 1_000_000_000_000),
+    ],
+)
+def test_parse_byte_size(value: int | str, expected: int) -> None:
+    assert parse_byte_size(value) == expected
+
+
+@pytest.mark.parametrize("value", [-1, "", "lots", "2PB", "-5MB", True])
+def test_parse_byte_size_invalid(value: int | str) -> None:
+    with pytest.raises(HarlequinConfigError):
+        parse_byte_size(value)
+
+
+@pytest.mark.parametrize(
+    "n,expected",
+    [
+        (0, "0 B"),
+        (999, "999 B"),
+        (81_250, "81.2 KB"),
+        (2_000_000_000, "2.0 GB"),
+        (3_500_000_000_000, "3.5 TB"),
+    ],
+)
+def test_format_byte_size(n: int, expected: str) -> None:
+    assert format_byte_size(n) == expected
+
+
+def test_spill_to_disk(tmp_path: Path) -> None:
+    data = pa.table(
+        {"a": pa.array(range(1_000)), "b": pa.array([str(i) for i in range(1_000)])}
+    )
+    path = tmp_path / "results.arrow"
+    spilled = spill_to_disk(data, path)
+    assert path.exists()
+    assert spilled.equals(data)
+    assert spilled is not data